@@ -0,0 +1,59 @@
+"""Benchmark: model cold start, regular converted weights vs a snapshot.
+
+Each repeat loads the model in a fresh interpreter, the way an autoscaled
+worker starts, and reports the time spent importing mlx_audio and the time
+spent in ``load_model`` (including evaluating the parameters).
+
+Usage:
+    python -m mlx_audio.convert --hf-path <repo> --mlx-path model
+    python -m mlx_audio.convert --hf-path <repo> --mlx-path model-snap --snapshot
+    python benchmarks/cold_start.py model model-snap --domain tts --repeats 5
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+
+CHILD = """
+import json, sys, time
+start = time.perf_counter()
+from mlx_audio.{domain}.utils import load_model
+imported = time.perf_counter()
+load_model({path!r})
+loaded = time.perf_counter()
+print(json.dumps({{"import": imported - start, "load": loaded - imported}}))
+"""
+
+
+def cold_start(path: str, domain: str) -> dict:
+    out = subprocess.run(
+        [sys.executable, "-c", CHILD.format(domain=domain, path=path)],
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("models", nargs="+", help="Converted model directories.")
+    parser.add_argument("--domain", choices=["tts", "stt"], default="tts")
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'model':<40} {'import':>9} {'load':>9} {'total':>9}")
+    for path in args.models:
+        cold_start(path, args.domain)  # warm the OS page cache
+        runs = [cold_start(path, args.domain) for _ in range(args.repeats)]
+        imported = statistics.median(r["import"] for r in runs) * 1000
+        loaded = statistics.median(r["load"] for r in runs) * 1000
+        print(
+            f"{path:<40} {imported:>7.0f}ms {loaded:>7.0f}ms "
+            f"{imported + loaded:>7.0f}ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""Micro-benchmark: Kokoro length regulator, dense alignment matmul vs gather.
+
+Usage:
+    python benchmarks/kokoro_alignment.py --tokens 64 256 510 --batch 1 4
+"""
+import argparse
+import time
+
+import mlx.core as mx
+
+from mlx_audio.tts.models.kokoro.kokoro import (
+    alignment_indices,
+    dense_alignment,
+    expand_frames,
+)
+
+
+def loop_alignment(pred_dur: mx.array, n_frames: int) -> mx.array:
+    """The original per-token repeat construction (batch size 1 only)."""
+    indices = mx.concatenate(
+        [mx.repeat(mx.array(i), int(n)) for i, n in enumerate(pred_dur[0])]
+    )
+    aln = mx.zeros((pred_dur.shape[1], n_frames))
+    aln[indices, mx.arange(n_frames)] = 1
+    return aln[None]
+
+
+def timeit(fn, repeats: int) -> float:
+    mx.eval(fn())  # warmup
+    start = time.perf_counter()
+    for _ in range(repeats):
+        mx.eval(fn())
+    return (time.perf_counter() - start) / repeats * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tokens", type=int, nargs="+", default=[64, 256, 510])
+    parser.add_argument("--batch", type=int, nargs="+", default=[1, 4])
+    parser.add_argument("--channels", type=int, default=640)
+    parser.add_argument("--repeats", type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"{'batch':>5} {'tokens':>6} {'frames':>6} {'loop':>9} {'dense':>9} {'gather':>9}")
+    for batch in args.batch:
+        for tokens in args.tokens:
+            pred_dur = mx.random.randint(1, 8, (batch, tokens))
+            n_frames = int(pred_dur.sum(axis=-1).max())
+            # Equal lengths keep the comparison free of padding effects
+            pred_dur = mx.concatenate(
+                [pred_dur[:, :-1], n_frames - pred_dur[:, :-1].sum(-1, keepdims=True)],
+                axis=-1,
+            )
+            x = mx.random.normal((batch, args.channels, tokens))
+            mx.eval(pred_dur, x)
+
+            def dense():
+                return x @ dense_alignment(pred_dur, n_frames)
+
+            def gather():
+                return expand_frames(x, alignment_indices(pred_dur, n_frames))
+
+            assert mx.array_equal(dense(), gather())
+            loop = (
+                f"{timeit(lambda: x @ loop_alignment(pred_dur, n_frames), args.repeats):8.2f}ms"
+                if batch == 1
+                else f"{'-':>9}"
+            )
+            print(
+                f"{batch:>5} {tokens:>6} {n_frames:>6} {loop} "
+                f"{timeit(dense, args.repeats):8.2f}ms {timeit(gather, args.repeats):8.2f}ms"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""Micro-benchmark: shared compiled LSTM scan vs the previous per-step loops.
+
+Times the Kokoro bidirectional LSTM (both directions stacked into one
+recurrence) and a Parakeet-style unidirectional LSTM against the previous
+implementations, counting graph construction and evaluation.
+
+Usage:
+    python benchmarks/lstm.py --seq-lens 32 128 512 --batch 1 4
+"""
+import argparse
+import time
+
+import mlx.core as mx
+import mlx.nn as nn
+
+from mlx_audio.rnn import lstm_input_projection, lstm_scan
+from mlx_audio.tts.models.kokoro.modules import LSTM
+
+
+def legacy_direction(x, Wx, Wh, bias, reverse=False):
+    """The previous Kokoro direction loop: unfused gates, one direction at a time."""
+    x_proj = mx.addmm(bias, x, Wx.T)
+    hidden = mx.zeros((x.shape[0], Wh.shape[1]))
+    cell = mx.zeros((x.shape[0], Wh.shape[1]))
+    all_hidden = []
+    steps = range(x.shape[-2] - 1, -1, -1) if reverse else range(x.shape[-2])
+    for idx in steps:
+        ifgo = x_proj[..., idx, :] + hidden @ Wh.T
+        i, f, g, o = mx.split(ifgo, 4, axis=-1)
+        cell = mx.sigmoid(f) * cell + mx.sigmoid(i) * mx.tanh(g)
+        hidden = mx.sigmoid(o) * mx.tanh(cell)
+        all_hidden.append(hidden)
+    if reverse:
+        all_hidden.reverse()
+    return mx.stack(all_hidden, axis=-2)
+
+
+def legacy_bidirectional(lstm: LSTM, x):
+    forward = legacy_direction(
+        x,
+        lstm.Wx_forward,
+        lstm.Wh_forward,
+        lstm.bias_ih_forward + lstm.bias_hh_forward,
+    )
+    backward = legacy_direction(
+        x,
+        lstm.Wx_backward,
+        lstm.Wh_backward,
+        lstm.bias_ih_backward + lstm.bias_hh_backward,
+        reverse=True,
+    )
+    return mx.concatenate([forward, backward], axis=-1)
+
+
+def timeit(fn, repeats: int) -> float:
+    mx.eval(fn())  # warmup, also traces the compiled cell
+    start = time.perf_counter()
+    for _ in range(repeats):
+        mx.eval(fn())
+    return (time.perf_counter() - start) / repeats * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--seq-lens", type=int, nargs="+", default=[32, 128, 512])
+    parser.add_argument("--batch", type=int, nargs="+", default=[1, 4])
+    parser.add_argument("--input-size", type=int, default=640)
+    parser.add_argument("--hidden-size", type=int, default=256)
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+
+    kokoro = LSTM(args.input_size, args.hidden_size)
+    parakeet = nn.LSTM(args.input_size, args.hidden_size)
+    mx.eval(kokoro.parameters(), parakeet.parameters())
+
+    print(f"{'model':>8} {'batch':>5} {'steps':>5} {'legacy':>10} {'scan':>10} {'speedup':>7}")
+    for batch in args.batch:
+        for seq_len in args.seq_lens:
+            x = mx.random.normal((batch, seq_len, args.input_size))
+            mx.eval(x)
+
+            cases = {
+                "kokoro": (
+                    lambda: legacy_bidirectional(kokoro, x),
+                    lambda: kokoro(x)[0],
+                ),
+                "parakeet": (
+                    lambda: parakeet(x)[0],
+                    lambda: lstm_scan(
+                        lstm_input_projection(x, parakeet.Wx, parakeet.bias),
+                        parakeet.Wh.T,
+                    )[0],
+                ),
+            }
+            for name, (legacy, scan) in cases.items():
+                assert mx.allclose(legacy(), scan(), atol=1e-5)
+                before = timeit(legacy, args.repeats)
+                after = timeit(scan, args.repeats)
+                print(
+                    f"{name:>8} {batch:>5} {seq_len:>5} {before:8.2f}ms "
+                    f"{after:8.2f}ms {before / after:6.2f}x"
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,6 @@
 """MLX-Audio FastAPI 三合一应用 - UI/API/MCP集成"""
 import asyncio
+import inspect
 import io
 import os
 import time
@@ -9,15 +10,18 @@ from typing import Optional
 
 import mlx.core as mx
 import soundfile as sf
-import uvicorn
 from fastapi import FastAPI, File, Form, HTTPException, UploadFile
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import StreamingResponse
+from fastapi.responses import JSONResponse, StreamingResponse
 from fastapi.staticfiles import StaticFiles
 from pydantic import BaseModel
 
 from mlx_audio.config import config
+from mlx_audio.models.executor import ExecutorBusy, model_executor
 from mlx_audio.models.memory_manager import memory_manager
+from mlx_audio.models.scheduler import tts_scheduler
+from mlx_audio.models.stt_engine import stt_engines
+from mlx_audio.stt.utils import decode_audio, model_sample_rate, shutdown_decoder_pool
 from mlx_audio.utils import load_model
 
 
@@ -30,6 +34,7 @@ class SpeechRequest(BaseModel):
     lang_code: str = "a"
     temperature: float = 0.7
     response_format: str = "wav"
+    streaming_interval: float = 0.5  # 流式接口每块音频的秒数
     blended_voice: Optional[str] = None  # base64编码的混合声音
 
 
@@ -43,15 +48,23 @@ async def lifespan(app: FastAPI):
     print("🔄 预加载模型...")
     for model_name in config.model.preload_models:
         try:
-            get_tts_model(model_name) if "whisper" not in model_name.lower() else get_stt_model(model_name)
+            model = get_tts_model(model_name) if "whisper" not in model_name.lower() else get_stt_model(model_name)
             print(f"  ✅ {model_name}")
+            # 预热声音缓存，避免首个请求加载声音文件
+            if hasattr(model, "preload_voices"):
+                voices = model.preload_voices()
+                print(f"     🎙️  {len(voices)} voices")
         except Exception as e:
             print(f"  ⚠️  {model_name}: {e}")
     
     asyncio.create_task(memory_manager.start_cleanup_loop())
     yield
+    tts_scheduler.shutdown()
+    stt_engines.shutdown()
+    model_executor.shutdown()
     memory_manager.stop_cleanup_loop()
     memory_manager.release_all()
+    shutdown_decoder_pool()
 
 
 # === App ===
@@ -73,6 +86,16 @@ app.add_middleware(
 )
 
 
+@app.exception_handler(ExecutorBusy)
+async def executor_busy_handler(request, exc: ExecutorBusy):
+    """模型队列已满 - 返回429让客户端稍后重试"""
+    return JSONResponse(
+        status_code=429,
+        content={"detail": str(exc)},
+        headers={"Retry-After": str(exc.retry_after)},
+    )
+
+
 # === Helper ===
 def get_tts_model(model_name: str):
     return memory_manager.get_model(model_name, lambda: load_model(model_name))
@@ -82,6 +105,15 @@ def get_stt_model(model_name: str):
     return memory_manager.get_model(model_name, lambda: load_model(model_name))
 
 
+async def get_model_async(model_name: str):
+    """在线程池中加载模型，避免阻塞事件循环"""
+    return await memory_manager.get_model_async(model_name, lambda: load_model(model_name))
+
+
+# 模型被释放或淘汰时一并停止其STT引擎
+memory_manager.add_release_listener(stt_engines.release)
+
+
 # 语言对应的默认声音
 LANG_DEFAULT_VOICE = {
     "a": "af_heart",
@@ -105,7 +137,10 @@ async def health():
             "tts": tts_models,
             "stt": stt_models,
             "total_memory_mb": stats['memory_mb']
-        }
+        },
+        "workers": model_executor.get_stats(),
+        "pending": tts_scheduler.pending(),
+        "stt_engines": stt_engines.get_stats(),
     }
 
 
@@ -120,13 +155,14 @@ async def list_models():
 
 @app.post("/v1/models")
 async def add_model(req: ModelRequest):
-    get_tts_model(req.model_name)
+    await get_model_async(req.model_name)
     return {"status": "success", "message": f"Model {req.model_name} loaded"}
 
 
 @app.delete("/v1/models/{model_name}")
 async def remove_model(model_name: str):
     if memory_manager.release(model_name):
+        model_executor.release(model_name)
         return {"status": "success"}
     raise HTTPException(404, f"Model '{model_name}' not found")
 
@@ -134,17 +170,21 @@ async def remove_model(model_name: str):
 @app.post("/v1/audio/speech")
 async def tts_speech(payload: SpeechRequest):
     """生成语音 - 支持中英日多语言"""
-    model = get_tts_model(payload.model)
+    model = await get_model_async(payload.model)
     voice = payload.voice or LANG_DEFAULT_VOICE.get(payload.lang_code, "af_heart")
+    # 经调度器排队，与同参数的并发请求合批生成
+    results = tts_scheduler.submit(
+        payload.model,
+        model,
+        payload.input,
+        voice=voice,
+        speed=payload.speed,
+        lang_code=payload.lang_code,
+        temperature=payload.temperature,
+    )
     
     async def generate():
-        for result in model.generate(
-            payload.input,
-            voice=voice,
-            speed=payload.speed,
-            lang_code=payload.lang_code,
-            temperature=payload.temperature,
-        ):
+        async for result in results:
             buf = io.BytesIO()
             sf.write(buf, result.audio, result.sample_rate, format=payload.response_format)
             buf.seek(0)
@@ -160,20 +200,25 @@ async def tts_speech(payload: SpeechRequest):
 @app.post("/v1/audio/speech/stream")
 async def tts_speech_stream(payload: SpeechRequest):
     """流式生成语音 - PCM格式实时输出"""
-    model = get_tts_model(payload.model)
+    model = await get_model_async(payload.model)
     voice = payload.voice or LANG_DEFAULT_VOICE.get(payload.lang_code, "af_heart")
+    params = dict(
+        voice=voice,
+        speed=payload.speed,
+        lang_code=payload.lang_code,
+        temperature=payload.temperature,
+    )
+    if "stream" in inspect.signature(model.generate).parameters:
+        # 模型原生支持流式，按固定时长的音频窗口输出
+        params.update(stream=True, streaming_interval=payload.streaming_interval)
+    else:
+        # 关键：按更细粒度分割（包括逗号、分号）
+        params.update(split_pattern=r'[.!?。！？,，;；:：]+')
+    results = tts_scheduler.submit(payload.model, model, payload.input, **params)
     
     async def generate_pcm():
         import numpy as np
-        # 关键：按更细粒度分割（包括逗号、分号）
-        for result in model.generate(
-            payload.input,
-            voice=voice,
-            speed=payload.speed,
-            lang_code=payload.lang_code,
-            temperature=payload.temperature,
-            split_pattern=r'[.!?。！？,，;；:：]+',  # 更细粒度分割
-        ):
+        async for result in results:
             audio_int16 = (np.array(result.audio) * 32767).astype(np.int16)
             yield audio_int16.tobytes()
     
@@ -181,7 +226,7 @@ async def tts_speech_stream(payload: SpeechRequest):
         generate_pcm(),
         media_type="audio/pcm",
         headers={
-            "X-Sample-Rate": "24000",
+            "X-Sample-Rate": str(getattr(model, "sample_rate", 24000)),
             "X-Channels": "1",
             "X-Bit-Depth": "16",
             "Cache-Control": "no-cache",
@@ -190,6 +235,39 @@ async def tts_speech_stream(payload: SpeechRequest):
     )
 
 
+def transcribe_audio(stt_model, audio: mx.array, language: Optional[str], prompt: Optional[str]):
+    """转录内存中的音频 - 在模型工作线程中执行"""
+    return stt_model.generate(
+        audio,
+        language=language if language != "Detect" else None,
+        initial_prompt=prompt
+    )
+
+
+async def submit_transcription(
+    model_name: str, stt_model, audio: mx.array, language: Optional[str], prompt: Optional[str]
+):
+    """投递转录任务 - Whisper走连续批处理引擎，与并发请求共享解码步骤"""
+    if stt_engines.supports(stt_model):
+        return await asyncio.to_thread(
+            stt_engines.submit,
+            model_name,
+            stt_model,
+            audio,
+            language=language if language != "Detect" else None,
+            initial_prompt=prompt,
+        )
+    return model_executor.submit(model_name, transcribe_audio, stt_model, audio, language, prompt)
+
+
+async def decode_upload(data: bytes, stt_model) -> mx.array:
+    """在内存中解码上传的音频为模型采样率的单声道波形，不落盘"""
+    try:
+        return await asyncio.to_thread(decode_audio, data, model_sample_rate(stt_model))
+    except Exception as e:
+        raise HTTPException(400, f"无法解码音频: {str(e)}")
+
+
 @app.post("/v1/audio/transcriptions")
 async def stt_transcriptions(
     file: UploadFile = File(...),
@@ -208,60 +286,30 @@ async def stt_transcriptions(
     - format: 输出格式 (text/json/srt/vtt)
     """
     data = await file.read()
-    tmp_input = f"/tmp/{time.time()}.{file.filename.split('.')[-1]}"
-    tmp_wav = f"/tmp/{time.time()}.wav"
-    
-    # 保存上传的文件
-    with open(tmp_input, "wb") as f:
-        f.write(data)
+    stt_model = await get_model_async(model)
+    audio = await decode_upload(data, stt_model)
+    duration = audio.shape[0] / model_sample_rate(stt_model)
     
     try:
-        # 尝试直接读取
-        try:
-            audio, sr = sf.read(tmp_input, always_2d=False)
-        except:
-            # 如果失败，使用ffmpeg转换
-            import subprocess
-            subprocess.run([
-                'ffmpeg', '-i', tmp_input, 
-                '-ar', '16000', '-ac', '1', 
-                tmp_wav, '-y'
-            ], check=True, capture_output=True)
-            audio, sr = sf.read(tmp_wav, always_2d=False)
-            os.remove(tmp_wav)
-        
-        # 保存为WAV供Whisper使用
-        tmp_path = f"/tmp/{time.time()}_final.wav"
-        sf.write(tmp_path, audio, sr)
-        
-        stt_model = get_stt_model(model)
-        result = stt_model.generate(
-            tmp_path, 
-            language=language if language != "Detect" else None,
-            initial_prompt=prompt
-        )
-        
-        os.remove(tmp_path)
-        os.remove(tmp_input)
-        
-        if format == "json":
-            return {
-                "text": result.text,
-                "language": result.language if hasattr(result, 'language') else language,
-                "duration": len(audio) / sr,
-            }
-        elif format == "srt":
-            return {"text": f"1\n00:00:00,000 --> 99:99:99,999\n{result.text}\n"}
-        elif format == "vtt":
-            return {"text": f"WEBVTT\n\n1\n00:00:00.000 --> 99:99:99.999\n{result.text}\n"}
-        else:
-            return {"text": result.text}
+        future = await submit_transcription(model, stt_model, audio, language, prompt)
+        result = await asyncio.wrap_future(future)
+    except ExecutorBusy:
+        raise
     except Exception as e:
-        # 清理临时文件
-        for f in [tmp_input, tmp_wav, tmp_path]:
-            if os.path.exists(f):
-                os.remove(f)
         raise HTTPException(500, f"处理失败: {str(e)}")
+    
+    if format == "json":
+        return {
+            "text": result.text,
+            "language": result.language if hasattr(result, 'language') else language,
+            "duration": duration,
+        }
+    elif format == "srt":
+        return {"text": f"1\n00:00:00,000 --> 99:99:99,999\n{result.text}\n"}
+    elif format == "vtt":
+        return {"text": f"WEBVTT\n\n1\n00:00:00.000 --> 99:99:99.999\n{result.text}\n"}
+    else:
+        return {"text": result.text}
 
 
 # === Voice Clone API ===
@@ -286,7 +334,7 @@ async def voice_clone(
     with open(tmp_ref, "wb") as f:
         f.write(data)
     
-    try:
+    def clone():
         # 加载模型
         clone_model = get_tts_model(model)
         
@@ -295,11 +343,14 @@ async def voice_clone(
         ref_audio = load_audio(tmp_ref, sample_rate=clone_model.sample_rate)
         
         # 生成克隆语音
-        results = list(clone_model.generate(
+        return list(clone_model.generate(
             text,
             ref_audio=ref_audio,
             ref_text=ref_text,
         ))
+    
+    try:
+        results = await model_executor.run(model, clone)
         
         if not results:
             raise HTTPException(500, "No audio generated")
@@ -319,6 +370,49 @@ async def voice_clone(
             os.remove(tmp_ref)
 
 
+@app.post("/v1/audio/voices")
+async def register_voice(
+    file: UploadFile = File(...),
+    name: str = Form(...),
+    model: str = Form(...),
+):
+    """注册命名声音 - 参考音频只做一次条件编码，之后用 voice=name 引用
+    
+    参数:
+    - file: 参考音频文件
+    - name: 声音ID（字母、数字、-、_）
+    - model: 支持声音注册的TTS模型（如Chatterbox）
+    """
+    tts_model = await get_model_async(model)
+    if not hasattr(tts_model, "register_voice"):
+        raise HTTPException(400, f"Model '{model}' does not support voice registration")
+    
+    data = await file.read()
+    try:
+        ref_audio = await asyncio.to_thread(decode_audio, data, tts_model.sample_rate)
+    except Exception as e:
+        raise HTTPException(400, f"无法解码音频: {str(e)}")
+    
+    try:
+        await model_executor.run(
+            model, tts_model.register_voice, name, ref_audio, tts_model.sample_rate
+        )
+    except ValueError as e:
+        raise HTTPException(400, str(e))
+    return {"status": "success", "voice": name}
+
+
+@app.get("/v1/audio/voices")
+async def list_voices(model: str):
+    """列出模型已注册的声音"""
+    tts_model = await get_model_async(model)
+    cache = getattr(tts_model, "conds_cache", None)
+    if cache is None:
+        return {"voices": []}
+    # 声音按模型权重区分，只列出当前权重注册的声音
+    return {"voices": cache.voices(tts_model.weights_id)}
+
+
 # === 异步STT任务 ===
 import uuid
 stt_tasks: dict = {}
@@ -333,33 +427,16 @@ async def stt_async(
     """异步STT - 适合长音频"""
     task_id = str(uuid.uuid4())
     data = await file.read()
-    tmp_input = f"/tmp/stt_{task_id}.{file.filename.split('.')[-1]}"
+    stt_model = await get_model_async(model)
+    audio = await decode_upload(data, stt_model)
     
-    with open(tmp_input, "wb") as f:
-        f.write(data)
+    future = await submit_transcription(model, stt_model, audio, language, prompt)
     
     stt_tasks[task_id] = {"status": "processing", "result": None, "error": None}
     
     async def process():
         try:
-            tmp_wav = f"/tmp/stt_{task_id}.wav"
-            try:
-                audio, sr = sf.read(tmp_input, always_2d=False)
-            except:
-                import subprocess
-                subprocess.run(['ffmpeg', '-i', tmp_input, '-ar', '16000', '-ac', '1', tmp_wav, '-y'], check=True, capture_output=True)
-                audio, sr = sf.read(tmp_wav, always_2d=False)
-                if os.path.exists(tmp_wav): os.remove(tmp_wav)
-            
-            tmp_path = f"/tmp/stt_{task_id}_final.wav"
-            sf.write(tmp_path, audio, sr)
-            
-            stt_model = get_stt_model(model)
-            result = stt_model.generate(tmp_path, language=language if language != "Detect" else None, initial_prompt=prompt)
-            
-            os.remove(tmp_path)
-            os.remove(tmp_input)
-            
+            result = await asyncio.wrap_future(future)
             stt_tasks[task_id]["status"] = "completed"
             stt_tasks[task_id]["result"] = result.text
         except Exception as e:
@@ -393,11 +470,13 @@ async def blend_voices(payload: VoiceBlendRequest):
     import base64
     import numpy as np
     
-    model = get_tts_model(config.model.default_tts_model)
+    model_name = config.model.default_tts_model
+    model = await get_model_async(model_name)
     pipeline = model._get_pipeline(payload.lang_code)
     
-    voice1_emb = pipeline.load_voice(payload.voice1)
-    voice2_emb = pipeline.load_voice(payload.voice2)
+    voice1_emb, voice2_emb = await model_executor.run(
+        model_name, lambda: (pipeline.load_voice(payload.voice1), pipeline.load_voice(payload.voice2))
+    )
     
     blended = voice1_emb * payload.weight1 + voice2_emb * payload.weight2
     blended_np = np.array(blended)
@@ -424,15 +503,16 @@ async def mcp_list_tools():
 @app.post("/mcp/call/{tool_name}")
 async def mcp_call_tool(tool_name: str, params: dict):
     if tool_name == "tts":
-        model = get_tts_model(params.get("model", config.model.default_tts_model))
+        model_name = params.get("model", config.model.default_tts_model)
+        model = await get_model_async(model_name)
         lang_code = params.get("lang_code", "a")
         voice = params.get("voice") or LANG_DEFAULT_VOICE.get(lang_code, "af_heart")
-        results = list(model.generate(
+        results = await model_executor.run(model_name, lambda: list(model.generate(
             params["text"],
             voice=voice,
             speed=params.get("speed", 1.0),
             lang_code=lang_code,
-        ))
+        )))
         if results:
             path = config.model.output_dir / f"tts_{int(time.time())}.wav"
             sf.write(str(path), results[0].audio, results[0].sample_rate)
@@ -440,8 +520,9 @@ async def mcp_call_tool(tool_name: str, params: dict):
         return {"status": "error", "message": "No audio generated"}
     
     elif tool_name == "stt":
-        model = get_stt_model(params.get("model", config.model.default_stt_model))
-        result = model.generate(params["audio_path"])
+        model_name = params.get("model", config.model.default_stt_model)
+        model = await get_model_async(model_name)
+        result = await model_executor.run(model_name, model.generate, params["audio_path"])
         return {"text": result.text}
     
     elif tool_name == "list_models":
@@ -458,6 +539,9 @@ if static_dir.exists():
 
 def main():
     import argparse
+
+    import uvicorn
+
     parser = argparse.ArgumentParser(description="MLX-Audio Server")
     parser.add_argument("--host", default=config.server.host)
     parser.add_argument("--port", type=int, default=config.server.port)
@@ -0,0 +1,350 @@
+"""Process-wide registry of the neural audio codecs used by TTS models.
+
+Several models decode through the same pretrained codec (SNAC for Orpheus and
+Qwen3, DAC for Dia and OuteTTS, Mimi for Sesame). Codecs are loaded on first
+use and shared by every model asking for the same ``(kind, source)`` pair, so
+importing a model module or constructing a model never fetches codec weights.
+
+``encode``/``decode`` batch concurrent calls: requests for the same codec
+whose inputs have the same shape (apart from the batch axis) run as one
+batched call. While other such calls are in flight, a request waits up to
+``max_wait_ms`` for more to join; a lone caller, such as a single streaming
+session, runs at once. Inputs and outputs are arrays, or lists of arrays,
+batched along axis 0.
+
+Usage:
+    from mlx_audio.codec_registry import codec_registry, get_codec
+
+    snac = get_codec("snac", "mlx-community/snac_24khz")
+    audio = codec_registry.decode("snac", "mlx-community/snac_24khz", codes)
+"""
+
+import logging
+import threading
+import time
+import weakref
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+
+import mlx.core as mx
+from mlx.utils import tree_flatten
+
+logger = logging.getLogger(__name__)
+
+CodecKey = Tuple[str, str]
+Batchable = Union[mx.array, List[mx.array], Tuple[mx.array, ...]]
+
+_LOADERS: Dict[str, Callable[[str], Any]] = {}
+
+
+def register_codec(kind: str):
+    """Register ``loader(source) -> codec`` for a codec kind.
+
+    Loaders should import the codec implementation themselves, so that
+    registering a codec stays free at import time.
+    """
+
+    def decorator(loader: Callable[[str], Any]) -> Callable[[str], Any]:
+        _LOADERS[kind] = loader
+        return loader
+
+    return decorator
+
+
+@register_codec("snac")
+def _load_snac(source: str):
+    from mlx_audio.codec.models.snac import SNAC
+
+    return SNAC.from_pretrained(source).eval()
+
+
+@register_codec("dac")
+def _load_dac(source: str):
+    from mlx_audio.codec.models import DAC
+
+    return DAC.from_pretrained(source)
+
+
+@register_codec("mimi")
+def _load_mimi(source: str):
+    from mlx_audio.codec.models.mimi import Mimi
+
+    mimi = Mimi.from_pretrained(source)
+    mimi.eval()
+    return mimi
+
+
+@register_codec("bicodec")
+def _load_bicodec(source: str):
+    from mlx_audio.tts.models.spark.bicodec import BiCodec
+
+    return BiCodec.load_from_checkpoint(source)
+
+
+def codec_nbytes(codec: Any) -> int:
+    """Bytes held by the codec parameters."""
+    if not hasattr(codec, "parameters"):
+        return 0
+    return sum(v.nbytes for _, v in tree_flatten(codec.parameters()))
+
+
+def _leaves(x: Batchable) -> List[mx.array]:
+    return list(x) if isinstance(x, (list, tuple)) else [x]
+
+
+def _like(x: Batchable, leaves: List[mx.array]) -> Batchable:
+    if isinstance(x, (list, tuple)):
+        return type(x)(leaves)
+    return leaves[0]
+
+
+@dataclass
+class CodecEntry:
+    """A loaded codec"""
+
+    codec: Any
+    size_bytes: int
+    load_time: float
+    last_access: float = field(default_factory=time.time)
+    hits: int = 0
+    batched_calls: int = 0
+    batched_requests: int = 0
+
+
+@dataclass
+class _Batch:
+    inputs: List[Batchable] = field(default_factory=list)
+    outputs: Optional[List[Batchable]] = None
+    error: Optional[BaseException] = None
+    full: threading.Event = field(default_factory=threading.Event)
+    done: threading.Event = field(default_factory=threading.Event)
+
+
+class CodecRegistry:
+    """Thread-safe cache of loaded codecs keyed by ``(kind, source)``."""
+
+    def __init__(self, max_batch_size: int = 8, max_wait_ms: float = 2.0):
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max_wait_ms / 1000
+        self._codecs: Dict[CodecKey, CodecEntry] = {}
+        self._lock = threading.Lock()
+        self._load_locks: Dict[CodecKey, threading.Lock] = {}
+        self._open: Dict[Tuple, _Batch] = {}
+        self._in_flight: Dict[Tuple, int] = {}
+        # Codecs released while idle that models may still hold, see _entry
+        self._released: Dict[CodecKey, Tuple[weakref.ref, float]] = {}
+
+    def get(self, kind: str, source: str) -> Any:
+        """Return the shared codec, loading it on first use.
+
+        Raises:
+            ValueError: If no loader is registered for ``kind``.
+        """
+        return self._entry(kind, source).codec
+
+    def _entry(self, kind: str, source: str) -> CodecEntry:
+        key = (kind, str(source))
+        entry = self._touch(key)
+        if entry is not None:
+            return entry
+        if kind not in _LOADERS:
+            raise ValueError(
+                f"Unknown codec '{kind}'. Available codecs: {sorted(_LOADERS)}"
+            )
+
+        # One load per codec, concurrent callers wait for it
+        with self._lock:
+            load_lock = self._load_locks.setdefault(key, threading.Lock())
+        with load_lock:
+            entry = self._touch(key)
+            if entry is None:
+                codec, load_time = self._revive(key)
+                if codec is None:
+                    start = time.perf_counter()
+                    codec = _LOADERS[kind](key[1])
+                    load_time = time.perf_counter() - start
+                    logger.info(
+                        f"Loaded {kind} codec from {key[1]} in {load_time:.2f}s"
+                    )
+                entry = CodecEntry(codec, codec_nbytes(codec), load_time, hits=1)
+                with self._lock:
+                    self._codecs[key] = entry
+        return entry
+
+    def _revive(self, key: CodecKey) -> Tuple[Any, float]:
+        """A codec released while idle but still held elsewhere, if any.
+
+        Taking it back avoids loading a second copy next to the one a model
+        (e.g. a streaming decoder) still uses.
+        """
+        with self._lock:
+            ref, load_time = self._released.pop(key, (None, 0.0))
+        codec = ref() if ref is not None else None
+        return codec, load_time
+
+    def _touch(self, key: CodecKey) -> Optional[CodecEntry]:
+        with self._lock:
+            entry = self._codecs.get(key)
+            if entry is not None:
+                entry.last_access = time.time()
+                entry.hits += 1
+            return entry
+
+    def encode(self, kind: str, source: str, audio: Batchable) -> Batchable:
+        """``codec.encode(audio)``, batched with concurrent calls."""
+        return self._batched("encode", kind, source, audio)
+
+    def decode(self, kind: str, source: str, codes: Batchable) -> Batchable:
+        """``codec.decode(codes)``, batched with concurrent calls."""
+        return self._batched("decode", kind, source, codes)
+
+    def _batched(self, method: str, kind: str, source: str, x: Batchable):
+        entry = self._entry(kind, source)
+        leaves = _leaves(x)
+        key = (
+            method,
+            kind,
+            str(source),
+            type(x),
+            tuple((a.shape[1:], a.dtype) for a in leaves),
+        )
+        with self._lock:
+            self._in_flight[key] = self._in_flight.get(key, 0) + 1
+        try:
+            # Graphs are bound to the streams of the thread that built them, so
+            # inputs and outputs cross threads evaluated
+            mx.eval(leaves)
+            return self._join(key, entry, method, x)
+        finally:
+            with self._lock:
+                self._in_flight[key] -= 1
+                if self._in_flight[key] == 0:
+                    del self._in_flight[key]
+
+    def _join(self, key: Tuple, entry: CodecEntry, method: str, x: Batchable):
+        with self._lock:
+            batch = self._open.get(key)
+            leader = batch is None
+            if leader:
+                batch = self._open[key] = _Batch()
+            index = len(batch.inputs)
+            batch.inputs.append(x)
+            if len(batch.inputs) >= self.max_batch_size:
+                del self._open[key]
+                batch.full.set()
+            # With no other call in flight nobody can join, so don't wait
+            alone = self._in_flight[key] == len(batch.inputs)
+
+        if not leader:
+            batch.done.wait()
+        else:
+            if not alone:
+                batch.full.wait(self.max_wait)
+            with self._lock:
+                if self._open.get(key) is batch:
+                    del self._open[key]
+                entry.batched_calls += 1
+                entry.batched_requests += len(batch.inputs)
+            try:
+                batch.outputs = self._run(getattr(entry.codec, method), batch.inputs)
+            except BaseException as e:
+                batch.error = e
+            batch.done.set()
+
+        if batch.error is not None:
+            raise batch.error
+        return batch.outputs[index]
+
+    @staticmethod
+    def _run(fn: Callable, inputs: List[Batchable]) -> List[Batchable]:
+        if len(inputs) == 1:
+            out = fn(inputs[0])
+            mx.eval(out)
+            return [out]
+
+        sizes = [_leaves(x)[0].shape[0] for x in inputs]
+        columns = zip(*(_leaves(x) for x in inputs))
+        out = fn(_like(inputs[0], [mx.concatenate(c, axis=0) for c in columns]))
+        mx.eval(out)
+
+        # Split every output leaf back into the per-request batch sizes
+        offsets = [0]
+        for size in sizes:
+            offsets.append(offsets[-1] + size)
+        out_leaves = _leaves(out)
+        outputs = [
+            _like(out, [a[start:end] for a in out_leaves])
+            for start, end in zip(offsets, offsets[1:])
+        ]
+        mx.eval(outputs)
+        return outputs
+
+    def release(self, kind: str, source: str) -> bool:
+        """Drop a cached codec, returns whether it was loaded."""
+        with self._lock:
+            return self._codecs.pop((kind, str(source)), None) is not None
+
+    def release_idle(self, idle_timeout: float) -> List[CodecKey]:
+        """Drop codecs unused for ``idle_timeout`` seconds.
+
+        A model that still holds one keeps it alive; it is then taken back
+        on the next ``get`` instead of being loaded again.
+        """
+        now = time.time()
+        with self._lock:
+            self._released = {
+                key: released
+                for key, released in self._released.items()
+                if released[0]() is not None
+            }
+            idle = [
+                key
+                for key, entry in self._codecs.items()
+                if now - entry.last_access > idle_timeout
+            ]
+            for key in idle:
+                entry = self._codecs.pop(key)
+                try:
+                    self._released[key] = (weakref.ref(entry.codec), entry.load_time)
+                except TypeError:
+                    pass  # Not weak-referenceable, reloaded if needed again
+        return idle
+
+    def loaded(self) -> List[CodecKey]:
+        """The ``(kind, source)`` pairs currently loaded."""
+        with self._lock:
+            return list(self._codecs)
+
+    def nbytes(self) -> int:
+        """Bytes held by all loaded codecs."""
+        with self._lock:
+            return sum(entry.size_bytes for entry in self._codecs.values())
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Per-codec size and usage."""
+        with self._lock:
+            return {
+                f"{kind}:{source}": {
+                    "size_mb": entry.size_bytes / 1e6,
+                    "hits": entry.hits,
+                    "load_time": entry.load_time,
+                    "batched_calls": entry.batched_calls,
+                    "batched_requests": entry.batched_requests,
+                }
+                for (kind, source), entry in self._codecs.items()
+            }
+
+    def clear(self):
+        """Drop every cached codec."""
+        with self._lock:
+            self._codecs.clear()
+            self._released.clear()
+
+
+# Global instance
+codec_registry = CodecRegistry()
+
+
+def get_codec(kind: str, source: str) -> Any:
+    """Shorthand for ``codec_registry.get``."""
+    return codec_registry.get(kind, source)
@@ -30,6 +30,8 @@ class ModelConfig:
     cache_dir: Path = field(default_factory=lambda: Path.home() / ".cache" / "mlx_audio")
     output_dir: Path = field(default_factory=lambda: Path.home() / ".mlx_audio" / "outputs")
     idle_timeout: int = 300
+    memory_budget_mb: float = 0  # 模型参数内存预算，0表示不限制
+    eviction_policy: str = "lru"  # 超出预算时的淘汰策略: lru/lfu
     preload_models: list = field(default_factory=lambda: [
         "mlx-community/Kokoro-82M-bf16",
         "mlx-community/whisper-large-v3-turbo",
@@ -41,6 +43,14 @@ class ModelConfig:
     def __post_init__(self):
         self.cache_dir.mkdir(parents=True, exist_ok=True)
         self.output_dir.mkdir(parents=True, exist_ok=True)
+    
+    @classmethod
+    def from_env(cls) -> "ModelConfig":
+        return cls(
+            idle_timeout=int(os.getenv("MLX_AUDIO_IDLE_TIMEOUT", "300")),
+            memory_budget_mb=float(os.getenv("MLX_AUDIO_MEMORY_BUDGET_MB", "0")),
+            eviction_policy=os.getenv("MLX_AUDIO_EVICTION_POLICY", "lru"),
+        )
 
 
 @dataclass
@@ -60,6 +70,32 @@ class STTConfig:
     sample_rate: int = 16000
 
 
+@dataclass
+class SchedulerConfig:
+    """TTS批处理调度配置"""
+    max_batch_size: int = 8
+    max_wait_ms: float = 10.0
+    stt_slots: int = 8  # 每个Whisper引擎同时解码的窗口数
+
+    @classmethod
+    def from_env(cls) -> "SchedulerConfig":
+        return cls(
+            max_batch_size=int(os.getenv("MLX_AUDIO_MAX_BATCH_SIZE", "8")),
+            max_wait_ms=float(os.getenv("MLX_AUDIO_BATCH_WAIT_MS", "10")),
+            stt_slots=int(os.getenv("MLX_AUDIO_STT_SLOTS", "8")),
+        )
+
+
+@dataclass
+class ExecutorConfig:
+    """模型执行器配置"""
+    max_queue_size: int = 16
+
+    @classmethod
+    def from_env(cls) -> "ExecutorConfig":
+        return cls(max_queue_size=int(os.getenv("MLX_AUDIO_MAX_QUEUE_SIZE", "16")))
+
+
 @dataclass
 class Config:
     """全局配置"""
@@ -67,10 +103,17 @@ class Config:
     model: ModelConfig = field(default_factory=ModelConfig)
     tts: TTSConfig = field(default_factory=TTSConfig)
     stt: STTConfig = field(default_factory=STTConfig)
+    scheduler: SchedulerConfig = field(default_factory=SchedulerConfig)
+    executor: ExecutorConfig = field(default_factory=ExecutorConfig)
     
     @classmethod
     def load(cls) -> "Config":
-        return cls(server=ServerConfig.from_env())
+        return cls(
+            server=ServerConfig.from_env(),
+            model=ModelConfig.from_env(),
+            scheduler=SchedulerConfig.from_env(),
+            executor=ExecutorConfig.from_env(),
+        )
 
 
 # 全局配置实例
@@ -15,6 +15,8 @@ import mlx.core as mx
 from huggingface_hub import snapshot_download
 from mlx.utils import tree_flatten
 
+from mlx_audio.snapshot import SNAPSHOT_FILE, save_snapshot, snapshot_manifest
+
 
 # Auto-discover model types from directory structure
 def _discover_model_types(domain: str) -> set:
@@ -295,6 +297,7 @@ def convert(
     dequantize: bool = False,
     quant_predicate: Optional[str] = None,
     model_domain: Optional[str] = None,
+    snapshot: bool = False,
 ):
     """
     Convert a model from HuggingFace to MLX format.
@@ -315,6 +318,8 @@ def convert(
         trust_remote_code: Whether to trust remote code.
         quant_predicate: Mixed-bit quantization recipe.
         model_domain: Force model domain ("tts" or "stt"). Auto-detected if None.
+        snapshot: Also write a ``snapshot.json`` manifest so the model loads
+            without the sanitize and quantization passes.
     """
     from mlx_lm.utils import dequantize_model, quantize_model, save_config, save_model
 
@@ -429,13 +434,13 @@ def convert(
         "*.safetensors",
     ]:
         for file in glob.glob(str(model_path / pattern)):
-            if Path(file).name == "model.safetensors.index.json":
+            if Path(file).name in ("model.safetensors.index.json", SNAPSHOT_FILE):
                 continue
             shutil.copy(file, mlx_path)
 
         # Check subdirectories
         for file in glob.glob(str(model_path / "**" / pattern), recursive=True):
-            if Path(file).name == "model.safetensors.index.json":
+            if Path(file).name in ("model.safetensors.index.json", SNAPSHOT_FILE):
                 continue
             rel_path = Path(file).relative_to(model_path)
             dest_dir = mlx_path / rel_path.parent
@@ -443,7 +448,11 @@ def convert(
             shutil.copy(file, dest_dir)
 
     # Save model weights and config
+    manifest = snapshot_manifest(model) if snapshot else None
     save_model(mlx_path, model, donate_model=True)
+    if snapshot:
+        print("[INFO] Writing ready-to-load snapshot manifest")
+        save_snapshot(mlx_path, manifest)
 
     # Save config
     config["model_type"] = model_type
@@ -511,6 +520,11 @@ def configure_parser() -> argparse.ArgumentParser:
         default=None,
         help="Force model domain.",
     )
+    parser.add_argument(
+        "--snapshot",
+        action="store_true",
+        help="Write a ready-to-load snapshot that skips sanitizing at load time.",
+    )
 
     return parser
 
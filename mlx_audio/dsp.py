@@ -14,6 +14,7 @@ __all__ = [
     "STR_TO_WINDOW_FN",
     "stft",
     "istft",
+    "overlap_add",
     "mel_filters",
 ]
 from functools import lru_cache
@@ -64,6 +65,46 @@ STR_TO_WINDOW_FN = {
 
 
 # STFT and ISTFT
+@lru_cache(maxsize=None)
+def _named_window(window: str, win_length: int, periodic: bool = False) -> mx.array:
+    window_fn = STR_TO_WINDOW_FN.get(window.lower())
+    if window_fn is None:
+        raise ValueError(f"Unknown window function: {window}")
+    return window_fn(win_length + 1)[:-1] if periodic else window_fn(win_length)
+
+
+@lru_cache(maxsize=64)
+def _overlap_add_divisor(
+    window: str, win_length: int, hop_length: int, num_frames: int
+) -> mx.array:
+    """Summed overlap-added window, with zeros replaced by ones."""
+    w = _named_window(window, win_length, periodic=True)
+    window_sum = overlap_add(mx.broadcast_to(w, (num_frames, win_length)), hop_length)
+    return mx.where(window_sum != 0, window_sum, 1)
+
+
+def overlap_add(frames: mx.array, hop_length: int) -> mx.array:
+    """Overlap-add (..., num_frames, frame_length) frames spaced hop_length apart.
+
+    Frames are cut into hop_length blocks and each block offset is summed as a
+    shifted slice, so no scatter index array is needed.
+    """
+    *batch, num_frames, frame_length = frames.shape
+    blocks = -(-frame_length // hop_length)
+    pad = blocks * hop_length - frame_length
+    if pad:
+        frames = mx.pad(frames, [(0, 0)] * (frames.ndim - 1) + [(0, pad)])
+    frames = frames.reshape(*batch, num_frames, blocks, hop_length)
+    pad_width = [(0, 0)] * len(batch)
+    output = 0
+    for j in range(blocks):
+        output = output + mx.pad(
+            frames[..., j, :], pad_width + [(j, blocks - 1 - j), (0, 0)]
+        )
+    output = output.reshape(*batch, (num_frames + blocks - 1) * hop_length)
+    return output[..., : (num_frames - 1) * hop_length + frame_length]
+
+
 def stft(
     x,
     n_fft=800,
@@ -73,16 +114,18 @@ def stft(
     center=True,
     pad_mode="reflect",
 ):
+    """Short-time Fourier transform of (..., samples) signals.
+
+    Returns:
+        Complex spectrogram (..., num_frames, n_fft // 2 + 1)
+    """
     if hop_length is None:
         hop_length = n_fft // 4
     if win_length is None:
         win_length = n_fft
 
     if isinstance(window, str):
-        window_fn = STR_TO_WINDOW_FN.get(window.lower())
-        if window_fn is None:
-            raise ValueError(f"Unknown window function: {window}")
-        w = window_fn(win_length)
+        w = _named_window(window, win_length)
     else:
         w = window
 
@@ -92,26 +135,30 @@ def stft(
 
     def _pad(x, padding, pad_mode="reflect"):
         if pad_mode == "constant":
-            return mx.pad(x, [(padding, padding)])
+            return mx.pad(x, [(0, 0)] * (x.ndim - 1) + [(padding, padding)])
         elif pad_mode == "reflect":
-            prefix = x[1 : padding + 1][::-1]
-            suffix = x[-(padding + 1) : -1][::-1]
-            return mx.concatenate([prefix, x, suffix])
+            prefix = x[..., 1 : padding + 1][..., ::-1]
+            suffix = x[..., -(padding + 1) : -1][..., ::-1]
+            return mx.concatenate([prefix, x, suffix], axis=-1)
         else:
             raise ValueError(f"Invalid pad_mode {pad_mode}")
 
     if center:
         x = _pad(x, n_fft // 2, pad_mode)
 
-    num_frames = 1 + (x.shape[0] - n_fft) // hop_length
+    num_frames = 1 + (x.shape[-1] - n_fft) // hop_length
     if num_frames <= 0:
         raise ValueError(
-            f"Input is too short (length={x.shape[0]}) for n_fft={n_fft} with "
+            f"Input is too short (length={x.shape[-1]}) for n_fft={n_fft} with "
             f"hop_length={hop_length} and center={center}."
         )
 
-    shape = (num_frames, n_fft)
-    strides = (hop_length, 1)
+    batch = x.shape[:-1]
+    batch_strides = [x.shape[-1]]
+    for size in reversed(batch[1:]):
+        batch_strides.insert(0, batch_strides[0] * size)
+    shape = (*batch, num_frames, n_fft)
+    strides = (*batch_strides[: len(batch)], hop_length, 1)
     frames = mx.as_strided(x, shape=shape, strides=strides)
     return mx.fft.rfft(frames * w)
 
@@ -124,51 +171,45 @@ def istft(
     center=True,
     length=None,
 ):
+    """Inverse short-time Fourier transform.
+
+    Args:
+        x: Complex spectrogram (..., n_fft // 2 + 1, num_frames)
+
+    Returns:
+        Signals (..., samples)
+    """
     if win_length is None:
-        win_length = (x.shape[1] - 1) * 2
+        win_length = (x.shape[-2] - 1) * 2
     if hop_length is None:
         hop_length = win_length // 4
 
+    num_frames = x.shape[-1]
+
     if isinstance(window, str):
-        window_fn = STR_TO_WINDOW_FN.get(window.lower())
-        if window_fn is None:
-            raise ValueError(f"Unknown window function: {window}")
-        w = window_fn(win_length + 1)[:-1]
+        w = _named_window(window, win_length, periodic=True)
+        divisor = _overlap_add_divisor(window, win_length, hop_length, num_frames)
     else:
         w = window
-
-    if w.shape[0] < win_length:
-        w = mx.concatenate([w, mx.zeros((win_length - w.shape[0],))], axis=0)
-
-    num_frames = x.shape[1]
-    t = (num_frames - 1) * hop_length + win_length
-
-    reconstructed = mx.zeros(t)
-    window_sum = mx.zeros(t)
+        if w.shape[0] < win_length:
+            w = mx.concatenate([w, mx.zeros((win_length - w.shape[0],))], axis=0)
+        window_sum = overlap_add(
+            mx.broadcast_to(w, (num_frames, win_length)), hop_length
+        )
+        divisor = mx.where(window_sum != 0, window_sum, 1)
 
     # inverse FFT of each frame
-    frames_time = mx.fft.irfft(x, axis=0).transpose(1, 0)
-
-    # get the position in the time-domain signal to add the frame
-    frame_offsets = mx.arange(num_frames) * hop_length
-    indices = frame_offsets[:, None] + mx.arange(win_length)
-    indices_flat = indices.flatten()
-
-    updates_reconstructed = (frames_time * w).flatten()
-    updates_window = mx.tile(w, (num_frames,)).flatten()
-
-    # overlap-add the inverse transformed frame, scaled by the window
-    reconstructed = reconstructed.at[indices_flat].add(updates_reconstructed)
-    window_sum = window_sum.at[indices_flat].add(updates_window)
+    frames_time = mx.fft.irfft(x, axis=-2).swapaxes(-1, -2)
 
+    # overlap-add the inverse transformed frames, scaled by the window, and
     # normalize by the sum of the window values
-    reconstructed = mx.where(window_sum != 0, reconstructed / window_sum, reconstructed)
+    reconstructed = overlap_add(frames_time * w, hop_length) / divisor
 
     if center and length is None:
-        reconstructed = reconstructed[win_length // 2 : -win_length // 2]
+        reconstructed = reconstructed[..., win_length // 2 : -win_length // 2]
 
     if length is not None:
-        reconstructed = reconstructed[:length]
+        reconstructed = reconstructed[..., :length]
 
     return reconstructed
 
@@ -8,14 +8,15 @@ import soundfile as sf
 from fastmcp import FastMCP
 
 from mlx_audio.config import config
+from mlx_audio.models.executor import ExecutorBusy, model_executor
 from mlx_audio.models.memory_manager import memory_manager
 from mlx_audio.utils import load_model
 
 mcp = FastMCP("mlx-audio", description="MLX-Audio TTS/STT on Apple Silicon")
 
 
-def _get_model(name: str):
-    return memory_manager.get_model(name, lambda: load_model(name))
+async def _get_model(name: str):
+    return await memory_manager.get_model_async(name, lambda: load_model(name))
 
 
 @mcp.tool()
@@ -27,8 +28,14 @@ async def tts(
     lang_code: str = config.tts.lang_code,
 ) -> str:
     """文本转语音 - 生成音频文件并返回路径"""
-    tts_model = _get_model(model)
-    results = list(tts_model.generate(text, voice=voice, speed=speed, lang_code=lang_code))
+    tts_model = await _get_model(model)
+    try:
+        results = await model_executor.run(
+            model,
+            lambda: list(tts_model.generate(text, voice=voice, speed=speed, lang_code=lang_code)),
+        )
+    except ExecutorBusy as e:
+        return f"Error: {e}"
     
     if not results:
         return "Error: No audio generated"
@@ -48,8 +55,11 @@ async def stt(
     if not Path(audio_path).exists():
         return f"Error: File not found: {audio_path}"
     
-    stt_model = _get_model(model)
-    result = stt_model.generate(audio_path, language=language)
+    stt_model = await _get_model(model)
+    try:
+        result = await model_executor.run(model, stt_model.generate, audio_path, language=language)
+    except ExecutorBusy as e:
+        return f"Error: {e}"
     return result.text
 
 
@@ -64,6 +74,7 @@ async def list_models() -> str:
 async def unload_model(model_name: str) -> str:
     """卸载指定模型释放内存"""
     if memory_manager.release(model_name):
+        model_executor.release(model_name)
         return f"Model {model_name} unloaded"
     return f"Model {model_name} not found"
 
@@ -0,0 +1,128 @@
+"""MLX-Audio 模型执行器 - 每个模型一个专用工作线程+有界队列+背压
+
+所有阻塞的MLX推理都投递到模型对应的工作线程中执行，事件循环只负责
+收发请求。队列已满时立即抛出 ``ExecutorBusy``，由HTTP层转换为429。
+"""
+import asyncio
+import queue
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Optional
+
+from mlx_audio.config import config
+
+
+class ExecutorBusy(Exception):
+    """模型工作队列已满"""
+
+    def __init__(self, model_name: str, retry_after: int = 1):
+        super().__init__(f"Model '{model_name}' is busy, please retry later")
+        self.model_name = model_name
+        self.retry_after = retry_after
+
+
+class ModelWorker:
+    """单个模型的专用工作线程"""
+
+    def __init__(self, name: str, max_queue_size: int):
+        self.name = name
+        self._queue: queue.Queue = queue.Queue(maxsize=max_queue_size)
+        self._busy = False
+        self._stopping = False
+        self._thread = threading.Thread(
+            target=self._run, name=f"mlx-audio-{name}", daemon=True
+        )
+        self._thread.start()
+
+    def submit(self, fn: Callable[..., Any], *args, **kwargs) -> Future:
+        future: Future = Future()
+        try:
+            self._queue.put_nowait((future, fn, args, kwargs))
+        except queue.Full:
+            raise ExecutorBusy(self.name) from None
+        return future
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            future, fn, args, kwargs = item
+            if not future.set_running_or_notify_cancel():
+                continue
+            self._busy = True
+            try:
+                future.set_result(fn(*args, **kwargs))
+            except BaseException as e:
+                future.set_exception(e)
+            finally:
+                self._busy = False
+            # 队列已满时stop()无法投递哨兵，排空后按标志退出
+            if self._stopping and self._queue.empty():
+                return
+
+    @property
+    def full(self) -> bool:
+        return self._queue.full()
+
+    def stats(self) -> Dict[str, Any]:
+        return {"queued": self._queue.qsize(), "busy": self._busy}
+
+    def stop(self):
+        """处理完已排队任务后退出（不阻塞调用方）"""
+        self._stopping = True
+        try:
+            self._queue.put_nowait(None)
+        except queue.Full:
+            pass
+
+
+class ModelExecutor:
+    """按模型名分配工作线程的执行器"""
+
+    def __init__(self, max_queue_size: int = 16):
+        self.max_queue_size = max(1, max_queue_size)
+        self._workers: Dict[str, ModelWorker] = {}
+        self._lock = threading.Lock()
+
+    def _worker(self, model_name: str) -> ModelWorker:
+        with self._lock:
+            if model_name not in self._workers:
+                self._workers[model_name] = ModelWorker(model_name, self.max_queue_size)
+            return self._workers[model_name]
+
+    def submit(self, model_name: str, fn: Callable[..., Any], *args, **kwargs) -> Future:
+        """投递任务，队列已满时抛出 ExecutorBusy"""
+        return self._worker(model_name).submit(fn, *args, **kwargs)
+
+    async def run(self, model_name: str, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """在模型工作线程中执行并等待结果"""
+        return await asyncio.wrap_future(self.submit(model_name, fn, *args, **kwargs))
+
+    def is_full(self, model_name: str) -> bool:
+        with self._lock:
+            worker: Optional[ModelWorker] = self._workers.get(model_name)
+        return worker is not None and worker.full
+
+    def release(self, model_name: str):
+        """停止指定模型的工作线程"""
+        with self._lock:
+            worker = self._workers.pop(model_name, None)
+        if worker is not None:
+            worker.stop()
+
+    def get_stats(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            return {name: worker.stats() for name, worker in self._workers.items()}
+
+    def shutdown(self):
+        """停止所有工作线程"""
+        with self._lock:
+            workers = list(self._workers.values())
+            self._workers.clear()
+        for worker in workers:
+            worker.stop()
+
+
+# 全局实例
+model_executor = ModelExecutor(max_queue_size=config.executor.max_queue_size)
@@ -1,11 +1,27 @@
-"""MLX-Audio 资源管理器 - 懒加载+自动释放+线程安全+异步兼容"""
+"""MLX-Audio 资源管理器 - 懒加载+自动释放+内存预算+线程安全+异步兼容"""
 import asyncio
+import logging
 import threading
 import time
 from dataclasses import dataclass
-from typing import Any, Callable, Dict, Optional
+from typing import Any, Callable, Dict, Iterable, List, Optional
 
 import mlx.core as mx
+import mlx.nn as nn
+from mlx.utils import tree_flatten
+
+from mlx_audio.codec_registry import codec_registry
+from mlx_audio.config import config
+from mlx_audio.models.stt_engine import stt_engines
+
+logger = logging.getLogger(__name__)
+
+
+def model_nbytes(model: Any) -> int:
+    """按参数大小估算模型占用的字节数"""
+    if not isinstance(model, nn.Module):
+        return 0
+    return sum(v.nbytes for _, v in tree_flatten(model.parameters()))
 
 
 @dataclass
@@ -14,53 +30,195 @@ class ModelEntry:
     model: Any
     last_access: float
     load_time: float
+    size_bytes: int = 0
+    hits: int = 0
+    pinned: bool = False
 
 
 class MemoryManager:
     """统一资源管理器"""
     
-    def __init__(self, idle_timeout: int = 300):
+    def __init__(
+        self,
+        idle_timeout: int = 300,
+        memory_budget: int = 0,
+        eviction_policy: str = "lru",
+        pinned: Iterable[str] = (),
+    ):
+        """
+        参数:
+        - idle_timeout: 空闲多少秒后自动释放（固定模型除外）
+        - memory_budget: 模型参数总字节数上限，0表示不限制
+        - eviction_policy: 超出预算时的淘汰策略 (lru/lfu)
+        - pinned: 常驻模型，不会被淘汰或空闲释放
+        """
+        if eviction_policy not in ("lru", "lfu"):
+            raise ValueError(f"Unknown eviction policy: {eviction_policy}")
         self._models: Dict[str, ModelEntry] = {}
         self._lock = threading.RLock()
+        self._load_locks: Dict[str, threading.Lock] = {}
+        self._known_sizes: Dict[str, int] = {}
         self._idle_timeout = idle_timeout
+        self._memory_budget = memory_budget
+        self._eviction_policy = eviction_policy
+        self._pinned = set(pinned)
         self._cleanup_task: Optional[asyncio.Task] = None
         self._running = False
+        self._release_listeners: List[Callable[[str], None]] = []
     
-    def get_model(self, name: str, load_func: Callable[[], Any]) -> Any:
-        """获取模型（懒加载）"""
+    def add_release_listener(self, listener: Callable[[str], None]):
+        """注册模型被释放（含淘汰和空闲释放）时的回调，参数为模型名"""
+        self._release_listeners.append(listener)
+    
+    def _notify_released(self, names: Iterable[str]):
+        for name in names:
+            for listener in self._release_listeners:
+                try:
+                    listener(name)
+                except Exception:
+                    logger.exception(f"Release listener failed for '{name}'")
+    
+    def _touch(self, name: str) -> Optional[ModelEntry]:
         with self._lock:
-            if name in self._models:
-                self._models[name].last_access = time.time()
-                return self._models[name].model
+            entry = self._models.get(name)
+            if entry is not None:
+                entry.last_access = time.time()
+                entry.hits += 1
+            return entry
+    
+    def _load_lock(self, name: str) -> threading.Lock:
+        # 按名称常驻：释放模型时删除锁会让等待者与新请求各持一把锁，重复加载
+        with self._lock:
+            return self._load_locks.setdefault(name, threading.Lock())
+    
+    def get_model(self, name: str, load_func: Callable[[], Any]) -> Any:
+        """获取模型（懒加载）
+        
+        不同模型可并行加载；同一模型的并发加载请求只会加载一次。
+        """
+        entry = self._touch(name)
+        if entry is not None:
+            return entry.model
+        
+        with self._load_lock(name):
+            # 等待期间可能已被其他线程加载
+            entry = self._touch(name)
+            if entry is not None:
+                return entry.model
+            
+            # 已知大小时先腾出空间，避免加载期间超出预算
+            if name in self._known_sizes:
+                evicted = []
+                try:
+                    with self._lock:
+                        self._make_room(name, self._known_sizes[name], evicted)
+                finally:
+                    self._notify_released(evicted)
             
             start = time.time()
             model = load_func()
-            self._models[name] = ModelEntry(
-                model=model,
-                last_access=time.time(),
-                load_time=time.time() - start
-            )
+            size = model_nbytes(model)
+            evicted = []
+            try:
+                with self._lock:
+                    self._known_sizes[name] = size
+                    try:
+                        self._make_room(name, size, evicted)
+                    except MemoryError:
+                        del model
+                        mx.clear_cache()
+                        raise
+                    self._models[name] = ModelEntry(
+                        model=model,
+                        last_access=time.time(),
+                        load_time=time.time() - start,
+                        size_bytes=size,
+                        pinned=name in self._pinned,
+                    )
+            finally:
+                self._notify_released(evicted)
             return model
     
+    def _used_bytes(self) -> int:
+        # 共享编解码器（SNAC/DAC/Mimi等）和STT引擎的KV缓存也计入预算，但不参与淘汰
+        models = sum(entry.size_bytes for entry in self._models.values())
+        return models + codec_registry.nbytes() + stt_engines.nbytes()
+    
+    def _make_room(self, name: str, size: int, evicted: List[str]):
+        """按淘汰策略释放模型，直到能放下 size 字节（需持有 _lock）
+        
+        被淘汰的模型名追加到 evicted，由调用方在释放 _lock 后通知监听器。
+        即使淘汰全部可淘汰模型也放不下时直接抛出 MemoryError，不淘汰任何模型。
+        """
+        if self._memory_budget <= 0:
+            return
+        used = self._used_bytes()
+        if used + size <= self._memory_budget:
+            return
+        
+        candidates = [
+            item for item in self._models.items()
+            if item[0] != name and not item[1].pinned
+        ]
+        available = self._memory_budget - used
+        available += sum(entry.size_bytes for _, entry in candidates)
+        if size > available:
+            raise MemoryError(
+                f"Model '{name}' needs {size / 1e6:.1f} MB but only "
+                f"{available / 1e6:.1f} MB of the "
+                f"{self._memory_budget / 1e6:.1f} MB budget can be freed"
+            )
+        
+        if self._eviction_policy == "lfu":
+            order = lambda item: (item[1].hits, item[1].last_access)
+        else:
+            order = lambda item: item[1].last_access
+        for victim, entry in sorted(candidates, key=order):
+            if used + size <= self._memory_budget:
+                break
+            del self._models[victim]
+            used -= entry.size_bytes
+            evicted.append(victim)
+        mx.clear_cache()
+        logger.info(f"Evicted {evicted} to load '{name}'")
+    
+    def pin(self, name: str):
+        """固定模型，使其不被淘汰"""
+        with self._lock:
+            self._pinned.add(name)
+            if name in self._models:
+                self._models[name].pinned = True
+    
+    def unpin(self, name: str):
+        """取消固定"""
+        with self._lock:
+            self._pinned.discard(name)
+            if name in self._models:
+                self._models[name].pinned = False
+    
     async def get_model_async(self, name: str, load_func: Callable[[], Any]) -> Any:
         """异步获取模型"""
         loop = asyncio.get_event_loop()
         return await loop.run_in_executor(None, self.get_model, name, load_func)
     
     def release(self, name: str) -> bool:
-        """释放指定模型"""
+        """释放指定模型（包括固定模型）"""
         with self._lock:
-            if name in self._models:
-                del self._models[name]
-                mx.clear_cache()
-                return True
-            return False
+            if name not in self._models:
+                return False
+            del self._models[name]
+            mx.clear_cache()
+        self._notify_released([name])
+        return True
     
     def release_all(self):
-        """释放所有模型"""
+        """释放所有模型及共享编解码器"""
         with self._lock:
+            names = list(self._models)
             self._models.clear()
+            codec_registry.clear()
             mx.clear_cache()
+        self._notify_released(names)
     
     def cleanup_idle(self):
         """清理空闲模型"""
@@ -68,12 +226,15 @@ class MemoryManager:
         with self._lock:
             to_remove = [
                 name for name, entry in self._models.items()
-                if now - entry.last_access > self._idle_timeout
+                if not entry.pinned and now - entry.last_access > self._idle_timeout
             ]
             for name in to_remove:
                 del self._models[name]
-            if to_remove:
+            idle_codecs = codec_registry.release_idle(self._idle_timeout)
+            if to_remove or idle_codecs:
                 mx.clear_cache()
+        # 监听器可能阻塞（如停止STT引擎），不能持锁调用
+        self._notify_released(to_remove)
         return to_remove
     
     async def start_cleanup_loop(self, interval: int = 60):
@@ -81,7 +242,8 @@ class MemoryManager:
         self._running = True
         while self._running:
             await asyncio.sleep(interval)
-            self.cleanup_idle()
+            # 在线程中清理，避免释放回调阻塞事件循环
+            await asyncio.to_thread(self.cleanup_idle)
     
     def stop_cleanup_loop(self):
         """停止清理循环"""
@@ -103,6 +265,20 @@ class MemoryManager:
                 "loaded_models": list(self._models.keys()),
                 "count": len(self._models),
                 "memory_mb": memory_bytes / 1e6,
+                "params_mb": self._used_bytes() / 1e6,
+                "budget_mb": self._memory_budget / 1e6,
+                "codecs_mb": codec_registry.nbytes() / 1e6,
+                "codecs": codec_registry.get_stats(),
+                "stt_engines_mb": stt_engines.nbytes() / 1e6,
+                "models": {
+                    name: {
+                        "size_mb": entry.size_bytes / 1e6,
+                        "hits": entry.hits,
+                        "pinned": entry.pinned,
+                        "load_time": entry.load_time,
+                    }
+                    for name, entry in self._models.items()
+                },
             }
     
     def list_models(self) -> list:
@@ -112,4 +288,9 @@ class MemoryManager:
 
 
 # 全局实例
-memory_manager = MemoryManager()
+memory_manager = MemoryManager(
+    idle_timeout=config.model.idle_timeout,
+    memory_budget=int(config.model.memory_budget_mb * 1e6),
+    eviction_policy=config.model.eviction_policy,
+    pinned=config.model.preload_models,
+)
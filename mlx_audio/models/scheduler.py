@@ -0,0 +1,179 @@
+"""MLX-Audio TTS批处理调度器 - 按模型排队+兼容请求合批+逐请求流式返回
+
+模型如果实现了 ``generate_batch(texts, **params)``，同一批次中参数相同
+（voice、speed等）的请求会合并为一次批量前向计算。该方法需要产出
+``(index, GenerationResult)``，``index`` 对应 ``texts`` 中的位置，
+每个结果会立即推送给对应的调用方。未实现该方法的模型，以及带
+``stream=True`` 的流式请求，按请求逐个生成。
+批次在模型的专用工作线程（见 executor.py）中执行。
+"""
+import asyncio
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Dict, List, Tuple
+
+from mlx_audio.config import config
+from mlx_audio.models.executor import ExecutorBusy, model_executor
+
+_DONE = object()
+
+
+def _freeze(value: Any) -> Any:
+    """将参数转为可哈希形式，用于合批键"""
+    if isinstance(value, dict):
+        return tuple(sorted((k, _freeze(v)) for k, v in value.items()))
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(v) for v in value)
+    try:
+        hash(value)
+    except TypeError:
+        return id(value)
+    return value
+
+
+@dataclass
+class SpeechJob:
+    """单个语音合成请求"""
+    model: Any
+    text: str
+    params: Dict[str, Any]
+    loop: asyncio.AbstractEventLoop
+    queue: asyncio.Queue = field(default_factory=asyncio.Queue)
+    cancelled: bool = False
+
+    @property
+    def key(self) -> Tuple:
+        return (id(self.model), _freeze(self.params))
+
+    def put(self, item: Any):
+        """从工作线程把结果送回事件循环"""
+        self.loop.call_soon_threadsafe(self.queue.put_nowait, item)
+
+
+class TTSScheduler:
+    """按模型排队的TTS批处理调度器"""
+
+    def __init__(
+        self,
+        max_batch_size: int = 8,
+        max_wait_ms: float = 10.0,
+        max_pending: int = 16,
+    ):
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_pending = max(1, max_pending)
+        self.max_wait = max_wait_ms / 1000
+        self._queues: Dict[str, asyncio.Queue] = {}
+        self._workers: Dict[str, asyncio.Task] = {}
+
+    def submit(self, model_name: str, model: Any, text: str, **params) -> AsyncIterator[Any]:
+        """提交请求，返回逐段产出 GenerationResult 的异步迭代器
+
+        排队请求过多时立即抛出 ExecutorBusy，便于在响应开始前返回429。
+        """
+        queue = self._queue_for(model_name)
+        if queue.qsize() >= self.max_pending or model_executor.is_full(model_name):
+            raise ExecutorBusy(model_name)
+        job = SpeechJob(model=model, text=text, params=params, loop=asyncio.get_running_loop())
+        queue.put_nowait(job)
+        return self._results(job)
+
+    @staticmethod
+    async def _results(job: SpeechJob) -> AsyncIterator[Any]:
+        try:
+            while True:
+                item = await job.queue.get()
+                if item is _DONE:
+                    return
+                if isinstance(item, BaseException):
+                    raise item
+                yield item
+        finally:
+            # 客户端断开后不再为该请求继续生成
+            job.cancelled = True
+
+    def _queue_for(self, model_name: str) -> asyncio.Queue:
+        if model_name not in self._queues:
+            self._queues[model_name] = asyncio.Queue()
+        worker = self._workers.get(model_name)
+        if worker is None or worker.done():
+            self._workers[model_name] = asyncio.create_task(
+                self._worker(model_name, self._queues[model_name])
+            )
+        return self._queues[model_name]
+
+    async def _collect(self, queue: asyncio.Queue) -> List[SpeechJob]:
+        """取出首个请求后在 max_wait 内尽量凑满一批"""
+        jobs = [await queue.get()]
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.max_wait
+        while len(jobs) < self.max_batch_size:
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                jobs.append(await asyncio.wait_for(queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        while len(jobs) < self.max_batch_size and not queue.empty():
+            jobs.append(queue.get_nowait())
+        return [job for job in jobs if not job.cancelled]
+
+    async def _worker(self, model_name: str, queue: asyncio.Queue):
+        while True:
+            jobs = await self._collect(queue)
+            groups: Dict[Tuple, List[SpeechJob]] = {}
+            for job in jobs:
+                groups.setdefault(job.key, []).append(job)
+            for group in groups.values():
+                try:
+                    await model_executor.run(model_name, self._run_group, group)
+                except ExecutorBusy as e:
+                    for job in group:
+                        job.put(e)
+
+    @staticmethod
+    def _run_group(jobs: List[SpeechJob]):
+        """在工作线程中执行一组参数相同的请求"""
+        model = jobs[0].model
+        batched = len(jobs) > 1 and not jobs[0].params.get("stream")
+        if batched and hasattr(model, "generate_batch"):
+            try:
+                for index, result in model.generate_batch(
+                    [job.text for job in jobs], **jobs[0].params
+                ):
+                    jobs[index].put(result)
+            except Exception as e:
+                for job in jobs:
+                    job.put(e)
+                return
+            for job in jobs:
+                job.put(_DONE)
+            return
+
+        for job in jobs:
+            try:
+                for result in model.generate(job.text, **job.params):
+                    if job.cancelled:
+                        break
+                    job.put(result)
+                job.put(_DONE)
+            except Exception as e:
+                job.put(e)
+
+    def pending(self) -> Dict[str, int]:
+        """各模型排队中的请求数"""
+        return {name: queue.qsize() for name, queue in self._queues.items()}
+
+    def shutdown(self):
+        """停止所有调度任务"""
+        for worker in self._workers.values():
+            worker.cancel()
+        self._workers.clear()
+        self._queues.clear()
+
+
+# 全局实例
+tts_scheduler = TTSScheduler(
+    max_batch_size=config.scheduler.max_batch_size,
+    max_wait_ms=config.scheduler.max_wait_ms,
+    max_pending=config.executor.max_queue_size,
+)
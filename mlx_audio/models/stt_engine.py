@@ -0,0 +1,93 @@
+"""MLX-Audio STT连续批处理 - 每个Whisper模型一个解码引擎
+
+并发的转录请求不再逐个占用模型工作线程，而是把各自的30秒窗口交给
+同一个 ``WhisperEngine``：新窗口随时加入空闲槽位，与其他请求的窗口
+共享编码器和解码器调用。未决请求过多时抛出 ``ExecutorBusy``。
+"""
+import asyncio
+import threading
+from concurrent.futures import Future
+from typing import Any, Dict
+
+from mlx_audio.config import config
+from mlx_audio.models.executor import ExecutorBusy
+
+
+class STTEngines:
+    """按模型名管理Whisper解码引擎"""
+
+    def __init__(self, max_slots: int = 8, max_pending: int = 16):
+        self.max_slots = max(1, max_slots)
+        self.max_pending = max(1, max_pending)
+        self._engines: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def supports(model: Any) -> bool:
+        """是否为可连续批处理的Whisper模型"""
+        # 延迟导入，避免启动时加载Whisper依赖
+        from mlx_audio.stt.models.whisper.whisper import Model
+
+        return isinstance(model, Model)
+
+    def get(self, model_name: str, model: Any):
+        """获取模型对应的引擎，模型被重新加载时重建引擎"""
+        from mlx_audio.stt.models.whisper.engine import WhisperEngine
+
+        with self._lock:
+            engine = self._engines.get(model_name)
+            if engine is not None and engine.model is model:
+                return engine
+            stale = engine
+            engine = WhisperEngine(model, max_slots=self.max_slots)
+            self._engines[model_name] = engine
+        if stale is not None:
+            stale.stop(wait=False, drain=True)
+        return engine
+
+    def submit(self, model_name: str, model: Any, audio, **kwargs) -> Future:
+        """投递转录请求（计算梅尔频谱，会阻塞），未决请求过多时抛出 ExecutorBusy"""
+        engine = self.get(model_name, model)
+        if engine.pending_requests >= self.max_pending:
+            raise ExecutorBusy(model_name)
+        return engine.submit(audio, **kwargs)
+
+    async def transcribe(self, model_name: str, model: Any, audio, **kwargs) -> Any:
+        """转录并等待结果"""
+        future = await asyncio.to_thread(self.submit, model_name, model, audio, **kwargs)
+        return await asyncio.wrap_future(future)
+
+    def release(self, model_name: str):
+        """停止指定模型的引擎（不阻塞，可在事件循环中调用）
+
+        与 ModelWorker.stop 一样不再接收新请求，但已提交的请求会在
+        引擎线程中解码完成，空闲释放或淘汰不会让进行中的转录失败。
+        """
+        with self._lock:
+            engine = self._engines.pop(model_name, None)
+        if engine is not None:
+            engine.stop(wait=False, drain=True)
+
+    def nbytes(self) -> int:
+        """所有引擎预分配的KV缓存字节数"""
+        with self._lock:
+            return sum(engine.nbytes for engine in self._engines.values())
+
+    def get_stats(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            return {name: engine.stats() for name, engine in self._engines.items()}
+
+    def shutdown(self):
+        """停止所有引擎"""
+        with self._lock:
+            engines = list(self._engines.values())
+            self._engines.clear()
+        for engine in engines:
+            engine.stop()
+
+
+# 全局实例
+stt_engines = STTEngines(
+    max_slots=config.scheduler.stt_slots,
+    max_pending=config.executor.max_queue_size,
+)
@@ -0,0 +1,102 @@
+import importlib
+import threading
+import unittest
+from unittest.mock import AsyncMock, patch
+
+from fastapi.testclient import TestClient
+
+from mlx_audio.models.executor import ExecutorBusy, ModelExecutor, ModelWorker
+
+
+class Blocker:
+    """A task that holds the worker thread until released."""
+
+    def __init__(self):
+        self.started = threading.Event()
+        self.resume = threading.Event()
+
+    def __call__(self):
+        self.started.set()
+        self.resume.wait(timeout=5)
+        return "blocked"
+
+
+class TestModelWorker(unittest.TestCase):
+    def fill(self, worker):
+        """Occupy the thread and fill the one-slot queue behind it."""
+        blocker = Blocker()
+        running = worker.submit(blocker)
+        self.assertTrue(blocker.started.wait(timeout=5))
+        queued = worker.submit(lambda: "queued")
+        self.assertTrue(worker.full)
+        return blocker, running, queued
+
+    def test_full_queue_raises_busy(self):
+        worker = ModelWorker("busy", max_queue_size=1)
+        self.addCleanup(worker.stop)
+        blocker, running, queued = self.fill(worker)
+
+        with self.assertRaises(ExecutorBusy) as ctx:
+            worker.submit(lambda: "rejected")
+        self.assertEqual(ctx.exception.model_name, "busy")
+        self.assertEqual(worker.stats(), {"queued": 1, "busy": True})
+
+        blocker.resume.set()
+        self.assertEqual(running.result(timeout=5), "blocked")
+        self.assertEqual(queued.result(timeout=5), "queued")
+
+    def test_stop_on_full_queue_drains_and_exits(self):
+        worker = ModelWorker("stop", max_queue_size=1)
+        blocker, running, queued = self.fill(worker)
+
+        # The sentinel cannot be queued; the thread must exit on its own
+        worker.stop()
+        blocker.resume.set()
+        self.assertEqual(queued.result(timeout=5), "queued")
+        worker._thread.join(timeout=5)
+        self.assertFalse(worker._thread.is_alive())
+
+
+class TestModelExecutor(unittest.TestCase):
+    def test_release_finishes_queued_work(self):
+        executor = ModelExecutor(max_queue_size=2)
+        blocker = Blocker()
+        running = executor.submit("model", blocker)
+        self.assertTrue(blocker.started.wait(timeout=5))
+        queued = [executor.submit("model", lambda i=i: i) for i in range(2)]
+        self.assertTrue(executor.is_full("model"))
+        with self.assertRaises(ExecutorBusy):
+            executor.submit("model", lambda: None)
+        thread = executor._workers["model"]._thread
+
+        executor.release("model")
+        self.assertEqual(executor.get_stats(), {})
+        self.assertFalse(executor.is_full("model"))
+        blocker.resume.set()
+        self.assertEqual(running.result(timeout=5), "blocked")
+        self.assertEqual([f.result(timeout=5) for f in queued], [0, 1])
+        thread.join(timeout=5)
+        self.assertFalse(thread.is_alive())
+
+        # A fresh worker is started for the next request
+        self.assertEqual(executor.submit("model", lambda: "again").result(5), "again")
+        executor.shutdown()
+
+    def test_busy_maps_to_429(self):
+        # mlx_audio.api re-exports the FastAPI instance under the module's name
+        api = importlib.import_module("mlx_audio.api.app")
+        client = TestClient(api.app)
+        busy = ExecutorBusy("kokoro", retry_after=3)
+        with patch.object(api, "get_model_async", AsyncMock()), patch.object(
+            api.tts_scheduler, "submit", side_effect=busy
+        ):
+            response = client.post(
+                "/v1/audio/speech", json={"model": "kokoro", "input": "hi"}
+            )
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response.headers["Retry-After"], "3")
+        self.assertEqual(response.json()["detail"], str(busy))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,159 @@
+import itertools
+import threading
+import time
+import unittest
+from unittest.mock import patch
+
+import mlx.core as mx
+import mlx.nn as nn
+
+from mlx_audio.codec_registry import codec_registry
+from mlx_audio.models.memory_manager import MemoryManager
+from mlx_audio.models.stt_engine import stt_engines
+
+
+class FakeModel(nn.Module):
+    def __init__(self, nbytes: int):
+        super().__init__()
+        self.weight = mx.zeros((nbytes,), dtype=mx.uint8)
+
+
+def loader(nbytes: int):
+    return lambda: FakeModel(nbytes)
+
+
+class TestMemoryManager(unittest.TestCase):
+    def setUp(self):
+        # Shared codecs and STT engines count against the budget; keep them
+        # out of the way so only the fake models are measured.
+        for target in (codec_registry, stt_engines):
+            patcher = patch.object(target, "nbytes", return_value=0)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        # Strictly increasing access times regardless of clock resolution
+        clock = patch(
+            "mlx_audio.models.memory_manager.time.time",
+            side_effect=itertools.count(),
+        )
+        clock.start()
+        self.addCleanup(clock.stop)
+
+    def test_lru_eviction_order(self):
+        manager = MemoryManager(memory_budget=300, eviction_policy="lru")
+        for name in ("a", "b", "c"):
+            manager.get_model(name, loader(100))
+        manager.get_model("a", loader(100))
+
+        manager.get_model("d", loader(100))
+        self.assertEqual(manager.list_models(), ["a", "c", "d"])
+
+        manager.get_model("e", loader(200))
+        self.assertEqual(manager.list_models(), ["d", "e"])
+
+    def test_lfu_eviction_order(self):
+        manager = MemoryManager(memory_budget=300, eviction_policy="lfu")
+        for name in ("a", "b", "c"):
+            manager.get_model(name, loader(100))
+        for _ in range(2):
+            manager.get_model("a", loader(100))
+        manager.get_model("c", loader(100))
+
+        # b has the fewest hits even though a was loaded first
+        manager.get_model("d", loader(100))
+        self.assertEqual(manager.list_models(), ["a", "c", "d"])
+
+        # d and c tie on hits; the older access goes first
+        manager.get_model("d", loader(100))
+        manager.get_model("e", loader(100))
+        self.assertEqual(manager.list_models(), ["a", "d", "e"])
+
+    def test_pinned_models_never_evicted(self):
+        manager = MemoryManager(memory_budget=300, pinned=["a"])
+        manager.get_model("a", loader(100))
+        manager.get_model("b", loader(100))
+        manager.get_model("c", loader(100))
+
+        manager.get_model("d", loader(200))
+        self.assertEqual(manager.list_models(), ["a", "d"])
+
+        manager.pin("d")
+        with self.assertRaises(MemoryError):
+            manager.get_model("e", loader(100))
+        self.assertEqual(manager.list_models(), ["a", "d"])
+
+    def test_over_budget_leaves_cache_intact(self):
+        manager = MemoryManager(memory_budget=300, pinned=["a"])
+        released = []
+        manager.add_release_listener(released.append)
+        for name in ("a", "b", "c"):
+            manager.get_model(name, loader(100))
+
+        # Evicting b and c frees 200 bytes, not enough for 250
+        with self.assertRaises(MemoryError):
+            manager.get_model("big", loader(250))
+        self.assertEqual(manager.list_models(), ["a", "b", "c"])
+        self.assertEqual(released, [])
+
+        # The failed size is remembered, so the retry is refused before loading
+        calls = []
+        with self.assertRaises(MemoryError):
+            manager.get_model("big", lambda: calls.append(1) or FakeModel(250))
+        self.assertEqual(calls, [])
+        self.assertEqual(manager.list_models(), ["a", "b", "c"])
+
+    def test_concurrent_loads(self):
+        manager = MemoryManager()
+        calls = []
+        started = threading.Event()
+        finish = threading.Event()
+
+        def slow_load():
+            calls.append("same")
+            started.set()
+            finish.wait(timeout=5)
+            return FakeModel(10)
+
+        results = []
+        threads = [
+            threading.Thread(
+                target=lambda: results.append(manager.get_model("same", slow_load))
+            )
+            for _ in range(4)
+        ]
+        for thread in threads:
+            thread.start()
+        self.assertTrue(started.wait(timeout=5))
+        time.sleep(0.05)
+        finish.set()
+        for thread in threads:
+            thread.join(timeout=5)
+        self.assertEqual(calls, ["same"])
+        self.assertEqual(len(results), 4)
+        self.assertTrue(all(model is results[0] for model in results))
+
+        # Each loader waits for the other, so serialised loads would time out
+        barrier = threading.Barrier(2, timeout=5)
+
+        def parallel_load():
+            barrier.wait()
+            return FakeModel(10)
+
+        errors = []
+
+        def load(name):
+            try:
+                manager.get_model(name, parallel_load)
+            except threading.BrokenBarrierError as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=load, args=(n,)) for n in ("x", "y")]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(timeout=10)
+        self.assertEqual(errors, [])
+        self.assertEqual(sorted(manager.list_models()), ["same", "x", "y"])
+
+
+if __name__ == "__main__":
+    unittest.main()
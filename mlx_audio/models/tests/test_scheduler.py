@@ -0,0 +1,132 @@
+import asyncio
+import threading
+import unittest
+from unittest.mock import patch
+
+from mlx_audio.models.executor import ExecutorBusy, model_executor
+from mlx_audio.models.scheduler import TTSScheduler
+
+
+class FakeModel:
+    """Records generate/generate_batch calls and echoes the text back."""
+
+    def __init__(self):
+        self.calls = []
+        self.hold = threading.Event()
+        self.hold.set()
+
+    def generate(self, text, **params):
+        self.calls.append(("generate", [text], params))
+        self.hold.wait(timeout=5)
+        yield f"{text}:0"
+        yield f"{text}:1"
+
+    def generate_batch(self, texts, **params):
+        self.calls.append(("generate_batch", list(texts), params))
+        # Finish in reverse so routing by index is actually exercised
+        for index in reversed(range(len(texts))):
+            yield index, f"{texts[index]}:batch"
+
+
+async def collect(results):
+    return [item async for item in results]
+
+
+class TestTTSScheduler(unittest.IsolatedAsyncioTestCase):
+    def make_scheduler(self, **kwargs):
+        scheduler = TTSScheduler(**kwargs)
+        self.addCleanup(scheduler.shutdown)
+        self.addCleanup(model_executor.release, self.id())
+        return scheduler
+
+    async def test_groups_by_model_and_params(self):
+        scheduler = self.make_scheduler(max_wait_ms=50)
+        model, other = FakeModel(), FakeModel()
+        streams = [
+            scheduler.submit(self.id(), model, "a", voice="x"),
+            scheduler.submit(self.id(), model, "b", voice="y"),
+            scheduler.submit(self.id(), model, "c", voice="x"),
+            scheduler.submit(self.id(), other, "d", voice="x"),
+        ]
+        results = await asyncio.gather(*(collect(s) for s in streams))
+
+        self.assertEqual(
+            results, [["a:batch"], ["b:0", "b:1"], ["c:batch"], ["d:0", "d:1"]]
+        )
+        self.assertEqual(
+            model.calls,
+            [
+                ("generate_batch", ["a", "c"], {"voice": "x"}),
+                ("generate", ["b"], {"voice": "y"}),
+            ],
+        )
+        self.assertEqual(other.calls, [("generate", ["d"], {"voice": "x"})])
+
+    async def test_max_wait_window(self):
+        scheduler = self.make_scheduler(max_wait_ms=500)
+        model = FakeModel()
+        first = scheduler.submit(self.id(), model, "a")
+        await asyncio.sleep(0.05)
+        second = scheduler.submit(self.id(), model, "b")
+        await asyncio.gather(collect(first), collect(second))
+        self.assertEqual(model.calls, [("generate_batch", ["a", "b"], {})])
+
+        scheduler = self.make_scheduler(max_wait_ms=0)
+        model = FakeModel()
+        first = scheduler.submit(self.id(), model, "a")
+        await asyncio.sleep(0.05)
+        second = scheduler.submit(self.id(), model, "b")
+        await asyncio.gather(collect(first), collect(second))
+        self.assertEqual(
+            model.calls, [("generate", ["a"], {}), ("generate", ["b"], {})]
+        )
+
+    async def test_busy_when_queue_full(self):
+        scheduler = self.make_scheduler(max_pending=1)
+        model = FakeModel()
+        first = scheduler.submit(self.id(), model, "a")
+        with self.assertRaises(ExecutorBusy):
+            scheduler.submit(self.id(), model, "b")
+        self.assertEqual(await collect(first), ["a:0", "a:1"])
+
+        with patch.object(model_executor, "is_full", return_value=True):
+            with self.assertRaises(ExecutorBusy):
+                scheduler.submit(self.id(), model, "c")
+
+    async def test_streaming_requests_not_batched(self):
+        scheduler = self.make_scheduler(max_wait_ms=50)
+        model = FakeModel()
+        streams = [
+            scheduler.submit(self.id(), model, text, stream=True) for text in "ab"
+        ]
+        results = await asyncio.gather(*(collect(s) for s in streams))
+        self.assertEqual(results, [["a:0", "a:1"], ["b:0", "b:1"]])
+        self.assertEqual(
+            [call[0] for call in model.calls], ["generate", "generate"]
+        )
+
+    async def test_cancelled_jobs_dropped(self):
+        scheduler = self.make_scheduler(max_wait_ms=0)
+        model = FakeModel()
+        model.hold.clear()
+        held = scheduler.submit(self.id(), model, "hold")
+        await asyncio.sleep(0.05)
+
+        kept = scheduler.submit(self.id(), model, "kept")
+        dropped = scheduler.submit(self.id(), model, "dropped")
+        waiting = asyncio.create_task(anext(dropped))
+        await asyncio.sleep(0)
+        waiting.cancel()
+        with self.assertRaises(asyncio.CancelledError):
+            await waiting
+
+        model.hold.set()
+        self.assertEqual(await collect(held), ["hold:0", "hold:1"])
+        self.assertEqual(await collect(kept), ["kept:0", "kept:1"])
+        self.assertEqual(
+            [call[1] for call in model.calls], [["hold"], ["kept"]]
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,82 @@
+"""Recurrent kernels shared by TTS and STT models - no TTS/STT imports.
+
+The LSTM recurrence is split into a one-off input projection over the whole
+sequence and a per-step cell update. The cell update is compiled once per
+shape, so every step costs a single fused call, and stacking independent
+recurrences (e.g. the two directions of a bidirectional LSTM) along a leading
+axis runs them together as one batched matmul per step.
+"""
+
+from typing import Optional, Tuple
+
+import mlx.core as mx
+
+__all__ = [
+    "lstm_input_projection",
+    "lstm_scan",
+]
+
+
+def lstm_input_projection(
+    x: mx.array, Wx: mx.array, bias: Optional[mx.array] = None
+) -> mx.array:
+    """Project a whole input sequence for the LSTM gates.
+
+    Args:
+        x: Input (..., seq_len, input_size)
+        Wx: Input weights (4 * hidden_size, input_size), gates ordered i, f, g, o
+        bias: Optional combined gate bias (4 * hidden_size,)
+
+    Returns:
+        Gate pre-activations (..., seq_len, 4 * hidden_size)
+    """
+    if bias is not None:
+        return mx.addmm(bias, x, Wx.T)
+    return x @ Wx.T
+
+
+@mx.compile
+def _lstm_cell(
+    x_proj: mx.array, hidden: mx.array, cell: mx.array, Wh: mx.array
+) -> Tuple[mx.array, mx.array]:
+    ifgo = x_proj + hidden @ Wh
+    i, f, g, o = mx.split(ifgo, 4, axis=-1)
+    cell = mx.sigmoid(f) * cell + mx.sigmoid(i) * mx.tanh(g)
+    hidden = mx.sigmoid(o) * mx.tanh(cell)
+    return hidden, cell
+
+
+def lstm_scan(
+    x_proj: mx.array,
+    Wh: mx.array,
+    hidden: Optional[mx.array] = None,
+    cell: Optional[mx.array] = None,
+) -> Tuple[mx.array, mx.array]:
+    """Run the LSTM recurrence over projected inputs, first step to last.
+
+    Args:
+        x_proj: Gate pre-activations (..., seq_len, 4 * hidden_size), see
+            ``lstm_input_projection``
+        Wh: Transposed recurrent weights (hidden_size, 4 * hidden_size), or
+            (stack, hidden_size, 4 * hidden_size) to run ``stack`` recurrences
+            whose inputs are stacked on the first axis of ``x_proj``
+        hidden: Initial hidden state (..., hidden_size), zeros if None
+        cell: Initial cell state (..., hidden_size), zeros if None
+
+    Returns:
+        Hidden and cell states for every step, each (..., seq_len, hidden_size)
+    """
+    state_shape = x_proj.shape[:-2] + (Wh.shape[-2],)
+    if hidden is None:
+        hidden = mx.zeros(state_shape, dtype=x_proj.dtype)
+    if cell is None:
+        cell = mx.zeros(state_shape, dtype=x_proj.dtype)
+
+    all_hidden = []
+    all_cell = []
+    for idx in range(x_proj.shape[-2]):
+        hidden, cell = _lstm_cell(x_proj[..., idx, :], hidden, cell, Wh)
+        all_hidden.append(hidden)
+        all_cell.append(cell)
+
+    return mx.stack(all_hidden, axis=-2), mx.stack(all_cell, axis=-2)
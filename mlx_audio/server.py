@@ -34,9 +34,17 @@ from fastapi import (
     WebSocketDisconnect,
 )
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import StreamingResponse
+from fastapi.responses import JSONResponse, StreamingResponse
 from pydantic import BaseModel
 
+from mlx_audio.models.executor import ExecutorBusy, model_executor
+from mlx_audio.models.scheduler import tts_scheduler
+from mlx_audio.models.stt_engine import stt_engines
+from mlx_audio.stt.utils import (
+    StreamingResampler,
+    decode_audio,
+    model_sample_rate,
+)
 from mlx_audio.utils import load_model
 
 
@@ -95,6 +103,16 @@ class ModelProvider:
 app = FastAPI()
 
 
+@app.exception_handler(ExecutorBusy)
+async def executor_busy_handler(request, exc: ExecutorBusy):
+    """Reject the request with 429 when the model's work queue is full."""
+    return JSONResponse(
+        status_code=429,
+        content={"detail": str(exc)},
+        headers={"Retry-After": str(exc.retry_after)},
+    )
+
+
 def int_or_float(value):
 
     try:
@@ -207,7 +225,7 @@ async def add_model(model_name: str):
     Returns:
         dict (dict): A dictionary containing the status of the operation.
     """
-    model_provider.load_model(model_name)
+    await model_executor.run(model_name, model_provider.load_model, model_name)
     return {"status": "success", "message": f"Model {model_name} added successfully"}
 
 
@@ -228,13 +246,24 @@ async def remove_model(model_name: str):
     model_name = unquote(model_name).strip('"')
     removed = await model_provider.remove_model(model_name)
     if removed:
+        model_executor.release(model_name)
+        stt_engines.release(model_name)
         return Response(status_code=204)  # 204 No Content - successful deletion
     else:
         raise HTTPException(status_code=404, detail=f"Model '{model_name}' not found")
 
 
-async def generate_audio(model, payload: SpeechRequest, verbose: bool = False):
-    for result in model.generate(
+def generate_audio(model, payload: SpeechRequest, verbose: bool = False):
+    """Queue a speech request and return an async iterator of encoded audio.
+
+    The request is admitted immediately so that a full queue raises
+    ``ExecutorBusy`` before the response starts streaming.
+    """
+    # Requests are queued per model so that concurrent requests with matching
+    # generation parameters can be batched into a single forward pass.
+    results = tts_scheduler.submit(
+        payload.model,
+        model,
         payload.input,
         voice=payload.voice,
         speed=payload.speed,
@@ -247,19 +276,25 @@ async def generate_audio(model, payload: SpeechRequest, verbose: bool = False):
         top_p=payload.top_p,
         top_k=payload.top_k,
         repetition_penalty=payload.repetition_penalty,
-    ):
+    )
 
-        sample_rate = result.sample_rate
-        buffer = io.BytesIO()
-        sf.write(buffer, result.audio, sample_rate, format=payload.response_format)
-        buffer.seek(0)
-        yield buffer.getvalue()
+    async def encode():
+        async for result in results:
+            sample_rate = result.sample_rate
+            buffer = io.BytesIO()
+            sf.write(buffer, result.audio, sample_rate, format=payload.response_format)
+            buffer.seek(0)
+            yield buffer.getvalue()
+
+    return encode()
 
 
 @app.post("/v1/audio/speech")
 async def tts_speech(payload: SpeechRequest):
     """Generate speech audio following the OpenAI text-to-speech API."""
-    model = model_provider.load_model(payload.model)
+    model = await model_executor.run(
+        payload.model, model_provider.load_model, payload.model
+    )
     return StreamingResponse(
         generate_audio(model, payload),
         media_type=f"audio/{payload.response_format}",
@@ -277,15 +312,15 @@ async def stt_transcriptions(
 ):
     """Transcribe audio using an STT model in OpenAI format."""
     data = await file.read()
-    tmp = io.BytesIO(data)
-    audio, sr = sf.read(tmp, always_2d=False)
-    tmp.close()
-    tmp_path = f"/tmp/{time.time()}.wav"
-    sf.write(tmp_path, audio, sr)
-
-    stt_model = model_provider.load_model(model)
-    result = stt_model.generate(tmp_path)
-    os.remove(tmp_path)
+    stt_model = await model_executor.run(model, model_provider.load_model, model)
+    audio = await asyncio.to_thread(decode_audio, data, model_sample_rate(stt_model))
+    if stt_engines.supports(stt_model):
+        # Whisper windows of concurrent requests are decoded together
+        result = await stt_engines.transcribe(
+            model, stt_model, audio, language=language
+        )
+    else:
+        result = await model_executor.run(model, stt_model.generate, audio)
     # Sanitize NaN values for JSON serialization
     return sanitize_for_json(result)
 
@@ -308,9 +343,20 @@ async def stt_realtime_transcriptions(websocket: WebSocket):
 
         # Load the STT model
         print("Loading STT model...")
-        stt_model = model_provider.load_model(model_name)
+        stt_model = await model_executor.run(
+            model_name, model_provider.load_model, model_name
+        )
         print("STT model loaded successfully")
 
+        # Speech is resampled to the model rate as it arrives
+        model_rate = model_sample_rate(stt_model)
+        resampler = (
+            StreamingResampler(sample_rate, model_rate)
+            if sample_rate != model_rate
+            else None
+        )
+        model_buffer = []
+
         # Initialize WebRTC VAD for speech detection
         vad = webrtcvad.Vad(
             3
@@ -388,6 +434,11 @@ async def stt_realtime_transcriptions(websocket: WebSocket):
                     # Convert to float32 for buffer
                     audio_chunk_float = audio_chunk_int16.astype(np.float32) / 32768.0
                     audio_buffer.extend(audio_chunk_float)
+                    model_buffer.append(
+                        resampler(audio_chunk_float)
+                        if resampler is not None
+                        else audio_chunk_float
+                    )
                     speech_chunk_count += 1
                     silence_skip_count = 0
                     last_speech_time = current_time
@@ -441,18 +492,18 @@ async def stt_realtime_transcriptions(websocket: WebSocket):
                 # Process initial chunk for real-time feedback
                 if should_process_initial and len(audio_buffer) >= initial_chunk_size:
                     process_size = initial_chunk_size
-                    audio_array = np.array(audio_buffer[:process_size])
                     processed_samples = process_size
                     initial_chunk_processed = True
 
-                    # Save to temporary file for processing
-                    tmp_path = f"/tmp/realtime_initial_{time.time()}.wav"
-                    sf.write(tmp_path, audio_array, sample_rate)
+                    model_audio = np.concatenate(model_buffer)
+                    model_audio = model_audio[: process_size * model_rate // sample_rate]
 
                     try:
                         # Generate transcription for initial chunk
-                        result = stt_model.generate(
-                            tmp_path,
+                        result = await model_executor.run(
+                            model_name,
+                            stt_model.generate,
+                            mx.array(model_audio),
                             language=(
                                 language if language and language != "Detect" else None
                             ),
@@ -489,26 +540,24 @@ async def stt_realtime_transcriptions(websocket: WebSocket):
                         await websocket.send_json(
                             {"error": error_msg, "status": "error"}
                         )
-                    finally:
-                        # Clean up temp file
-                        if os.path.exists(tmp_path):
-                            os.remove(tmp_path)
 
                 # Process final chunk (entire accumulated buffer)
                 if should_process_final and len(audio_buffer) > 0:
                     # Process the entire buffer (continuous speech chunk)
                     process_size = len(audio_buffer)
-                    audio_array = np.array(audio_buffer)
 
-                    # Save to temporary file for processing
-                    tmp_path = f"/tmp/realtime_{time.time()}.wav"
-                    sf.write(tmp_path, audio_array, sample_rate)
+                    model_buffer.append(
+                        resampler.flush() if resampler is not None else np.zeros(0)
+                    )
+                    model_audio = np.concatenate(model_buffer).astype(np.float32)
 
                     try:
                         # Generate transcription
 
-                        result = stt_model.generate(
-                            tmp_path,
+                        result = await model_executor.run(
+                            model_name,
+                            stt_model.generate,
+                            mx.array(model_audio),
                             language=(
                                 language if language and language != "Detect" else None
                             ),
@@ -538,6 +587,7 @@ async def stt_realtime_transcriptions(websocket: WebSocket):
 
                         # Clear processed audio from buffer and reset state
                         audio_buffer = []
+                        model_buffer = []
                         processed_samples = 0
                         initial_chunk_processed = False
                         last_process_time = current_time
@@ -554,10 +604,6 @@ async def stt_realtime_transcriptions(websocket: WebSocket):
                         await websocket.send_json(
                             {"error": error_msg, "status": "error"}
                         )
-                    finally:
-                        # Clean up temp file
-                        if os.path.exists(tmp_path):
-                            os.remove(tmp_path)
 
             elif "text" in message:
                 # JSON message received (e.g., stop command)
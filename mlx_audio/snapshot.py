@@ -0,0 +1,121 @@
+"""Ready-to-load model snapshots.
+
+``python -m mlx_audio.convert --snapshot`` writes a ``snapshot.json`` manifest
+next to the converted weights. The weights are stored exactly as the module
+tree holds them (already sanitized and quantized), and the manifest records
+every parameter path with its shape and dtype, the quantization parameters of
+each quantized layer and the safetensors files to read.
+
+Loading a snapshot skips the model's ``sanitize`` remap and the quantization
+predicates: quantized layers are swapped in from the manifest and the weights
+are bound to the module tree directly. ``mx.load`` reads safetensors lazily,
+so with ``lazy=True`` tensors are only read from disk on first use.
+"""
+
+import json
+from pathlib import Path
+from typing import Union
+
+import mlx.core as mx
+import mlx.nn as nn
+from mlx.utils import tree_flatten, tree_unflatten
+
+SNAPSHOT_FILE = "snapshot.json"
+SNAPSHOT_VERSION = 1
+
+
+def snapshot_manifest(model: nn.Module) -> dict:
+    """Describe the parameters and quantized layers of ``model``.
+
+    Call this before the weights are saved, ``save_model(donate_model=True)``
+    empties the module tree.
+    """
+    parameters = {
+        k: {"shape": list(v.shape), "dtype": str(v.dtype).split(".")[-1]}
+        for k, v in tree_flatten(model.parameters())
+    }
+    quantization = {
+        path: {
+            "group_size": module.group_size,
+            "bits": module.bits,
+            "mode": getattr(module, "mode", "affine"),
+        }
+        for path, module in model.named_modules()
+        if "scales" in module and hasattr(module, "bits")
+    }
+    return {
+        "version": SNAPSHOT_VERSION,
+        "parameters": parameters,
+        "quantization": quantization,
+    }
+
+
+def save_snapshot(model_path: Union[str, Path], manifest: dict):
+    """Write ``manifest`` for weights saved with ``mlx_lm.utils.save_model``."""
+    model_path = Path(model_path)
+    with open(model_path / "model.safetensors.index.json", encoding="utf-8") as f:
+        weight_map = json.load(f)["weight_map"]
+
+    missing = set(manifest["parameters"]) - set(weight_map)
+    if missing:
+        raise ValueError(
+            f"Weights in {model_path} are missing {len(missing)} parameters "
+            f"of the snapshot, e.g. {sorted(missing)[0]}"
+        )
+
+    manifest = dict(manifest, files=sorted(set(weight_map.values())))
+    with open(model_path / SNAPSHOT_FILE, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=4)
+
+
+def is_snapshot(model_path: Union[str, Path]) -> bool:
+    """Whether ``model_path`` holds a ready-to-load snapshot."""
+    return (Path(model_path) / SNAPSHOT_FILE).exists()
+
+
+def load_snapshot(model: nn.Module, model_path: Union[str, Path], strict: bool = True):
+    """Bind the snapshot in ``model_path`` to a freshly constructed ``model``.
+
+    Raises:
+        ValueError: If the snapshot was written by another version of the
+            format or, with ``strict``, no longer matches the module tree.
+    """
+    model_path = Path(model_path)
+    with open(model_path / SNAPSHOT_FILE, encoding="utf-8") as f:
+        manifest = json.load(f)
+
+    if manifest.get("version") != SNAPSHOT_VERSION:
+        raise ValueError(
+            f"Unsupported snapshot version {manifest.get('version')} in "
+            f"{model_path}, expected {SNAPSHOT_VERSION}."
+        )
+
+    quantization = manifest["quantization"]
+    if quantization:
+        nn.quantize(
+            model,
+            class_predicate=lambda p, m: dict(quantization[p])
+            if p in quantization
+            else False,
+        )
+
+    if strict:
+        expected = {k: list(v.shape) for k, v in tree_flatten(model.parameters())}
+        recorded = {k: p["shape"] for k, p in manifest["parameters"].items()}
+        if expected != recorded:
+            mismatched = sorted(
+                k
+                for k in expected.keys() | recorded.keys()
+                if expected.get(k) != recorded.get(k)
+            )
+            raise ValueError(
+                f"Snapshot in {model_path} does not match "
+                f"{type(model).__name__} ({len(mismatched)} mismatched "
+                f"parameters, e.g. {mismatched[0]}). Re-run convert with "
+                "--snapshot."
+            )
+
+    weights = {}
+    for name in manifest["files"]:
+        weights.update(mx.load(str(model_path / name)))
+    model.update(tree_unflatten(list(weights.items())), strict=strict)
@@ -9,6 +9,7 @@ from typing import Any, Callable, Dict, Generator, List, Optional, Tuple
 import mlx.core as mx
 import mlx.nn as nn
 
+from mlx_audio.snapshot import is_snapshot, load_snapshot
 from mlx_audio.stt.generate import wired_limit
 from mlx_audio.stt.utils import get_model_path
 
@@ -413,6 +414,11 @@ class Model(nn.Module):
         model = cls(config)
         model._tokenizer = tokenizer
 
+        if is_snapshot(model_path_resolved):
+            load_snapshot(model, model_path_resolved)
+            mx.eval(model.parameters())
+            return model
+
         weights = {}
         weight_files = glob.glob(str(Path(model_path_resolved) / "model*.safetensors"))
         if not weight_files:
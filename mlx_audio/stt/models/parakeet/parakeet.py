@@ -129,7 +129,7 @@ class Model(nn.Module):
 
     def generate(
         self,
-        path: Path | str,
+        path: Path | str | mx.array,
         *,
         dtype: mx.Dtype = mx.bfloat16,
         chunk_duration: Optional[float] = None,
@@ -141,7 +141,8 @@ class Model(nn.Module):
         Transcribe an audio file, with optional chunking for long files.
 
         Args:
-            path: Path to the audio file
+            path: Path to the audio file, or a mono waveform at the
+                preprocessor sample rate
             dtype: Data type for processing
             chunk_duration: If provided, splits audio into chunks of this length for processing
             overlap_duration: Overlap between chunks (only used when chunking)
@@ -155,10 +156,12 @@ class Model(nn.Module):
         kwargs.pop("generation_stream", None)
         verbose = kwargs.pop("verbose", False)
 
-        audio_path = Path(path)
-        audio_data = load_audio(
-            audio_path, self.preprocessor_config.sample_rate, dtype=dtype
-        )
+        if isinstance(path, (str, Path)):
+            audio_data = load_audio(
+                Path(path), self.preprocessor_config.sample_rate, dtype=dtype
+            )
+        else:
+            audio_data = mx.array(path, dtype=dtype)
 
         if chunk_duration is None:
             return self.decode_chunk(audio_data, verbose)
@@ -3,6 +3,8 @@ from dataclasses import dataclass
 import mlx.core as mx
 import mlx.nn as nn
 
+from mlx_audio.rnn import lstm_input_projection, lstm_scan
+
 
 @dataclass
 class PredictNetworkArgs:
@@ -55,7 +57,7 @@ class LSTM(nn.Module):
     def __call__(
         self, x: mx.array, h_c: tuple[mx.array, mx.array] | None = None
     ) -> tuple[mx.array, tuple[mx.array, mx.array]]:
-        if self.batch_first:
+        if not self.batch_first:
             x = mx.transpose(x, (1, 0, 2))
 
         if h_c is None:
@@ -71,12 +73,13 @@ class LSTM(nn.Module):
         for i in range(self.num_layers):
             layer = self.lstm[i]
 
-            all_h_steps, all_c_steps = layer(outputs, hidden=h[i], cell=c[i])
+            x_proj = lstm_input_projection(outputs, layer.Wx, layer.bias)
+            all_h_steps, all_c_steps = lstm_scan(x_proj, layer.Wh.T, h[i], c[i])
             outputs = all_h_steps
-            next_h.append(all_h_steps[-1])
-            next_c.append(all_c_steps[-1])
+            next_h.append(all_h_steps[:, -1])
+            next_c.append(all_c_steps[:, -1])
 
-        if self.batch_first:
+        if not self.batch_first:
             outputs = mx.transpose(outputs, (1, 0, 2))
 
         final_h = mx.stack(next_h, axis=0)
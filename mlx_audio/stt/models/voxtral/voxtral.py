@@ -1,12 +1,13 @@
 import glob
 import math
 import time
-from typing import Any, Callable, Dict, Generator, List, Optional, Tuple
+from typing import Any, Callable, Dict, Generator, List, Optional, Tuple, Union
 
 import mlx.core as mx
 import mlx.nn as nn
 import numpy as np
 
+from mlx_audio.snapshot import is_snapshot, load_snapshot
 from mlx_audio.stt.generate import wired_limit
 from mlx_audio.stt.utils import get_model_path
 
@@ -303,6 +304,10 @@ class Model(nn.Module):
         )
         model.config.model_repo = model_repo
 
+        if is_snapshot(model_path):
+            load_snapshot(model, model_path)
+            return model
+
         weights = {}
         weight_files = glob.glob(str(model_path / "model-*.safetensors"))
         for file in weight_files:
@@ -348,7 +353,7 @@ class Model(nn.Module):
 
     def generate(
         self,
-        audio: List[mx.array],
+        audio: Union[str, mx.array],
         *,
         message: Optional[List[Dict[str, Any]]] = None,
         max_tokens: int = 128,
@@ -360,6 +365,7 @@ class Model(nn.Module):
         language: str = "en",
         verbose: bool = False,
         generation_stream: bool = False,
+        **kwargs,
     ) -> mx.array:
 
         start_time = time.time()
@@ -377,8 +383,20 @@ class Model(nn.Module):
                 }
             ]
 
+        audio_kwargs = {}
+        if isinstance(audio, mx.array):
+            # Waveforms are wrapped in an in-memory wav by the processor
+            audio = np.array(audio, dtype=np.float32)
+            audio_kwargs = dict(
+                sampling_rate=self._processor.feature_extractor.sampling_rate,
+                format=["wav"],
+            )
+
         inputs = self._processor.apply_transcription_request(
-            language=language, audio=audio, model_id=self.config.model_repo
+            language=language,
+            audio=audio,
+            model_id=self.config.model_repo,
+            **audio_kwargs,
         )
         input_ids = mx.array(inputs["input_ids"])
         input_features = mx.array(inputs["input_features"]).transpose(0, 2, 1)
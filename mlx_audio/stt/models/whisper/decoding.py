@@ -6,7 +6,6 @@ from typing import Dict, Iterable, List, Optional, Sequence, Tuple, Union
 
 import mlx.core as mx
 import numpy as np
-from mlx.utils import tree_map
 
 from .audio import CHUNK_LENGTH
 from .tokenizer import Tokenizer, get_tokenizer
@@ -112,6 +111,12 @@ class DecodingOptions:
     without_timestamps: bool = False  # use <|notimestamps|> to sample text tokens only
     max_initial_timestamp: Optional[float] = 1.0
 
+    # speculative decoding: a smaller model sharing the tokenizer, e.g. a distilled
+    # decoder, proposes `num_draft_tokens` tokens per step that the model verifies
+    # in one forward pass; only used for greedy sampling (t == 0, no best_of)
+    draft_model: Optional["Whisper"] = None
+    num_draft_tokens: int = 4
+
     # implementation details
     fp16: bool = True  # use fp16 for most of the calculation
 
@@ -130,22 +135,43 @@ class DecodingResult:
 
 
 class Inference:
-    def __init__(self, model: "Whisper"):
+    def __init__(
+        self,
+        model: "Whisper",
+        cross_kv: Optional[List[Tuple[mx.array, mx.array]]] = None,
+    ):
         self.model: "Whisper" = model
+        # precomputed cross-attention keys and values, e.g. from an earlier attempt
+        self.cross_kv = cross_kv
         self.kv_cache = None
 
     def logits(self, tokens: mx.array, audio_features: mx.array) -> mx.array:
         """Perform a forward pass on the decoder and return per-token logits"""
+        if self.kv_cache is None:
+            self.kv_cache = self.model.decoder.make_cache(self.cross_kv)
         logits, self.kv_cache, _ = self.model.decoder(
             tokens, audio_features, kv_cache=self.kv_cache
         )
         return logits.astype(mx.float32)
 
     def rearrange_kv_cache(self, source_indices):
-        """Update the key-value cache according to the updated beams"""
-        # update the key/value cache to contain the selected sequences
+        """Update the key-value cache according to the updated beams
+
+        Not called yet: beam search still raises NotImplementedError.
+        """
+        # update the self-attention cache to contain the selected sequences; beams
+        # are only reordered within the group of their audio, so the
+        # cross-attention keys and values are unchanged
         if source_indices != list(range(len(source_indices))):
-            self.kv_cache = tree_map(lambda x: x[source_indices], self.kv_cache)
+            indices = mx.array(source_indices)
+            for kv_cache, _ in self.kv_cache:
+                kv_cache.reorder(indices)
+
+    def trim(self, n: int):
+        """Drop the last `n` positions of the self-attention cache"""
+        if n > 0:
+            for kv_cache, _ in self.kv_cache:
+                kv_cache.trim(n)
 
     def reset(self):
         self.kv_cache = None
@@ -265,7 +291,7 @@ class GreedyDecoder(TokenDecoder):
         else:
             next_tokens = categorical(logits, self.temperature)
 
-        logprobs = logits - mx.logsumexp(logits, axis=-1)
+        logprobs = logits - mx.logsumexp(logits, axis=-1, keepdims=True)
 
         current_logprobs = logprobs[mx.arange(logprobs.shape[0]), next_tokens]
         sum_logprobs += current_logprobs * (tokens[:, -1] != self.eot)
@@ -379,8 +405,10 @@ class ApplyTimestampRules(LogitFilter):
                 mask[:, last_allowed + 1 :] = -np.inf
 
         # if sum of probability over timestamps is above any other token, sample timestamp
+        # (among the tokens still allowed by the rules above)
         mask = mx.array(mask)
-        logprobs = logits - mx.logsumexp(logits, axis=-1)
+        logprobs = logits + mask
+        logprobs = logprobs - mx.logsumexp(logprobs, axis=-1, keepdims=True)
         timestamp_logprob = logprobs[:, self.tokenizer.timestamp_begin :].logsumexp(
             axis=-1, keepdims=True
         )
@@ -429,6 +457,12 @@ class DecodingTask:
         # inference: implements the forward pass through the decoder, including kv caching
         self.inference = Inference(model)
 
+        # speculative decoding: the draft decoder proposes tokens for greedy sampling
+        self.draft_inference = None
+        if options.draft_model is not None and options.temperature == 0:
+            if self.n_group == 1:
+                self.draft_inference = Inference(options.draft_model)
+
         # sequence ranker: implements how to rank a group of sampled sequences
         self.sequence_ranker = MaximumLikelihoodRanker(options.length_penalty)
 
@@ -468,6 +502,16 @@ class DecodingTask:
         if options.temperature == 0:
             if options.best_of is not None:
                 raise ValueError("best_of with greedy sampling (T=0) is not compatible")
+        if options.draft_model is not None:
+            if options.beam_size is not None:
+                raise ValueError("draft_model is not compatible with beam search")
+            draft_dims = options.draft_model.dims
+            if draft_dims.n_vocab != self.model.dims.n_vocab:
+                raise ValueError("draft_model must share the tokenizer of the model")
+            if draft_dims.n_text_ctx < self.model.dims.n_text_ctx:
+                raise ValueError("draft_model needs at least the model's text context")
+            if options.num_draft_tokens < 1:
+                raise ValueError("num_draft_tokens should be at least 1")
         if options.patience is not None and options.beam_size is None:
             raise ValueError("patience requires beam_size to be given")
         if options.length_penalty is not None and not (
@@ -615,8 +659,136 @@ class DecodingTask:
 
         return tokens, sum_logprobs, no_speech_probs
 
-    def run(self, mel: mx.array) -> List[DecodingResult]:
+    def _get_draft_audio_features(self, mel: mx.array, audio_features: mx.array):
+        draft = self.options.draft_model
+        draft_shape = (draft.dims.n_audio_ctx, draft.dims.n_audio_state)
+        if audio_features.shape[-2:] == draft_shape:
+            # same encoder dimensions, e.g. distil-whisper keeps the teacher encoder
+            return audio_features.astype(draft.dtype)
+        if mel.shape[-2:] == audio_features.shape[-2:]:
+            raise ValueError(
+                "draft_model needs the mel spectrogram: its encoder differs from "
+                "the model's, and only encoded audio features were given"
+            )
+        return draft.encoder(mel.astype(draft.dtype))
+
+    def _speculative_loop(
+        self, audio_features: mx.array, draft_features: mx.array, tokens: mx.array
+    ):
+        """
+        Greedy sampling where the draft decoder proposes up to `num_draft_tokens`
+        tokens and the model scores all of them in one forward pass. Each row keeps
+        the proposals matching the model's own filtered argmax, followed by the
+        model's token at the first mismatch; the batch advances by the shortest
+        match, so the output equals `_main_loop` with temperature 0.
+        """
+        n_batch = tokens.shape[0]
+        eot = self.tokenizer.eot
+
+        # the first token comes from the prompt pass of the model alone
+        pre_logits = self.inference.logits(tokens, audio_features)
+        self.draft_inference.logits(tokens, draft_features)
+        logits = pre_logits[:, -1]
+        for logit_filter in self.logit_filters:
+            logits = logit_filter.apply(logits, tokens)
+        next_tokens = logits.argmax(axis=-1)
+        logprobs = logits - mx.logsumexp(logits, axis=-1, keepdims=True)
+        logprobs = mx.take_along_axis(logprobs, next_tokens[:, None], axis=-1)
+
+        if self.tokenizer.no_speech is not None:  # compute no_speech_probs
+            probs_at_sot = mx.softmax(pre_logits[:, self.sot_index], axis=-1)
+            no_speech_probs = probs_at_sot[:, self.tokenizer.no_speech]
+        else:
+            no_speech_probs = mx.full(n_batch, mx.nan)
+
+        sequences = [
+            seq + [token]
+            for seq, token in zip(tokens.tolist(), next_tokens.tolist())
+        ]
+        sum_logprobs = logprobs[:, 0].tolist()
+        # the caches hold every token but the last one
+        draft_length = len(sequences[0]) - 1
+        n_sampled = 1
+
+        while (
+            n_sampled < self.sample_len
+            and len(sequences[0]) <= self.n_ctx
+            and not all(seq[-1] == eot for seq in sequences)
+        ):
+            length = len(sequences[0])
+            k = min(
+                self.options.num_draft_tokens,
+                self.sample_len - n_sampled - 1,
+                self.n_ctx - length,
+            )
+
+            # the draft decoder proposes k tokens, one at a time
+            drafts = [[] for _ in range(n_batch)]
+            inputs = mx.array([seq[draft_length:] for seq in sequences])
+            for _ in range(k):
+                logits = self.draft_inference.logits(inputs, draft_features)[:, -1]
+                context = mx.array([seq + d for seq, d in zip(sequences, drafts)])
+                for logit_filter in self.logit_filters:
+                    logits = logit_filter.apply(logits, context)
+                proposed = logits.argmax(axis=-1).tolist()
+                for d, token in zip(drafts, proposed):
+                    d.append(token)
+                inputs = mx.array(proposed)[:, None]
+
+            # the model scores the last token and all proposals in one pass
+            inputs = mx.array([[seq[-1]] + d for seq, d in zip(sequences, drafts)])
+            pre_logits = self.inference.logits(inputs, audio_features)
+            logits = []
+            for j in range(k + 1):
+                context = mx.array([seq + d[:j] for seq, d in zip(sequences, drafts)])
+                logits_j = pre_logits[:, j]
+                for logit_filter in self.logit_filters:
+                    logits_j = logit_filter.apply(logits_j, context)
+                logits.append(logits_j)
+            logits = mx.stack(logits, axis=1)
+            chosen = logits.argmax(axis=-1)
+            logprobs = logits - mx.logsumexp(logits, axis=-1, keepdims=True)
+            logprobs = mx.take_along_axis(logprobs, chosen[..., None], axis=-1)
+            chosen, logprobs = chosen.tolist(), logprobs[..., 0].tolist()
+
+            # keep the proposals every unfinished row agrees with
+            n_accepted = k
+            for seq, d, c in zip(sequences, drafts, chosen):
+                if seq[-1] == eot:
+                    continue
+                n = 0
+                while n < n_accepted and c[n] == d[n] and d[n] != eot:
+                    n += 1
+                if n < n_accepted and c[n] == d[n]:  # agreed on the end of text
+                    continue
+                n_accepted = n
+
+            for i, seq in enumerate(sequences):
+                for j in range(n_accepted + 1):
+                    if seq[-1] == eot:
+                        seq.append(eot)
+                    else:
+                        seq.append(chosen[i][j])
+                        sum_logprobs[i] += logprobs[i][j]
+            n_sampled += n_accepted + 1
+
+            # roll back the cache positions of the rejected proposals
+            self.inference.trim(k - n_accepted)
+            if k > 0:
+                self.draft_inference.trim(k - 1 - min(n_accepted, k - 1))
+                draft_length = length + min(n_accepted, k - 1)
+
+        return mx.array(sequences), mx.array(sum_logprobs), no_speech_probs
+
+    def run(
+        self,
+        mel: mx.array,
+        cross_kv: Optional[List[Tuple[mx.array, mx.array]]] = None,
+    ) -> List[DecodingResult]:
         self.inference.reset()
+        self.inference.cross_kv = cross_kv
+        if self.draft_inference is not None:
+            self.draft_inference.reset()
         self.decoder.reset()
         tokenizer: Tokenizer = self.tokenizer
         n_audio: int = mel.shape[0]
@@ -637,18 +809,31 @@ class DecodingTask:
                 )
             ]
 
-        # repeat tokens by the group size, for beam search or best-of-n sampling
+        # repeat tokens and audio by the group size, for beam search or best-of-n
+        # sampling, so that all samples of the group are decoded in one batch
         if self.n_group > 1:
             tokens = tokens[:, None, :]
             tokens = mx.broadcast_to(
                 tokens, [n_audio, self.n_group, len(self.initial_tokens)]
             )
-            tokens = tokens.reshape(
-                tokens, (n_audio * self.n_group, len(self.initial_tokens))
-            )
+            tokens = tokens.reshape(n_audio * self.n_group, len(self.initial_tokens))
+            audio_features = mx.repeat(audio_features, self.n_group, axis=0)
+            if cross_kv is not None:
+                self.inference.cross_kv = [
+                    tuple(mx.repeat(x, self.n_group, axis=0) for x in kv)
+                    for kv in cross_kv
+                ]
 
         # call the main sampling loop
-        tokens, sum_logprobs, no_speech_probs = self._main_loop(audio_features, tokens)
+        if self.draft_inference is not None:
+            draft_features = self._get_draft_audio_features(mel, audio_features)
+            tokens, sum_logprobs, no_speech_probs = self._speculative_loop(
+                audio_features, draft_features, tokens
+            )
+        else:
+            tokens, sum_logprobs, no_speech_probs = self._main_loop(
+                audio_features, tokens
+            )
 
         # reshape the tensors to have (n_audio, n_group) as the first two dimensions
         audio_features = audio_features[:: self.n_group]
@@ -711,6 +896,7 @@ def decode(
     model: "Whisper",
     mel: mx.array,
     options: DecodingOptions = DecodingOptions(),
+    cross_kv: Optional[List[Tuple[mx.array, mx.array]]] = None,
     **kwargs,
 ) -> Union[DecodingResult, List[DecodingResult]]:
     """
@@ -727,6 +913,10 @@ def decode(
     options: DecodingOptions
         A dataclass that contains all necessary options for decoding 30-second segments
 
+    cross_kv: List[Tuple[mx.array, mx.array]], optional
+        Per-layer cross-attention keys and values of the audio features, as returned
+        by `model.decoder.cross_kv`, to skip recomputing them, e.g. on fallback
+
     Returns
     -------
     result: Union[DecodingResult, List[DecodingResult]]
@@ -738,5 +928,5 @@ def decode(
     if kwargs:
         options = replace(options, **kwargs)
 
-    result = DecodingTask(model, options).run(mel)
+    result = DecodingTask(model, options).run(mel, cross_kv)
     return result[0] if single else result
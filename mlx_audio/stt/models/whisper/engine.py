@@ -0,0 +1,549 @@
+"""Continuous batching of concurrent Whisper transcription requests.
+
+``WhisperEngine`` decodes the 30-second windows of many requests together. It
+owns a fixed pool of decoding slots, each with a preallocated self-attention
+cache of ``n_text_ctx`` positions and the cross-attention keys and values of
+the window it decodes. Every iteration of the engine thread
+
+1. admits queued windows, from any request, into the free slots: their mels
+   are encoded in one ``embed_audio`` call and their prompts are prefilled in
+   one decoder call per distinct prompt,
+2. runs one batched decoder step over the occupied slots,
+3. retires the slots that reached end of text. Windows failing the fallback
+   thresholds are queued again, first in line, at the next temperature.
+
+Windows are split and decoded independently, as with
+``Model.generate(batch_size=...)``: the previous window's text is not used as
+a prompt.
+
+Usage:
+    engine = WhisperEngine(model, max_slots=8)
+    result = engine.submit(audio, language="en").result()  # STTOutput
+    engine.stop()
+"""
+
+import logging
+import threading
+from collections import deque
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from typing import Any, Deque, Dict, List, Optional, Tuple, Union
+
+import mlx.core as mx
+import numpy as np
+
+from .audio import (
+    HOP_LENGTH,
+    N_FRAMES,
+    N_SAMPLES,
+    SAMPLE_RATE,
+    log_mel_spectrogram,
+    pad_or_trim,
+)
+from .decoding import DecodingOptions, DecodingResult, DecodingTask, compression_ratio
+from .tokenizer import get_tokenizer
+from .whisper import (
+    KVCache,
+    Model,
+    STTOutput,
+    _is_silent,
+    _needs_fallback,
+    _split_windows,
+    _stitch_windows,
+    _window_segments,
+)
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class _Request:
+    future: Future
+    mel: mx.array
+    windows: List[Tuple[int, int]]
+    language: Optional[str]
+    task: str
+    prompt: Optional[List[int]]
+    temperatures: Tuple[float, ...]
+    compression_ratio_threshold: Optional[float]
+    logprob_threshold: Optional[float]
+    no_speech_threshold: Optional[float]
+    results: List[Optional[DecodingResult]] = field(default_factory=list)
+    remaining: int = 0
+    started: bool = False
+    tasks: Dict[float, DecodingTask] = field(default_factory=dict)
+
+
+@dataclass
+class _Window:
+    request: _Request
+    index: int
+    attempt: int = 0
+    # encoder output, kept while the window may still fall back
+    features: Optional[mx.array] = None
+
+
+@dataclass
+class _Slot:
+    window: _Window
+    task: DecodingTask
+    tokens: List[int]
+    no_speech_prob: float
+    sum_logprob: float = 0.0
+
+
+class WhisperEngine:
+    """Shares Whisper encoder and decoder calls across concurrent requests.
+
+    Args:
+        model: The Whisper model, used from the engine thread only.
+        max_slots: Windows decoded together. Each slot preallocates
+            ``n_text_ctx`` self-attention and ``n_audio_ctx`` cross-attention
+            keys and values per decoder layer.
+    """
+
+    def __init__(self, model: Model, max_slots: int = 8):
+        self.model = model
+        # graphs are bound to the thread that built them, so hand the engine
+        # thread evaluated weights and constants
+        mx.eval(
+            model.parameters(),
+            model.encoder._positional_embedding,
+            model.decoder._mask,
+        )
+        self.max_slots = max(1, max_slots)
+        self._slots: List[Optional[_Slot]] = [None] * self.max_slots
+        self._queue: Deque[_Window] = deque()
+        self._cond = threading.Condition()
+        self._running = True
+        self._draining = False
+        self._pending = 0
+        self._counters = {
+            "steps": 0,
+            "slot_steps": 0,
+            "encoder_calls": 0,
+            "encoded_windows": 0,
+            "fallbacks": 0,
+            "completed_requests": 0,
+        }
+        self._thread = threading.Thread(
+            target=self._run, name="whisper-engine", daemon=True
+        )
+        self._thread.start()
+
+    def submit(
+        self,
+        audio: Union[str, np.ndarray, mx.array],
+        *,
+        language: Optional[str] = None,
+        task: str = "transcribe",
+        initial_prompt: Optional[str] = None,
+        temperature: Union[float, Tuple[float, ...]] = (0.0, 0.2, 0.4, 0.6, 0.8, 1.0),
+        compression_ratio_threshold: Optional[float] = 2.4,
+        logprob_threshold: Optional[float] = -1.0,
+        no_speech_threshold: Optional[float] = 0.6,
+    ) -> Future:
+        """Queue ``audio`` for transcription.
+
+        Returns a future resolving to an ``STTOutput``. Cancelling the future
+        drops the windows of the request that are not decoded yet.
+        """
+        model = self.model
+        mel = log_mel_spectrogram(audio, n_mels=model.dims.n_mels, padding=N_SAMPLES)
+        # graphs are bound to the thread that built them
+        mx.eval(mel)
+        content_frames = mel.shape[-2] - N_FRAMES
+
+        if not model.is_multilingual:
+            language = "en"
+        prompt = None
+        if initial_prompt is not None:
+            tokenizer = get_tokenizer(
+                model.is_multilingual, num_languages=model.num_languages
+            )
+            prompt = tokenizer.encode(" " + initial_prompt.strip())
+
+        windows = _split_windows(mel, [(0, content_frames)])
+        request = _Request(
+            future=Future(),
+            mel=mel,
+            windows=windows,
+            language=language,
+            task=task,
+            prompt=prompt,
+            temperatures=(
+                (temperature,) if isinstance(temperature, (int, float)) else temperature
+            ),
+            compression_ratio_threshold=compression_ratio_threshold,
+            logprob_threshold=logprob_threshold,
+            no_speech_threshold=no_speech_threshold,
+            results=[None] * len(windows),
+            remaining=len(windows),
+        )
+        if not windows:
+            request.future.set_result(STTOutput(text="", segments=[], language=language))
+            return request.future
+
+        with self._cond:
+            if not self._running:
+                raise RuntimeError("WhisperEngine is stopped")
+            self._pending += 1
+            self._queue.extend(_Window(request, i) for i in range(len(windows)))
+            self._cond.notify()
+        return request.future
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes of the slot buffers: self- and cross-attention keys and values."""
+        dims = self.model.dims
+        positions = dims.n_text_ctx + dims.n_audio_ctx
+        return (
+            2
+            * dims.n_text_layer
+            * self.max_slots
+            * positions
+            * dims.n_text_state
+            * self.model.dtype.size
+        )
+
+    @property
+    def pending_requests(self) -> int:
+        """Requests submitted and not finished yet."""
+        with self._cond:
+            return self._pending
+
+    def stats(self) -> Dict[str, Any]:
+        """Queue depth, slot occupancy and batching counters."""
+        with self._cond:
+            counters = dict(self._counters)
+            active = sum(slot is not None for slot in self._slots)
+            queued = len(self._queue)
+            pending = self._pending
+        steps = counters.pop("steps")
+        slot_steps = counters.pop("slot_steps")
+        return {
+            "pending_requests": pending,
+            "queued_windows": queued,
+            "active_slots": active,
+            "max_slots": self.max_slots,
+            "cache_mb": self.nbytes / 1e6,
+            "occupancy": (
+                slot_steps / (steps * self.max_slots) if steps > 0 else 0.0
+            ),
+            "steps": steps,
+            **counters,
+        }
+
+    def stop(self, wait: bool = True, drain: bool = False):
+        """Stop the engine thread. New requests are refused from now on.
+
+        Args:
+            wait: Join the thread, which finishes its current step first.
+            drain: Decode the queued and active windows of the submitted
+                requests before stopping, instead of failing those requests.
+        """
+        with self._cond:
+            self._running = False
+            self._draining = drain
+            self._cond.notify()
+        if wait:
+            self._thread.join()
+
+    # === Engine thread ===
+
+    def _run(self):
+        mx.set_default_stream(mx.new_stream(mx.default_device()))
+        self._allocate()
+        while True:
+            with self._cond:
+                while self._running and not self._queue and not self._active():
+                    self._cond.wait()
+                if not self._running and not (
+                    self._draining and (self._queue or self._active())
+                ):
+                    break
+                admitted = self._take()
+
+            try:
+                if admitted:
+                    self._admit(admitted)
+                if self._active():
+                    self._step()
+            except Exception as e:
+                logger.exception("Whisper engine step failed")
+                failed = {id(w.request): w.request for w in admitted}
+                for i, slot in enumerate(self._slots):
+                    if slot is not None:
+                        failed[id(slot.window.request)] = slot.window.request
+                        self._slots[i] = None
+                for request in failed.values():
+                    self._finish(request, error=e)
+
+        error = RuntimeError("WhisperEngine was stopped")
+        requests = {id(w.request): w.request for w in self._queue}
+        requests.update(
+            (id(slot.window.request), slot.window.request)
+            for slot in self._slots
+            if slot is not None
+        )
+        for request in requests.values():
+            self._finish(request, error=error)
+        self._queue.clear()
+        self._slots = [None] * self.max_slots
+        self._kv_cache = self._cross_kv = self._no_features = None
+        mx.clear_cache()
+
+    def _allocate(self):
+        dims, dtype = self.model.dims, self.model.dtype
+        self._kv_cache = [KVCache(dims.n_text_ctx) for _ in range(dims.n_text_layer)]
+        for kv_cache in self._kv_cache:
+            kv_cache.allocate(self.max_slots, dims.n_text_state, dtype)
+        cross_shape = (self.max_slots, dims.n_audio_ctx, dims.n_text_state)
+        self._cross_kv = [
+            (mx.zeros(cross_shape, dtype), mx.zeros(cross_shape, dtype))
+            for _ in range(dims.n_text_layer)
+        ]
+        mx.eval(self._buffers())
+        self._no_features = mx.zeros((dims.n_audio_ctx, dims.n_audio_state), dtype)
+
+    def _buffers(self) -> List[mx.array]:
+        return [
+            a
+            for kv_cache, cross_kv in zip(self._kv_cache, self._cross_kv)
+            for a in (kv_cache.keys, kv_cache.values, *cross_kv)
+        ]
+
+    def _active(self) -> List[int]:
+        return [i for i, slot in enumerate(self._slots) if slot is not None]
+
+    def _take(self) -> List[_Window]:
+        """Pop as many live windows as there are free slots (holds _cond)"""
+        free = self.max_slots - len(self._active())
+        windows = []
+        while self._queue and len(windows) < free:
+            window = self._queue.popleft()
+            request = window.request
+            if not request.started:
+                request.started = True
+                # a running future can no longer be cancelled by the caller
+                if not request.future.set_running_or_notify_cancel():
+                    self._pending -= 1
+            if request.future.done():
+                continue
+            windows.append(window)
+        return windows
+
+    def _task(self, window: _Window) -> DecodingTask:
+        request = window.request
+        temperature = request.temperatures[window.attempt]
+        if temperature not in request.tasks:
+            options = DecodingOptions(
+                task=request.task,
+                language=request.language,
+                temperature=temperature,
+                prompt=request.prompt,
+                fp16=self.model.dtype == mx.float16,
+            )
+            request.tasks[temperature] = DecodingTask(self.model, options)
+        return request.tasks[temperature]
+
+    def _admit(self, windows: List[_Window]):
+        # encode the windows seen for the first time in one call
+        new = [w for w in windows if w.features is None]
+        if new:
+            mels = mx.stack(
+                [
+                    pad_or_trim(
+                        w.request.mel[seek : seek + size], N_FRAMES, axis=-2
+                    )
+                    for w in new
+                    for seek, size in [w.request.windows[w.index]]
+                ]
+            ).astype(self.model.dtype)
+            features = self.model.embed_audio(mels)
+            mx.eval(features)
+            for w, f in zip(new, features):
+                w.features = f
+            with self._cond:
+                self._counters["encoder_calls"] += 1
+                self._counters["encoded_windows"] += len(new)
+
+        # the first admitted window of a request decides its language
+        undetected = [w for w in windows if w.request.language is None]
+        if undetected:
+            _, probs = self.model.detect_language(
+                mx.stack([w.features for w in undetected])
+            )
+            for w, p in zip(undetected, probs):
+                if w.request.language is None:
+                    w.request.language = max(p, key=p.get)
+
+        free = [i for i, slot in enumerate(self._slots) if slot is None]
+        groups: Dict[Tuple[int, ...], List[Tuple[int, _Window, DecodingTask]]] = {}
+        for slot, window in zip(free, windows):
+            task = self._task(window)
+            groups.setdefault(task.initial_tokens, []).append((slot, window, task))
+        for members in groups.values():
+            self._prefill(members)
+
+    def _prefill(self, members: List[Tuple[int, _Window, DecodingTask]]):
+        task = members[0][2]
+        slots = mx.array([slot for slot, _, _ in members])
+        n = len(task.initial_tokens)
+        tokens = mx.array([task.initial_tokens] * len(members))
+        features = mx.stack([window.features for _, window, _ in members])
+
+        logits, kv_cache, _ = self.model.decoder(tokens, features)
+        for ((k, v), (cross_k, cross_v)), slot_cache, slot_cross_kv in zip(
+            kv_cache, self._kv_cache, self._cross_kv
+        ):
+            slot_cache.write(slots, k, v)
+            slot_cross_kv[0][slots] = cross_k
+            slot_cross_kv[1][slots] = cross_v
+
+        logits = logits.astype(mx.float32)
+        no_speech = task.tokenizer.no_speech
+        if no_speech is not None:
+            probs_at_sot = mx.softmax(logits[:, task.sot_index], axis=-1)
+            no_speech_probs = probs_at_sot[:, no_speech].tolist()
+        else:
+            no_speech_probs = [np.nan] * len(members)
+
+        for (slot, window, task), no_speech_prob in zip(members, no_speech_probs):
+            self._slots[slot] = _Slot(
+                window, task, list(task.initial_tokens), no_speech_prob
+            )
+        self._sample([slot for slot, _, _ in members], logits[:, -1])
+
+    def _step(self):
+        """One decoder step over the slots up to the last occupied one"""
+        active = self._active()
+        n = active[-1] + 1
+        slots = self._slots[:n]
+        tokens = mx.array([[s.tokens[-1] if s is not None else 0] for s in slots])
+        # free rows below the last occupied one decode a dummy token at 0
+        offsets = [len(s.tokens) - 1 if s is not None else 0 for s in slots]
+
+        kv_cache = []
+        for slot_cache, (cross_k, cross_v) in zip(self._kv_cache, self._cross_kv):
+            slot_cache.seek(offsets)
+            kv_cache.append((slot_cache, (cross_k[:n], cross_v[:n])))
+        # the cross-attention reads the cached keys and values, so the stacked
+        # features are never evaluated
+        features = mx.stack(
+            [s.window.features if s is not None else self._no_features for s in slots]
+        )
+        logits, _, _ = self.model.decoder(tokens, features, kv_cache=kv_cache)
+        logits = logits[:, 0]
+
+        with self._cond:
+            self._counters["steps"] += 1
+            self._counters["slot_steps"] += len(active)
+        self._sample(active, logits[mx.array(active)].astype(mx.float32))
+
+    def _sample(self, slot_ids: List[int], logits: mx.array):
+        """Pick the next token of each slot and retire the finished ones"""
+        slots = [self._slots[i] for i in slot_ids]
+
+        # logit filters depend on each slot's own prompt and history
+        rows = []
+        for slot, row in zip(slots, logits):
+            row = row[None]
+            tokens = mx.array([slot.tokens])
+            for logit_filter in slot.task.logit_filters:
+                row = logit_filter.apply(row, tokens)
+            rows.append(row)
+        logits = mx.concatenate(rows)
+
+        temperatures = mx.array([slot.task.options.temperature for slot in slots])
+        next_tokens = logits.argmax(axis=-1)
+        if any(slot.task.options.temperature > 0 for slot in slots):
+            sampled = mx.random.categorical(
+                logits / mx.maximum(temperatures, 1e-6)[:, None]
+            )
+            next_tokens = mx.where(temperatures > 0, sampled, next_tokens)
+        logprobs = logits - mx.logsumexp(logits, axis=-1, keepdims=True)
+        logprobs = mx.take_along_axis(logprobs, next_tokens[:, None], axis=-1)[:, 0]
+        mx.eval(next_tokens, logprobs, self._buffers())
+
+        n_ctx = self.model.dims.n_text_ctx
+        for slot_id, slot, token, logprob in zip(
+            slot_ids, slots, next_tokens.tolist(), logprobs.tolist()
+        ):
+            slot.tokens.append(token)
+            slot.sum_logprob += logprob
+            task = slot.task
+            if (
+                token == task.tokenizer.eot
+                or len(slot.tokens) - task.sample_begin >= task.sample_len
+                or len(slot.tokens) >= n_ctx
+            ):
+                self._slots[slot_id] = None
+                self._retire(slot)
+
+    def _retire(self, slot: _Slot):
+        window, task = slot.window, slot.task
+        request = window.request
+        tokens = slot.tokens[task.sample_begin :]
+        if task.tokenizer.eot in tokens:
+            tokens = tokens[: tokens.index(task.tokenizer.eot)]
+        text = task.tokenizer.decode(tokens).strip()
+        result = DecodingResult(
+            audio_features=window.features,
+            language=request.language,
+            tokens=tokens,
+            text=text,
+            avg_logprob=slot.sum_logprob / (len(tokens) + 1),
+            no_speech_prob=slot.no_speech_prob,
+            temperature=task.options.temperature,
+            compression_ratio=compression_ratio(text),
+        )
+
+        if window.attempt + 1 < len(request.temperatures) and _needs_fallback(
+            result,
+            request.compression_ratio_threshold,
+            request.logprob_threshold,
+            request.no_speech_threshold,
+        ):
+            window.attempt += 1
+            with self._cond:
+                self._counters["fallbacks"] += 1
+                self._queue.appendleft(window)
+            return
+
+        window.features = None
+        request.results[window.index] = result
+        request.remaining -= 1
+        if request.remaining == 0:
+            self._finish(request)
+
+    def _finish(self, request: _Request, error: Optional[BaseException] = None):
+        if request.future.done():
+            return
+        with self._cond:
+            self._pending -= 1
+            if error is None:
+                self._counters["completed_requests"] += 1
+        if error is not None:
+            request.future.set_exception(error)
+            return
+
+        tokenizer = get_tokenizer(
+            self.model.is_multilingual,
+            num_languages=self.model.num_languages,
+            language=request.language,
+            task=request.task,
+        )
+        time_precision = (
+            N_FRAMES // self.model.dims.n_audio_ctx * HOP_LENGTH / SAMPLE_RATE
+        )
+        window_segments = [
+            _window_segments(seek, size, result, tokenizer, time_precision)
+            for (seek, size), result in zip(request.windows, request.results)
+            if not _is_silent(
+                result, request.no_speech_threshold, request.logprob_threshold
+            )
+        ]
+        request.future.set_result(
+            _stitch_windows(window_segments, tokenizer, request.language)
+        )
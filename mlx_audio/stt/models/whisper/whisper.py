@@ -17,6 +17,8 @@ import tqdm
 from huggingface_hub import snapshot_download
 from mlx.utils import tree_unflatten
 
+from mlx_audio.snapshot import is_snapshot, load_snapshot
+
 from .audio import (
     FRAMES_PER_SECOND,
     HOP_LENGTH,
@@ -57,6 +59,158 @@ def _get_end(segments: List[dict]) -> Optional[float]:
     )
 
 
+def _split_windows(
+    mel: mx.array,
+    seek_clips: List[Tuple[int, int]],
+    search_frames: int = 5 * FRAMES_PER_SECOND,
+    smooth_frames: int = FRAMES_PER_SECOND // 10,
+) -> List[Tuple[int, int]]:
+    """
+    Split the clips into `(seek, size)` windows of up to N_FRAMES, ending each window at the
+    quietest point of its last `search_frames` frames so that words are rarely cut in half.
+    """
+    if not seek_clips:
+        return []
+    end = max(clip_end for _, clip_end in seek_clips)
+    loudness = np.array(mel[:end].astype(mx.float32).mean(axis=-1))
+    loudness = np.convolve(loudness, np.ones(smooth_frames) / smooth_frames, "same")
+
+    windows = []
+    for seek, clip_end in seek_clips:
+        while seek < clip_end:
+            size = min(N_FRAMES, clip_end - seek)
+            if seek + size < clip_end:
+                # on ties keep the longest window
+                search = loudness[seek + size - search_frames : seek + size][::-1]
+                size -= int(np.argmin(search))
+            windows.append((seek, size))
+            seek += size
+    return windows
+
+
+def _split_segments(
+    tokens: np.ndarray,
+    timestamp_begin: int,
+    time_precision: float,
+    duration: float,
+) -> List[Tuple[float, float, np.ndarray]]:
+    """
+    Split the tokens decoded for a window at consecutive timestamp tokens into
+    `(start, end, tokens)` segments, with times relative to the window start. Text after
+    the last segment becomes a segment that ends at the end of the window.
+    """
+    timestamp_tokens = tokens >= timestamp_begin
+    consecutive = np.where(
+        np.logical_and(timestamp_tokens[:-1], timestamp_tokens[1:])
+    )[0]
+
+    segments = []
+    last_slice = 0
+    for current_slice in (consecutive + 1).tolist():
+        sliced_tokens = tokens[last_slice:current_slice]
+        start = (sliced_tokens[0].item() - timestamp_begin) * time_precision
+        end = (sliced_tokens[-1].item() - timestamp_begin) * time_precision
+        segments.append((start, end, sliced_tokens))
+        last_slice = current_slice
+
+    rest = tokens[last_slice:]
+    if not timestamp_tokens[last_slice:].all():
+        start, end = 0.0, duration
+        if timestamp_tokens[last_slice]:
+            start = (rest[0].item() - timestamp_begin) * time_precision
+        if timestamp_tokens[-1] and rest[-1].item() != timestamp_begin:
+            end = (rest[-1].item() - timestamp_begin) * time_precision
+        segments.append((start, end, rest))
+    return segments
+
+
+def _needs_fallback(
+    result: DecodingResult,
+    compression_ratio_threshold: Optional[float],
+    logprob_threshold: Optional[float],
+    no_speech_threshold: Optional[float],
+) -> bool:
+    """Whether a window should be decoded again at a higher temperature"""
+    if no_speech_threshold is not None and result.no_speech_prob > no_speech_threshold:
+        return False  # silence
+    if (
+        compression_ratio_threshold is not None
+        and result.compression_ratio > compression_ratio_threshold
+    ):
+        return True  # too repetitive
+    # average log probability is too low
+    return logprob_threshold is not None and result.avg_logprob < logprob_threshold
+
+
+def _is_silent(
+    result: DecodingResult,
+    no_speech_threshold: Optional[float],
+    logprob_threshold: Optional[float],
+) -> bool:
+    """No voice activity check for a decoded window"""
+    if no_speech_threshold is None:
+        return False
+    # don't skip if the logprob is high enough, despite the no_speech_prob
+    if logprob_threshold is not None and result.avg_logprob > logprob_threshold:
+        return False
+    return result.no_speech_prob > no_speech_threshold
+
+
+def _window_segments(
+    seek: int,
+    size: int,
+    result: DecodingResult,
+    tokenizer,
+    time_precision: float,
+) -> List[dict]:
+    """Segments of a window decoded on its own, with absolute times"""
+    time_offset = float(seek * HOP_LENGTH / SAMPLE_RATE)
+    segments = []
+    for start, end, tokens in _split_segments(
+        np.array(result.tokens),
+        tokenizer.timestamp_begin,
+        time_precision,
+        size * HOP_LENGTH / SAMPLE_RATE,
+    ):
+        tokens = tokens.tolist()
+        text_tokens = [token for token in tokens if token < tokenizer.eot]
+        segments.append(
+            {
+                "seek": seek,
+                "start": time_offset + start,
+                "end": time_offset + end,
+                "text": tokenizer.decode(text_tokens),
+                "tokens": tokens,
+                "temperature": result.temperature,
+                "avg_logprob": result.avg_logprob,
+                "compression_ratio": result.compression_ratio,
+                "no_speech_prob": result.no_speech_prob,
+            }
+        )
+    return segments
+
+
+def _stitch_windows(
+    window_segments: List[List[dict]], tokenizer, language: str
+) -> "STTOutput":
+    """Number the segments of consecutive windows and join their text"""
+    all_tokens = []
+    all_segments = []
+    for segments in window_segments:
+        for segment in segments:
+            # if a segment is instantaneous or does not contain text, clear it
+            if segment["start"] == segment["end"] or segment["text"].strip() == "":
+                segment["text"] = ""
+                segment["tokens"] = []
+                segment["words"] = []
+            all_segments.append({"id": len(all_segments), **segment})
+            all_tokens.extend(segment["tokens"])
+
+    return STTOutput(
+        text=tokenizer.decode(all_tokens), segments=all_segments, language=language
+    )
+
+
 @dataclass
 class STTOutput:
     text: str
@@ -87,6 +241,92 @@ def sinusoids(length, channels, max_timescale=10000):
     return mx.concatenate([mx.sin(scaled_time), mx.cos(scaled_time)], axis=1)
 
 
+class KVCache:
+    """Self-attention keys and values of one decoder layer.
+
+    The buffers hold ``n_ctx`` positions and are allocated on the first update,
+    then written in place at ``offset`` so each step only touches the new
+    positions.
+
+    After ``seek``, every batch row decodes one token at its own position
+    instead, e.g. the slots of ``WhisperEngine``: row ``i`` writes at
+    ``offsets[i]`` and attends to the positions up to it.
+    """
+
+    def __init__(self, n_ctx: int):
+        self.n_ctx = n_ctx
+        self.keys = None
+        self.values = None
+        self.offset = 0
+        self.offsets: Optional[List[int]] = None
+
+    def allocate(self, batch_size: int, n_state: int, dtype: mx.Dtype):
+        shape = (batch_size, self.n_ctx, n_state)
+        self.keys = mx.zeros(shape, dtype)
+        self.values = mx.zeros(shape, dtype)
+
+    @property
+    def nbytes(self) -> int:
+        return 0 if self.keys is None else self.keys.nbytes + self.values.nbytes
+
+    def update_and_fetch(
+        self, k: mx.array, v: mx.array
+    ) -> Tuple[mx.array, mx.array]:
+        if self.keys is None:
+            self.allocate(k.shape[0], k.shape[-1], k.dtype)
+        if self.offsets is not None:
+            return self._update_rows(k, v)
+        end = self.offset + k.shape[1]
+        if end > self.n_ctx:
+            raise ValueError(f"KV cache overflow: {end} > {self.n_ctx} positions")
+        self.keys[:, self.offset : end] = k
+        self.values[:, self.offset : end] = v
+        self.offset = end
+        return self.state
+
+    @property
+    def state(self) -> Tuple[mx.array, mx.array]:
+        return self.keys[:, : self.offset], self.values[:, : self.offset]
+
+    def trim(self, n: int):
+        """Drop the last ``n`` written positions, e.g. rejected draft tokens"""
+        self.offset -= n
+
+    def reorder(self, indices: mx.array):
+        """Gather the batch rows at ``indices``, copying the written positions only"""
+        if self.keys is None:
+            return
+        self.keys[:, : self.offset] = self.keys[indices, : self.offset]
+        self.values[:, : self.offset] = self.values[indices, : self.offset]
+
+    def write(self, rows: mx.array, k: mx.array, v: mx.array):
+        """Store prefilled keys and values of batch ``rows`` from position 0"""
+        self.keys[rows, : k.shape[1]] = k
+        self.values[rows, : v.shape[1]] = v
+
+    def seek(self, offsets: List[int]):
+        """Decode the first ``len(offsets)`` rows one token each at ``offsets``"""
+        end = max(offsets) + 1
+        if end > self.n_ctx:
+            raise ValueError(f"KV cache overflow: {end} > {self.n_ctx} positions")
+        self.offsets = offsets
+
+    def row_mask(self, dtype: mx.Dtype) -> mx.array:
+        """Additive mask hiding the positions past each row's offset"""
+        offsets = mx.array(self.offsets)
+        visible = mx.arange(max(self.offsets) + 1) <= offsets[:, None]
+        return mx.where(visible, 0, -1e9).astype(dtype)[:, None, None, :]
+
+    def _update_rows(self, k: mx.array, v: mx.array) -> Tuple[mx.array, mx.array]:
+        n = len(self.offsets)
+        rows, offsets = mx.arange(n), mx.array(self.offsets)
+        self.keys[rows, offsets] = k[:, 0]
+        self.values[rows, offsets] = v[:, 0]
+        end = max(self.offsets) + 1
+        self.offsets = [offset + 1 for offset in self.offsets]
+        return self.keys[:n, :end], self.values[:n, :end]
+
+
 class MultiHeadAttention(nn.Module):
     def __init__(self, n_state: int, n_head: int):
         super().__init__()
@@ -108,7 +348,9 @@ class MultiHeadAttention(nn.Module):
         if xa is None:
             k = self.key(x)
             v = self.value(x)
-            if kv_cache is not None:
+            if isinstance(kv_cache, KVCache):
+                k, v = kv_cache.update_and_fetch(k, v)
+            elif kv_cache is not None:
                 k = mx.concatenate([kv_cache[0], k], axis=1)
                 v = mx.concatenate([kv_cache[1], v], axis=1)
         elif kv_cache is None:
@@ -118,10 +360,13 @@ class MultiHeadAttention(nn.Module):
             k, v = kv_cache
 
         wv, qk = self.qkv_attention(q, k, v, mask)
+        if isinstance(kv_cache, KVCache):
+            return self.out(wv), kv_cache, qk
         return self.out(wv), (k, v), qk
 
     def qkv_attention(self, q, k, v, mask=None):
         n_batch, n_ctx, n_state = q.shape
+        n_keys = k.shape[1]
         scale = (n_state // self.n_head) ** -0.25
         q = q.reshape(*q.shape[:2], self.n_head, -1).transpose(0, 2, 1, 3) * scale
         k = k.reshape(*k.shape[:2], self.n_head, -1).transpose(0, 2, 3, 1) * scale
@@ -129,7 +374,11 @@ class MultiHeadAttention(nn.Module):
 
         qk = q @ k
         if mask is not None:
-            qk = qk + mask[:n_ctx, :n_ctx]
+            if mask.ndim == 2:
+                # the queries are the last n_ctx positions when keys come from a
+                # cache
+                mask = mask[n_keys - n_ctx : n_keys, :n_keys]
+            qk = qk + mask
 
         w = mx.softmax(qk, axis=-1, precise=True)
         out = (w @ v).transpose(0, 2, 1, 3)
@@ -230,23 +479,53 @@ class TextDecoder(nn.Module):
         xa : mx.array, shape = (batch_size, n_audio_ctx, n_audio_state)
             the encoded audio features to be attended on
         """
-        offset = kv_cache[0][0][0].shape[1] if kv_cache else 0
-        x = (
-            self.token_embedding(x)
-            + self.positional_embedding[offset : offset + x.shape[-1]]
-        )
+        offset = 0
+        mask = self._mask
+        kv = kv_cache[0][0] if kv_cache else None
+        if isinstance(kv, KVCache) and kv.offsets is not None:
+            # one token per row, each at its own position
+            positional_embedding = self.positional_embedding[mx.array(kv.offsets)]
+            x = self.token_embedding(x) + positional_embedding[:, None]
+            mask = kv.row_mask(mask.dtype)
+        else:
+            if kv is not None:
+                offset = kv.offset if isinstance(kv, KVCache) else kv[0].shape[1]
+            x = (
+                self.token_embedding(x)
+                + self.positional_embedding[offset : offset + x.shape[-1]]
+            )
 
         if kv_cache is None:
             kv_cache = [None] * len(self.blocks)
         cross_qk = [None] * len(self.blocks)
         for e, block in enumerate(self.blocks):
             x, kv_cache[e], cross_qk[e] = block(
-                x, xa, mask=self._mask, kv_cache=kv_cache[e]
+                x, xa, mask=mask, kv_cache=kv_cache[e]
             )
 
         x = self.ln(x)
         return self.token_embedding.as_linear(x), kv_cache, cross_qk
 
+    def make_cache(
+        self, cross_kv: Optional[List[Tuple[mx.array, mx.array]]] = None
+    ) -> List[Tuple[KVCache, Optional[Tuple[mx.array, mx.array]]]]:
+        """
+        Per-layer caches for incremental decoding: a preallocated self-attention
+        ``KVCache`` and the cross-attention keys and values, computed on the first
+        call unless ``cross_kv`` is given.
+        """
+        n_ctx = self.positional_embedding.shape[0]
+        if cross_kv is None:
+            cross_kv = [None] * len(self.blocks)
+        return [(KVCache(n_ctx), kv) for kv in cross_kv]
+
+    def cross_kv(self, xa: mx.array) -> List[Tuple[mx.array, mx.array]]:
+        """Cross-attention keys and values of every layer for audio features ``xa``"""
+        return [
+            (block.cross_attn.key(xa), block.cross_attn.value(xa))
+            for block in self.blocks
+        ]
+
 
 class Model(nn.Module):
     def __init__(self, dims: ModelDimensions, dtype: mx.Dtype = mx.float16):
@@ -299,7 +578,12 @@ class Model(nn.Module):
         return self.decoder(tokens, audio_features)[0]
 
     def forward_with_cross_qk(self, mel, tokens):
-        logits, _, cross_qk = self.decoder(tokens, self.encoder(mel))
+        # skip the encoder if already-encoded audio features are given
+        if mel.shape[-2:] == (self.dims.n_audio_ctx, self.dims.n_audio_state):
+            audio_features = mel
+        else:
+            audio_features = self.encoder(mel)
+        logits, _, cross_qk = self.decoder(tokens, audio_features)
         return logits, cross_qk
 
     def __call__(self, mel, tokens):
@@ -332,14 +616,18 @@ class Model(nn.Module):
             quantization = config.pop("quantization", None)
 
         model_args = ModelDimensions(**config)
+        model = Model(model_args, dtype)
+
+        if is_snapshot(model_path):
+            load_snapshot(model, model_path)
+            mx.eval(model.parameters())
+            return model
 
         wf = model_path / "weights.safetensors"
         if not wf.exists():
             wf = model_path / "weights.npz"
         weights = mx.load(str(wf))
 
-        model = Model(model_args, dtype)
-
         if quantization is not None:
             class_predicate = (
                 lambda p, m: isinstance(m, (nn.Linear, nn.Embedding))
@@ -369,6 +657,7 @@ class Model(nn.Module):
         append_punctuations: str = "\"'.。,，!！?？:：”)]}、",
         clip_timestamps: Union[str, List[float]] = "0",
         hallucination_silence_threshold: Optional[float] = None,
+        batch_size: Optional[int] = None,
         **decode_options,
     ):
         """
@@ -428,6 +717,12 @@ class Model(nn.Module):
             When word_timestamps is True, skip silent periods longer than this threshold (in seconds)
             when a possible hallucination is detected
 
+        batch_size: Optional[int]
+            If greater than 1, split the audio into windows of up to 30 seconds, cut at the quietest
+            frame near each window end, and transcribe `batch_size` windows at a time in one batched
+            encoder and decoder pass. Windows are decoded independently: `condition_on_previous_text`
+            and `hallucination_silence_threshold` are ignored, `initial_prompt` is used for every window
+
         Returns
         -------
         A dictionary containing the resulting text ("text") and segment-level details ("segments"), and
@@ -501,44 +796,14 @@ class Model(nn.Module):
             warnings.warn("Word-level timestamps on translations may not be reliable.")
 
         def decode_with_fallback(segment: mx.array) -> DecodingResult:
-            temperatures = (
-                [temperature] if isinstance(temperature, (int, float)) else temperature
+            return self._decode_with_fallback(
+                segment,
+                decode_options,
+                temperature,
+                compression_ratio_threshold,
+                logprob_threshold,
+                no_speech_threshold,
             )
-            decode_result = None
-
-            for t in temperatures:
-                kwargs = {**decode_options}
-                if t > 0:
-                    # disable beam_size and patience when t > 0
-                    kwargs.pop("beam_size", None)
-                    kwargs.pop("patience", None)
-                else:
-                    # disable best_of when t == 0
-                    kwargs.pop("best_of", None)
-
-                options = DecodingOptions(**kwargs, temperature=t)
-                decode_result = self.decode(segment, options)
-
-                needs_fallback = False
-                if (
-                    compression_ratio_threshold is not None
-                    and decode_result.compression_ratio > compression_ratio_threshold
-                ):
-                    needs_fallback = True  # too repetitive
-                if (
-                    logprob_threshold is not None
-                    and decode_result.avg_logprob < logprob_threshold
-                ):
-                    needs_fallback = True  # average log probability is too low
-                if (
-                    no_speech_threshold is not None
-                    and decode_result.no_speech_prob > no_speech_threshold
-                ):
-                    needs_fallback = False  # silence
-                if not needs_fallback:
-                    break
-
-            return decode_result
 
         clip_idx = 0
         seek = seek_clips[clip_idx][0]
@@ -558,6 +823,23 @@ class Model(nn.Module):
         else:
             initial_prompt_tokens = []
 
+        if batch_size is not None and batch_size > 1:
+            decode_options["prompt"] = initial_prompt_tokens
+            return self._generate_batched(
+                mel,
+                seek_clips,
+                tokenizer,
+                batch_size,
+                decode_with_fallback,
+                verbose=verbose,
+                no_speech_threshold=no_speech_threshold,
+                logprob_threshold=logprob_threshold,
+                word_timestamps=word_timestamps,
+                prepend_punctuations=prepend_punctuations,
+                append_punctuations=append_punctuations,
+                language=language,
+            )
+
         def new_segment(
             *, start: float, end: float, tokens: mx.array, result: DecodingResult
         ):
@@ -718,7 +1000,7 @@ class Model(nn.Module):
                             segments=current_segments,
                             model=self,
                             tokenizer=tokenizer,
-                            mel=mel_segment,
+                            mel=result.audio_features,
                             num_frames=segment_size,
                             prepend_punctuations=prepend_punctuations,
                             append_punctuations=append_punctuations,
@@ -865,3 +1147,141 @@ class Model(nn.Module):
             segments=all_segments,
             language=language,
         )
+
+    def _decode_with_fallback(
+        self,
+        mel: mx.array,
+        decode_options: dict,
+        temperature: Union[float, Tuple[float, ...]],
+        compression_ratio_threshold: Optional[float],
+        logprob_threshold: Optional[float],
+        no_speech_threshold: Optional[float],
+    ) -> Union[DecodingResult, List[DecodingResult]]:
+        """
+        Decode one mel window, or a batch of them, retrying the windows that fail the
+        compression ratio or log probability checks at the next temperature. Retries
+        of a batch only decode the windows that need them, together, and reuse their
+        encoder output and cross-attention keys and values.
+        """
+        temperatures = (
+            [temperature] if isinstance(temperature, (int, float)) else temperature
+        )
+        single = mel.ndim == 2
+        results = [None] * (1 if single else mel.shape[0])
+        pending = list(range(len(results)))
+        features = cross_kv = None
+
+        for t in temperatures:
+            kwargs = {**decode_options}
+            if t > 0:
+                # disable beam_size and patience when t > 0
+                kwargs.pop("beam_size", None)
+                kwargs.pop("patience", None)
+            else:
+                # disable best_of when t == 0
+                kwargs.pop("best_of", None)
+
+            options = DecodingOptions(**kwargs, temperature=t)
+            if cross_kv is not None:
+                decoded = self.decode(features, options, cross_kv=cross_kv)
+            elif single:
+                decoded = [self.decode(mel, options)]
+            else:
+                decoded = self.decode(mel, options)
+
+            retry = []
+            for i, decode_result in zip(pending, decoded):
+                results[i] = decode_result
+                if _needs_fallback(
+                    decode_result,
+                    compression_ratio_threshold,
+                    logprob_threshold,
+                    no_speech_threshold,
+                ):
+                    retry.append(i)
+
+            if not retry:
+                break
+            if cross_kv is None:
+                features = mx.stack([results[i].audio_features for i in retry])
+                cross_kv = self.decoder.cross_kv(features)
+            elif len(retry) < len(pending):
+                rows = mx.array([pending.index(i) for i in retry])
+                features = features[rows]
+                cross_kv = [(k[rows], v[rows]) for k, v in cross_kv]
+            pending = retry
+
+        return results[0] if single else results
+
+    def _generate_batched(
+        self,
+        mel: mx.array,
+        seek_clips: List[Tuple[int, int]],
+        tokenizer,
+        batch_size: int,
+        decode_with_fallback,
+        *,
+        verbose: Optional[bool],
+        no_speech_threshold: Optional[float],
+        logprob_threshold: Optional[float],
+        word_timestamps: bool,
+        prepend_punctuations: str,
+        append_punctuations: str,
+        language: str,
+    ) -> STTOutput:
+        """Transcribe independent windows `batch_size` at a time, see `generate`"""
+        windows = _split_windows(mel, seek_clips)
+        time_precision = N_FRAMES // self.dims.n_audio_ctx * HOP_LENGTH / SAMPLE_RATE
+        window_segments = []
+        last_speech_timestamp = 0.0
+
+        with tqdm.tqdm(
+            total=sum(size for _, size in windows),
+            unit="frames",
+            disable=verbose is not False,
+        ) as pbar:
+            for b in range(0, len(windows), batch_size):
+                batch = windows[b : b + batch_size]
+                mel_batch = mx.stack(
+                    [
+                        pad_or_trim(mel[seek : seek + size], N_FRAMES, axis=-2)
+                        for seek, size in batch
+                    ]
+                ).astype(self.dtype)
+                results = decode_with_fallback(mel_batch)
+
+                for (seek, size), result in zip(batch, results):
+                    pbar.update(size)
+                    if _is_silent(result, no_speech_threshold, logprob_threshold):
+                        continue
+
+                    current_segments = _window_segments(
+                        seek, size, result, tokenizer, time_precision
+                    )
+                    if word_timestamps:
+                        add_word_timestamps(
+                            segments=current_segments,
+                            model=self,
+                            tokenizer=tokenizer,
+                            mel=result.audio_features,
+                            num_frames=size,
+                            prepend_punctuations=prepend_punctuations,
+                            append_punctuations=append_punctuations,
+                            last_speech_timestamp=last_speech_timestamp,
+                        )
+                        last_word_end = _get_end(current_segments)
+                        if last_word_end is not None:
+                            last_speech_timestamp = last_word_end
+
+                    if verbose:
+                        for segment in current_segments:
+                            print(
+                                f"[{_format_timestamp(segment['start'])} --> "
+                                f"{_format_timestamp(segment['end'])}] {segment['text']}"
+                            )
+                    window_segments.append(current_segments)
+
+                # Clear cache after each batch to avoid memory leaks
+                mx.clear_cache()
+
+        return _stitch_windows(window_segments, tokenizer, language)
@@ -254,6 +254,332 @@ class TestWhisperModel(unittest.TestCase):
         self.assertEqual(args_pad_call[0].shape, (100, self.dims.n_mels))
         self.assertEqual(args_pad_call[1], self.N_FRAMES)
 
+    @patch("mlx_audio.stt.models.whisper.whisper.get_tokenizer")
+    @patch("mlx_audio.stt.models.whisper.whisper.log_mel_spectrogram")
+    def test_generate_batched(self, mock_log_mel, mock_get_tokenizer):
+        """Test batched long-form transcription decodes windows together."""
+        EOT_TOKEN_ID = 50257
+        TIMESTAMP_BEGIN_ID = 50364
+
+        # 75 seconds of content with a quiet stretch around 27 seconds
+        mel = np.ones((self.N_FRAMES * 7 // 2, self.dims.n_mels), dtype=np.float32)
+        mel[2690:2710] = -1.0
+        mock_log_mel.return_value = mx.array(mel)
+
+        mock_tokenizer_inst = MagicMock(
+            eot=EOT_TOKEN_ID, timestamp_begin=TIMESTAMP_BEGIN_ID
+        )
+        mock_tokenizer_inst.decode.side_effect = lambda tokens: " ".join(
+            "word" for t in tokens if t < EOT_TOKEN_ID
+        )
+        mock_tokenizer_inst.encode.return_value = []
+        mock_get_tokenizer.return_value = mock_tokenizer_inst
+
+        # "<|0.00|> word <|1.00|><|1.00|> word" and a too repetitive first
+        # attempt for the second window
+        tokens = [TIMESTAMP_BEGIN_ID, 100] + [TIMESTAMP_BEGIN_ID + 50] * 2 + [200]
+        calls = []
+
+        features_shape = (self.dims.n_audio_ctx, self.dims.n_audio_state)
+
+        def decode_side_effect(mel_batch, options, cross_kv=None):
+            calls.append((mel_batch.shape, options.temperature, cross_kv is not None))
+            ratios = [1.0] * mel_batch.shape[0]
+            if options.temperature == 0:
+                ratios[1] = 3.0
+            return [
+                self.DecodingResult(
+                    audio_features=mx.zeros(features_shape),
+                    language="en",
+                    tokens=tokens,
+                    temperature=options.temperature,
+                    avg_logprob=-0.1,
+                    no_speech_prob=0.0,
+                    compression_ratio=ratio,
+                )
+                for ratio in ratios
+            ]
+
+        model = self.Model(self.dims, dtype=mx.float32)
+        with patch.object(model, "decode", side_effect=decode_side_effect):
+            output = model.generate(
+                np.zeros(self.SAMPLE_RATE, dtype=np.float32),
+                language="en",
+                temperature=(0.0, 0.2),
+                batch_size=4,
+            )
+
+        # the retry reuses the encoder output and cross-attention keys and values
+        shape = (self.N_FRAMES, self.dims.n_mels)
+        self.assertEqual(
+            calls, [((3, *shape), 0.0, False), ((1, *features_shape), 0.2, True)]
+        )
+
+        # the first window ends in the quiet stretch, the next 30 seconds later
+        seeks = [s["seek"] for s in output.segments]
+        self.assertEqual(seeks[::2], seeks[1::2])
+        first, second, third = seeks[::2]
+        self.assertTrue(2690 <= second <= 2710)
+        self.assertEqual((first, third), (0, second + self.N_FRAMES))
+
+        window_ends = [second / 100, third / 100, 75.0]
+        for i, (start, end) in enumerate(zip(seeks[::2], window_ends)):
+            self.assertAlmostEqual(output.segments[2 * i]["start"], start / 100)
+            self.assertAlmostEqual(output.segments[2 * i]["end"], start / 100 + 1)
+            self.assertAlmostEqual(output.segments[2 * i + 1]["start"], start / 100 + 1)
+            self.assertAlmostEqual(output.segments[2 * i + 1]["end"], end)
+        self.assertEqual(output.segments[2]["temperature"], 0.2)
+        self.assertEqual(output.segments[0]["temperature"], 0.0)
+        self.assertEqual(output.text, " ".join(["word"] * 6))
+
+    def _small_model(self):
+        dims = self.ModelDimensions(
+            n_mels=80,
+            n_audio_ctx=1500,
+            n_audio_state=64,
+            n_audio_head=2,
+            n_audio_layer=1,
+            n_vocab=51864,
+            n_text_ctx=448,
+            n_text_state=64,
+            n_text_head=2,
+            n_text_layer=1,
+        )
+        mx.random.seed(0)
+        return self.Model(dims, dtype=mx.float32)
+
+    def test_decode_best_of(self):
+        """Test best-of-N samples of all windows are decoded in one batch."""
+        from mlx_audio.stt.models.whisper.decoding import Inference
+
+        model = self._small_model()
+        mel = mx.random.normal((2, self.N_FRAMES, model.dims.n_mels))
+        options = self.DecodingOptions(
+            language="en", temperature=0.8, best_of=3, sample_len=8, fp16=False
+        )
+
+        batch_sizes = []
+        logits = Inference.logits
+
+        def record_logits(inference, tokens, audio_features):
+            batch_sizes.append((tokens.shape[0], audio_features.shape[0]))
+            return logits(inference, tokens, audio_features)
+
+        with patch.object(Inference, "logits", record_logits):
+            results = model.decode(mel, options)
+
+        self.assertEqual(len(batch_sizes), 8)
+        self.assertEqual(set(batch_sizes), {(6, 6)})
+        self.assertEqual(len(results), 2)
+        for result in results:
+            self.assertEqual(result.audio_features.shape, (1500, 64))
+            self.assertLessEqual(len(result.tokens), 8)
+            self.assertTrue(np.isfinite(result.avg_logprob))
+
+    def test_decode_speculative(self):
+        """Test draft-model decoding matches greedy decoding with fewer passes."""
+        from dataclasses import replace
+
+        from mlx_audio.stt.models.whisper.decoding import DecodingTask, Inference
+
+        model = self._small_model()
+        mel = mx.random.normal((2, self.N_FRAMES, model.dims.n_mels))
+        options = self.DecodingOptions(language="en", sample_len=12, fp16=False)
+        expected = model.decode(mel, options)
+
+        draft_dims = replace(model.dims, n_audio_state=32, n_text_state=32)
+        other_draft = self.Model(draft_dims, dtype=mx.float32)
+
+        passes = {}
+        logits = Inference.logits
+
+        def count_logits(inference, tokens, audio_features):
+            passes[id(inference)] = passes.get(id(inference), 0) + 1
+            return logits(inference, tokens, audio_features)
+
+        # the model's prompt pass comes first; greedy decoding takes 12 passes,
+        # a draft proposing the model's own tokens 1 + ceil(11 / (3 + 1))
+        for draft, model_passes in [(other_draft, 12), (model, 4)]:
+            passes.clear()
+            with patch.object(Inference, "logits", count_logits):
+                results = model.decode(
+                    mel, options, draft_model=draft, num_draft_tokens=3
+                )
+            self.assertLessEqual(next(iter(passes.values())), model_passes)
+            for result, greedy in zip(results, expected):
+                self.assertEqual(result.tokens, greedy.tokens)
+                self.assertAlmostEqual(result.avg_logprob, greedy.avg_logprob, 4)
+
+        # a task can run again without the draft cache of the previous run
+        task = DecodingTask(
+            model, replace(options, draft_model=other_draft, num_draft_tokens=3)
+        )
+        offsets = []
+        for _ in range(2):
+            results = task.run(mel)
+            self.assertEqual(
+                [r.tokens for r in results], [r.tokens for r in expected]
+            )
+            offsets.append(task.draft_inference.kv_cache[0][0].offset)
+        self.assertEqual(offsets[0], offsets[1])
+
+    def test_kv_cache(self):
+        """Test the preallocated KV cache updates, reorders, trims and overflows."""
+        from mlx_audio.stt.models.whisper.whisper import KVCache
+
+        cache = KVCache(n_ctx=4)
+        k = mx.arange(12, dtype=mx.float32).reshape(2, 3, 2)
+        keys, values = cache.update_and_fetch(k, -k)
+        self.assertEqual(cache.keys.shape, (2, 4, 2))
+        self.assertEqual(cache.offset, 3)
+        self.assertTrue(mx.array_equal(keys, k).item())
+        self.assertTrue(mx.array_equal(values, -k).item())
+
+        step = mx.full((2, 1, 2), 100.0)
+        keys, _ = cache.update_and_fetch(step, step)
+        self.assertEqual(keys.shape, (2, 4, 2))
+        self.assertTrue(mx.array_equal(keys[:, 3:], step).item())
+
+        cache.reorder(mx.array([1, 1]))
+        keys, values = cache.state
+        self.assertTrue(mx.array_equal(keys[0], keys[1]).item())
+        self.assertTrue(mx.array_equal(keys[0, :3], k[1]).item())
+        self.assertTrue(mx.array_equal(values[0, :3], -k[1]).item())
+
+        with self.assertRaises(ValueError):
+            cache.update_and_fetch(step, step)
+
+        cache.trim(2)
+        self.assertEqual(cache.state[0].shape, (2, 2, 2))
+        cache.update_and_fetch(step, step)
+        self.assertEqual(cache.offset, 3)
+
+    def test_kv_cache_rows(self):
+        """Test rows decoding at their own offsets match a full forward pass."""
+        from mlx_audio.stt.models.whisper.whisper import KVCache
+
+        model = self._small_model()
+        decoder = model.decoder
+        xa = mx.random.normal((2, 1500, 64))
+        tokens = mx.array([[50258, 50259, 50359, 50363, 100], [50258, 7, 8, 9, 10]])
+        expected, _, _ = decoder(tokens, xa)
+
+        # row 0 has four prompt tokens cached, row 1 only its first token
+        _, kv_cache, _ = decoder(tokens[:, :4], xa)
+        (k, v), cross_kv = kv_cache[0]
+        cache = KVCache(model.dims.n_text_ctx)
+        cache.allocate(2, 64, mx.float32)
+        cache.write(mx.array([0]), k[:1], v[:1])
+        cache.write(mx.array([1]), k[1:, :1], v[1:, :1])
+
+        # row 0 repeats its step while row 1 moves on
+        for step, offsets in enumerate([[4, 1], [4, 2]]):
+            cache.seek(offsets)
+            step_tokens = mx.array([[100], [tokens[1, step + 1].item()]])
+            logits, _, _ = decoder(step_tokens, xa, kv_cache=[(cache, cross_kv)])
+            for row, offset in enumerate(offsets):
+                self.assertTrue(
+                    mx.allclose(
+                        logits[row, 0], expected[row, offset], atol=1e-4
+                    ).item()
+                )
+            self.assertEqual(cache.offsets, [offset + 1 for offset in offsets])
+
+        with self.assertRaises(ValueError):
+            cache.seek([model.dims.n_text_ctx, 0])
+
+    def test_engine_matches_batched_generate(self):
+        """Test concurrent engine requests decode like batched generate."""
+        from mlx_audio.stt.models.whisper.engine import WhisperEngine
+
+        model = self._small_model()
+        rng = np.random.default_rng(0)
+        audios = [
+            0.1 * rng.standard_normal(seconds * self.SAMPLE_RATE).astype(np.float32)
+            for seconds in (5, 40)
+        ]
+
+        # two slots for three windows: the last one joins a running batch
+        engine = WhisperEngine(model, max_slots=2)
+        try:
+            futures = [
+                engine.submit(audio, language="en", temperature=0.0)
+                for audio in audios
+            ]
+            outputs = [future.result(timeout=300) for future in futures]
+            stats = engine.stats()
+            buffer_bytes = sum(a.nbytes for a in engine._buffers())
+        finally:
+            engine.stop()
+
+        self.assertEqual(stats["completed_requests"], 2)
+        self.assertEqual(stats["encoded_windows"], 3)
+        self.assertEqual(stats["pending_requests"], 0)
+        self.assertGreater(stats["occupancy"], 0.5)
+        self.assertEqual(engine.nbytes, buffer_bytes)
+
+        for audio, output in zip(audios, outputs):
+            expected = model.generate(
+                audio, language="en", temperature=0.0, batch_size=4, fp16=False
+            )
+            self.assertEqual(output.text, expected.text)
+            self.assertEqual(output.language, "en")
+            self.assertEqual(
+                [(s["seek"], s["tokens"]) for s in output.segments],
+                [(s["seek"], s["tokens"]) for s in expected.segments],
+            )
+
+    def test_engine_drains_on_release(self):
+        """Test idle cleanup during a transcription lets it finish."""
+        import threading
+
+        from mlx_audio.models.memory_manager import MemoryManager
+        from mlx_audio.models.stt_engine import STTEngines
+        from mlx_audio.stt.models.whisper.engine import WhisperEngine
+
+        model = self._small_model()
+        audio = 0.1 * np.random.default_rng(0).standard_normal(
+            40 * self.SAMPLE_RATE
+        ).astype(np.float32)
+        expected = model.generate(
+            audio, language="en", temperature=0.0, batch_size=4, fp16=False
+        )
+
+        manager = MemoryManager(idle_timeout=0)
+        engines = STTEngines(max_slots=1)
+        manager.add_release_listener(engines.release)
+        manager.get_model("whisper", lambda: model)
+
+        # Hold the engine in its first decoder step while the model idles out
+        step = WhisperEngine._step
+        started, resume = threading.Event(), threading.Event()
+
+        def held_step(engine):
+            if not started.is_set():
+                started.set()
+                resume.wait()
+            step(engine)
+
+        with patch.object(WhisperEngine, "_step", held_step):
+            future = engines.submit(
+                "whisper", model, audio, language="en", temperature=0.0
+            )
+            engine = engines.get("whisper", model)
+            started.wait()
+            self.assertEqual(manager.cleanup_idle(), ["whisper"])
+            self.assertEqual(engines.get_stats(), {})
+            with self.assertRaisesRegex(RuntimeError, "stopped"):
+                engine.submit(audio, language="en")
+            resume.set()
+
+            # Both windows, the second still queued at release, are decoded
+            output = future.result(timeout=300)
+        engine._thread.join(timeout=60)
+
+        self.assertFalse(engine._thread.is_alive())
+        self.assertEqual(output.text, expected.text)
+        self.assertEqual(engine.stats()["completed_requests"], 1)
+
 
 class TestParakeetModel(unittest.TestCase):
 
@@ -702,5 +1028,38 @@ class TestGLMASRModel(unittest.TestCase):
         self.assertEqual(model.config.merge_factor, 4)
 
 
+class TestAudioUtils(unittest.TestCase):
+    def test_streaming_resampler_matches_resample_poly(self):
+        from scipy.signal import resample_poly
+
+        from mlx_audio.stt.utils import StreamingResampler
+
+        x = np.random.default_rng(0).standard_normal(20000).astype(np.float32)
+        for orig_sr, target_sr in [(48000, 16000), (44100, 16000), (8000, 16000)]:
+            resampler = StreamingResampler(orig_sr, target_sr)
+            chunks = np.split(x, [1, 8, 1008, 1341, 6341])
+            out = np.concatenate([resampler(c) for c in chunks] + [resampler.flush()])
+
+            gcd = np.gcd(orig_sr, target_sr)
+            expected = resample_poly(x, target_sr // gcd, orig_sr // gcd)
+            np.testing.assert_allclose(out, expected, atol=1e-5)
+
+    def test_decode_audio_in_memory(self):
+        import io
+
+        import soundfile as sf
+
+        from mlx_audio.stt.utils import decode_audio
+
+        stereo = np.random.default_rng(0).uniform(-0.5, 0.5, (44100, 2))
+        buffer = io.BytesIO()
+        sf.write(buffer, stereo, 44100, format="FLAC")
+
+        audio = decode_audio(buffer.getvalue(), sr=16000)
+        self.assertIsInstance(audio, mx.array)
+        self.assertEqual(audio.dtype, mx.float32)
+        self.assertEqual(audio.shape, (16000,))
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -1,11 +1,16 @@
 import importlib
+import io
 import logging
+import multiprocessing
+import subprocess
+import tempfile
+import threading
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 from typing import List, Optional
 
 import mlx.core as mx
 import numpy as np
-from huggingface_hub import snapshot_download
 
 SAMPLE_RATE = 16000
 
@@ -14,6 +19,7 @@ MODEL_REMAPPING = {
 }
 MAX_FILE_SIZE_GB = 5
 MODEL_CONVERSION_DTYPES = ["float16", "bfloat16", "float32"]
+DECODER_POOL_SIZE = 2
 
 
 def resample_audio(audio: np.ndarray, orig_sr: int, target_sr: int) -> np.ndarray:
@@ -55,6 +61,191 @@ def load_audio(
     return mx.array(audio, dtype=dtype).mean(axis=1)
 
 
+class StreamingResampler:
+    """Polyphase resampler for audio that arrives in chunks.
+
+    Uses the same Kaiser-windowed FIR filter as ``scipy.signal.resample_poly``
+    and produces the same samples (with zero padding at the ends), but keeps
+    only as much input history as the filter needs, so arbitrarily long
+    streams can be resampled block by block.
+
+    Example:
+        >>> resampler = StreamingResampler(48000, 16000)
+        >>> out = [resampler(chunk) for chunk in chunks] + [resampler.flush()]
+    """
+
+    def __init__(self, orig_sr: int, target_sr: int):
+        from scipy.signal import firwin  # Lazy import
+
+        gcd = np.gcd(orig_sr, target_sr)
+        self.up = target_sr // gcd
+        self.down = orig_sr // gcd
+        max_rate = max(self.up, self.down)
+        self._half_len = 10 * max_rate
+        h = firwin(2 * self._half_len + 1, 1.0 / max_rate, window=("kaiser", 5.0))
+        self._taps = -(-len(h) // self.up)
+        h = np.pad(h * self.up, (0, self._taps * self.up - len(h)))
+        # One reversed filter per output phase, applied to the last `taps` inputs
+        self._filters = h.reshape(self._taps, self.up).T[:, ::-1].astype(np.float32)
+        self.reset()
+
+    def reset(self):
+        """Forget all buffered input and start a new stream."""
+        # Leading zeros stand in for the samples before the stream starts
+        self._buffer = np.zeros(self._taps - 1, dtype=np.float32)
+        self._offset = 1 - self._taps
+        self._received = 0
+        self._emitted = 0
+
+    def __call__(self, chunk: np.ndarray) -> np.ndarray:
+        """Push a chunk of mono input and return every output sample it completes."""
+        chunk = np.asarray(chunk, dtype=np.float32).reshape(-1)
+        self._buffer = np.concatenate([self._buffer, chunk])
+        self._received += len(chunk)
+        ready = (self._received * self.up - 1 - self._half_len) // self.down + 1
+        return self._emit(max(ready, self._emitted))
+
+    def flush(self) -> np.ndarray:
+        """Return the remaining output, treating the stream as ended, and reset."""
+        total = -(-self._received * self.up // self.down)
+        last = ((total - 1) * self.down + self._half_len) // self.up
+        padding = max(0, last + 1 - self._offset - len(self._buffer))
+        self._buffer = np.pad(self._buffer, (0, padding))
+        out = self._emit(total)
+        self.reset()
+        return out
+
+    def _emit(self, end: int) -> np.ndarray:
+        if end <= self._emitted:
+            return np.zeros(0, dtype=np.float32)
+        n = np.arange(self._emitted, end)
+        position = n * self.down + self._half_len
+        newest, phase = position // self.up, position % self.up
+        windows = np.lib.stride_tricks.sliding_window_view(self._buffer, self._taps)
+        out = np.einsum(
+            "nk,nk->n", windows[newest - self._taps + 1 - self._offset], self._filters[phase]
+        )
+        self._emitted = end
+
+        # Drop input that no later output can reach
+        position = self._emitted * self.down + self._half_len
+        start = position // self.up - self._taps + 1
+        if start > self._offset:
+            self._buffer = self._buffer[start - self._offset :]
+            self._offset = start
+        return out.astype(np.float32)
+
+
+_decoder_pool: Optional[ProcessPoolExecutor] = None
+_decoder_pool_lock = threading.Lock()
+
+
+def _get_decoder_pool() -> ProcessPoolExecutor:
+    global _decoder_pool
+    with _decoder_pool_lock:
+        if _decoder_pool is None:
+            # Spawned rather than forked: forking a process that already runs
+            # MLX (and its GPU threads) is not safe
+            _decoder_pool = ProcessPoolExecutor(
+                max_workers=DECODER_POOL_SIZE,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _decoder_pool
+
+
+def shutdown_decoder_pool():
+    """Stop the decoder worker processes, if any were started."""
+    global _decoder_pool
+    with _decoder_pool_lock:
+        pool, _decoder_pool = _decoder_pool, None
+    if pool is not None:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _decode_in_worker(data: bytes, sr: int) -> np.ndarray:
+    """Decode any container/codec to mono float32 at `sr` - runs in the pool."""
+    try:
+        import av  # Optional, decodes in-process without spawning ffmpeg
+    except ImportError:
+        av = None
+
+    if av is not None:
+        with av.open(io.BytesIO(data)) as container:
+            resampler = av.AudioResampler(format="flt", layout="mono", rate=sr)
+            frames = []
+            for frame in container.decode(audio=0):
+                frames.extend(resampler.resample(frame))
+            frames.extend(resampler.resample(None))
+        return np.concatenate([f.to_ndarray().reshape(-1) for f in frames])
+
+    cmd = ["ffmpeg", "-nostdin", "-loglevel", "error", "-i", "pipe:0"]
+    cmd += ["-f", "f32le", "-ac", "1", "-ar", str(sr), "pipe:1"]
+    try:
+        out = subprocess.run(cmd, input=data, capture_output=True, check=True).stdout
+    except subprocess.CalledProcessError:
+        # Containers with the index at the end (e.g. most .m4a) need a
+        # seekable input
+        with tempfile.NamedTemporaryFile() as f:
+            f.write(data)
+            f.flush()
+            cmd[cmd.index("pipe:0")] = f.name
+            out = subprocess.run(cmd, capture_output=True, check=True).stdout
+    return np.frombuffer(out, dtype=np.float32)
+
+
+def decode_audio(
+    data: bytes,
+    sr: int = SAMPLE_RATE,
+    dtype: mx.Dtype = mx.float32,
+    block_size: int = 1 << 16,
+) -> mx.array:
+    """
+    Decode an in-memory audio file to a mono waveform, resampling as necessary
+
+    Formats soundfile can read are decoded in-process and resampled block by
+    block; anything else (mp3 on old libsndfile, m4a, webm, ...) goes to a
+    persistent pool of decoder processes. Nothing is written to disk.
+
+    Parameters
+    ----------
+    data: bytes
+        The encoded audio file
+
+    sr: int
+        The sample rate to resample the audio to
+
+    block_size: int
+        Frames decoded and resampled at a time
+
+    Returns
+    -------
+    An mx.array containing the audio waveform, in `dtype`.
+    """
+    import soundfile as sf  # Lazy import
+
+    try:
+        with sf.SoundFile(io.BytesIO(data)) as f:
+            blocks = f.blocks(blocksize=block_size, dtype="float32", always_2d=True)
+            if f.samplerate == sr:
+                audio = [block.mean(axis=1) for block in blocks]
+            else:
+                resampler = StreamingResampler(f.samplerate, sr)
+                audio = [resampler(block.mean(axis=1)) for block in blocks]
+                audio.append(resampler.flush())
+        audio = np.concatenate(audio) if audio else np.zeros(0, dtype=np.float32)
+    except RuntimeError:
+        audio = _get_decoder_pool().submit(_decode_in_worker, data, sr).result()
+    return mx.array(audio, dtype=dtype)
+
+
+def model_sample_rate(model) -> int:
+    """Sample rate an STT model expects its input waveform at."""
+    preprocessor = getattr(model, "preprocessor_config", None)
+    if preprocessor is not None:
+        return preprocessor.sample_rate
+    return getattr(model, "sample_rate", SAMPLE_RATE)
+
+
 def get_model_path(
     path_or_hf_repo: str, revision: Optional[str] = None, force_download: bool = False
 ) -> Path:
@@ -72,6 +263,8 @@ def get_model_path(
     model_path = Path(path_or_hf_repo)
 
     if not model_path.exists():
+        from huggingface_hub import snapshot_download
+
         model_path = Path(
             snapshot_download(
                 path_or_hf_repo,
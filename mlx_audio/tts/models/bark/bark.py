@@ -166,18 +166,19 @@ class CausalSelfAttention(nn.Module):
             key = mx.concatenate([past_key, key], axis=-2)
             value = mx.concatenate([past_value, value], axis=-2)
 
-        FULL_T = key.shape[-2]
         if use_cache is True:
             present = (key, value)
         else:
             present = None
 
+        # ``self.bias`` is kept for checkpoint compatibility only: as a float
+        # array sdpa would add it to the scores instead of masking them
         y = mx.fast.scaled_dot_product_attention(
             query,
             key,
             value,
             scale=1.0 / math.sqrt(key.shape[3]),
-            mask=self.bias[:, :, FULL_T - T : FULL_T, :FULL_T],
+            mask="causal" if T > 1 else None,
         )
         y = self.attn_dropout(y)
         y = y.transpose(0, 2, 1, 3).reshape(B, T, C)
@@ -113,6 +113,14 @@ def _flatten_codebooks(arr, offset_size=CODEBOOK_SIZE):
     return flat_arr
 
 
+def _sample(logits: mx.array, temperature: Optional[float]) -> mx.array:
+    """Draw one token per row of ``logits`` (..., vocab), greedy if no temperature."""
+    if not temperature:
+        return mx.argmax(logits, axis=-1).astype(mx.int32)
+    samples = mx.random.categorical(logits * (1 / temperature), num_samples=1)
+    return samples.reshape(logits.shape[:-1]).astype(mx.int32)
+
+
 class Pipeline:
     def __init__(self, model: nn.Module, tokenizer: any, config: any):
         self.model = model
@@ -124,8 +132,9 @@ class Pipeline:
         text: str,
         voice: str = "announcer",
         temperature: float = 0.7,
-        use_kv_caching: bool = False,
+        use_kv_caching: bool = True,
         allow_early_stop: bool = True,
+        max_gen_duration_s: Optional[float] = None,
         **kwargs,
     ):
         """Generate semantic tokens from text."""
@@ -178,32 +187,32 @@ class Pipeline:
             .astype(mx.int64)
         )
         n_tot_steps = 768
+        if max_gen_duration_s is not None:
+            n_tot_steps = min(n_tot_steps, int(max_gen_duration_s * SEMANTIC_RATE_HZ))
         kv_cache = None
+        x_input = x
         for i in tqdm.tqdm(range(n_tot_steps), disable=not verbose):
-            if use_kv_caching and kv_cache is not None:
-                x_input = x[:, -1:]
-            else:
-                x_input = x
             logits, kv_cache = self.model.semantic(
                 x_input, merge_context=True, use_cache=use_kv_caching, past_kv=kv_cache
             )
-            relevant_logits = logits[0, 0, :SEMANTIC_VOCAB_SIZE]
+            relevant_logits = logits[:, -1, :SEMANTIC_VOCAB_SIZE]
             if allow_early_stop:
                 # Early stop
                 relevant_logits = mx.concatenate(
-                    [relevant_logits, logits[0, 0, SEMANTIC_PAD_TOKEN].reshape(1)],
+                    [
+                        relevant_logits,
+                        logits[:, -1, SEMANTIC_PAD_TOKEN : SEMANTIC_PAD_TOKEN + 1],
+                    ],
                     axis=-1,
                 )
-            next_token = mx.random.categorical(
-                relevant_logits * 1 / (temperature), num_samples=1
-            ).astype(mx.int32)
+            next_token = _sample(relevant_logits, temperature)
 
-            if next_token == SEMANTIC_VOCAB_SIZE:
+            if next_token.item() == SEMANTIC_VOCAB_SIZE:
                 print(f"Early stop at step {i} with token {next_token.tolist()}")
                 break
             x = mx.concatenate([x, next_token.reshape(1, -1)], axis=1)
-            if i == n_tot_steps - 1:
-                break
+            # Once the prompt is cached only the new token is fed back
+            x_input = x[:, -1:] if kv_cache is not None else x
         out = x.squeeze()[256 + 256 + 1 :]
         return out, encoded_text
 
@@ -214,7 +223,7 @@ class Pipeline:
         temperature: float = 0.7,
         max_coarse_history: int = 60,  # min 60 (faster), max 630 (more context)
         sliding_window_len: int = 60,
-        use_kv_caching: bool = False,
+        use_kv_caching: bool = True,
         **kwargs,
     ):
         """Generate coarse tokens from semantic tokens."""
@@ -309,14 +318,14 @@ class Pipeline:
                 ],
                 axis=1,
             )
+            # The window's semantic context shifts, so its positions change and
+            # the cache is rebuilt from a fresh prefill at every window
             kv_cache = None
+            x_input = x_in
             for _ in range(sliding_window_len):
                 if n_step >= n_steps:
                     continue
                 is_major_step = n_step % N_COARSE_CODEBOOKS == 0
-                x_input = (
-                    x_in[:, -1:] if use_kv_caching and kv_cache is not None else x_in
-                )
                 logits, kv_cache = self.model.coarse_acoustics(
                     x_input, use_cache=use_kv_caching, past_kv=kv_cache
                 )
@@ -327,16 +336,15 @@ class Pipeline:
                     SEMANTIC_VOCAB_SIZE + (2 - int(is_major_step)) * CODEBOOK_SIZE
                 )
                 logit_end_idx = min(logit_end_idx, logits.shape[-1])
-                relevant_logits = logits[0, 0, logit_start_idx:logit_end_idx]
-                item_next = mx.random.categorical(
-                    relevant_logits * (1 / temperature), num_samples=1
-                ).astype(mx.int32)
+                relevant_logits = logits[:, -1, logit_start_idx:logit_end_idx]
+                item_next = _sample(relevant_logits, temperature)
 
                 item_next += logit_start_idx
                 x_coarse_in = mx.concatenate(
                     [x_coarse_in, item_next.reshape(1, 1)], axis=1
                 )
                 x_in = mx.concatenate([x_in, item_next.reshape(1, 1)], axis=1)
+                x_input = x_in[:, -1:] if kv_cache is not None else x_in
                 n_step += 1
 
         gen_coarse_arr = x_coarse_in[0, len(x_coarse_history) :]
@@ -394,19 +402,11 @@ class Pipeline:
             rel_start_fill_idx = start_fill_idx - start_idx
             in_buffer = in_arr[start_idx : start_idx + 1024, :][None]
             for nn in range(n_coarse, N_FINE_CODEBOOKS):
+                # The fine model is bidirectional, so every position of the
+                # window is predicted and sampled in one pass
                 logits = self.model.fine_acoustics(nn, in_buffer)
-                if temperature is None:
-                    relevant_logits = logits[0, rel_start_fill_idx:, :CODEBOOK_SIZE]
-                    codebook_preds = mx.argmax(relevant_logits, -1)
-                else:
-                    relevant_logits = logits[0, :, :CODEBOOK_SIZE] / temperature
-                    codebook_preds = (
-                        mx.random.categorical(
-                            relevant_logits[rel_start_fill_idx:1024], num_samples=1
-                        )
-                        .reshape(-1)
-                        .astype(mx.int32)
-                    )
+                relevant_logits = logits[0, rel_start_fill_idx:1024, :CODEBOOK_SIZE]
+                codebook_preds = _sample(relevant_logits, temperature)
                 in_buffer[0, rel_start_fill_idx:, nn] = codebook_preds
             for nn in range(n_coarse, N_FINE_CODEBOOKS):
                 in_arr[
@@ -425,14 +425,14 @@ class Pipeline:
         voice: str = None,
         temperature: float = 0.7,
         speed: float = 1.0,
-        use_kv_caching: bool = False,
+        use_kv_caching: bool = True,
         **kwargs,
     ):
         semantic_tokens, tokens = self.generate_text_semantic(
-            text, voice, temperature, use_kv_caching, **kwargs
+            text, voice, temperature, use_kv_caching=use_kv_caching, **kwargs
         )
         coarse_tokens = self.generate_coarse(
-            semantic_tokens, voice, temperature, use_kv_caching, **kwargs
+            semantic_tokens, voice, temperature, use_kv_caching=use_kv_caching, **kwargs
         )
         fine_tokens = self.generate_fine(coarse_tokens, temperature, **kwargs)
         # TODO: adjust speed
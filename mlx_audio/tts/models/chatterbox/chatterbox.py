@@ -1,13 +1,18 @@
 # Copyright (c) 2025, Prince Canuma and contributors (https://github.com/Blaizzy/mlx-audio)
 
+import hashlib
 import math
+import os
+import threading
 import time
-from dataclasses import dataclass
+from collections import OrderedDict
+from dataclasses import dataclass, replace
 from pathlib import Path
-from typing import Dict, Generator, Optional, Union
+from typing import Dict, Generator, List, Optional, Union
 
 import mlx.core as mx
 import mlx.nn as nn
+import numpy as np
 from scipy import signal
 
 from ..base import GenerationResult
@@ -45,8 +50,6 @@ def resample_audio(audio: mx.array, orig_sr: int, target_sr: int) -> mx.array:
         return audio
 
     # Convert to numpy for scipy
-    import numpy as np
-
     audio_np = np.array(audio)
 
     # Calculate resampling factors
@@ -157,6 +160,200 @@ class Conditionals:
     t3: T3Cond
     gen: dict
 
+    def save(self, fpath: Path):
+        """Save conditionals to file, in the layout of conds.safetensors."""
+        arrays = {
+            f"t3.{name}": getattr(self.t3, name)
+            for name in ("speaker_emb", "cond_prompt_speech_tokens", "emotion_adv")
+            if getattr(self.t3, name) is not None
+        }
+        arrays.update({f"gen.{k}": v for k, v in self.gen.items()})
+        mx.save_safetensors(str(fpath), arrays)
+
+    @classmethod
+    def load(cls, fpath: Path) -> "Conditionals":
+        """Load conditionals from a conds.safetensors style file."""
+        conds_data = mx.load(str(fpath))
+
+        # Extract T3 conditionals
+        speaker_emb = conds_data.get("t3.speaker_emb")
+        if speaker_emb is None:
+            speaker_emb = mx.zeros((1, 256))
+
+        cond_tokens = conds_data.get("t3.cond_prompt_speech_tokens")
+        emotion_adv = conds_data.get("t3.emotion_adv")
+        if emotion_adv is None:
+            emotion_adv = mx.ones((1, 1, 1)) * 0.5
+
+        t3_cond = T3Cond(
+            speaker_emb=speaker_emb,
+            cond_prompt_speech_tokens=cond_tokens,
+            emotion_adv=emotion_adv,
+        )
+
+        # Extract gen conditionals
+        gen_dict = {}
+        for k, v in conds_data.items():
+            if k.startswith("gen."):
+                gen_dict[k.replace("gen.", "")] = v
+
+        # Compute prompt_feat_len if missing
+        if "prompt_feat_len" not in gen_dict and "prompt_feat" in gen_dict:
+            prompt_feat = gen_dict["prompt_feat"]
+            gen_dict["prompt_feat_len"] = mx.array([prompt_feat.shape[1]])
+
+        return cls(t3_cond, gen_dict)
+
+    def with_exaggeration(self, exaggeration: float) -> "Conditionals":
+        """Return a copy with a different emotion exaggeration, sharing arrays."""
+        emotion_adv = mx.ones((1, 1, 1)) * exaggeration
+        return Conditionals(replace(self.t3, emotion_adv=emotion_adv), self.gen)
+
+
+DEFAULT_CONDS_CACHE_SIZE = 64
+DEFAULT_CONDS_CACHE_MB = float(os.getenv("MLX_AUDIO_CHATTERBOX_CACHE_MB", "256"))
+DEFAULT_CONDS_CACHE_DIR = Path(
+    os.getenv(
+        "MLX_AUDIO_CHATTERBOX_CACHE",
+        Path.home() / ".cache" / "mlx_audio" / "chatterbox",
+    )
+)
+
+
+def _weights_id(paths: List[Path]) -> str:
+    """Identity of the weight files a model was loaded from.
+
+    Hub snapshots resolve to content-addressed blobs, local files are told
+    apart by size and modification time.
+    """
+    parts = []
+    for path in paths:
+        stat = path.stat()
+        parts.append(f"{path.resolve()}:{stat.st_size}:{stat.st_mtime_ns}")
+    return "|".join(parts)
+
+
+class ConditionalsCache:
+    """
+    Two-tier cache of speaker conditionals: a thread-safe in-memory LRU in
+    front of a directory of .safetensors files that survives restarts.
+
+    Reference clips are content-addressed (see ``key``), so the same clip
+    sent by any number of requests is only conditioned once. Their files are
+    deleted least recently used first beyond ``max_disk_mb``. Named voices
+    registered with ``Model.register_voice`` live under ``voices/``, one
+    directory per set of model weights (see ``voice_key``), and are never
+    deleted.
+    """
+
+    def __init__(
+        self,
+        cache_dir: Optional[Path] = DEFAULT_CONDS_CACHE_DIR,
+        max_size: int = DEFAULT_CONDS_CACHE_SIZE,
+        max_disk_mb: float = DEFAULT_CONDS_CACHE_MB,
+    ):
+        self.cache_dir = Path(cache_dir) if cache_dir is not None else None
+        self.max_size = max_size
+        self.max_disk_bytes = int(max_disk_mb * 1e6)
+        self._conds: "OrderedDict[str, Conditionals]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(ref_wav: mx.array, ref_sr: int, weights_id: str = "") -> str:
+        """Hash of a reference waveform, its sample rate and the model weights."""
+        digest = hashlib.sha256(np.asarray(ref_wav, dtype=np.float32).tobytes())
+        digest.update(f"{ref_sr}|{weights_id}".encode())
+        return digest.hexdigest()
+
+    @staticmethod
+    def voice_key(name: str, weights_id: str = "") -> str:
+        """Key of a named voice, namespaced by the model weights it was made with."""
+        namespace = hashlib.sha256(weights_id.encode()).hexdigest()[:16]
+        return f"voices/{namespace}/{name}"
+
+    def _path(self, key: str) -> Optional[Path]:
+        if self.cache_dir is None:
+            return None
+        return self.cache_dir / f"{key}.safetensors"
+
+    def get(self, key: str) -> Optional[Conditionals]:
+        with self._lock:
+            if key in self._conds:
+                self._conds.move_to_end(key)
+                return self._conds[key]
+
+        path = self._path(key)
+        if path is None or not path.exists():
+            return None
+        try:
+            conds = Conditionals.load(path)
+            os.utime(path)  # Most recently used, see _trim_disk
+        except FileNotFoundError:
+            return None  # Deleted by another process meanwhile
+        self._put(key, conds)
+        return conds
+
+    def put(self, key: str, conds: Conditionals):
+        self._put(key, conds)
+        path = self._path(key)
+        if path is not None:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            # Write then rename so concurrent readers never see a partial file
+            writer = f"{os.getpid()}.{threading.get_ident()}"
+            tmp = path.with_name(f".{path.stem}.{writer}.safetensors")
+            conds.save(tmp)
+            os.replace(tmp, path)
+            if not key.startswith("voices/"):
+                self._trim_disk()
+
+    def _trim_disk(self):
+        """Delete the least recently used clip files beyond ``max_disk_bytes``."""
+        files = []
+        for path in self.cache_dir.glob("*.safetensors"):
+            if path.name.startswith("."):
+                continue  # Still being written
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            files.append((stat.st_mtime_ns, stat.st_size, path))
+        total = sum(size for _, size, _ in files)
+        for _, size, path in sorted(files):
+            if total <= self.max_disk_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+
+    def _put(self, key: str, conds: Conditionals):
+        with self._lock:
+            self._conds[key] = conds
+            self._conds.move_to_end(key)
+            while len(self._conds) > self.max_size:
+                self._conds.popitem(last=False)
+
+    def voices(self, weights_id: str = "") -> List[str]:
+        """Names of the voices registered for ``weights_id``, in memory or on disk."""
+        prefix = self.voice_key("", weights_id)
+        names = {k[len(prefix) :] for k in self.keys() if k.startswith(prefix)}
+        if self.cache_dir is not None:
+            for path in (self.cache_dir / prefix).glob("*.safetensors"):
+                if not path.name.startswith("."):
+                    names.add(path.stem)
+        return sorted(names)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._conds)
+
+    def keys(self):
+        with self._lock:
+            return list(self._conds.keys())
+
+    def clear(self):
+        """Empty the in-memory tier; files on disk are kept."""
+        with self._lock:
+            self._conds.clear()
+
 
 class Model(nn.Module):
     """
@@ -204,6 +401,11 @@ class Model(nn.Module):
             self.ve = ve
             self._conds = conds
 
+        # Conditionals of reference clips and named voices, see prepare_conditionals.
+        # Clip entries are also keyed by weights_id, set when weights are loaded
+        self.conds_cache = ConditionalsCache()
+        self.weights_id = ""
+
         # S3 tokenizer for speech token extraction (initialized lazily or during load_weights)
         self._s3_tokenizer = S3TokenizerV2("speech_tokenizer_v2_25hz")
         # Text tokenizer (initialized during load_weights if model_path is available)
@@ -512,6 +714,7 @@ class Model(nn.Module):
         s3tok_weights = mx.load(str(s3tok_path))
         model._s3_tokenizer = S3TokenizerV2("speech_tokenizer_v2_25hz")
         load_component_weights(model._s3_tokenizer, s3tok_weights, strict=False)
+        model.weights_id = _weights_id([combined_path, s3tok_path])
 
         # Initialize text tokenizer
         tokenizer_path = ckpt_dir / "tokenizer.json"
@@ -580,42 +783,17 @@ class Model(nn.Module):
             print("Loaded S3Tokenizer weights")
         else:
             print(f"Warning: S3Tokenizer weights not found at {s3tok_path}")
+        weight_files = sorted(model_path.glob("model*.safetensors"))
+        if s3tok_path.exists():
+            weight_files.append(s3tok_path)
+        model.weights_id = _weights_id(weight_files)
 
         # Load pre-computed conditionals from conds.safetensors
         conds_path = model_path / "conds.safetensors"
 
         if conds_path.exists():
-            conds_data = mx.load(str(conds_path))
+            model._conds = Conditionals.load(conds_path)
             print("Loaded pre-computed conditionals from conds.safetensors")
-
-            # Extract T3 conditionals
-            speaker_emb = conds_data.get("t3.speaker_emb")
-            if speaker_emb is None:
-                speaker_emb = mx.zeros((1, 256))
-
-            cond_tokens = conds_data.get("t3.cond_prompt_speech_tokens")
-            emotion_adv = conds_data.get("t3.emotion_adv")
-            if emotion_adv is None:
-                emotion_adv = mx.ones((1, 1, 1)) * 0.5
-
-            t3_cond = T3Cond(
-                speaker_emb=speaker_emb,
-                cond_prompt_speech_tokens=cond_tokens,
-                emotion_adv=emotion_adv,
-            )
-
-            # Extract gen conditionals
-            gen_dict = {}
-            for k, v in conds_data.items():
-                if k.startswith("gen."):
-                    gen_dict[k.replace("gen.", "")] = v
-
-            # Compute prompt_feat_len if missing
-            if "prompt_feat_len" not in gen_dict and "prompt_feat" in gen_dict:
-                prompt_feat = gen_dict["prompt_feat"]
-                gen_dict["prompt_feat_len"] = mx.array([prompt_feat.shape[1]])
-
-            model._conds = Conditionals(t3_cond, gen_dict)
         else:
             print("Warning: conds.safetensors not found - ref_audio will be required")
             model._conds = None
@@ -710,6 +888,55 @@ class Model(nn.Module):
 
         return Conditionals(t3_cond, s3gen_ref_dict)
 
+    def cached_conditionals(
+        self, ref_wav: mx.array, ref_sr: int, exaggeration: float = 0.5
+    ) -> Conditionals:
+        """
+        Like ``prepare_conditionals``, but looked up in ``conds_cache`` first.
+
+        Entries are keyed by the waveform, sample rate and ``weights_id`` only:
+        exaggeration just sets ``emotion_adv``, so it is applied to the cached
+        entry.
+        """
+        key = ConditionalsCache.key(ref_wav, ref_sr, self.weights_id)
+        conds = self.conds_cache.get(key)
+        if conds is None:
+            conds = self.prepare_conditionals(ref_wav, ref_sr)
+            mx.eval(conds.t3.speaker_emb, conds.t3.cond_prompt_speech_tokens, conds.gen)
+            self.conds_cache.put(key, conds)
+        return conds.with_exaggeration(exaggeration)
+
+    def register_voice(
+        self, name: str, ref_wav: mx.array, ref_sr: int
+    ) -> Conditionals:
+        """
+        Condition on a reference clip once and store it as a named voice.
+
+        The voice is saved in the conditionals cache directory, so it stays
+        available across restarts; pass ``voice=name`` to ``generate`` to use it.
+        Voices belong to the loaded weights (``weights_id``), other weights
+        don't see them.
+
+        Args:
+            name: Voice id, letters, digits, ``-`` and ``_`` only
+            ref_wav: Reference waveform (samples,) or (1, samples)
+            ref_sr: Reference sample rate
+
+        Returns:
+            The voice's conditionals
+        """
+        if not name or not all(c.isalnum() or c in "-_" for c in name):
+            raise ValueError(f"Invalid voice name: {name!r}")
+        conds = self.cached_conditionals(ref_wav, ref_sr)
+        self.conds_cache.put(ConditionalsCache.voice_key(name, self.weights_id), conds)
+        return conds
+
+    def voice_conditionals(self, name: str) -> Optional[Conditionals]:
+        """Conditionals of a voice registered with ``register_voice``, if any."""
+        if not name or not all(c.isalnum() or c in "-_" for c in name):
+            return None
+        return self.conds_cache.get(ConditionalsCache.voice_key(name, self.weights_id))
+
     @property
     def sample_rate(self) -> int:
         """Output sample rate."""
@@ -755,7 +982,8 @@ class Model(nn.Module):
             top_p: Top-p (nucleus) sampling threshold
             max_new_tokens: Maximum number of tokens to generate
             ref_audio: Alias for audio_prompt (for mlx_audio.tts.generate compatibility)
-            voice: Ignored (Chatterbox uses reference audio for voice cloning)
+            voice: Name of a voice added with ``register_voice``, used when no
+                reference audio or conditionals are given (unknown names are ignored)
             speed: Ignored (Chatterbox doesn't support speed adjustment)
             lang_code: Ignored (Chatterbox is English-only)
             max_tokens: Alias for max_new_tokens
@@ -780,9 +1008,11 @@ class Model(nn.Module):
         # Prepare conditionals if needed
         if conds is None:
             if audio_prompt is not None and audio_prompt_sr is not None:
-                conds = self.prepare_conditionals(
+                conds = self.cached_conditionals(
                     audio_prompt, audio_prompt_sr, exaggeration
                 )
+            elif (voice_conds := self.voice_conditionals(voice)) is not None:
+                conds = voice_conds
             elif self._conds is not None:
                 conds = self._conds
             else:
@@ -791,9 +1021,9 @@ class Model(nn.Module):
                     "for voice cloning, or ensure conds.safetensors is in the model directory."
                 )
 
-        # Update exaggeration if needed
+        # Update exaggeration if needed, without touching shared conditionals
         if exaggeration != float(conds.t3.emotion_adv[0, 0, 0]):
-            conds.t3.emotion_adv = mx.ones((1, 1, 1)) * exaggeration
+            conds = conds.with_exaggeration(exaggeration)
 
         # Normalize and tokenize text
         text = punc_norm(text)
@@ -834,6 +1064,12 @@ class Model(nn.Module):
             min_p=min_p,
             top_p=top_p,
         )
+        if verbose:
+            stats = self.t3.last_inference_stats
+            print(
+                f"T3: prefill {stats.prefill_time * 1000:.1f} ms, "
+                f"{len(stats.step_times)} steps at {stats.tokens_per_sec:.1f} tokens/s"
+            )
 
         # Clear cache after T3 inference to free memory before S3Gen
         mx.clear_cache()
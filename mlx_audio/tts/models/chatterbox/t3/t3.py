@@ -1,17 +1,32 @@
-from typing import Dict, Optional, Tuple
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
 
 import mlx.core as mx
 import mlx.nn as nn
 from mlx_lm.models.cache import make_prompt_cache
 from mlx_lm.models.llama import Model as LlamaModel
 from mlx_lm.models.llama import ModelArgs as LlamaModelConfig
-from mlx_lm.sample_utils import make_logits_processors, make_sampler
+from mlx_lm.sample_utils import make_sampler
 
 from ..config import LLAMA_CONFIGS, T3Config
 from .cond_enc import T3Cond, T3CondEnc
 from .learned_pos_emb import LearnedPositionEmbeddings
 
 
+@dataclass
+class T3InferenceStats:
+    """Timing of the last ``T3.inference`` call, in seconds."""
+
+    prefill_time: float = 0.0
+    step_times: List[float] = field(default_factory=list)
+
+    @property
+    def tokens_per_sec(self) -> float:
+        total = sum(self.step_times)
+        return len(self.step_times) / total if total > 0 else 0.0
+
+
 class T3(nn.Module):
     """
     Token-To-Token (T3) TTS model using LLaMA as backbone.
@@ -59,6 +74,9 @@ class T3(nn.Module):
             self.cfg.hidden_size, hp.speech_tokens_dict_size, bias=False
         )
 
+        # Filled in by inference()
+        self.last_inference_stats = T3InferenceStats()
+
     def sanitize(self, weights: Dict[str, mx.array]) -> Dict[str, mx.array]:
         """
         Sanitize PyTorch weights for MLX.
@@ -349,78 +367,36 @@ class T3(nn.Module):
         if text_tokens.ndim == 1:
             text_tokens = mx.expand_dims(text_tokens, 0)
 
-        # Default initial speech token (BOS)
-        bos_token = mx.array([[self.hp.start_speech_token]], dtype=mx.int32)
+        # CFG runs the unconditional branch as a second batch item
+        if cfg_weight > 0.0 and text_tokens.shape[0] == 1:
+            text_tokens = mx.concatenate([text_tokens, text_tokens], axis=0)
+        batch_size = text_tokens.shape[0]
 
-        # Prepare conditioning and text embeddings
-        embeds, len_cond = self.prepare_input_embeds(
+        # Build the prefill input: [cond | text | bos]
+        bos_token = mx.array([[self.hp.start_speech_token]], dtype=mx.int32)
+        input_embeddings, _ = self.prepare_input_embeds(
             t3_cond=t3_cond,
             text_tokens=text_tokens,
             speech_tokens=bos_token,
             cfg_weight=cfg_weight,
         )
 
-        # Create BOS embedding with position embedding at position 0
-        bos_embed = self.speech_emb(bos_token)  # (1, 1, dim)
-        bos_embed = bos_embed + self.speech_pos_emb.get_fixed_embedding(0)
-
-        # For CFG, duplicate BOS embed
-        if cfg_weight > 0.0:
-            bos_embed = mx.concatenate([bos_embed, bos_embed], axis=0)
-
-        # Combine conditioning+text embeddings with BOS token
-        # embeds already has [cond | text | bos] structure from prepare_input_embeds
-        # We need to replace the speech part with our position-embedded BOS
-        # Actually, let's rebuild the input properly
-        cond_emb = self.prepare_conditioning(t3_cond)  # (1, len_cond, dim)
-        text_emb = self.text_emb(text_tokens)  # (B, len_text, dim)
-
-        if cfg_weight > 0.0:
-            # Zero out second batch for unconditional
-            text_emb = mx.concatenate(
-                [
-                    text_emb[:1],
-                    mx.zeros_like(text_emb[:1]),
-                ],
-                axis=0,
-            )
-
-        if self.hp.input_pos_emb == "learned":
-            text_emb = text_emb + self.text_pos_emb(text_tokens)
-
-        # Broadcast conditioning if needed
-        if cond_emb.shape[0] != text_emb.shape[0]:
-            cond_emb = mx.broadcast_to(
-                cond_emb, (text_emb.shape[0],) + cond_emb.shape[1:]
-            )
-
-        # Build initial input: [cond | text | bos]
-        input_embeddings = mx.concatenate([cond_emb, text_emb, bos_embed], axis=1)
-
         # Create KV cache
         cache = make_prompt_cache(self.tfmr)
 
-        # Create sampler and logits processors
+        # Sampler handles temperature, top_p and min_p
         sampler = make_sampler(temp=temperature, top_p=top_p, min_p=min_p)
-        logits_processors = make_logits_processors(
-            logit_bias=None,
-            repetition_penalty=repetition_penalty,
-            repetition_context_size=max_new_tokens,  # Use all generated tokens for repetition
-        )
 
-        # Track generated tokens (Python list for efficiency - avoid growing mx.array each step)
-        generated_ids = [self.hp.start_speech_token]
-
-        # Initial forward pass to fill cache
-        hidden = self.tfmr.model(
-            inputs=None, input_embeddings=input_embeddings, cache=cache
-        )
+        # Every generated token is penalized, so the history is kept on device
+        # as a mask over the vocabulary rather than as a growing token list
+        vocab = mx.arange(self.hp.speech_tokens_dict_size)
+        seen = vocab == self.hp.start_speech_token
 
-        # Generation loop
-        for step in range(max_new_tokens):
-            # Get logits for last position
-            logits = self.speech_head(hidden[:, -1:, :])  # (B, 1, vocab)
-            logits = logits.squeeze(1)  # (B, vocab)
+        def step(embeddings: mx.array, seen: mx.array) -> Tuple[mx.array, mx.array]:
+            hidden = self.tfmr.model(
+                inputs=None, input_embeddings=embeddings, cache=cache
+            )
+            logits = self.speech_head(hidden[:, -1, :])  # (B, vocab)
 
             # Apply CFG
             if cfg_weight > 0.0 and logits.shape[0] > 1:
@@ -430,42 +406,53 @@ class T3(nn.Module):
             else:
                 logits = logits[0:1, :]
 
-            # Apply logits processors (repetition penalty)
-            # Lazily convert Python list to array - processor only uses last N tokens anyway
-            for processor in logits_processors:
-                tokens_for_penalty = mx.array([generated_ids], dtype=mx.int32)
-                logits = processor(tokens_for_penalty, logits)
-
-            # Sample next token using the sampler (handles temperature, top_p, min_p)
-            next_token = sampler(logits)
-
-            mx.eval(next_token)
-            next_token_id = int(next_token[0])
-
-            # Check for EOS
-            if next_token_id == self.hp.stop_speech_token:
-                generated_ids.append(next_token_id)
-                break
+            # Repetition penalty
+            if repetition_penalty and repetition_penalty != 0.0:
+                penalized = mx.where(
+                    logits < 0,
+                    logits * repetition_penalty,
+                    logits / repetition_penalty,
+                )
+                logits = mx.where(seen, penalized, logits)
 
-            generated_ids.append(next_token_id)
+            next_token = sampler(logits)  # (1,)
+            return next_token, seen | (vocab == next_token)
 
-            # Create embedding for next token with position embedding
-            next_token_embed = self.speech_emb(mx.array([[next_token_id]]))
-            next_token_embed = (
-                next_token_embed + self.speech_pos_emb.get_fixed_embedding(step + 1)
+        def embed(token: mx.array, position: int) -> mx.array:
+            token_embed = self.speech_emb(token[None])
+            token_embed = token_embed + self.speech_pos_emb.get_fixed_embedding(
+                position
             )
+            # Same token for the conditional and unconditional CFG branches
+            return mx.broadcast_to(token_embed, (batch_size,) + token_embed.shape[1:])
 
-            # For CFG, duplicate
-            if cfg_weight > 0.0:
-                next_token_embed = mx.concatenate(
-                    [next_token_embed, next_token_embed], axis=0
-                )
+        # Step n + 1 is queued before step n is read back, so the device is
+        # never idle while the host checks for EOS
+        start = time.perf_counter()
+        token, seen = step(input_embeddings, seen)
+        mx.async_eval(token, seen)
 
-            # Forward pass with cache (only new token)
-            hidden = self.tfmr.model(
-                inputs=None, input_embeddings=next_token_embed, cache=cache
-            )
-
-            mx.eval(hidden)
+        generated_ids = [self.hp.start_speech_token]
+        step_times = []
+        for n in range(max_new_tokens):
+            last = n + 1 == max_new_tokens
+            if not last:
+                next_token, next_seen = step(embed(token, n + 1), seen)
+                mx.async_eval(next_token, next_seen)
+
+            token_id = token.item()
+            now = time.perf_counter()
+            step_times.append(now - start)
+            start = now
+
+            generated_ids.append(token_id)
+            if last or token_id == self.hp.stop_speech_token:
+                break
+            token, seen = next_token, next_seen
 
+        self.last_inference_stats = (
+            T3InferenceStats(prefill_time=step_times[0], step_times=step_times[1:])
+            if step_times
+            else T3InferenceStats()
+        )
         return mx.array([generated_ids])
@@ -9,13 +9,15 @@ from huggingface_hub import hf_hub_download
 from mlx_lm.sample_utils import make_sampler
 from tqdm import trange
 
-from mlx_audio.codec.models import DAC
+from mlx_audio.codec_registry import get_codec
 
 from ..base import GenerationResult
 from .audio import audio_to_codebook, codebook_to_audio
 from .config import DiaConfig
 from .layers import DiaModel, KVCache
 
+DAC_REPO = "mlx-community/descript-audio-codec-44khz"
+
 
 def _sample_next_token(
     logits_BCxV: mx.array,
@@ -35,14 +37,10 @@ class Model(nn.Module):
 
         Args:
             config: The configuration object for the model.
-
-        Raises:
-            RuntimeError: If there is an error loading the DAC model.
         """
         super().__init__()
         self.config = DiaConfig.load_dict(config)
         self.model = DiaModel(self.config)
-        self.dac_model = DAC.from_pretrained("mlx-community/descript-audio-codec-44khz")
 
     @classmethod
     def from_local(cls, config_path: str, checkpoint_path: str) -> "Dia":
@@ -75,8 +73,6 @@ class Model(nn.Module):
                 f"Error loading checkpoint from {checkpoint_path}"
             ) from e
 
-        dia.dac_model = DAC.from_pretrained("mlx-community/descript-audio-codec-44khz")
-
         return dia
 
     @classmethod
@@ -105,6 +101,11 @@ class Model(nn.Module):
     def load_weights(self, weights, strict: bool = True):
         self.model.load_weights(weights, strict=strict)
 
+    @property
+    def dac_model(self):
+        """The shared DAC codec, loaded on first use."""
+        return get_codec("dac", DAC_REPO)
+
     def sanitize(self, weights):
         return weights
 
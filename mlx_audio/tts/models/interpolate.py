@@ -87,7 +87,8 @@ def interpolate1d(
         else:
             x = mx.arange(size) * (in_width / size)
             if not align_corners:
-                x = x + 0.5 * (in_width / size) - 0.5
+                # Clamp like PyTorch; a negative index would wrap to the end
+                x = mx.maximum(x + 0.5 * (in_width / size) - 0.5, 0)
 
     # Handle the case where input width is 1
     if in_width == 1:
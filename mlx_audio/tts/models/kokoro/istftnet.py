@@ -15,6 +15,21 @@ def get_padding(kernel_size: int, dilation: int = 1) -> int:
     return int((kernel_size * dilation - dilation) / 2)
 
 
+def length_mask(lengths: mx.array, length: int) -> mx.array:
+    """Build a (batch, 1, length) float mask from valid lengths of right-padded items."""
+    return (mx.arange(length)[None, :] < lengths[:, None])[:, None, :].astype(
+        mx.float32
+    )
+
+
+def resize_mask(mask: Optional[mx.array], length: int) -> Optional[mx.array]:
+    """Rescale a (batch, 1, frames) mask to another time resolution."""
+    if mask is None or mask.shape[-1] == length:
+        return mask
+    lengths = mx.ceil(mask.sum(axis=-1)[:, 0] * length / mask.shape[-1])
+    return length_mask(lengths, length)
+
+
 def compute_norm(
     x: mx.array,
     p: int,
@@ -213,7 +228,7 @@ class _InstanceNorm(nn.Module):
         result = self._apply_instance_norm(expanded)
         return mx.squeeze(result, axis=0)
 
-    def _apply_instance_norm(self, input):
+    def _apply_instance_norm(self, input, mask=None):
         # MLX doesn't have a direct instance_norm function like PyTorch
         # So we need to implement it manually
 
@@ -224,7 +239,15 @@ class _InstanceNorm(nn.Module):
         # Compute statistics along all dims except batch and feature dims
         reduce_dims = [d for d in dims if d != 0 and d != feature_dim]
 
-        if self.training or not self.track_running_stats:
+        if (self.training or not self.track_running_stats) and mask is not None:
+            # Statistics over valid (unpadded) positions only
+            count = mx.maximum(mx.sum(mask, axis=reduce_dims, keepdims=True), 1)
+            mean = mx.sum(input * mask, axis=reduce_dims, keepdims=True) / count
+            var = (
+                mx.sum(mx.square((input - mean) * mask), axis=reduce_dims, keepdims=True)
+                / count
+            )
+        elif self.training or not self.track_running_stats:
             # Compute mean and variance for normalization
             mean = mx.mean(input, axis=reduce_dims, keepdims=True)
             var = mx.var(input, axis=reduce_dims, keepdims=True)
@@ -267,7 +290,7 @@ class _InstanceNorm(nn.Module):
         else:
             return x_norm
 
-    def __call__(self, input):
+    def __call__(self, input, mask=None):
         self._check_input_dim(input)
 
         feature_dim = input.ndim - self._get_no_batch_dim()
@@ -287,7 +310,7 @@ class _InstanceNorm(nn.Module):
         if input.ndim == self._get_no_batch_dim():
             return self._handle_no_batch_input(input)
 
-        return self._apply_instance_norm(input)
+        return self._apply_instance_norm(input, mask)
 
 
 class InstanceNorm1d(_InstanceNorm):
@@ -305,6 +328,7 @@ class InstanceNorm1d(_InstanceNorm):
 
     Shape:
         - Input: (N, C, L) or (C, L)
+        - Mask (optional): (N, 1, L), statistics are computed over positions where it is 1
         - Output: Same shape as input
 
     Examples:
@@ -330,11 +354,16 @@ class AdaIN1d(nn.Module):
         self.norm = InstanceNorm1d(num_features, affine=False)
         self.fc = nn.Linear(style_dim, num_features * 2)
 
-    def __call__(self, x: mx.array, s: mx.array) -> mx.array:
+    def __call__(
+        self, x: mx.array, s: mx.array, mask: Optional[mx.array] = None
+    ) -> mx.array:
         h = self.fc(s)
         h = mx.expand_dims(h, axis=2)  # Equivalent to view(..., 1)
         gamma, beta = mx.split(h, 2, axis=1)
-        x = (1 + gamma) * self.norm(x) + beta
+        x = (1 + gamma) * self.norm(x, mask) + beta
+        if mask is not None:
+            # Keep padded positions at zero so they act like conv zero-padding
+            x = x * mask
         return x
 
 
@@ -374,18 +403,20 @@ class AdaINResBlock1(nn.Module):
         self.alpha1 = [mx.ones((1, channels, 1)) for _ in range(len(self.convs1))]
         self.alpha2 = [mx.ones((1, channels, 1)) for _ in range(len(self.convs2))]
 
-    def __call__(self, x: mx.array, s: mx.array) -> mx.array:
+    def __call__(
+        self, x: mx.array, s: mx.array, mask: Optional[mx.array] = None
+    ) -> mx.array:
         for c1, c2, n1, n2, a1, a2 in zip(
             self.convs1, self.convs2, self.adain1, self.adain2, self.alpha1, self.alpha2
         ):
-            xt = n1(x, s)
+            xt = n1(x, s, mask)
             xt = xt + (1 / a1) * (mx.sin(a1 * xt) ** 2)  # Snake1D
 
             xt = xt.swapaxes(2, 1)
             xt = c1(xt, mx.conv1d)
             xt = xt.swapaxes(2, 1)
 
-            xt = n2(xt, s)
+            xt = n2(xt, s, mask)
             xt = xt + (1 / a2) * (mx.sin(a2 * xt) ** 2)  # Snake1D
 
             xt = xt.swapaxes(2, 1)
@@ -465,62 +496,39 @@ class MLXSTFT:
         if input_data.ndim == 1:
             input_data = input_data[None, :]
 
-        magnitudes = []
-        phases = []
+        # Compute STFT for the whole batch
+        x_stft = stft(
+            input_data,
+            n_fft=self.filter_length,
+            hop_length=self.hop_length,
+            win_length=self.win_length,
+            window=self.window,
+            center=True,
+            pad_mode="reflect",
+        ).swapaxes(-1, -2)
 
-        for batch_idx in range(input_data.shape[0]):
-            # Compute STFT
-            x_stft = stft(
-                input_data[batch_idx],
-                n_fft=self.filter_length,
-                hop_length=self.hop_length,
-                win_length=self.win_length,
-                window=self.window,
-                center=True,
-                pad_mode="reflect",
-            ).transpose(1, 0)
-
-            # Get magnitude
-            magnitude = mx.abs(x_stft)
-
-            # Get phase
-            phase = mlx_angle(x_stft)
-
-            magnitudes.append(magnitude)
-            phases.append(phase)
-
-        magnitudes = mx.stack(magnitudes, axis=0)
-        phases = mx.stack(phases, axis=0)
-
-        return magnitudes, phases
+        # Get magnitude and phase
+        return mx.abs(x_stft), mlx_angle(x_stft)
 
     def inverse(self, magnitude, phase):
-        reconstructed = []
-
-        for batch_idx in range(magnitude.shape[0]):
-            # Unwrap phases for reconstruction
-            phase_cont = mlx_unwrap(phase[batch_idx], axis=1)
-
-            # Combine magnitude and phase
-            real_part = magnitude[batch_idx] * mx.cos(phase_cont)
-            imag_part = magnitude[batch_idx] * mx.sin(phase_cont)
-            x_stft = real_part + 1j * imag_part
-
-            # Inverse STFT
-            audio = istft(
-                x_stft,
-                hop_length=self.hop_length,
-                win_length=self.win_length,
-                window=self.window,
-                center=True,
-                length=None,
-            )
-
-            reconstructed.append(audio)
-
-        reconstructed = mx.stack(reconstructed, axis=0)[:, None, :]
-
-        return reconstructed
+        # Unwrap phases for reconstruction
+        phase_cont = mlx_unwrap(phase, axis=-1)
+
+        # Combine magnitude and phase
+        real_part = magnitude * mx.cos(phase_cont)
+        imag_part = magnitude * mx.sin(phase_cont)
+        x_stft = real_part + 1j * imag_part
+
+        # Inverse STFT for the whole batch
+        audio = istft(
+            x_stft,
+            hop_length=self.hop_length,
+            win_length=self.win_length,
+            window=self.window,
+            center=True,
+            length=None,
+        )
+        return audio[:, None, :]
 
     def __call__(self, input_data: mx.array) -> mx.array:
         self.magnitude, self.phase = self.transform(input_data)
@@ -552,17 +560,69 @@ class SineGen:
     def _f02uv(self, f0: mx.array) -> mx.array:
         return mx.array(f0 > self.voiced_threshold, dtype=mx.float32)
 
-    def _f02sine(self, f0_values: mx.array) -> mx.array:
+    def phase_offset(self, f0: mx.array) -> mx.array:
+        """Phase every harmonic has reached at the end of an F0 curve.
+
+        Passing this to the sine generation of the following F0 points
+        continues the waveforms without a phase jump, which lets a long
+        curve be rendered in consecutive windows.
+
+        Args:
+            f0: F0 curve (batchsize, length), each point spanning
+                upsample_scale samples
+
+        Returns:
+            Phases in radians (batchsize, dim)
+        """
+        fn = f0[..., None] * mx.arange(1, self.harmonic_num + 2)
+        cycles = ((fn / self.sampling_rate) % 1 * self.upsample_scale) % 1
+        return (mx.sum(cycles, axis=1) % 1) * 2 * mx.pi
+
+    def random_phase(self, batch: int, length: int) -> mx.array:
+        """Random initial phase, drawn like calls without a phase_offset do.
+
+        Passing it as ``phase_offset`` (plus ``phase_offset()`` of any earlier
+        points) lets every window of a curve share one random phase.
+
+        Args:
+            batch: Batch size
+            length: Points of the curve it is drawn for
+
+        Returns:
+            Phases in radians (batchsize, dim)
+        """
+        rand_ini = mx.random.normal((batch, self.dim))
+        rand_ini[:, 0] = 0
+        return self._initial_phase_shift(rand_ini, length)
+
+    def _initial_phase_shift(self, rand_ini: mx.array, length: int) -> mx.array:
+        """Phase in radians that ``rand_ini`` adds to every later sample.
+
+        The noise enters at the first point, so after the downsampling
+        interpolation only the weight that point keeps reaches the phase.
+        """
+        impulse = mx.zeros((1, 1, length))
+        impulse[..., 0] = 1
+        weight = interpolate(
+            impulse, scale_factor=1 / self.upsample_scale, mode="linear"
+        ).sum()
+        return rand_ini * weight * self.upsample_scale * 2 * mx.pi
+
+    def _f02sine(
+        self, f0_values: mx.array, phase_offset: Optional[mx.array] = None
+    ) -> mx.array:
         """f0_values: (batchsize, length, dim)
         where dim indicates fundamental tone and overtones
+        phase_offset: optional starting phase (batchsize, dim), see phase_offset()
         """
         # convert to F0 in rad. The interger part n can be ignored
         # because 2 * np.pi * n doesn't affect phase
         rad_values = (f0_values / self.sampling_rate) % 1
-        # initial phase noise (no noise for fundamental component)
-        rand_ini = mx.random.normal((f0_values.shape[0], f0_values.shape[2]))
-        rand_ini[:, 0] = 0
-        rad_values[:, 0, :] = rad_values[:, 0, :] + rand_ini
+        if phase_offset is None:
+            # initial phase noise (no noise for fundamental component)
+            rand_ini = mx.random.normal((f0_values.shape[0], f0_values.shape[2]))
+            rand_ini[:, 0] = 0
+            rad_values[:, 0, :] = rad_values[:, 0, :] + rand_ini
         # instantanouse phase sine[t] = sin(2*pi \sum_i=1 ^{t} rad)
         if not self.flag_for_pulse:
             rad_values = interpolate(
@@ -576,6 +636,8 @@ class SineGen:
                 scale_factor=self.upsample_scale,
                 mode="linear",
             ).transpose(0, 2, 1)
+            if phase_offset is not None:
+                phase = phase + phase_offset[:, None, :]
             sines = mx.sin(phase)
         else:
             # If necessary, make sure that the first time step of every
@@ -603,14 +665,16 @@ class SineGen:
             sines = mx.cos(i_phase * 2 * mx.pi)
         return sines
 
-    def __call__(self, f0: mx.array) -> Tuple[mx.array, mx.array, mx.array]:
+    def __call__(
+        self, f0: mx.array, phase_offset: Optional[mx.array] = None
+    ) -> Tuple[mx.array, mx.array, mx.array]:
         f0_buf = mx.zeros((f0.shape[0], f0.shape[1], self.dim))
 
         # Fundamental component
         fn = f0 * mx.arange(1, self.harmonic_num + 2)[None, None, :]
 
         # Generate sine waveforms
-        sine_waves = self._f02sine(fn) * self.sine_amp
+        sine_waves = self._f02sine(fn, phase_offset) * self.sine_amp
 
         # Generate UV signal
         uv = self._f02uv(f0)
@@ -665,15 +729,16 @@ class SourceModuleHnNSF(nn.Module):
         # to merge source harmonics into a single excitation
         self.l_linear = nn.Linear(harmonic_num + 1, 1)
 
-    def __call__(self, x):
+    def __call__(self, x, phase_offset=None):
         """
         Sine_source, noise_source = SourceModuleHnNSF(F0_sampled)
         F0_sampled (batchsize, length, 1)
+        phase_offset (batchsize, harmonic_num + 1), optional starting phase
         Sine_source (batchsize, length, 1)
         noise_source (batchsize, length 1)
         """
         # source for harmonic branch
-        sine_wavs, uv, _ = self.l_sin_gen(x)
+        sine_wavs, uv, _ = self.l_sin_gen(x, phase_offset)
         sine_merge = mx.tanh(self.l_linear(sine_wavs))
         # source for noise branch, in the same shape as uv
         noise = mx.random.normal(uv.shape) * self.sine_amp / 3
@@ -766,9 +831,9 @@ class Generator(nn.Module):
             win_length=gen_istft_n_fft,
         )
 
-    def __call__(self, x, s, f0):
+    def __call__(self, x, s, f0, mask=None, phase_offset=None):
         f0 = self.f0_upsamp(f0[:, None].transpose(0, 2, 1))  # bs,n,t
-        har_source, noi_source, uv = self.m_source(f0)
+        har_source, noi_source, uv = self.m_source(f0, phase_offset)
         har_source = mx.squeeze(har_source.transpose(0, 2, 1), axis=1)
         har_spec, har_phase = self.stft.transform(har_source)
         har = mx.concatenate([har_spec, har_phase], axis=1)
@@ -777,7 +842,9 @@ class Generator(nn.Module):
             x = leaky_relu(x, negative_slope=0.1)
             x_source = self.noise_convs[i](har)
             x_source = x_source.swapaxes(2, 1)
-            x_source = self.noise_res[i](x_source, s)
+            x_source = self.noise_res[i](
+                x_source, s, resize_mask(mask, x_source.shape[-1])
+            )
 
             x = x.swapaxes(2, 1)
             x = self.ups[i](x, mx.conv_transpose1d)
@@ -788,11 +855,14 @@ class Generator(nn.Module):
             x = x + x_source
 
             xs = None
+            x_mask = resize_mask(mask, x.shape[-1])
+            if x_mask is not None:
+                x = x * x_mask
             for j in range(self.num_kernels):
                 if xs is None:
-                    xs = self.resblocks[i * self.num_kernels + j](x, s)
+                    xs = self.resblocks[i * self.num_kernels + j](x, s, x_mask)
                 else:
-                    xs += self.resblocks[i * self.num_kernels + j](x, s)
+                    xs += self.resblocks[i * self.num_kernels + j](x, s, x_mask)
             x = xs / self.num_kernels
 
         x = leaky_relu(x, negative_slope=0.01)
@@ -871,8 +941,8 @@ class AdainResBlk1d(nn.Module):
             x = x.swapaxes(2, 1)
         return x
 
-    def _residual(self, x, s):
-        x = self.norm1(x, s)
+    def _residual(self, x, s, mask=None):
+        x = self.norm1(x, s, resize_mask(mask, x.shape[-1]))
         x = self.actv(x)
 
         # Manually implement grouped ConvTranspose1d since MLX doesn't support groups
@@ -881,11 +951,16 @@ class AdainResBlk1d(nn.Module):
         x = mx.pad(x, ((0, 0), (1, 0), (0, 0))) if self.upsample_type != "none" else x
         x = x.swapaxes(2, 1)
 
+        mask = resize_mask(mask, x.shape[-1])
+        if mask is not None:
+            # The transposed conv spills into the first padded frame
+            x = x * mask
+
         x = x.swapaxes(2, 1)
         x = self.conv1(self.dropout(x), mx.conv1d)
         x = x.swapaxes(2, 1)
 
-        x = self.norm2(x, s)
+        x = self.norm2(x, s, mask)
         x = self.actv(x)
 
         x = x.swapaxes(2, 1)
@@ -893,8 +968,8 @@ class AdainResBlk1d(nn.Module):
         x = x.swapaxes(2, 1)
         return x
 
-    def __call__(self, x, s):
-        out = self._residual(x, s)
+    def __call__(self, x, s, mask=None):
+        out = self._residual(x, s, mask)
         out = (out + self._shortcut(x)) / mx.sqrt(2)
         return out
 
@@ -944,24 +1019,120 @@ class Decoder(nn.Module):
             gen_istft_hop_size,
         )
 
-    def __call__(self, asr, F0_curve, N, s):
+    def __call__(self, asr, F0_curve, N, s, mask=None, phase_offset=None):
+        """
+        Args:
+            asr: Aligned text features (batch, dim_in, frames)
+            F0_curve, N: Pitch and energy curves (batch, 2 * frames)
+            s: Style vectors (batch, style_dim)
+            mask: Optional (batch, 1, frames) mask of valid frames when the
+                batch holds right-padded utterances of different lengths
+            phase_offset: Optional starting phase of the harmonic source, used
+                to continue a previous window (see ``stream``)
+        """
+        x = self._generator_input(asr, F0_curve, N, s, mask)
+        x = self.generator(
+            x, s, F0_curve, resize_mask(mask, x.shape[-1]), phase_offset
+        )  # Working in MLX
+        return x
+
+    def _generator_input(self, asr, F0_curve, N, s, mask=None):
         s = mx.array(s)
         F0 = self.F0_conv(F0_curve[:, None, :].swapaxes(2, 1), mx.conv1d).swapaxes(2, 1)
         N = self.N_conv(N[:, None, :].swapaxes(2, 1), mx.conv1d).swapaxes(2, 1)
         x = mx.concatenate([asr, F0, N], axis=1)
-        x = self.encode(x, s)
+        x = self.encode(x, s, mask)
         asr_res = self.asr_res[0](asr.swapaxes(2, 1), mx.conv1d).swapaxes(2, 1)
         res = True
         for block in self.decode:  # Working in MLX
             if res:
                 x = mx.concatenate([x, asr_res, F0, N], axis=1)
-            x = block(x, s)
+            x = block(x, s, resize_mask(mask, x.shape[-1]))
             # Check if this block has upsampling
             if hasattr(block, "upsample_type") and block.upsample_type != "none":
                 res = False
-        x = self.generator(x, s, F0_curve)  # Working in MLX
         return x
 
+    def stream(
+        self,
+        asr,
+        F0_curve,
+        N,
+        s,
+        window_frames: int = 20,
+        context_frames: int = 8,
+        overlap_frames: int = 2,
+    ):
+        """Decode in fixed-size windows, yielding audio as each one is ready.
+
+        The frame-rate blocks run once over the whole utterance; only the
+        generator, which does most of the work, runs per window. Every window
+        is generated together with ``context_frames`` of input on both sides,
+        which are then dropped. Consecutive windows share ``overlap_frames``
+        frames that are stitched with a linear crossfade. The random initial
+        phase of the harmonic source is drawn once, as ``__call__`` does, and
+        carried from one window to the next.
+
+        The instance norms in the generator take their statistics over the
+        window and its context rather than the whole utterance, so windows
+        that span a change in loudness (e.g. silence into speech) differ
+        slightly from a full decode; more ``context_frames`` narrows the gap.
+
+        Args:
+            asr, F0_curve, N, s: Decoder inputs as for ``__call__``
+            window_frames: Frames emitted per window
+            context_frames: Extra input frames generated on each side of a window
+            overlap_frames: Frames crossfaded between consecutive windows
+
+        Yields:
+            Audio chunks (batch, samples) that concatenate to the utterance
+        """
+        x = self._generator_input(asr, F0_curve, N, s)
+        s = mx.array(s)
+
+        # The generator runs at the F0 curve rate, two points per frame
+        scale = F0_curve.shape[-1] // asr.shape[-1]
+        window = max(1, window_frames) * scale
+        context = max(0, context_frames) * scale
+        overlap = min(max(0, overlap_frames) * scale, window)
+        total = x.shape[-1]
+
+        sine_gen = self.generator.m_source.l_sin_gen
+        initial_phase = None
+        tail = None
+        for start in range(0, total, window):
+            end = min(start + window, total)
+            keep = min(end + overlap, total)
+            first = max(0, start - context)
+            last = min(total, keep + context)
+
+            if initial_phase is None:
+                initial_phase = sine_gen.random_phase(
+                    x.shape[0], (last - first) * int(sine_gen.upsample_scale)
+                )
+            phase_offset = sine_gen.phase_offset(F0_curve[..., :first]) + initial_phase
+            audio = self.generator(
+                x[..., first:last],
+                s,
+                F0_curve[..., first:last],
+                phase_offset=phase_offset,
+            )[:, 0]
+            hop = audio.shape[-1] // (last - first)
+            chunk = audio[:, (start - first) * hop : (keep - first) * hop]
+
+            if tail is not None:
+                fade = (mx.arange(tail.shape[-1]) + 0.5) / tail.shape[-1]
+                head = tail * (1 - fade) + chunk[:, : tail.shape[-1]] * fade
+                chunk = mx.concatenate([head, chunk[:, tail.shape[-1] :]], axis=-1)
+            if keep > end:
+                split = chunk.shape[-1] - (keep - end) * hop
+                chunk, tail = chunk[:, :split], chunk[:, split:]
+            else:
+                tail = None
+
+            mx.eval(chunk)
+            yield chunk
+
     def sanitize(self, key, weights):
         sanitized_weights = None
         if "noise_convs" in key and key.endswith(".weight"):
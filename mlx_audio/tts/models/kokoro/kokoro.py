@@ -1,18 +1,22 @@
 import json
+import math
 import sys
 import time
 from dataclasses import dataclass
 from numbers import Number
-from typing import Dict, Optional, Union
+from pathlib import Path
+from typing import Dict, Generator, List, Optional, Union
 
 import mlx.core as mx
 import mlx.nn as nn
+from huggingface_hub import hf_hub_download, snapshot_download
 from loguru import logger
 
 from ..base import BaseModelArgs, GenerationResult, check_array_shape
-from .istftnet import Decoder
+from .istftnet import Decoder, length_mask
 from .modules import AlbertModelArgs, CustomAlbert, ProsodyPredictor, TextEncoder
 from .pipeline import KokoroPipeline
+from .voice import get_voice_cache, load_voice_tensor
 
 # Force reset logger configuration at the top of your file
 logger.remove()  # Remove all handlers
@@ -44,6 +48,43 @@ def sanitize_lstm_weights(key: str, state_dict: mx.array) -> dict:
     return {key: state_dict}
 
 
+def alignment_indices(pred_dur: mx.array, n_frames: int) -> mx.array:
+    """Map every output frame to the token it repeats (length regulator).
+
+    Args:
+        pred_dur: Integer token durations (batch_size, tokens)
+        n_frames: Number of output frames
+
+    Returns:
+        Token indices (batch_size, n_frames). Frames past an item's total
+        duration point past its last token.
+    """
+    ends = mx.cumsum(pred_dur, axis=-1)
+    # Each token end bumps the index of all following frames by one
+    boundaries = mx.zeros((pred_dur.shape[0], n_frames + 1), dtype=mx.int32)
+    boundaries = boundaries.at[mx.arange(pred_dur.shape[0])[:, None], ends].add(1)
+    return mx.cumsum(boundaries[:, :n_frames], axis=-1)
+
+
+def dense_alignment(pred_dur: mx.array, n_frames: int) -> mx.array:
+    """Dense (batch_size, tokens, n_frames) one-hot alignment matrix.
+
+    Reference form of ``alignment_indices``: ``x @ dense_alignment(...)``
+    equals ``expand_frames(x, alignment_indices(...))`` on valid frames.
+    """
+    ends = mx.cumsum(pred_dur, axis=-1)
+    frames = mx.arange(n_frames)[None, None, :]
+    return (
+        (frames >= (ends - pred_dur)[..., None]) & (frames < ends[..., None])
+    ).astype(mx.float32)
+
+
+def expand_frames(x: mx.array, indices: mx.array) -> mx.array:
+    """Gather (batch_size, channels, tokens) features into frames using token indices."""
+    indices = mx.minimum(indices, x.shape[-1] - 1)
+    return mx.take_along_axis(x, indices[:, None, :], axis=-1)
+
+
 @dataclass
 class ModelConfig(BaseModelArgs):
     istftnet: dict
@@ -117,6 +158,16 @@ class Model(nn.Module):
         audio: mx.array
         pred_dur: Optional[mx.array] = None
 
+    def _input_ids(self, phonemes: str) -> List[int]:
+        input_ids = list(
+            filter(lambda i: i is not None, map(lambda p: self.vocab.get(p), phonemes))
+        )
+        assert len(input_ids) + 2 <= self.context_length, (
+            len(input_ids) + 2,
+            self.context_length,
+        )
+        return [0, *input_ids, 0]
+
     def __call__(
         self,
         phonemes: str,
@@ -125,49 +176,122 @@ class Model(nn.Module):
         return_output: bool = False,  # MARK: BACKWARD COMPAT
         decoder=None,
     ) -> Union["KokoroModel.Output", mx.array]:
-        input_ids = list(
-            filter(lambda i: i is not None, map(lambda p: self.vocab.get(p), phonemes))
+        output = self.forward_batch([phonemes], ref_s, speed, decoder=decoder)[0]
+        return output if return_output else output.audio
+
+    def forward_batch(
+        self,
+        phonemes: List[str],
+        ref_s: mx.array,
+        speed: Number = 1,
+        decoder=None,
+    ) -> List["KokoroModel.Output"]:
+        """Synthesize several phoneme strings in a single padded forward pass.
+
+        Args:
+            phonemes: Phoneme strings, one per batch item
+            ref_s: Reference styles (batch_size, 256), one row per phoneme string
+            speed: Speech speed modifier shared by the batch
+            decoder: Optional decoder override, compiled before use
+
+        Returns:
+            One Output per phoneme string, with audio trimmed to its own length
+        """
+        ids, asr, F0_pred, N_pred, pred_dur, frame_lengths, mask = self._decoder_input(
+            phonemes, ref_s, speed
         )
-        assert len(input_ids) + 2 <= self.context_length, (
-            len(input_ids) + 2,
-            self.context_length,
+
+        decoder = mx.compile(decoder) if decoder is not None else self.decoder
+        audio = decoder(asr, F0_pred, N_pred, ref_s[:, :128], mask)
+
+        # Evaluate the computation graph for audio and pred_dur before returning
+        mx.eval(audio, pred_dur)
+
+        n_frames = asr.shape[-1]
+        samples = audio.shape[-1]
+        outputs = []
+        for b, n in enumerate(frame_lengths.tolist()):
+            outputs.append(
+                self.Output(
+                    audio=audio[b, :, : n * samples // n_frames],
+                    pred_dur=pred_dur[b, : len(ids[b])],
+                )
+            )
+        return outputs
+
+    def forward_stream(
+        self,
+        phonemes: str,
+        ref_s: mx.array,
+        speed: Number = 1,
+        window_frames: int = 20,
+    ) -> Generator[mx.array, None, None]:
+        """Synthesize one phoneme string, yielding audio window by window.
+
+        Durations, F0 and the frame-rate decoder blocks run once for the whole
+        string; the waveform generator then runs ``window_frames`` frames at a
+        time (see ``Decoder.stream``), so the first samples are ready long
+        before the full utterance is.
+
+        Args:
+            phonemes: Phoneme string
+            ref_s: Reference style (1, 256)
+            speed: Speech speed modifier
+            window_frames: Frames decoded per window
+
+        Yields:
+            Audio chunks (1, samples) that concatenate to the utterance
+        """
+        _, asr, F0_pred, N_pred, _, _, _ = self._decoder_input(
+            [phonemes], ref_s, speed
         )
-        input_ids = mx.array([[0, *input_ids, 0]])
-        input_lengths = mx.array([input_ids.shape[-1]])
-        text_mask = mx.arange(int(input_lengths.max()))[None, ...]
+        yield from self.decoder.stream(
+            asr, F0_pred, N_pred, ref_s[:, :128], window_frames=window_frames
+        )
+
+    def _decoder_input(self, phonemes: List[str], ref_s: mx.array, speed: Number):
+        """Run everything up to the decoder: durations, alignment, F0 and energy."""
+        ids = [self._input_ids(p) for p in phonemes]
+        input_lengths = mx.array([len(i) for i in ids])
+        max_len = max(len(i) for i in ids)
+        input_ids = mx.array([i + [0] * (max_len - len(i)) for i in ids])
+        text_mask = mx.arange(max_len)[None, ...]
         text_mask = mx.repeat(text_mask, input_lengths.shape[0], axis=0).astype(
             input_lengths.dtype
         )
         text_mask = text_mask + 1 > input_lengths[:, None]
         bert_dur, _ = self.bert(input_ids, attention_mask=(~text_mask).astype(mx.int32))
         d_en = self.bert_encoder(bert_dur).transpose(0, 2, 1)
-        ref_s = ref_s
         s = ref_s[:, 128:]
         d = self.predictor.text_encoder(d_en, s, input_lengths, text_mask)
-        x, _ = self.predictor.lstm(d)
+        x, _ = self.predictor.lstm(d, lengths=input_lengths)
         duration = self.predictor.duration_proj(x)
         duration = mx.sigmoid(duration).sum(axis=-1) / speed
-        pred_dur = mx.clip(mx.round(duration), a_min=1, a_max=None).astype(mx.int32)[0]
-        indices = mx.concatenate(
-            [mx.repeat(mx.array(i), int(n)) for i, n in enumerate(pred_dur)]
-        )
-        pred_aln_trg = mx.zeros((input_ids.shape[1], indices.shape[0]))
-        pred_aln_trg[indices, mx.arange(indices.shape[0])] = 1
-        pred_aln_trg = pred_aln_trg[None, :]
-        en = d.transpose(0, 2, 1) @ pred_aln_trg
-        F0_pred, N_pred = self.predictor.F0Ntrain(en, s)
+        pred_dur = mx.clip(mx.round(duration), a_min=1, a_max=None).astype(mx.int32)
+        # Padding tokens get no frames
+        pred_dur = mx.where(text_mask, 0, pred_dur)
+
+        # The only host sync: the frame count fixes the output shapes
+        frame_lengths = pred_dur.sum(axis=-1)
+        mx.eval(frame_lengths)
+        n_frames = int(frame_lengths.max())
+        indices = alignment_indices(pred_dur, n_frames)
+
+        # Single items need no masking, which keeps them bit-identical to the
+        # unbatched path
+        mask = None if len(ids) == 1 else length_mask(frame_lengths, n_frames)
+
+        en = expand_frames(d.transpose(0, 2, 1), indices)
+        if mask is not None:
+            en = en * mask
+        F0_pred, N_pred = self.predictor.F0Ntrain(en, s, mask)
         t_en = self.text_encoder(
             input_ids, input_lengths, text_mask
         )  # Working fine in MLX
-        asr = t_en @ pred_aln_trg
-
-        decoder = mx.compile(decoder) if decoder is not None else self.decoder
-        audio = decoder(asr, F0_pred, N_pred, ref_s[:, :128])[0]  # Working fine in MLX
-
-        # Evaluate the computation graph for audio and pred_dur before returning
-        mx.eval(audio, pred_dur)
-
-        return self.Output(audio=audio, pred_dur=pred_dur) if return_output else audio
+        asr = expand_frames(t_en, indices)
+        if mask is not None:
+            asr = asr * mask
+        return ids, asr, F0_pred, N_pred, pred_dur, frame_lengths, mask
 
     def sanitize(self, weights):
         sanitized_weights = {}
@@ -266,6 +390,80 @@ class Model(nn.Module):
             )
         return self._pipelines[lang_code]
 
+    def preload_voices(self, voices: Optional[List[str]] = None) -> List[str]:
+        """Load voice packs into the shared voice cache ahead of the first request.
+
+        Args:
+            voices: Voice names to load. Defaults to every voice in the repo.
+
+        Returns:
+            The names of the voices that were loaded.
+        """
+        repo_id = self.REPO_ID if self.repo_id is None else self.repo_id
+        cache = get_voice_cache(repo_id)
+        if voices is None:
+            path = Path(snapshot_download(repo_id, allow_patterns=["voices/*.pt"]))
+            files = {f.stem: f for f in sorted((path / "voices").glob("*.pt"))}
+        else:
+            files = {
+                v: hf_hub_download(repo_id=repo_id, filename=f"voices/{v}.pt")
+                for v in voices
+            }
+        if len(files) > cache.max_size:
+            cache.max_size = len(files)
+        for name, f in files.items():
+            if name not in cache:
+                cache[name] = mx.array(load_voice_tensor(str(f)))
+        return list(files)
+
+    def _generation_result(
+        self, audio: mx.array, phonemes: str, segment_idx: int, segment_time: float
+    ) -> GenerationResult:
+        samples = audio.shape[0] if audio is not None else 0
+        assert samples > 0, "No audio generated"
+
+        # Calculate token count
+        token_count = len(phonemes) if phonemes is not None else 0
+
+        # Calculate audio duration in seconds
+        sample_rate = self.config.sample_rate
+
+        audio_duration_seconds = samples / sample_rate * audio.shape[1]
+
+        # Calculate real-time factor (RTF)
+        rtf = segment_time / audio_duration_seconds if audio_duration_seconds > 0 else 0
+
+        # Format duration as HH:MM:SS.mmm
+        duration_mins = int(audio_duration_seconds // 60)
+        duration_secs = int(audio_duration_seconds % 60)
+        duration_ms = int((audio_duration_seconds % 1) * 1000)
+        duration_hours = int(audio_duration_seconds // 3600)
+        duration_str = f"{duration_hours:02d}:{duration_mins:02d}:{duration_secs:02d}.{duration_ms:03d}"
+
+        return GenerationResult(
+            audio=audio[0],
+            samples=samples,
+            sample_rate=sample_rate,
+            segment_idx=segment_idx,
+            token_count=token_count,
+            audio_duration=duration_str,
+            real_time_factor=round(rtf, 2),
+            prompt={
+                "tokens": token_count,
+                "tokens-per-sec": (
+                    round(token_count / segment_time, 2) if segment_time > 0 else 0
+                ),
+            },
+            audio_samples={
+                "samples": samples,
+                "samples-per-sec": (
+                    round(samples / segment_time, 2) if segment_time > 0 else 0
+                ),
+            },
+            processing_time_seconds=segment_time,
+            peak_memory_usage=mx.get_peak_memory() / 1e9,
+        )
+
     def generate(
         self,
         text: str,
@@ -273,15 +471,21 @@ class Model(nn.Module):
         speed: float = 1.0,
         lang_code: str = "a",
         split_pattern: str = r"\n+",
+        stream: bool = False,
+        streaming_interval: float = 0.5,
         **kwargs,
     ):
         pipeline = self._get_pipeline(lang_code)
 
-        pipeline.voices = {}  # Reset voices
-
         if voice is None:
             voice = "af_heart"
 
+        if stream:
+            yield from self._generate_stream(
+                pipeline, text, voice, speed, split_pattern, streaming_interval
+            )
+            return
+
         # Track overall generation time
         start_time = time.time()
 
@@ -293,54 +497,98 @@ class Model(nn.Module):
             segment_time = now - start_time
             start_time = now
 
-            samples = audio.shape[0] if audio is not None else 0
-            assert samples > 0, "No audio generated"
+            yield self._generation_result(audio, phonemes, segment_idx, segment_time)
+
+            # Clear cache after each segment to avoid memory leaks
+            mx.clear_cache()
+
+    def _generate_stream(
+        self,
+        pipeline: KokoroPipeline,
+        text: str,
+        voice: str,
+        speed: float,
+        split_pattern: str,
+        streaming_interval: float,
+    ):
+        """Yield roughly ``streaming_interval`` seconds of audio at a time."""
+        istftnet = self.config.istftnet
+        samples_per_frame = (
+            2 * math.prod(istftnet["upsample_rates"]) * istftnet["gen_istft_hop_size"]
+        )
+        window_frames = max(
+            1, round(streaming_interval * self.sample_rate / samples_per_frame)
+        )
+        pack = pipeline.load_voice(voice)
+
+        start_time = time.time()
+        segment_idx = 0
+        for _, _, phonemes, _ in pipeline.chunk_text(text, split_pattern):
+            for audio in self.forward_stream(
+                phonemes, pack[len(phonemes) - 1], speed, window_frames
+            ):
+                now = time.time()
+                segment_time = now - start_time
+                start_time = now
+
+                yield self._generation_result(
+                    audio, phonemes, segment_idx, segment_time
+                )
+                segment_idx += 1
+
+            # Clear cache after each chunk to avoid memory leaks
+            mx.clear_cache()
 
-            # Calculate token count
-            token_count = len(phonemes) if phonemes is not None else 0
+    def generate_batch(
+        self,
+        texts: List[str],
+        voice: str = None,
+        speed: float = 1.0,
+        lang_code: str = "a",
+        split_pattern: str = r"\n+",
+        max_batch_size: int = 8,
+        **kwargs,
+    ):
+        """Generate several texts at once, batching their chunks through the model.
 
-            # Calculate audio duration in seconds
-            sample_rate = self.config.sample_rate
+        Chunks are padded to a common length and run through ``forward_batch``
+        up to ``max_batch_size`` at a time; the n-th segment of every text is
+        scheduled before the (n+1)-th so all callers start receiving audio early.
 
-            audio_duration_seconds = samples / sample_rate * audio.shape[1]
+        Yields:
+            (text_index, GenerationResult) in completion order, with segments of
+            each text in order
+        """
+        pipeline = self._get_pipeline(lang_code)
 
-            # Calculate real-time factor (RTF)
-            rtf = (
-                segment_time / audio_duration_seconds
-                if audio_duration_seconds > 0
-                else 0
-            )
+        if voice is None:
+            voice = "af_heart"
+        pack = pipeline.load_voice(voice)
 
-            # Format duration as HH:MM:SS.mmm
-            duration_mins = int(audio_duration_seconds // 60)
-            duration_secs = int(audio_duration_seconds % 60)
-            duration_ms = int((audio_duration_seconds % 1) * 1000)
-            duration_hours = int(audio_duration_seconds // 3600)
-            duration_str = f"{duration_hours:02d}:{duration_mins:02d}:{duration_secs:02d}.{duration_ms:03d}"
-
-            yield GenerationResult(
-                audio=audio[0],
-                samples=samples,
-                sample_rate=sample_rate,
-                segment_idx=segment_idx,
-                token_count=token_count,
-                audio_duration=duration_str,
-                real_time_factor=round(rtf, 2),
-                prompt={
-                    "tokens": token_count,
-                    "tokens-per-sec": (
-                        round(token_count / segment_time, 2) if segment_time > 0 else 0
-                    ),
-                },
-                audio_samples={
-                    "samples": samples,
-                    "samples-per-sec": (
-                        round(samples / segment_time, 2) if segment_time > 0 else 0
-                    ),
-                },
-                processing_time_seconds=segment_time,
-                peak_memory_usage=mx.get_peak_memory() / 1e9,
+        chunks = []
+        for text_index, text in enumerate(texts):
+            for segment_idx, (_, _, ps, _) in enumerate(
+                pipeline.chunk_text(text, split_pattern)
+            ):
+                chunks.append((segment_idx, text_index, ps))
+        chunks.sort(key=lambda c: (c[0], c[1]))
+
+        start_time = time.time()
+        for i in range(0, len(chunks), max(1, max_batch_size)):
+            batch = chunks[i : i + max(1, max_batch_size)]
+            outputs = KokoroPipeline.infer_batch(
+                self, [ps for _, _, ps in batch], pack, speed
             )
 
-            # Clear cache after each segment to avoid memory leaks
+            # Batch wall time is shared evenly between its segments
+            now = time.time()
+            segment_time = (now - start_time) / len(batch)
+            start_time = now
+
+            for (segment_idx, text_index, ps), output in zip(batch, outputs):
+                yield text_index, self._generation_result(
+                    output.audio, ps, segment_idx, segment_time
+                )
+
+            # Clear cache after each batch to avoid memory leaks
             mx.clear_cache()
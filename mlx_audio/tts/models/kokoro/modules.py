@@ -5,8 +5,10 @@ from typing import List, Optional, Tuple, Union
 import mlx.core as mx
 import mlx.nn as nn
 
+from mlx_audio.rnn import lstm_input_projection, lstm_scan
+
 from ..base import BaseModelArgs
-from .istftnet import AdainResBlk1d, ConvWeighted
+from .istftnet import AdainResBlk1d, ConvWeighted, resize_mask
 
 
 class LinearNorm(nn.Module):
@@ -60,7 +62,7 @@ class TextEncoder(nn.Module):
                 x = mx.where(m, 0.0, x)
 
         x = x.swapaxes(2, 1)
-        x, _ = self.lstm(x)
+        x, _ = self.lstm(x, lengths=input_lengths)
         x = x.swapaxes(2, 1)
         x_pad = mx.zeros([x.shape[0], x.shape[1], m.shape[-1]])
         x_pad[:, :, : x.shape[-1]] = x
@@ -80,8 +82,8 @@ class AdaLayerNorm(nn.Module):
         h = self.fc(s)
         h = mx.reshape(h, (h.shape[0], h.shape[1], 1))
         gamma, beta = mx.split(h, 2, axis=1)
-        gamma = gamma.transpose(2, 0, 1)
-        beta = beta.transpose(2, 0, 1)
+        gamma = gamma.transpose(0, 2, 1)
+        beta = beta.transpose(0, 2, 1)
 
         mean = mx.mean(x, axis=-1, keepdims=True)
         var = mx.var(x, axis=-1, keepdims=True)
@@ -143,100 +145,24 @@ class LSTM(nn.Module):
             else None
         )
 
+    @staticmethod
+    def _roll_rows(x, shifts):
+        """Roll each batch item of (batch_size, seq_len, dim) along seq_len by its own shift"""
+        seq_len = x.shape[-2]
+        idx = (mx.arange(seq_len)[None, :] - shifts[:, None]) % seq_len
+        return mx.take_along_axis(x, idx[..., None], axis=-2)
+
     def _extra_repr(self):
         return (
             f"input_size={self.input_size}, "
             f"hidden_size={self.hidden_size}, bias={self.bias}"
         )
 
-    def _forward_direction(self, x, hidden=None, cell=None):
-        """Process sequence in forward direction"""
-        # Pre-compute input projections
-        if self.bias_ih_forward is not None and self.bias_hh_forward is not None:
-            x_proj = mx.addmm(
-                self.bias_ih_forward + self.bias_hh_forward, x, self.Wx_forward.T
-            )
-        else:
-            x_proj = x @ self.Wx_forward.T
-
-        all_hidden = []
-        all_cell = []
-
-        seq_len = x.shape[-2]
-
-        # Initialize hidden and cell states if not provided
-        if hidden is None:
-            hidden = mx.zeros((x.shape[0], self.hidden_size))
-        if cell is None:
-            cell = mx.zeros((x.shape[0], self.hidden_size))
-
-        # Process sequence in forward direction (0 to seq_len-1)
-        for idx in range(seq_len):
-            ifgo = x_proj[..., idx, :]
-            ifgo = ifgo + hidden @ self.Wh_forward.T
-
-            # Split gates
-            i, f, g, o = mx.split(ifgo, 4, axis=-1)
-
-            # Apply activations
-            i = mx.sigmoid(i)
-            f = mx.sigmoid(f)
-            g = mx.tanh(g)
-            o = mx.sigmoid(o)
-
-            # Update cell and hidden states
-            cell = f * cell + i * g
-            hidden = o * mx.tanh(cell)
-
-            all_cell.append(cell)
-            all_hidden.append(hidden)
-
-        return mx.stack(all_hidden, axis=-2), mx.stack(all_cell, axis=-2)
-
-    def _backward_direction(self, x, hidden=None, cell=None):
-        """Process sequence in backward direction"""
-        # Pre-compute input projections
-        if self.bias_ih_backward is not None and self.bias_hh_backward is not None:
-            x_proj = mx.addmm(
-                self.bias_ih_backward + self.bias_hh_backward, x, self.Wx_backward.T
-            )
-        else:
-            x_proj = x @ self.Wx_backward.T
-
-        all_hidden = []
-        all_cell = []
-
-        seq_len = x.shape[-2]
-
-        # Initialize hidden and cell states if not provided
-        if hidden is None:
-            hidden = mx.zeros((x.shape[0], self.hidden_size))
-        if cell is None:
-            cell = mx.zeros((x.shape[0], self.hidden_size))
-
-        # Process sequence in backward direction (seq_len-1 to 0)
-        for idx in range(seq_len - 1, -1, -1):
-            ifgo = x_proj[..., idx, :]
-            ifgo = ifgo + hidden @ self.Wh_backward.T
-
-            # Split gates
-            i, f, g, o = mx.split(ifgo, 4, axis=-1)
-
-            # Apply activations
-            i = mx.sigmoid(i)
-            f = mx.sigmoid(f)
-            g = mx.tanh(g)
-            o = mx.sigmoid(o)
-
-            # Update cell and hidden states
-            cell = f * cell + i * g
-            hidden = o * mx.tanh(cell)
-
-            # Insert at beginning to maintain original sequence order
-            all_cell.insert(0, cell)
-            all_hidden.insert(0, hidden)
-
-        return mx.stack(all_hidden, axis=-2), mx.stack(all_cell, axis=-2)
+    def _input_projection(self, x, direction):
+        bias_ih = getattr(self, f"bias_ih_{direction}")
+        bias_hh = getattr(self, f"bias_hh_{direction}")
+        bias = bias_ih + bias_hh if bias_ih is not None and bias_hh is not None else None
+        return lstm_input_projection(x, getattr(self, f"Wx_{direction}"), bias)
 
     def __call__(
         self,
@@ -245,42 +171,81 @@ class LSTM(nn.Module):
         cell_forward=None,
         hidden_backward=None,
         cell_backward=None,
+        lengths=None,
     ):
         """
         Process input sequence in both directions and concatenate the results.
 
         Args:
-            x: Input tensor of shape (batch_size, seq_len, input_size)
+            x: Input tensor of shape (batch_size, seq_len, input_size), or
+                (seq_len, input_size) for a batch of one
             hidden_forward: Initial hidden state for forward direction
             cell_forward: Initial cell state for forward direction
             hidden_backward: Initial hidden state for backward direction
             cell_backward: Initial cell state for backward direction
+            lengths: Optional valid lengths (batch_size,) of right-padded sequences.
+                The backward direction then starts at each sequence's last valid
+                step, so outputs match running every sequence unpadded.
 
         Returns:
             Tuple of:
                 - Combined output hidden states (batch_size, seq_len, 2*hidden_size)
                 - Tuple of final states ((forward_hidden, forward_cell), (backward_hidden, backward_cell))
         """
-
         if x.ndim == 2:
             x = mx.expand_dims(x, axis=0)  # (1, seq_len, input_size)
 
-        # Forward direction
-        forward_hidden, forward_cell = self._forward_direction(
-            x, hidden_forward, cell_forward
+        # Right-align every sequence so the backward pass sees its valid
+        # steps first, then shift the outputs back into place
+        shifts = None if lengths is None else x.shape[-2] - lengths
+        x_backward = x if shifts is None else self._roll_rows(x, shifts)
+
+        # Both directions run as one stacked recurrence, the backward one on
+        # time-reversed inputs
+        x_proj = mx.stack(
+            [
+                self._input_projection(x, "forward"),
+                self._input_projection(x_backward, "backward")[..., ::-1, :],
+            ]
         )
-
-        # Backward direction
-        backward_hidden, backward_cell = self._backward_direction(
-            x, hidden_backward, cell_backward
+        Wh = mx.stack([self.Wh_forward.T, self.Wh_backward.T])
+        zeros = mx.zeros((x.shape[0], self.hidden_size), dtype=x_proj.dtype)
+        hidden = mx.stack(
+            [
+                zeros if hidden_forward is None else hidden_forward,
+                zeros if hidden_backward is None else hidden_backward,
+            ]
         )
+        cell = mx.stack(
+            [
+                zeros if cell_forward is None else cell_forward,
+                zeros if cell_backward is None else cell_backward,
+            ]
+        )
+        all_hidden, all_cell = lstm_scan(x_proj, Wh, hidden, cell)
+
+        forward_hidden, forward_cell = all_hidden[0], all_cell[0]
+        backward_hidden = all_hidden[1][..., ::-1, :]
+        backward_cell = all_cell[1][..., ::-1, :]
+
+        if shifts is None:
+            last = -1
+        else:
+            backward_hidden = self._roll_rows(backward_hidden, -shifts)
+            backward_cell = self._roll_rows(backward_cell, -shifts)
+            last = (lengths - 1)[:, None, None]
 
         # Concatenate outputs along the feature dimension
         output = mx.concatenate([forward_hidden, backward_hidden], axis=-1)
 
+        if lengths is not None:
+            forward_hidden = mx.take_along_axis(forward_hidden, last, axis=-2)
+            forward_cell = mx.take_along_axis(forward_cell, last, axis=-2)
+            last = -1
+
         # Return combined output and final states for both directions
         return output, (
-            (forward_hidden[..., -1, :], forward_cell[..., -1, :]),
+            (forward_hidden[..., last, :], forward_cell[..., last, :]),
             (backward_hidden[..., 0, :], backward_cell[..., 0, :]),
         )
 
@@ -352,15 +317,24 @@ class ProsodyPredictor(nn.Module):
         en = mx.matmul(mx.transpose(d), alignment)
         return mx.squeeze(duration, axis=-1), en
 
-    def F0Ntrain(self, x, s):
+    def F0Ntrain(self, x, s, mask=None):
+        """Predict F0 and energy curves from frame-level features.
+
+        Args:
+            x: Frame features (batch_size, channels, frames)
+            s: Style vectors (batch_size, style_dim)
+            mask: Optional (batch_size, 1, frames) mask of valid frames for
+                right-padded batches
+        """
         x = mx.array(x)
         s = mx.array(s)
-        x, _ = self.shared(mx.transpose(x, (0, 2, 1)))
+        lengths = None if mask is None else mask.sum(axis=-1)[:, 0].astype(mx.int32)
+        x, _ = self.shared(mx.transpose(x, (0, 2, 1)), lengths=lengths)
 
         # F0 prediction
         F0 = mx.transpose(x, (0, 2, 1))
         for block in self.F0:
-            F0 = block(F0, s)
+            F0 = block(F0, s, mask)
 
         F0 = F0.swapaxes(2, 1)
         F0 = self.F0_proj(F0)
@@ -369,11 +343,16 @@ class ProsodyPredictor(nn.Module):
         # N prediction
         N = mx.transpose(x, (0, 2, 1))
         for block in self.N:
-            N = block(N, s)
+            N = block(N, s, mask)
         N = N.swapaxes(2, 1)
         N = self.N_proj(N)
         N = N.swapaxes(2, 1)
 
+        if mask is not None:
+            out_mask = resize_mask(mask, F0.shape[-1])
+            F0 = F0 * out_mask
+            N = N * out_mask
+
         return mx.squeeze(F0, axis=1), mx.squeeze(N, axis=1)
 
 
@@ -402,8 +381,8 @@ class DurationEncoder(nn.Module):
                 x = mx.concatenate([x, s.transpose(1, 2, 0)], axis=1)
                 x = mx.where(m[..., None].transpose(0, 2, 1), 0.0, x)
             else:
-                x = x.transpose(0, 2, 1)[0]
-                x, _ = block(x)
+                x = x.transpose(0, 2, 1)
+                x, _ = block(x, lengths=text_lengths)
                 x = x.transpose(0, 2, 1)
                 x_pad = mx.zeros([x.shape[0], x.shape[1], m.shape[-1]])
                 x_pad[:, :, : x.shape[-1]] = x
@@ -9,7 +9,7 @@ import mlx.nn as nn
 from huggingface_hub import hf_hub_download
 from misaki import en, espeak
 
-from .voice import load_voice_tensor
+from .voice import get_voice_cache, load_voice_tensor
 
 ALIASES = {
     "en-us": "a",
@@ -44,7 +44,8 @@ class KokoroPipeline:
     """
     KokoroPipeline is a language-aware support class with 2 main responsibilities:
     1. Perform language-specific G2P, mapping (and chunking) text -> phonemes
-    2. Manage and store voices, lazily downloaded from HF if needed
+    2. Manage and store voices, lazily downloaded from HF if needed. Loaded
+       voice packs live in a cache shared by all pipelines of the same repo.
 
     You are expected to have one KokoroPipeline per language. If you have multiple
     KokoroPipeline instances, you should reuse one KokoroModel instance across all of them.
@@ -88,7 +89,7 @@ class KokoroPipeline:
         if repo_id is None:
             raise ValueError("repo_id is required to load voices")
         self.model = model
-        self.voices = {}
+        self.voices = get_voice_cache(repo_id)
         if lang_code in "ab":
             try:
                 fallback = espeak.EspeakFallback(british=lang_code == "b")
@@ -127,8 +128,9 @@ class KokoroPipeline:
             self.g2p = espeak.EspeakG2P(language=language)
 
     def load_single_voice(self, voice: str) -> mx.array:
-        if voice in self.voices:
-            return self.voices[voice]
+        pack = self.voices.get(voice)
+        if pack is not None:
+            return pack
         if voice.endswith(".pt"):
             f = voice
         else:
@@ -151,14 +153,16 @@ class KokoroPipeline:
     """
 
     def load_voice(self, voice: str, delimiter: str = ",") -> mx.array:
-        if voice in self.voices:
-            return self.voices[voice]
+        pack = self.voices.get(voice)
+        if pack is not None:
+            return pack
         logging.debug(f"Loading voice: {voice}")
         packs = [self.load_single_voice(v) for v in voice.split(delimiter)]
         if len(packs) == 1:
             return packs[0]
-        self.voices[voice] = mx.mean(mx.stack(packs), axis=0)
-        return self.voices[voice]
+        pack = mx.mean(mx.stack(packs), axis=0)
+        self.voices[voice] = pack
+        return pack
 
     @classmethod
     def tokens_to_ps(cls, tokens: List[en.MToken]) -> str:
@@ -235,6 +239,17 @@ class KokoroPipeline:
     ):
         return model(ps, pack[len(ps) - 1], speed, return_output=True)
 
+    @classmethod
+    def infer_batch(
+        cls,
+        model: nn.Module,
+        ps: List[str],
+        pack: mx.array,
+        speed: Number = 1,
+    ):
+        ref_s = mx.concatenate([pack[len(p) - 1] for p in ps], axis=0)
+        return model.forward_batch(ps, ref_s, speed)
+
     def generate_from_tokens(
         self,
         tokens: Union[str, List[en.MToken]],
@@ -355,18 +370,17 @@ class KokoroPipeline:
         def __len__(self):
             return 3
 
-    def __call__(
+    def chunk_text(
         self,
         text: Union[str, List[str]],
-        voice: Optional[str] = None,
-        speed: Number = 1,
         split_pattern: Optional[str] = r"\n+",
-    ) -> Generator["KokoroPipeline.Result", None, None]:
-        if voice is None:
-            raise ValueError(
-                'Specify a voice: en_us_pipeline(text="Hello world!", voice="af_heart")'
-            )
-        pack = self.load_voice(voice) if self.model else None
+    ) -> Generator[Tuple[int, str, str, Optional[List[en.MToken]]], None, None]:
+        """Split text into model-sized chunks and phonemize them.
+
+        Yields:
+            (text_index, graphemes, phonemes, tokens) per chunk, where tokens is
+            None for languages without MToken support
+        """
         if isinstance(text, str):
             text = re.split(split_pattern, text.strip()) if split_pattern else [text]
         # Process each segment
@@ -386,20 +400,7 @@ class KokoroPipeline:
                             f"Unexpected len(ps) == {len(ps)} > 510 and ps == '{ps}'"
                         )
                         ps = ps[:510]
-                    output = (
-                        KokoroPipeline.infer(self.model, ps, pack, speed)
-                        if self.model
-                        else None
-                    )
-                    if output is not None and output.pred_dur is not None:
-                        KokoroPipeline.join_timestamps(tks, output.pred_dur)
-                    yield self.Result(
-                        graphemes=gs,
-                        phonemes=ps,
-                        tokens=tks,
-                        output=output,
-                        text_index=graphemes_index,
-                    )
+                    yield graphemes_index, gs, ps, tks
 
             # Non-English processing with chunking
             else:
@@ -446,15 +447,32 @@ class KokoroPipeline:
                     elif len(ps) > 510:
                         logging.warning(f"Truncating len(ps) == {len(ps)} > 510")
                         ps = ps[:510]
+                    yield graphemes_index, chunk, ps, None
 
-                    output = (
-                        KokoroPipeline.infer(self.model, ps, pack, speed)
-                        if self.model
-                        else None
-                    )
-                    yield self.Result(
-                        graphemes=chunk,
-                        phonemes=ps,
-                        output=output,
-                        text_index=graphemes_index,
-                    )
+    def __call__(
+        self,
+        text: Union[str, List[str]],
+        voice: Optional[str] = None,
+        speed: Number = 1,
+        split_pattern: Optional[str] = r"\n+",
+    ) -> Generator["KokoroPipeline.Result", None, None]:
+        if voice is None:
+            raise ValueError(
+                'Specify a voice: en_us_pipeline(text="Hello world!", voice="af_heart")'
+            )
+        pack = self.load_voice(voice) if self.model else None
+        for text_index, gs, ps, tks in self.chunk_text(text, split_pattern):
+            output = (
+                KokoroPipeline.infer(self.model, ps, pack, speed)
+                if self.model
+                else None
+            )
+            if tks is not None and output is not None and output.pred_dur is not None:
+                KokoroPipeline.join_timestamps(tks, output.pred_dur)
+            yield self.Result(
+                graphemes=gs,
+                phonemes=ps,
+                tokens=tks,
+                output=output,
+                text_index=text_index,
+            )
@@ -1,10 +1,77 @@
 import io
 import pickle
 import sys
+import threading
 import zipfile
+from collections import OrderedDict
+from typing import Dict, Optional
 
+import mlx.core as mx
 import numpy as np
 
+DEFAULT_VOICE_CACHE_SIZE = 128
+
+
+class VoiceCache:
+    """
+    Thread-safe LRU cache of voice packs, shared by every KokoroPipeline that
+    loads voices from the same repo so packs survive across requests.
+    Keys are voice specs: a voice name, a .pt path or a comma-blended spec.
+    """
+
+    def __init__(self, max_size: int = DEFAULT_VOICE_CACHE_SIZE):
+        self.max_size = max_size
+        self._packs: "OrderedDict[str, mx.array]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __contains__(self, key: str) -> bool:
+        with self._lock:
+            return key in self._packs
+
+    def __getitem__(self, key: str) -> mx.array:
+        with self._lock:
+            self._packs.move_to_end(key)
+            return self._packs[key]
+
+    def get(self, key: str) -> Optional[mx.array]:
+        """Return the pack for ``key`` and mark it recently used, or None."""
+        with self._lock:
+            pack = self._packs.get(key)
+            if pack is not None:
+                self._packs.move_to_end(key)
+            return pack
+
+    def __setitem__(self, key: str, pack: mx.array):
+        with self._lock:
+            self._packs[key] = pack
+            self._packs.move_to_end(key)
+            while len(self._packs) > self.max_size:
+                self._packs.popitem(last=False)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._packs)
+
+    def keys(self):
+        with self._lock:
+            return list(self._packs.keys())
+
+    def clear(self):
+        with self._lock:
+            self._packs.clear()
+
+
+_voice_caches: Dict[str, VoiceCache] = {}
+_voice_caches_lock = threading.Lock()
+
+
+def get_voice_cache(repo_id: str) -> VoiceCache:
+    """Return the process-wide voice cache for a repo."""
+    with _voice_caches_lock:
+        if repo_id not in _voice_caches:
+            _voice_caches[repo_id] = VoiceCache()
+        return _voice_caches[repo_id]
+
 
 def load_voice_tensor(path: str) -> np.ndarray:
     """
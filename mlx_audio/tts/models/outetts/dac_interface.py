@@ -2,11 +2,9 @@ import math
 
 import mlx.core as mx
 import numpy as np
-import pyloudnorm as pyln
-import scipy.signal
 import soundfile as sf
 
-from mlx_audio.codec import DAC
+from mlx_audio.codec_registry import get_codec
 
 
 def process_audio_array(
@@ -16,6 +14,8 @@ def process_audio_array(
     peak_limit: float = -1,
     block_size: float = 0.400,
 ) -> mx.array:
+    import pyloudnorm as pyln
+
     audio_np = np.array(audio)
 
     # handle multi-channel audio
@@ -56,9 +56,14 @@ def process_audio_array(
 
 class DacInterface:
     def __init__(self, repo_id: str = "mlx-community/dac-speech-24khz-1.5kbps"):
-        self.model = DAC.from_pretrained(repo_id)
+        self.repo_id = repo_id
         self.sr = 24000
 
+    @property
+    def model(self):
+        """The shared DAC codec, loaded on first use."""
+        return get_codec("dac", self.repo_id)
+
     def convert_audio(
         self, audio: mx.array, sr: int, target_sr: int, target_channels: int
     ):
@@ -79,6 +84,8 @@ class DacInterface:
                 audio_np = audio_np[..., :2, :]
 
         if sr != target_sr:
+            import scipy.signal
+
             new_length = int(length * target_sr / sr)
             resampled = np.zeros((target_channels, new_length))
 
@@ -4,15 +4,22 @@ from pathlib import Path
 from typing import List, Optional
 
 import mlx.core as mx
+import numpy as np
 from mlx_lm.generate import stream_generate
 from mlx_lm.models.qwen3 import Model as Qwen3Model
 from mlx_lm.models.qwen3 import ModelArgs as Qwen3ModelConfig
 from mlx_lm.sample_utils import make_logits_processors, make_sampler
 from tqdm import tqdm
 
-from mlx_audio.codec.models.snac import SNAC
+from mlx_audio.codec_registry import codec_registry
 
 from ..base import GenerationResult
+from ..snac_streaming import (
+    CODES_PER_FRAME,
+    SAMPLES_PER_FRAME,
+    SnacStreamDecoder,
+    decode_snac_frames,
+)
 
 # VyvoTTS special token IDs (Qwen3-based tokenizer)
 TOKENIZER_LENGTH = 151669
@@ -34,34 +41,17 @@ class ModelConfig(Qwen3ModelConfig):
     sample_rate: int = 24000
 
 
-snac_model = SNAC.from_pretrained("mlx-community/snac_24khz").eval()
+SNAC_REPO = "mlx-community/snac_24khz"
 
 
 def decode_audio_from_codes(code_list):
-    layer_1 = []
-    layer_2 = []
-    layer_3 = []
-    for i in range((len(code_list) + 1) // 7):
-        layer_1.append(code_list[7 * i])
-        layer_2.append(code_list[7 * i + 1] - 4096)
-        layer_3.append(code_list[7 * i + 2] - (2 * 4096))
-        layer_3.append(code_list[7 * i + 3] - (3 * 4096))
-        layer_2.append(code_list[7 * i + 4] - (4 * 4096))
-        layer_3.append(code_list[7 * i + 5] - (5 * 4096))
-        layer_3.append(code_list[7 * i + 6] - (6 * 4096))
-    codes = [
-        mx.expand_dims(mx.array(layer_1), 0),
-        mx.expand_dims(mx.array(layer_2), 0),
-        mx.expand_dims(mx.array(layer_3), 0),
-    ]
-    audio_hat = snac_model.decode(codes).squeeze(-1)
-    return audio_hat
+    return decode_snac_frames(code_list, SNAC_REPO)
 
 
 def encode_audio_to_codes(audio):
     audio = audio[None, None, :]
 
-    codes = snac_model.encode(audio)
+    codes = codec_registry.encode("snac", SNAC_REPO, audio)
 
     layer_1 = codes[0].squeeze(0).tolist()
     layer_2 = codes[1].squeeze(0).tolist()
@@ -109,48 +99,19 @@ class Model(Qwen3Model):
         return self.config.sample_rate
 
     def parse_output(self, input_ids):
-        token_to_find = START_OF_SPEECH  # 151670
-        token_to_remove = END_OF_SPEECH  # 151671
-
-        # MLX doesn't have nonzero, so we need to create indices manually
-        mask = input_ids == token_to_find
-        indices = []
-        for i in range(mask.shape[0]):
-            for j in range(mask.shape[1]):
-                if mask[i, j]:
-                    indices.append((i, j))
-        token_indices = [[], []]
-        for i, j in indices:
-            token_indices[0].append(i)
-            token_indices[1].append(j)
-
-        # Check if we found any tokens BEFORE converting to MLX array
-        # to avoid "Cannot do a non-empty take from an array with zero elements" error
-        if len(token_indices[1]) > 0:
-            token_indices = mx.array(token_indices)
-            last_occurrence_idx = int(token_indices[1][-1])
-            cropped_tensor = input_ids[:, last_occurrence_idx + 1 :]
-        else:
-            cropped_tensor = input_ids
-
-        mask = cropped_tensor != token_to_remove
+        token_to_find = START_OF_SPEECH
+        token_to_remove = END_OF_SPEECH
 
-        processed_rows = []
-
-        for row in cropped_tensor:
-            # Create a mask and filter manually since boolean indexing isn't supported
-            row_list = row.tolist()
-            masked_row = mx.array([val for val in row_list if val != token_to_remove])
-            processed_rows.append(masked_row)
+        ids = np.array(input_ids)
+        _, cols = np.nonzero(ids == token_to_find)
+        if len(cols) > 0:
+            ids = ids[:, cols[-1] + 1 :]
 
         code_lists = []
-
-        for row in processed_rows:
-            row_length = row.shape[0]
-            new_length = (row_length // 7) * 7
-            trimmed_row = row[:new_length]
-            trimmed_row = [t - AUDIO_TOKENS_START for t in trimmed_row]  # 151679
-            code_lists.append(trimmed_row)
+        for row in ids:
+            row = row[row != token_to_remove]
+            row = row[: (len(row) // CODES_PER_FRAME) * CODES_PER_FRAME]
+            code_lists.append((row - AUDIO_TOKENS_START).tolist())
 
         return code_lists
 
@@ -240,6 +201,8 @@ class Model(Qwen3Model):
         verbose: bool = False,
         ref_audio: mx.array = None,
         ref_text: Optional[str] = None,
+        stream: bool = False,
+        streaming_interval: float = 0.5,
         **kwargs,
     ):
         prompt = text.replace("\\n", "\n").replace("\\t", "\t")
@@ -259,6 +222,24 @@ class Model(Qwen3Model):
             kwargs.get("repetition_context_size", 20),
         )
 
+        decoder = None
+        if stream:
+            # SNAC frames are decoded every streaming_interval seconds of audio
+            decoder = SnacStreamDecoder(
+                SNAC_REPO,
+                max_frames=max_tokens // CODES_PER_FRAME,
+                interval_frames=round(
+                    streaming_interval * self.sample_rate / SAMPLES_PER_FRAME
+                ),
+            )
+
+        # Generated ids go to a preallocated buffer instead of being
+        # concatenated to input_ids at every step
+        generated = np.zeros(max_tokens, dtype=np.int64)
+        num_generated = 0
+        segment_idx = 0
+        chunk_tokens = 0
+
         time_start = time.time()
         # TODO: Support batch processing as in the Colab: https://github.com/canopyai/Orpheus-TTS
         for i, response in enumerate(
@@ -275,14 +256,42 @@ class Model(Qwen3Model):
                 disable=not verbose,
             )
         ):
-            next_token = mx.array([response.token])
-            input_ids = mx.concatenate([input_ids, next_token[None, :]], axis=1)
+            next_token = response.token
+            generated[num_generated] = next_token
+            num_generated += 1
+            chunk_tokens += 1
             if i % 50 == 0:
                 mx.clear_cache()
 
             if next_token == END_OF_SPEECH:  # 151671
                 break
 
+            if decoder is None:
+                continue
+            if next_token == START_OF_SPEECH:
+                decoder.reset()
+            elif next_token >= AUDIO_TOKENS_START:
+                audio = decoder.add(next_token - AUDIO_TOKENS_START)
+                if audio is not None:
+                    yield self._generation_result(
+                        audio, chunk_tokens, time.time() - time_start, segment_idx
+                    )
+                    segment_idx += 1
+                    chunk_tokens = 0
+                    time_start = time.time()
+
+        if decoder is not None:
+            audio = decoder.flush()
+            if audio is not None:
+                yield self._generation_result(
+                    audio, chunk_tokens, time.time() - time_start, segment_idx
+                )
+            mx.clear_cache()
+            return
+
+        input_ids = mx.concatenate(
+            [input_ids, mx.array(generated[:num_generated])[None]], axis=1
+        )
         code_lists = self.parse_output(input_ids)
 
         my_samples = []
@@ -304,47 +313,60 @@ class Model(Qwen3Model):
                 # Calculate token count
                 token_count = input_ids.shape[1] if input_ids is not None else 0
 
-                # Calculate audio duration in seconds
-                sample_rate = self.config.sample_rate
-                audio_duration_seconds = samples / sample_rate
-
-                # Calculate real-time factor (RTF)
-                rtf = audio_duration_seconds / (time_end - time_start)
-
-                # Format duration as HH:MM:SS.mmm
-                duration_mins = int(audio_duration_seconds // 60)
-                duration_secs = int(audio_duration_seconds % 60)
-                duration_ms = int((audio_duration_seconds % 1) * 1000)
-                duration_hours = int(audio_duration_seconds // 3600)
-                duration_str = f"{duration_hours:02d}:{duration_mins:02d}:{duration_secs:02d}.{duration_ms:03d}"
-
-                yield GenerationResult(
-                    audio=audio,
-                    samples=samples,
-                    sample_rate=sample_rate,
-                    segment_idx=i,
-                    token_count=token_count,
-                    audio_duration=duration_str,
-                    real_time_factor=rtf,
-                    prompt={
-                        "tokens": token_count,
-                        "tokens-per-sec": (
-                            round(token_count / audio_duration_seconds, 2)
-                            if audio_duration_seconds > 0
-                            else 0
-                        ),
-                    },
-                    audio_samples={
-                        "samples": samples,
-                        "samples-per-sec": (
-                            round(samples / audio_duration_seconds, 2)
-                            if audio_duration_seconds > 0
-                            else 0
-                        ),
-                    },
-                    processing_time_seconds=time_end - time_start,
-                    peak_memory_usage=mx.get_peak_memory() / 1e9,
+                yield self._generation_result(
+                    audio, token_count, time_end - time_start, i
                 )
 
                 # Clear cache after each segment to avoid memory leaks
                 mx.clear_cache()
+
+    def _generation_result(
+        self,
+        audio: mx.array,
+        token_count: int,
+        elapsed_time: float,
+        segment_idx: int = 0,
+    ) -> GenerationResult:
+        samples = audio.shape[0]
+
+        # Calculate audio duration in seconds
+        sample_rate = self.config.sample_rate
+        audio_duration_seconds = samples / sample_rate
+
+        # Calculate real-time factor (RTF)
+        rtf = audio_duration_seconds / elapsed_time if elapsed_time > 0 else 0
+
+        # Format duration as HH:MM:SS.mmm
+        duration_mins = int(audio_duration_seconds // 60)
+        duration_secs = int(audio_duration_seconds % 60)
+        duration_ms = int((audio_duration_seconds % 1) * 1000)
+        duration_hours = int(audio_duration_seconds // 3600)
+        duration_str = f"{duration_hours:02d}:{duration_mins:02d}:{duration_secs:02d}.{duration_ms:03d}"
+
+        return GenerationResult(
+            audio=audio,
+            samples=samples,
+            sample_rate=sample_rate,
+            segment_idx=segment_idx,
+            token_count=token_count,
+            audio_duration=duration_str,
+            real_time_factor=rtf,
+            prompt={
+                "tokens": token_count,
+                "tokens-per-sec": (
+                    round(token_count / audio_duration_seconds, 2)
+                    if audio_duration_seconds > 0
+                    else 0
+                ),
+            },
+            audio_samples={
+                "samples": samples,
+                "samples-per-sec": (
+                    round(samples / audio_duration_seconds, 2)
+                    if audio_duration_seconds > 0
+                    else 0
+                ),
+            },
+            processing_time_seconds=elapsed_time,
+            peak_memory_usage=mx.get_peak_memory() / 1e9,
+        )
@@ -1,7 +1,9 @@
 from __future__ import annotations
 
+import hashlib
 import re
 import time
+from collections import OrderedDict
 from dataclasses import dataclass
 from pathlib import Path
 from typing import Any, Callable, Dict, List, Optional, Tuple
@@ -20,7 +22,8 @@ from tokenizers.processors import TemplateProcessing
 from tqdm import tqdm
 from transformers import AutoTokenizer
 
-from mlx_audio.codec.models.mimi import Mimi, MimiStreamingDecoder
+from mlx_audio.codec.models.mimi import MimiStreamingDecoder
+from mlx_audio.codec_registry import codec_registry, get_codec
 
 from ..base import GenerationResult
 from .attention import Attention
@@ -33,6 +36,11 @@ except ImportError:
 MIMI_REPO = "kyutai/moshiko-pytorch-bf16"
 TOKENIZER_REPO = "unsloth/Llama-3.2-1B"
 
+# Prefilled speaker prompts are bounded by the size of their backbone state,
+# Mimi-encoded reference clips by count
+PROMPT_CACHE_MB = 256
+AUDIO_CACHE_SIZE = 8
+
 
 def resample_audio(audio: np.ndarray, orig_sr: int, target_sr: int) -> np.ndarray:
     gcd = np.gcd(orig_sr, target_sr)
@@ -324,6 +332,21 @@ class SesameModel(nn.Module):
         if self.decoder_cache is not None:
             self.decoder_cache = make_prompt_cache(self.decoder)
 
+    def backbone_state(self) -> List[Tuple[mx.array, mx.array]]:
+        """Snapshot of the backbone KV cache, one (keys, values) pair per layer."""
+        state = [
+            (mx.array(keys), mx.array(values))
+            for keys, values in (cache.state for cache in self.backbone_cache)
+        ]
+        mx.eval(state)
+        return state
+
+    def load_backbone_state(self, state: List[Tuple[mx.array, mx.array]], length: int):
+        """Reset the caches and restore the first ``length`` positions of ``state``."""
+        self.reset_caches()
+        for cache, (keys, values) in zip(self.backbone_cache, state):
+            cache.state = (keys[..., :length, :], values[..., :length, :])
+
     def generate_frame(
         self,
         tokens: mx.array,
@@ -398,6 +421,39 @@ class Segment:
     audio: mx.array
 
 
+@dataclass
+class PromptCacheEntry:
+    # (seq_len, 33) prompt frames and masks the backbone state was built from
+    tokens: mx.array
+    mask: mx.array
+    state: List[Tuple[mx.array, mx.array]]
+
+    @property
+    def nbytes(self) -> int:
+        state = sum(keys.nbytes + values.nbytes for keys, values in self.state)
+        return state + self.tokens.nbytes + self.mask.nbytes
+
+
+def _audio_key(audio: mx.array) -> str:
+    return hashlib.sha1(np.asarray(audio, dtype=np.float32).tobytes()).hexdigest()
+
+
+def _lru_put(
+    cache: OrderedDict,
+    key: Any,
+    value: Any,
+    max_size: int,
+    size: Callable[[Any], int] = lambda _: 1,
+):
+    """Insert ``value`` as most recent, then evict until the sizes fit."""
+    cache[key] = value
+    cache.move_to_end(key)
+    total = sum(size(v) for v in cache.values())
+    while cache and total > max_size:
+        _, evicted = cache.popitem(last=False)
+        total -= size(evicted)
+
+
 def load_llama3_tokenizer(path_or_hf_repo: str):
     tokenizer = AutoTokenizer.from_pretrained(path_or_hf_repo)
     bos = tokenizer.bos_token
@@ -428,18 +484,20 @@ class Model(nn.Module):
         else:
             self._text_tokenizer = load_llama3_tokenizer(TOKENIZER_REPO)
 
-        mimi = Mimi.from_pretrained(MIMI_REPO)
-        mimi.eval()
-
-        self._audio_tokenizer = mimi
-        self._streaming_decoder = MimiStreamingDecoder(mimi)
+        # Mimi is shared through the codec registry and loaded on first use
+        self._mimi_decoder = None
+        self._mimi_id = None
 
         try:
             self._watermarker = load_watermarker()
         except Exception:
             self._watermarker = None
 
-        self._sample_rate = mimi.cfg.sample_rate
+        # Both keyed by reference audio, see _restore_prompt / _tokenize_audio
+        self.prompt_cache_bytes = int(PROMPT_CACHE_MB * 1e6)
+        self.audio_cache_size = AUDIO_CACHE_SIZE
+        self._prompt_cache: OrderedDict[str, PromptCacheEntry] = OrderedDict()
+        self._audio_frames: OrderedDict[Tuple[str, bool], Tuple] = OrderedDict()
 
     def model_quant_predicate(self, p, m):
         """
@@ -454,7 +512,22 @@ class Model(nn.Module):
 
     @property
     def sample_rate(self):
-        return self._sample_rate
+        return self._audio_tokenizer.cfg.sample_rate
+
+    @property
+    def _audio_tokenizer(self):
+        return get_codec("mimi", MIMI_REPO)
+
+    @property
+    def _streaming_decoder(self):
+        # Decoder state is per model, the Mimi weights are shared. Looking Mimi
+        # up on every use keeps it from idling out of the registry, and a
+        # reloaded Mimi gets a new decoder
+        mimi = self._audio_tokenizer
+        if self._mimi_decoder is None or self._mimi_id != id(mimi):
+            self._mimi_decoder = MimiStreamingDecoder(mimi)
+            self._mimi_id = id(mimi)
+        return self._mimi_decoder
 
     def _tokenize_text_segment(
         self, text: str, speaker: int
@@ -478,11 +551,17 @@ class Model(nn.Module):
     def _tokenize_audio(
         self, audio: mx.array, add_eos: bool = True
     ) -> Tuple[mx.array, mx.array]:
+        key = (_audio_key(audio), add_eos)
+        if key in self._audio_frames:
+            self._audio_frames.move_to_end(key)
+            return self._audio_frames[key]
+
         frame_tokens = []
         frame_masks = []
 
         # (K, T)
-        audio_tokens = self._audio_tokenizer.encode(audio[None, None, ...])[0]
+        audio_tokens = codec_registry.encode("mimi", MIMI_REPO, audio[None, None, ...])
+        audio_tokens = audio_tokens[0]
 
         # add EOS frame
         if add_eos:
@@ -497,7 +576,9 @@ class Model(nn.Module):
         frame_tokens.append(audio_frame)
         frame_masks.append(audio_frame_mask)
 
-        return mx.concat(frame_tokens, axis=0), mx.concat(frame_masks, axis=0)
+        frames = mx.concat(frame_tokens, axis=0), mx.concat(frame_masks, axis=0)
+        _lru_put(self._audio_frames, key, frames, self.audio_cache_size)
+        return frames
 
     def _tokenize_segment(
         self, segment: Segment, add_eos: bool = True
@@ -515,6 +596,46 @@ class Model(nn.Module):
             [text_masks, audio_masks], axis=0
         )
 
+    def _voice_key(self, segments: List[Segment]) -> str:
+        return "|".join(f"{s.speaker}:{_audio_key(s.audio)}" for s in segments)
+
+    def _restore_prompt(self, key: str, tokens: mx.array, mask: mx.array) -> int:
+        """
+        Load the longest cached prefix of a prompt into the backbone cache.
+
+        Returns:
+            Number of prompt frames that no longer need to be prefilled
+        """
+        entry = self._prompt_cache.get(key)
+        # At least one frame is always prefilled to get the next-frame logits
+        n = 0 if entry is None else min(entry.tokens.shape[0], tokens.shape[0] - 1)
+        if n <= 0:
+            return 0
+        self._prompt_cache.move_to_end(key)
+
+        same = mx.all(entry.tokens[:n] == tokens[:n], axis=1) & mx.all(
+            entry.mask[:n] == mask[:n], axis=1
+        )
+        length = n if mx.all(same).item() else int(mx.argmin(same).item())
+        if length > 0:
+            self.model.load_backbone_state(entry.state, length)
+        return length
+
+    def _store_prompt(self, key: str, tokens: mx.array, mask: mx.array):
+        """Snapshot the backbone cache right after a prompt has been prefilled."""
+        entry = PromptCacheEntry(tokens, mask, self.model.backbone_state())
+        _lru_put(
+            self._prompt_cache,
+            key,
+            entry,
+            self.prompt_cache_bytes,
+            size=lambda e: e.nbytes,
+        )
+
+    def clear_prompt_cache(self):
+        self._prompt_cache.clear()
+        self._audio_frames.clear()
+
     def sanitize(self, weights):
         sanitized_weights = {}
 
@@ -618,7 +739,7 @@ class Model(nn.Module):
             audio = watermark(
                 self._watermarker,
                 audio,
-                self._sample_rate,
+                self.sample_rate,
                 CSM_1B_GH_WATERMARK,
             )
             audio = mx.array(audio, dtype=mx.float32)
@@ -706,13 +827,11 @@ class Model(nn.Module):
             text = re.split(split_pattern, text.strip()) if split_pattern else [text]
 
         for prompt in text:
-            if voice_match:
-                generation_text = (context[0].text + " " + prompt).strip()
-                current_context = [
-                    Segment(
-                        speaker=speaker, text=generation_text, audio=context[0].audio
-                    )
-                ]
+            # With voice_match the reference audio runs on into the new sentence
+            # without an EOS frame. The sentence comes after it as its own text
+            # segment, so the reference segment is the same prefix for every
+            # sentence and its prefill is restored from the prompt cache.
+            current_context = context[:1] if voice_match else context
 
             start_time = time.perf_counter()
 
@@ -728,19 +847,24 @@ class Model(nn.Module):
                 tokens.append(segment_tokens)
                 tokens_mask.append(segment_tokens_mask)
 
-            if not voice_match:
-                gen_segment_tokens, gen_segment_tokens_mask = (
-                    self._tokenize_text_segment(prompt, speaker)
-                )
-                tokens.append(gen_segment_tokens)
-                tokens_mask.append(gen_segment_tokens_mask)
+            gen_segment_tokens, gen_segment_tokens_mask = self._tokenize_text_segment(
+                prompt, speaker
+            )
+            tokens.append(gen_segment_tokens)
+            tokens_mask.append(gen_segment_tokens_mask)
 
             prompt_tokens = mx.concat(tokens, axis=0).astype(mx.int32)
             prompt_tokens_mask = mx.concat(tokens_mask, axis=0).astype(mx.bool_)
 
+            # Frames shared with the last prompt for this voice come prefilled
+            voice_key = self._voice_key(current_context)
+            prefilled = self._restore_prompt(
+                voice_key, prompt_tokens, prompt_tokens_mask
+            )
+
             samples = []
-            curr_tokens = mx.expand_dims(prompt_tokens, axis=0)
-            curr_tokens_mask = mx.expand_dims(prompt_tokens_mask, axis=0)
+            curr_tokens = mx.expand_dims(prompt_tokens[prefilled:], axis=0)
+            curr_tokens_mask = mx.expand_dims(prompt_tokens_mask[prefilled:], axis=0)
             curr_pos = mx.expand_dims(
                 mx.arange(0, prompt_tokens.shape[0]), axis=0
             ).astype(mx.int32)
@@ -758,6 +882,8 @@ class Model(nn.Module):
                     sample = self.model.generate_frame(
                         curr_tokens, curr_tokens_mask, curr_pos, sampler
                     )
+                    if generated_frame_count == 0:
+                        self._store_prompt(voice_key, prompt_tokens, prompt_tokens_mask)
                     if mx.all(sample == 0):
                         break  # eos
 
@@ -0,0 +1,133 @@
+"""Incremental SNAC decoding for models emitting Orpheus-style audio codes.
+
+Orpheus (llama) and Qwen3 TTS emit 7 codes per SNAC frame: one code of the
+coarsest layer, two of the middle and four of the finest, each offset by
+``position * 4096``. ``SnacStreamDecoder`` collects the codes as they are
+generated and decodes them in sliding windows, with context frames on both
+sides of the emitted span so chunk boundaries match a full decode closely.
+"""
+
+import math
+from typing import List, Optional, Sequence
+
+import mlx.core as mx
+import numpy as np
+
+from mlx_audio.codec_registry import codec_registry
+
+CODES_PER_FRAME = 7
+CODEBOOK_SIZE = 4096
+# 24 kHz SNAC: hop length 512 x coarsest stride 4
+SAMPLES_PER_FRAME = 2048
+
+
+def snac_context_frames(
+    decoder_rates: Sequence[int] = (8, 8, 4, 2),
+    kernel_size: int = 7,
+    dilations: Sequence[int] = (1, 3, 9),
+    latent_steps_per_frame: int = 4,
+) -> int:
+    """Number of frames on each side an output sample can depend on.
+
+    The SNAC decoder is not causal: its convolutions are centred, so the
+    receptive field reaches equally far into past and future frames. The
+    defaults are the 24 kHz checkpoint's decoder hyperparameters.
+    """
+    radius = (kernel_size - 1) // 2
+    # Depthwise input conv, at the latent rate
+    history = radius
+    rate = 1
+    for stride in decoder_rates:
+        # Transposed conv with kernel 2 * stride overlaps one neighbouring input
+        history += 1 / rate
+        rate *= stride
+        history += sum(radius * d for d in dilations) / rate
+    history += radius / rate
+    return math.ceil(history / latent_steps_per_frame)
+
+
+# 3 frames for the 24 kHz decoder (about 9.9 latent steps)
+SNAC_CONTEXT_FRAMES = snac_context_frames()
+
+
+def snac_layers(frames: np.ndarray) -> List[mx.array]:
+    """Split ``(F, 7)`` frames into the three SNAC code layers."""
+    frames = frames - np.arange(CODES_PER_FRAME) * CODEBOOK_SIZE
+    layer_1 = frames[:, 0]
+    layer_2 = frames[:, [1, 4]].reshape(-1)
+    layer_3 = frames[:, [2, 3, 5, 6]].reshape(-1)
+    return [mx.array(layer)[None] for layer in (layer_1, layer_2, layer_3)]
+
+
+def decode_snac_frames(codes: Sequence[int], repo: str) -> mx.array:
+    """Decode a flat code list (a multiple of 7 long) to ``(1, samples)``."""
+    frames = np.asarray(codes, dtype=np.int32).reshape(-1, CODES_PER_FRAME)
+    return codec_registry.decode("snac", repo, snac_layers(frames)).squeeze(-1)
+
+
+class SnacStreamDecoder:
+    """Decode SNAC codes in sliding windows as they are generated.
+
+    Args:
+        repo: SNAC checkpoint, shared through the codec registry.
+        max_frames: Capacity of the preallocated frame buffer.
+        interval_frames: Frames per emitted chunk.
+        context_frames: Already emitted frames decoded again as left context.
+        lookahead_frames: Frames held back as right context until ``flush``.
+            Both default to the decoder's receptive field, so chunk edges
+            match a full decode up to the decoder's noise blocks; the
+            lookahead delays every chunk by that many frames (256 ms).
+    """
+
+    def __init__(
+        self,
+        repo: str,
+        max_frames: int,
+        interval_frames: int = 6,
+        context_frames: int = SNAC_CONTEXT_FRAMES,
+        lookahead_frames: int = SNAC_CONTEXT_FRAMES,
+    ):
+        self.repo = repo
+        self.interval_frames = max(1, interval_frames)
+        self.context_frames = context_frames
+        self.lookahead_frames = lookahead_frames
+        self._codes = np.zeros((max_frames + 1) * CODES_PER_FRAME, dtype=np.int32)
+        self.reset()
+
+    def reset(self):
+        """Drop all collected codes."""
+        self._count = 0
+        self._emitted = 0
+
+    @property
+    def frames(self) -> int:
+        """Complete frames collected so far."""
+        return self._count // CODES_PER_FRAME
+
+    def add(self, code: int) -> Optional[mx.array]:
+        """Collect one code, returns a chunk of audio once one is ready."""
+        if self._count == self._codes.shape[0]:
+            self._codes = np.concatenate([self._codes, np.zeros_like(self._codes)])
+        self._codes[self._count] = code
+        self._count += 1
+        if self.frames - self.lookahead_frames - self._emitted < self.interval_frames:
+            return None
+        return self._decode(self.frames - self.lookahead_frames)
+
+    def flush(self) -> Optional[mx.array]:
+        """Decode every frame not emitted yet."""
+        if self.frames == self._emitted:
+            return None
+        return self._decode(self.frames)
+
+    def _decode(self, end: int) -> mx.array:
+        start = max(0, self._emitted - self.context_frames)
+        stop = self.frames
+        frames = self._codes[: stop * CODES_PER_FRAME].reshape(-1, CODES_PER_FRAME)
+        audio = codec_registry.decode("snac", self.repo, snac_layers(frames[start:]))
+        audio = audio.reshape(-1)
+
+        per_frame = audio.shape[0] // (stop - start)
+        chunk = audio[(self._emitted - start) * per_frame : (end - start) * per_frame]
+        self._emitted = end
+        return chunk
@@ -4,10 +4,10 @@ from typing import Any, Dict, Tuple, Union
 import mlx.core as mx
 import numpy as np
 
+from mlx_audio.codec_registry import get_codec
 from mlx_audio.stt.models.wav2vec.feature_extractor import Wav2Vec2FeatureExtractor
 from mlx_audio.stt.models.wav2vec.wav2vec import Wav2Vec2Model
 
-from .bicodec import BiCodec
 from .utils.audio import load_audio
 from .utils.file import load_config
 
@@ -26,9 +26,13 @@ class BiCodecTokenizer:
         self.config = load_config(f"{model_dir}/audio_tokenizer_config.yaml")
         self._initialize_model()
 
+    @property
+    def model(self):
+        """The shared BiCodec model, loaded on first use."""
+        return get_codec("bicodec", f"{self.model_dir}/BiCodec")
+
     def _initialize_model(self):
-        """Load and initialize the BiCodec model and Wav2Vec2 feature extractor."""
-        self.model = BiCodec.load_from_checkpoint(f"{self.model_dir}/BiCodec")
+        """Load and initialize the Wav2Vec2 feature extractor."""
         self.processor = Wav2Vec2FeatureExtractor.from_pretrained(
             f"{self.model_dir}/wav2vec2-large-xlsr-53"
         )
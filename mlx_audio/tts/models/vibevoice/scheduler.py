@@ -2,7 +2,7 @@
 
 import math
 from dataclasses import dataclass
-from typing import List, Optional, Tuple, Union
+from typing import Dict, List, Optional, Tuple, Union
 
 import mlx.core as mx
 import numpy as np
@@ -49,6 +49,8 @@ class DPMSolverMultistepScheduler:
     """DPM-Solver multistep scheduler for fast diffusion sampling.
 
     Implements DPM-Solver++ algorithm for efficient sampling with multi-order updates.
+    Updates are elementwise, so one pass steps a whole batch of samples that
+    share a step count; the timestep tables are computed once per step count.
     """
 
     def __init__(
@@ -107,30 +109,46 @@ class DPMSolverMultistepScheduler:
         self._cached_alpha_t: List[float] = []
         self._cached_sigma_t: List[float] = []
         self._cached_lambda: List[float] = []
+        # Timesteps and tables above, per number of inference steps
+        self._schedules: Dict[int, Tuple] = {}
 
     @property
     def step_index(self) -> Optional[int]:
         return self._step_index
 
     def set_timesteps(self, num_inference_steps: int):
-        """Set the number of inference steps."""
+        """Set the number of inference steps and reset the solver state."""
         self.num_inference_steps = num_inference_steps
 
+        if num_inference_steps not in self._schedules:
+            self._schedules[num_inference_steps] = self._compute_schedule(
+                num_inference_steps
+            )
+        (
+            self.timesteps,
+            self._cached_alpha_t,
+            self._cached_sigma_t,
+            self._cached_lambda,
+        ) = self._schedules[num_inference_steps]
+
+        # Reset state
+        self.reset()
+
+    def _compute_schedule(
+        self, num_inference_steps: int
+    ) -> Tuple[mx.array, List[float], List[float], List[float]]:
         # Create timesteps - linspace from max to 0
         timestep_values = []
         for i in range(num_inference_steps):
             t = (self.num_train_timesteps - 1) * (1.0 - i / num_inference_steps)
             timestep_values.append(int(round(t)))
 
-        self.timesteps = mx.array(timestep_values, dtype=mx.int32)
-
         # Precompute values for each inference timestep
-        self._cached_alpha_t = []
-        self._cached_sigma_t = []
-        self._cached_lambda = []
+        cached_alpha_t = []
+        cached_sigma_t = []
+        cached_lambda = []
 
         alpha_t_np = np.array(self.alpha_t.tolist())
-        sigma_t_np = np.array(self.sigma_t.tolist())
 
         for t in timestep_values:
             sigma = np.sqrt((1 - alpha_t_np[t] ** 2) / (alpha_t_np[t] ** 2))
@@ -138,19 +156,17 @@ class DPMSolverMultistepScheduler:
             sigma_t_val = sigma * alpha_t_val
             lambda_val = np.log(alpha_t_val) - np.log(sigma_t_val)
 
-            self._cached_alpha_t.append(float(alpha_t_val))
-            self._cached_sigma_t.append(float(sigma_t_val))
-            self._cached_lambda.append(float(lambda_val))
+            cached_alpha_t.append(float(alpha_t_val))
+            cached_sigma_t.append(float(sigma_t_val))
+            cached_lambda.append(float(lambda_val))
 
         # Add final step values
-        self._cached_alpha_t.append(1.0)
-        self._cached_sigma_t.append(0.0)
-        self._cached_lambda.append(float("inf"))
+        cached_alpha_t.append(1.0)
+        cached_sigma_t.append(0.0)
+        cached_lambda.append(float("inf"))
 
-        # Reset state
-        self.model_outputs = [None] * self.solver_order
-        self.lower_order_nums = 0
-        self._step_index = None
+        timesteps = mx.array(timestep_values, dtype=mx.int32)
+        return timesteps, cached_alpha_t, cached_sigma_t, cached_lambda
 
     def _convert_model_output(
         self,
@@ -241,9 +257,9 @@ class DPMSolverMultistepScheduler:
         """Perform one step of the DPM-Solver.
 
         Args:
-            model_output: Direct output from the model
+            model_output: Direct output from the model, same shape as ``sample``
             timestep: Current timestep
-            sample: Current sample
+            sample: Current samples, any batch shape
             prev_x0: Previous x0 prediction for multi-order updates
 
         Returns:
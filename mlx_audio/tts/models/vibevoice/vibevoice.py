@@ -2,6 +2,7 @@
 
 import os
 import time
+from dataclasses import dataclass, field
 from pathlib import Path
 from typing import Generator, List, Optional, Tuple, Union
 
@@ -22,6 +23,24 @@ TTS_TEXT_WINDOW_SIZE = 5
 TTS_SPEECH_WINDOW_SIZE = 6
 
 
+@dataclass
+class _SpeakerState:
+    """Generation state of one utterance, see ``Model._generate_single_speaker``."""
+
+    input_ids: mx.array
+    start_time: float
+    finished: bool = False
+    use_voice_cache: bool = False
+    lm_cache: Optional[list] = None
+    tts_cache: Optional[list] = None
+    neg_cache: Optional[list] = None
+    tts_hidden: Optional[mx.array] = None
+    neg_hidden: Optional[mx.array] = None
+    speech_latents: List[mx.array] = field(default_factory=list)
+    text_pos: int = 0
+    step: int = 0
+
+
 class Model(nn.Module):
     """VibeVoice streaming TTS model.
 
@@ -320,13 +339,19 @@ class Model(nn.Module):
         neg_condition: mx.array,
         cfg_scale: float = 3.0,
         ddpm_steps: Optional[int] = None,
+        noise: Optional[mx.array] = None,
     ) -> mx.array:
         """Sample speech latents using diffusion with classifier-free guidance.
 
+        Every row is denoised independently, so several pending frames or
+        requests can be sampled together in one prediction-head call per step.
+
         Args:
             condition: Positive conditioning, shape (B, hidden_size)
             neg_condition: Negative conditioning, shape (B, hidden_size)
             cfg_scale: Classifier-free guidance scale
+            ddpm_steps: Override diffusion inference steps
+            noise: Initial latents, shape (B, acoustic_vae_dim); random if None
 
         Returns:
             Sampled speech latents, shape (B, acoustic_vae_dim)
@@ -336,7 +361,6 @@ class Model(nn.Module):
         neg_condition = neg_condition.astype(mx.float32)
 
         # Reset scheduler for new generation
-        self.noise_scheduler.reset()
         self.noise_scheduler.set_timesteps(ddpm_steps or self.ddpm_inference_steps)
 
         # Concatenate conditions for batched prediction
@@ -345,24 +369,17 @@ class Model(nn.Module):
         # Initialize noise
         batch_size = condition.shape[0]
         latent_dim = self.config.acoustic_vae_dim
-        speech = mx.random.normal((batch_size, latent_dim), dtype=mx.float32)
-
-        prev_x0 = None
+        if noise is None:
+            noise = mx.random.normal((batch_size, latent_dim), dtype=mx.float32)
+        speech = noise.astype(mx.float32)
 
-        # Get timesteps as list
-        timesteps_list = self.noise_scheduler.timesteps.tolist()
+        timesteps = self.noise_scheduler.timesteps.astype(mx.float32)
 
-        for _, t_val in enumerate(timesteps_list):
-            # Create timestep array for both positive and negative
-            t_float = float(t_val)
-            timesteps = mx.array([t_float, t_float], dtype=mx.float32)
-
-            # Duplicate speech for batched CFG prediction
-            combined_speech = mx.concatenate([speech, speech], axis=0)
-
-            # Predict v/epsilon
+        for i in range(timesteps.shape[0]):
+            # Positive and negative branches denoise the same latents
+            t = mx.broadcast_to(timesteps[i], (2 * batch_size,))
             eps = self.prediction_head(
-                combined_speech, timesteps, condition=condition_combined
+                mx.concatenate([speech, speech], axis=0), t, condition=condition_combined
             )
 
             # Apply CFG
@@ -370,23 +387,10 @@ class Model(nn.Module):
             uncond_eps = eps[batch_size:]
             guided_eps = uncond_eps + cfg_scale * (cond_eps - uncond_eps)
 
-            # Duplicate for scheduler (it expects same batch size as input)
-            full_eps = mx.concatenate([guided_eps, guided_eps], axis=0)
-            full_speech = mx.concatenate([speech, speech], axis=0)
-
             # Scheduler step with multi-order support
-            output = self.noise_scheduler.step(
-                full_eps,
-                t_val,
-                full_speech,
-                prev_x0=prev_x0,
-            )
-
-            # Extract just the first half (positive conditioning result)
-            speech = output.prev_sample[:batch_size]
-            prev_x0 = (
-                output.x0_pred[:batch_size] if output.x0_pred is not None else None
-            )
+            speech = self.noise_scheduler.step(
+                guided_eps, timesteps[i], speech
+            ).prev_sample
 
         return speech
 
@@ -557,16 +561,103 @@ class Model(nn.Module):
         This contains the core generation logic, used by both generate() and
         _generate_multi_speaker().
         """
-        start_time = time.perf_counter()
+        state = self._start_speaker(text, max_tokens)
+
+        while not state.finished:
+            self._feed_text_window(state)
+
+            for _ in range(TTS_SPEECH_WINDOW_SIZE):
+                if state.finished:
+                    break
+                speech_latent = self.sample_speech_tokens(
+                    state.tts_hidden[:, -1, :],
+                    state.neg_hidden[:, -1, :],
+                    cfg_scale=cfg_scale,
+                    ddpm_steps=ddpm_steps,
+                )
+                self._feed_speech_latent(state, speech_latent, max_tokens)
+
+        yield self._speaker_result(state)
+
+    def generate_batch(
+        self,
+        texts: List[str],
+        max_tokens: int = 512,
+        cfg_scale: float = 1.5,
+        ddpm_steps: Optional[int] = None,
+        voice: Optional[Union[str, Path]] = None,
+        verbose: bool = False,
+        **kwargs,
+    ) -> Generator[Tuple[int, GenerationResult], None, None]:
+        """Generate several utterances in the same voice together.
+
+        Each utterance keeps its own language model caches, but all of them
+        advance in lockstep: every text window is followed by up to
+        ``TTS_SPEECH_WINDOW_SIZE`` speech frames. So the diffusion head, which
+        runs ``ddpm_steps`` times per frame, samples the current frame of every
+        unfinished utterance in one batched call.
+
+        Args:
+            texts: Input texts to synthesize
+            max_tokens: Maximum number of tokens to generate per text
+            cfg_scale: Classifier-free guidance scale
+            ddpm_steps: Override diffusion inference steps
+            voice: A single voice name/path, shared by all texts
+            verbose: Whether to show progress
+
+        Yields:
+            (index into ``texts``, GenerationResult) as each utterance finishes
+        """
+        if self.tokenizer is None:
+            raise ValueError("Tokenizer not loaded. Call post_load_hook first.")
+
+        if voice is not None:
+            # Only reload if different
+            if not hasattr(self, "_voice_path") or str(voice) != getattr(
+                self, "_voice_path"
+            ):
+                self.load_voice(voice)
+
+        pending = {
+            index: self._start_speaker(text, max_tokens)
+            for index, text in enumerate(texts)
+        }
+        while pending:
+            for state in pending.values():
+                if not state.finished:
+                    self._feed_text_window(state)
 
+            for _ in range(TTS_SPEECH_WINDOW_SIZE):
+                active = [state for state in pending.values() if not state.finished]
+                if not active:
+                    break
+                speech_latents = self.sample_speech_tokens(
+                    mx.concatenate([state.tts_hidden[:, -1, :] for state in active]),
+                    mx.concatenate([state.neg_hidden[:, -1, :] for state in active]),
+                    cfg_scale=cfg_scale,
+                    ddpm_steps=ddpm_steps,
+                )
+                for row, state in enumerate(active):
+                    self._feed_speech_latent(
+                        state, speech_latents[row : row + 1], max_tokens
+                    )
+
+            for index in [i for i, state in pending.items() if state.finished]:
+                if verbose:
+                    print(f"Finished text {index + 1}/{len(texts)}")
+                yield index, self._speaker_result(pending.pop(index))
+
+    def _start_speaker(self, text: str, max_tokens: int) -> _SpeakerState:
+        """Tokenize a text and set up its generation state."""
         # Tokenize input
         text_token_ids = self.tokenizer.encode(
             text.strip() + "\n", add_special_tokens=False
         )
-        input_ids = mx.array([text_token_ids], dtype=mx.int32)
-
-        batch_size = 1
-        seq_len = input_ids.shape[1]
+        state = _SpeakerState(
+            input_ids=mx.array([text_token_ids], dtype=mx.int32),
+            start_time=time.perf_counter(),
+            finished=max_tokens <= 0,
+        )
 
         # Use voice cache if available
         use_voice_cache = hasattr(self, "_voice_lm_cache") and hasattr(
@@ -574,116 +665,108 @@ class Model(nn.Module):
         )
 
         if use_voice_cache:
-            lm_cache = self._voice_lm_cache
-            tts_cache = self._voice_tts_cache
-            tts_hidden = self._voice_tts_hidden
-            neg_hidden = self._voice_neg_tts_hidden
-            neg_cache = self._voice_neg_tts_cache
-        else:
-            lm_cache = None
-            tts_cache = None
-            tts_hidden = None
-            neg_hidden = None
-            neg_cache = None
-
-        speech_latents = []
-        finished = False
-        step = 0
-        text_pos = 0
-
-        while not finished and step < max_tokens:
-            if text_pos < seq_len:
-                cur_text_ids = input_ids[
-                    :, text_pos : min(seq_len, text_pos + TTS_TEXT_WINDOW_SIZE)
-                ]
-                cur_window = cur_text_ids.shape[1]
-                text_pos += cur_window
-
-                text_embeds = self.language_model.embed_tokens(cur_text_ids)
-                lm_out, lm_cache = self.language_model(
-                    inputs_embeds=text_embeds, cache=lm_cache
-                )
+            state.lm_cache = self._voice_lm_cache
+            state.tts_cache = self._voice_tts_cache
+            state.tts_hidden = self._voice_tts_hidden
+            state.neg_hidden = self._voice_neg_tts_hidden
+            state.neg_cache = self._voice_neg_tts_cache
+        state.use_voice_cache = use_voice_cache
+        return state
+
+    def _feed_text_window(self, state: _SpeakerState):
+        """Run the next text window, if any is left, through the language models."""
+        batch_size = 1
+        seq_len = state.input_ids.shape[1]
+
+        if state.text_pos < seq_len:
+            cur_text_ids = state.input_ids[
+                :, state.text_pos : min(seq_len, state.text_pos + TTS_TEXT_WINDOW_SIZE)
+            ]
+            cur_window = cur_text_ids.shape[1]
+            state.text_pos += cur_window
+
+            text_embeds = self.language_model.embed_tokens(cur_text_ids)
+            lm_out, state.lm_cache = self.language_model(
+                inputs_embeds=text_embeds, cache=state.lm_cache
+            )
 
-                text_type = mx.ones((batch_size, cur_window), dtype=mx.int32)
-                type_embed = self.tts_input_types(text_type)
-                tts_in = lm_out + type_embed
-                tts_out, tts_cache = self.tts_language_model(
-                    inputs_embeds=tts_in, cache=tts_cache
-                )
+            text_type = mx.ones((batch_size, cur_window), dtype=mx.int32)
+            type_embed = self.tts_input_types(text_type)
+            tts_in = lm_out + type_embed
+            tts_out, state.tts_cache = self.tts_language_model(
+                inputs_embeds=tts_in, cache=state.tts_cache
+            )
 
-                if tts_hidden is None:
-                    tts_hidden = tts_out
-                else:
-                    tts_hidden = mx.concatenate([tts_hidden, tts_out], axis=1)
+            if state.tts_hidden is None:
+                state.tts_hidden = tts_out
+            else:
+                state.tts_hidden = mx.concatenate([state.tts_hidden, tts_out], axis=1)
 
-                if neg_hidden is None or not use_voice_cache:
-                    neg_embed = mx.zeros(
-                        (batch_size, cur_window, self.config.decoder_config.hidden_size)
-                    )
-                    neg_type_embed = self.tts_input_types(
-                        mx.ones((batch_size, cur_window), dtype=mx.int32)
-                    )
-                    neg_in = neg_embed + neg_type_embed
-                    neg_out, neg_cache = self.tts_language_model(
-                        inputs_embeds=neg_in, cache=neg_cache
+            if state.neg_hidden is None or not state.use_voice_cache:
+                neg_embed = mx.zeros(
+                    (batch_size, cur_window, self.config.decoder_config.hidden_size)
+                )
+                neg_type_embed = self.tts_input_types(
+                    mx.ones((batch_size, cur_window), dtype=mx.int32)
+                )
+                neg_in = neg_embed + neg_type_embed
+                neg_out, state.neg_cache = self.tts_language_model(
+                    inputs_embeds=neg_in, cache=state.neg_cache
+                )
+                if state.neg_hidden is None:
+                    state.neg_hidden = neg_out
+                else:
+                    state.neg_hidden = mx.concatenate(
+                        [state.neg_hidden, neg_out], axis=1
                     )
-                    if neg_hidden is None:
-                        neg_hidden = neg_out
-                    else:
-                        neg_hidden = mx.concatenate([neg_hidden, neg_out], axis=1)
 
-            if tts_hidden is None or neg_hidden is None:
-                break
+        if state.tts_hidden is None or state.neg_hidden is None:
+            state.finished = True
 
-            for _ in range(TTS_SPEECH_WINDOW_SIZE):
-                positive_condition = tts_hidden[:, -1, :]
-                negative_condition = neg_hidden[:, -1, :]
-
-                speech_latent = self.sample_speech_tokens(
-                    positive_condition,
-                    negative_condition,
-                    cfg_scale=cfg_scale,
-                    ddpm_steps=ddpm_steps,
-                )
-                speech_latent = mx.expand_dims(speech_latent, 1)
+    def _feed_speech_latent(
+        self, state: _SpeakerState, speech_latent: mx.array, max_tokens: int
+    ):
+        """Append a sampled latent (1, acoustic_vae_dim) and advance the LMs."""
+        batch_size = 1
+        speech_latent = mx.expand_dims(speech_latent, 1)
 
-                speech_latents.append(speech_latent)
+        state.speech_latents.append(speech_latent)
 
-                acoustic_embed = self.acoustic_connector(speech_latent)
+        acoustic_embed = self.acoustic_connector(speech_latent)
 
-                type_embed = self.tts_input_types(
-                    mx.zeros((batch_size, 1), dtype=mx.int32)
-                )
-                tts_input = acoustic_embed + type_embed
+        type_embed = self.tts_input_types(mx.zeros((batch_size, 1), dtype=mx.int32))
+        tts_input = acoustic_embed + type_embed
 
-                tts_out, tts_cache = self.tts_language_model(
-                    inputs_embeds=tts_input,
-                    cache=tts_cache,
-                )
-                tts_hidden = mx.concatenate([tts_hidden, tts_out], axis=1)
+        tts_out, state.tts_cache = self.tts_language_model(
+            inputs_embeds=tts_input,
+            cache=state.tts_cache,
+        )
+        state.tts_hidden = mx.concatenate([state.tts_hidden, tts_out], axis=1)
 
-                neg_type_embed = self.tts_input_types(
-                    mx.zeros((batch_size, 1), dtype=mx.int32)
-                )
-                neg_input = acoustic_embed + neg_type_embed
-                neg_out, neg_cache = self.tts_language_model(
-                    inputs_embeds=neg_input,
-                    cache=neg_cache,
-                )
-                neg_hidden = mx.concatenate([neg_hidden, neg_out], axis=1)
+        neg_type_embed = self.tts_input_types(
+            mx.zeros((batch_size, 1), dtype=mx.int32)
+        )
+        neg_input = acoustic_embed + neg_type_embed
+        neg_out, state.neg_cache = self.tts_language_model(
+            inputs_embeds=neg_input,
+            cache=state.neg_cache,
+        )
+        state.neg_hidden = mx.concatenate([state.neg_hidden, neg_out], axis=1)
 
-                eos_logits = mx.sigmoid(self.tts_eos_classifier(tts_out[:, -1, :]))
-                if eos_logits[0].item() > 0.5:
-                    finished = True
-                    break
+        eos_logits = mx.sigmoid(self.tts_eos_classifier(tts_out[:, -1, :]))
+        if eos_logits[0].item() > 0.5:
+            state.finished = True
+            return
 
-                step += 1
-                if step >= max_tokens:
-                    finished = True
-                    break
+        state.step += 1
+        if state.step >= max_tokens:
+            state.finished = True
 
-        if speech_latents:
-            speech_latent_seq = mx.concatenate(speech_latents, axis=1)
+    def _speaker_result(self, state: _SpeakerState) -> GenerationResult:
+        """Decode the sampled latents of a finished utterance."""
+        input_ids = state.input_ids
+        if state.speech_latents:
+            speech_latent_seq = mx.concatenate(state.speech_latents, axis=1)
             scaled_latents = (
                 speech_latent_seq / self.speech_scaling_factor - self.speech_bias_factor
             )
@@ -693,7 +776,7 @@ class Model(nn.Module):
             final_audio = mx.array([])
 
         end_time = time.perf_counter()
-        elapsed_time = end_time - start_time
+        elapsed_time = end_time - state.start_time
 
         samples = final_audio.shape[0] if final_audio.size > 0 else 0
         audio_duration_seconds = samples / self.sample_rate if samples > 0 else 0
@@ -705,7 +788,7 @@ class Model(nn.Module):
 
         rtf = audio_duration_seconds / elapsed_time if elapsed_time > 0 else 0
 
-        yield GenerationResult(
+        return GenerationResult(
             audio=final_audio,
             samples=samples,
             sample_rate=self.sample_rate,
@@ -321,6 +321,27 @@ class CausalDecoder(nn.Module):
         self.snake_out = Snake1d(final_dim)
         self.conv_out = CausalConv1d(final_dim, d_out, kernel_size=7, padding=3)
 
+    @property
+    def context_frames(self) -> int:
+        """Number of past input frames an output sample can depend on."""
+        convs_in = (
+            self.conv_in.layers
+            if isinstance(self.conv_in, nn.Sequential)
+            else [self.conv_in]
+        )
+        # Causal convs look back over exactly their left padding
+        history = sum(2 * conv.pad_val for conv in convs_in)
+        rate = 1
+        for block in self.blocks.layers:
+            stride = block.conv_t.stride
+            # Transposed conv outputs overlap this many earlier input frames
+            history += (math.ceil(block.conv_t.weight.shape[1] / stride) - 1) / rate
+            rate *= stride
+            for res in (block.res1, block.res2, block.res3):
+                history += 2 * res.conv1.pad_val / rate
+        history += 2 * self.conv_out.pad_val / rate
+        return math.ceil(history)
+
     def __call__(self, x):
         x = self.conv_in(x)
         for block in self.blocks.layers:
@@ -549,3 +570,34 @@ class AudioVAE(nn.Module):
             final_weights[k] = w
 
         return final_weights
+
+
+class AudioVAEStreamingDecoder:
+    """Decode latents chunk by chunk with the same output as ``AudioVAE.decode``.
+
+    The decoder is causal, so each chunk is decoded after the last
+    ``context_frames`` latent frames of the previous ones and only the samples
+    of the new frames are kept.
+    """
+
+    def __init__(self, vae: AudioVAE):
+        self.vae = vae
+        self.context_frames = vae.decoder.context_frames
+        self.upsample = int(np.prod(vae.decoder_rates))
+        self.reset()
+
+    def reset(self):
+        self.context = None
+
+    def decode(self, z: mx.array, final: bool = False) -> mx.array:
+        """(N, T, C) new latent frames -> (N, T * upsample) new samples.
+
+        The decoder emits a few samples past the last frame, which later
+        frames still contribute to; they are only returned with ``final``.
+        """
+        n_context = 0 if self.context is None else self.context.shape[1]
+        if self.context is not None:
+            z = mx.concatenate([self.context, z], axis=1)
+        self.context = z[:, -self.context_frames :]
+        end = None if final else z.shape[1] * self.upsample
+        return self.vae.decode(z)[:, n_context * self.upsample : end]
@@ -6,7 +6,7 @@ import mlx.core as mx
 import mlx.nn as nn
 
 from ..base import GenerationResult
-from .audio_vae import AudioVAE
+from .audio_vae import AudioVAE, AudioVAEStreamingDecoder
 from .config import LMConfig, ModelArgs
 from .dit import UnifiedCFM, VoxCPMLocDiT
 from .encoder import VoxCPMLocEnc
@@ -261,6 +261,8 @@ class Model(nn.Module):
         ref_audio: Optional[str] = None,
         inference_timesteps: int = 10,
         cfg_value: float = 2.0,
+        stream: bool = False,
+        streaming_interval: float = 0.5,
         **kwargs,
     ):
         # Tokenize
@@ -373,6 +375,14 @@ class Model(nn.Module):
 
         # Generation Loop
         pred_feat_seq = []
+        segment_idx = 0
+
+        if stream:
+            # Latents are decoded every streaming_interval seconds of audio
+            vae_decoder = AudioVAEStreamingDecoder(self.audio_vae)
+            interval_frames = max(
+                1, round(streaming_interval * self.sample_rate / vae_decoder.upsample)
+            )
 
         for i in range(max_tokens):
             # DiT
@@ -400,6 +410,18 @@ class Model(nn.Module):
             if i > 5 and stop_flag == 1:
                 break
 
+            # The last chunk is decoded after the loop, with the decoder tail
+            pending = sum(feat.shape[1] for feat in pred_feat_seq)
+            if stream and pending >= interval_frames and i < max_tokens - 1:
+                audio = vae_decoder.decode(mx.concatenate(pred_feat_seq, axis=1))
+                elapsed_time = time.perf_counter() - start_time
+                yield self._generation_result(
+                    audio.flatten(), token_count, elapsed_time, segment_idx
+                )
+                pred_feat_seq = []
+                segment_idx += 1
+                start_time = time.perf_counter()
+
             curr_embed_step = curr_embed  # (B, 1, H)
 
             new_lm_out, lm_cache = self.base_lm(
@@ -420,12 +442,23 @@ class Model(nn.Module):
 
         all_feats = mx.concatenate(pred_feat_seq, axis=1)  # (B, Total_P, D)
 
-        audio = self.audio_vae.decode(all_feats)
+        if stream:
+            audio = vae_decoder.decode(all_feats, final=True)
+        else:
+            audio = self.audio_vae.decode(all_feats)
         audio = audio.flatten()
 
-        end_time = time.perf_counter()
-        elapsed_time = end_time - start_time
+        elapsed_time = time.perf_counter() - start_time
+
+        yield self._generation_result(audio, token_count, elapsed_time, segment_idx)
 
+    def _generation_result(
+        self,
+        audio: mx.array,
+        token_count: int,
+        elapsed_time: float,
+        segment_idx: int = 0,
+    ) -> GenerationResult:
         samples = audio.shape[0]
         sample_rate = self.args.audio_vae_config.sample_rate  # Use config value (44100)
         audio_duration_seconds = samples / sample_rate
@@ -437,12 +470,11 @@ class Model(nn.Module):
         duration_ms = int((audio_duration_seconds % 1) * 1000)
         duration_str = f"{int(audio_duration_seconds // 3600):02d}:{duration_mins:02d}:{duration_secs:02d}.{duration_ms:03d}"
 
-        # Yield single result
-        yield GenerationResult(
+        return GenerationResult(
             audio=audio,
             samples=samples,
             sample_rate=sample_rate,
-            segment_idx=0,
+            segment_idx=segment_idx,
             token_count=token_count,
             audio_duration=duration_str,
             real_time_factor=rtf,
@@ -106,5 +106,252 @@ class TestChatterboxModel(unittest.TestCase):
         self.assertIn("s3gen.flow.weight", result)
 
 
+class TestChatterboxConditionals(unittest.TestCase):
+    def _conds(self):
+        from mlx_audio.tts.models.chatterbox.chatterbox import Conditionals
+        from mlx_audio.tts.models.chatterbox.t3.cond_enc import T3Cond
+
+        t3 = T3Cond(
+            speaker_emb=mx.ones((1, 256)),
+            cond_prompt_speech_tokens=mx.array([[1, 2, 3]]),
+            emotion_adv=mx.ones((1, 1, 1)) * 0.5,
+        )
+        gen = dict(
+            prompt_token=mx.array([[4, 5]]),
+            prompt_token_len=mx.array([2]),
+            prompt_feat=mx.zeros((1, 4, 80)),
+            prompt_feat_len=mx.array([4]),
+            embedding=mx.ones((1, 192)),
+        )
+        return Conditionals(t3, gen)
+
+    def test_save_load(self):
+        """Test conditionals round-trip through conds.safetensors layout."""
+        import tempfile
+        from pathlib import Path
+
+        from mlx_audio.tts.models.chatterbox.chatterbox import Conditionals
+
+        conds = self._conds()
+        with tempfile.TemporaryDirectory() as tmp:
+            conds.save(Path(tmp) / "conds.safetensors")
+            loaded = Conditionals.load(Path(tmp) / "conds.safetensors")
+
+        self.assertEqual(loaded.t3.cond_prompt_speech_tokens.tolist(), [[1, 2, 3]])
+        self.assertEqual(sorted(loaded.gen), sorted(conds.gen))
+
+        # Exaggeration is applied to a copy
+        louder = loaded.with_exaggeration(0.9)
+        self.assertAlmostEqual(float(loaded.t3.emotion_adv.item()), 0.5)
+        self.assertAlmostEqual(float(louder.t3.emotion_adv.item()), 0.9, places=5)
+
+    def test_cache_tiers(self):
+        """Test the in-memory LRU falls back to the on-disk tier."""
+        import tempfile
+
+        from mlx_audio.tts.models.chatterbox.chatterbox import ConditionalsCache
+
+        wav = mx.random.normal((2400,))
+        key = ConditionalsCache.key(wav, 24000)
+        self.assertEqual(key, ConditionalsCache.key(wav, 24000))
+        self.assertNotEqual(key, ConditionalsCache.key(wav, 16000))
+        self.assertNotEqual(key, ConditionalsCache.key(wav, 24000, "other/weights"))
+
+        narrator = ConditionalsCache.voice_key("narrator", "some/weights")
+        self.assertTrue(narrator.startswith("voices/"))
+        self.assertNotEqual(narrator, ConditionalsCache.voice_key("narrator"))
+
+        with tempfile.TemporaryDirectory() as tmp:
+            cache = ConditionalsCache(tmp, max_size=1)
+            cache.put(key, self._conds())
+            cache.put(narrator, self._conds())
+            self.assertEqual(cache.keys(), [narrator])
+
+            # Evicted from memory, reloaded from disk
+            self.assertIsNotNone(cache.get(key))
+            self.assertEqual(cache.keys(), [key])
+            self.assertIsNone(cache.get("missing"))
+
+            # Voices are listed per set of weights
+            self.assertEqual(cache.voices("some/weights"), ["narrator"])
+            self.assertEqual(cache.voices("other/weights"), [])
+            host = ConditionalsCache.voice_key("host", "other/weights")
+            cache.put(host, self._conds())
+            self.assertEqual(cache.voices("other/weights"), ["host"])
+            self.assertEqual(cache.voices("some/weights"), ["narrator"])
+
+    def test_cache_concurrent_put(self):
+        """Test threads writing the same entry don't share a temp file."""
+        import tempfile
+        import threading
+        from unittest.mock import patch
+
+        from mlx_audio.tts.models.chatterbox.chatterbox import (
+            Conditionals,
+            ConditionalsCache,
+        )
+
+        save = Conditionals.save
+        both_writing = threading.Barrier(2, timeout=5)
+        tmp_paths, errors = [], []
+
+        def slow_save(conds, path):
+            tmp_paths.append(path)
+            save(conds, path)
+            both_writing.wait()
+
+        def put(cache, conds):
+            try:
+                cache.put("a", conds)
+            except Exception as e:
+                errors.append(e)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            cache = ConditionalsCache(tmp)
+            conds = [self._conds(), self._conds()]
+            # Evaluate here: lazy arrays can't be computed on another thread
+            mx.eval([(vars(c.t3), c.gen) for c in conds])
+            with patch.object(Conditionals, "save", slow_save):
+                threads = [
+                    threading.Thread(target=put, args=(cache, c)) for c in conds
+                ]
+                for thread in threads:
+                    thread.start()
+                for thread in threads:
+                    thread.join(timeout=10)
+
+            self.assertEqual(errors, [])
+            self.assertEqual(len(set(tmp_paths)), 2)
+            cache.clear()
+            self.assertIsNotNone(cache.get("a"))
+
+    def test_cache_disk_limit(self):
+        """Test clip files are evicted least recently used first, voices never."""
+        import os
+        import tempfile
+        from pathlib import Path
+
+        from mlx_audio.tts.models.chatterbox.chatterbox import ConditionalsCache
+
+        with tempfile.TemporaryDirectory() as tmp:
+            cache = ConditionalsCache(tmp, max_size=1)
+            cache.put("a", self._conds())
+            size = (Path(tmp) / "a.safetensors").stat().st_size
+            cache.max_disk_bytes = 2 * size
+
+            narrator = ConditionalsCache.voice_key("narrator")
+            cache.put(narrator, self._conds())
+            cache.put("b", self._conds())
+            os.utime(Path(tmp) / "a.safetensors", ns=(0, 0))
+            os.utime(Path(tmp) / "b.safetensors", ns=(1, 1))
+            cache.clear()
+            self.assertIsNotNone(cache.get("a"))  # Refreshes "a" on disk
+            cache.put("c", self._conds())
+
+            files = sorted(p.stem for p in Path(tmp).rglob("*.safetensors"))
+            self.assertEqual(files, ["a", "c", "narrator"])
+            self.assertIsNone(cache.get("b"))
+            self.assertIsNotNone(cache.get(narrator))
+
+
+TINY_LLAMA_CONFIG = {
+    "model_type": "llama",
+    "vocab_size": 64,
+    "hidden_size": 32,
+    "num_hidden_layers": 2,
+    "intermediate_size": 64,
+    "num_attention_heads": 4,
+    "num_key_value_heads": 4,
+    "head_dim": 8,
+    "max_position_embeddings": 256,
+    "rms_norm_eps": 1e-05,
+    "rope_theta": 10000.0,
+    "attention_bias": False,
+    "mlp_bias": False,
+    "tie_word_embeddings": False,
+}
+
+
+class TestT3Inference(unittest.TestCase):
+    def setUp(self):
+        from mlx_audio.tts.models.chatterbox import config as chatterbox_config
+        from mlx_audio.tts.models.chatterbox.config import T3Config
+        from mlx_audio.tts.models.chatterbox.t3.cond_enc import T3Cond
+        from mlx_audio.tts.models.chatterbox.t3.t3 import T3
+
+        patcher = patch.dict(chatterbox_config.LLAMA_CONFIGS, tiny=TINY_LLAMA_CONFIG)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        mx.random.seed(0)
+        self.t3 = T3(
+            T3Config(
+                text_tokens_dict_size=32,
+                speech_tokens_dict_size=48,
+                start_speech_token=46,
+                stop_speech_token=47,
+                max_text_tokens=16,
+                max_speech_tokens=32,
+                llama_config_name="tiny",
+                speaker_embed_size=8,
+                use_perceiver_resampler=False,
+            )
+        )
+        self.cond = T3Cond(speaker_emb=mx.ones((1, 8)), emotion_adv=mx.array(0.5))
+        self.text = mx.array([[1, 5, 9, 3, 0]])
+
+    def _sequential(self, max_new_tokens, cfg_weight, repetition_penalty):
+        """Reference: one synchronous forward and host read-back per token."""
+        from mlx_lm.models.cache import make_prompt_cache
+        from mlx_lm.sample_utils import make_logits_processors
+
+        t3, hp = self.t3, self.t3.hp
+        text = self.text
+        if cfg_weight > 0.0:
+            text = mx.concatenate([text, text], axis=0)
+        bos = mx.array([[hp.start_speech_token]], dtype=mx.int32)
+        embeds, _ = t3.prepare_input_embeds(
+            t3_cond=self.cond, text_tokens=text, speech_tokens=bos, cfg_weight=cfg_weight
+        )
+        cache = make_prompt_cache(t3.tfmr)
+        processors = make_logits_processors(repetition_penalty=repetition_penalty)
+
+        generated = [hp.start_speech_token]
+        for step in range(max_new_tokens):
+            hidden = t3.tfmr.model(inputs=None, input_embeddings=embeds, cache=cache)
+            logits = t3.speech_head(hidden[:, -1, :])
+            if cfg_weight > 0.0:
+                logits = logits[0:1] + cfg_weight * (logits[0:1] - logits[1:2])
+            for processor in processors:
+                logits = processor(mx.array([generated]), logits)
+            token_id = int(mx.argmax(logits, axis=-1).item())
+            generated.append(token_id)
+            if token_id == hp.stop_speech_token:
+                break
+            embeds = t3.speech_emb(mx.array([[token_id]]))
+            embeds = embeds + t3.speech_pos_emb.get_fixed_embedding(step + 1)
+            embeds = mx.broadcast_to(embeds, (text.shape[0],) + embeds.shape[1:])
+        return generated
+
+    def test_pipelined_matches_sequential(self):
+        """Test the pipelined decode loop against a step-by-step reference."""
+        for cfg_weight in (0.0, 0.5):
+            for max_new_tokens in (0, 1, 2, 12):
+                with self.subTest(cfg_weight=cfg_weight, max_new_tokens=max_new_tokens):
+                    tokens = self.t3.inference(
+                        t3_cond=self.cond,
+                        text_tokens=self.text,
+                        max_new_tokens=max_new_tokens,
+                        temperature=0.0,
+                        cfg_weight=cfg_weight,
+                    )
+                    expected = self._sequential(max_new_tokens, cfg_weight, 1.2)
+                    self.assertEqual(tokens.tolist(), [expected])
+                    self.assertEqual(
+                        len(self.t3.last_inference_stats.step_times),
+                        max(0, len(expected) - 2),
+                    )
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -1,7 +1,11 @@
 import sys  # Import sys to patch argv
+import tempfile
 import unittest
 from unittest.mock import MagicMock, patch
 
+import mlx.core as mx
+import mlx.nn as nn
+
 from mlx_audio.convert import configure_parser, main
 
 
@@ -42,6 +46,7 @@ class TestConvert(unittest.TestCase):
             revision=None,
             dequantize=False,
             model_domain=None,
+            snapshot=False,
         )
 
     def test_quantized_conversion(self):
@@ -70,6 +75,7 @@ class TestConvert(unittest.TestCase):
             revision=None,
             dequantize=False,
             model_domain=None,
+            snapshot=False,
         )
 
     def test_quantized_conversion_invalid_group_size_raises_error(self):
@@ -114,6 +120,7 @@ class TestConvert(unittest.TestCase):
             revision=None,
             dequantize=False,
             model_domain=None,
+            snapshot=False,
         )
 
     def test_quantization_recipes(self):
@@ -137,6 +144,7 @@ class TestConvert(unittest.TestCase):
                     revision=None,
                     dequantize=False,  # Default dequantize
                     model_domain=None,
+                    snapshot=False,
                 )
                 # No need to reset mock here, it's handled at the start of the loop
 
@@ -158,6 +166,7 @@ class TestConvert(unittest.TestCase):
             revision=None,
             dequantize=True,
             model_domain=None,
+            snapshot=False,
         )
 
     def test_upload_repo_argument(self):
@@ -178,8 +187,80 @@ class TestConvert(unittest.TestCase):
             revision=None,
             dequantize=False,
             model_domain=None,
+            snapshot=False,
+        )
+
+    def test_snapshot_flag(self):
+        test_args = ["--hf-path", "dummy_hf", "--quantize", "--snapshot"]
+        # Patch sys.argv for this test run
+        with patch.object(sys, "argv", ["convert.py"] + test_args):
+            main()
+
+        self.convert_mock.assert_called_once_with(
+            hf_path="dummy_hf",
+            mlx_path="mlx_model",  # Default mlx_path
+            quantize=True,
+            q_group_size=64,
+            q_bits=4,
+            quant_predicate=None,
+            dtype=None,  # Default dtype is None
+            upload_repo=None,
+            revision=None,
+            dequantize=False,
+            model_domain=None,
+            snapshot=True,
         )
 
 
+class TestSnapshot(unittest.TestCase):
+    class Model(nn.Module):
+        def __init__(self):
+            super().__init__()
+            self.proj = nn.Linear(64, 128)
+            self.norm = nn.LayerNorm(128)
+            self.head = nn.Linear(128, 8)
+
+        def __call__(self, x):
+            return self.head(self.norm(self.proj(x)))
+
+    def test_round_trip(self):
+        """Test a quantized model loads from its snapshot without sanitizing."""
+        from mlx_lm.utils import save_model
+
+        from mlx_audio.snapshot import (
+            is_snapshot,
+            load_snapshot,
+            save_snapshot,
+            snapshot_manifest,
+        )
+
+        model = self.Model()
+        nn.quantize(model, 64, 4, class_predicate=lambda p, m: p == "proj")
+        x = mx.random.normal((2, 64))
+        expected = model(x)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            manifest = snapshot_manifest(model)
+            self.assertEqual(list(manifest["quantization"]), ["proj"])
+            self.assertEqual(manifest["parameters"]["proj.weight"]["dtype"], "uint32")
+
+            save_model(tmp, model, donate_model=True)
+            self.assertFalse(is_snapshot(tmp))
+            save_snapshot(tmp, manifest)
+            self.assertTrue(is_snapshot(tmp))
+
+            loaded = self.Model()
+            load_snapshot(loaded, tmp)
+            self.assertIsInstance(loaded.proj, nn.QuantizedLinear)
+            self.assertIsInstance(loaded.head, nn.Linear)
+            self.assertTrue(mx.array_equal(loaded(x), expected))
+
+            # A snapshot of another module tree is rejected before loading
+            stale = self.Model()
+            stale.head = nn.Linear(128, 16)
+            with self.assertRaisesRegex(ValueError, "head"):
+                load_snapshot(stale, tmp)
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,212 @@
+import os
+import subprocess
+import sys
+import threading
+import time
+import unittest
+
+import mlx.core as mx
+
+# Seconds allowed for `import <module>` in a fresh interpreter, and packages
+# the import must not pull in. Wall-clock budgets are noisy on cold or shared
+# runners, so they are only checked when MLX_AUDIO_CHECK_IMPORT_TIME=1; the
+# forbidden imports are always checked.
+CHECK_IMPORT_TIME = os.getenv("MLX_AUDIO_CHECK_IMPORT_TIME") == "1"
+HEAVY = {"transformers", "mlx_lm", "scipy", "torch", "huggingface_hub", "sklearn"}
+IMPORT_BUDGETS = {
+    "mlx_audio": (0.5, HEAVY | {"mlx", "numpy"}),
+    "mlx_audio.utils": (1.0, HEAVY),
+    "mlx_audio.codec_registry": (0.5, HEAVY | {"mlx_audio.codec"}),
+    "mlx_audio.tts.utils": (1.5, HEAVY),
+    "mlx_audio.stt.utils": (1.5, HEAVY),
+    "mlx_audio.api.app": (3.0, HEAVY),
+}
+
+
+def import_profile(module: str):
+    """Run ``python -X importtime -c 'import module'``.
+
+    Returns the cumulative import time of ``module`` in seconds and the
+    names of all imported modules.
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    imported, total = set(), 0.0
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        if not cumulative.strip().isdigit():
+            continue  # header line
+        imported.add(name.strip())
+        if name.strip() == module:
+            total = int(cumulative) / 1e6
+    return total, imported
+
+
+class TestImportTime(unittest.TestCase):
+    def test_import_budgets(self):
+        for module, (budget, forbidden) in IMPORT_BUDGETS.items():
+            with self.subTest(module=module):
+                seconds, imported = import_profile(module)
+                eager = sorted(
+                    name
+                    for name in imported
+                    if any(name == f or name.startswith(f + ".") for f in forbidden)
+                )
+                self.assertEqual(eager, [], f"{module} imports {eager}")
+                if CHECK_IMPORT_TIME:
+                    self.assertLess(seconds, budget)
+
+
+class FakeCodec:
+    """SNAC-like codec: decode takes a list of code arrays."""
+
+    def __init__(self):
+        self.batch_sizes = []
+        self.scale = mx.array(2.0)
+
+    def parameters(self):
+        return {"scale": self.scale}
+
+    def decode(self, codes):
+        self.batch_sizes.append(codes[0].shape[0])
+        return codes[0] * self.scale + codes[1].sum(axis=-1, keepdims=True)
+
+    def encode(self, audio):
+        if audio.shape[-1] == 0:
+            raise ValueError("empty audio")
+        return [audio[..., ::2], audio[..., ::4]]
+
+
+class TestCodecRegistry(unittest.TestCase):
+    def setUp(self):
+        from mlx_audio.codec_registry import CodecRegistry, _LOADERS, register_codec
+
+        self.loads = []
+
+        @register_codec("test")
+        def load(source):
+            self.loads.append(source)
+            time.sleep(0.05)
+            return FakeCodec()
+
+        self.addCleanup(_LOADERS.pop, "test")
+        self.registry = CodecRegistry(max_batch_size=4, max_wait_ms=500)
+
+    def concurrently(self, fn, args):
+        results = [None] * len(args)
+
+        def run(i):
+            results[i] = fn(*args[i])
+
+        threads = [threading.Thread(target=run, args=(i,)) for i in range(len(args))]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return results
+
+    def test_shared_and_loaded_once(self):
+        """Test concurrent callers share one codec instance per source."""
+        codecs = self.concurrently(self.registry.get, [("test", "a")] * 4)
+
+        self.assertEqual(self.loads, ["a"])
+        self.assertTrue(all(codec is codecs[0] for codec in codecs))
+        self.assertIsNot(self.registry.get("test", "b"), codecs[0])
+        self.assertEqual(self.registry.loaded(), [("test", "a"), ("test", "b")])
+
+        self.assertTrue(self.registry.release("test", "a"))
+        self.assertFalse(self.registry.release("test", "a"))
+        self.registry.get("test", "a")
+        self.assertEqual(self.loads, ["a", "b", "a"])
+
+    def test_batched_decode(self):
+        """Test same-shape decodes arriving while one runs are batched."""
+        requests = [
+            [mx.full((1, 6), float(i)), mx.full((1, 12), float(i))] for i in range(5)
+        ]
+        mx.eval(requests)
+
+        # Hold the first decode inside the codec while the others arrive
+        codec = self.registry.get("test", "a")
+        decode, started, resume = codec.decode, threading.Event(), threading.Event()
+
+        def first_blocks(codes):
+            if not started.is_set():
+                started.set()
+                resume.wait()
+            return decode(codes)
+
+        codec.decode = first_blocks
+        first = threading.Thread(
+            target=self.registry.decode, args=("test", "a", requests[4])
+        )
+        first.start()
+        started.wait()
+        outputs = self.concurrently(
+            self.registry.decode, [("test", "a", codes) for codes in requests[:4]]
+        )
+        resume.set()
+        first.join()
+
+        self.assertEqual(codec.batch_sizes, [4, 1])
+        for i, out in enumerate(outputs):
+            self.assertEqual(out.shape, (1, 6))
+            self.assertTrue(mx.allclose(out, mx.full((1, 6), 14.0 * i)))
+
+        stats = self.registry.get_stats()["test:a"]
+        self.assertEqual((stats["batched_calls"], stats["batched_requests"]), (2, 5))
+        self.assertEqual(self.registry.nbytes(), 4)
+
+        # A lone call has nobody to batch with and runs without waiting
+        start = time.perf_counter()
+        self.registry.decode("test", "a", requests[0])
+        self.assertLess(time.perf_counter() - start, self.registry.max_wait / 2)
+        self.assertEqual(codec.batch_sizes[-1], 1)
+
+        # Different shapes are never padded together
+        self.registry.max_wait = 0.05
+        requests = [[mx.zeros((1, n)), mx.zeros((1, 2 * n))] for n in (3, 5)]
+        mx.eval(requests)
+        self.concurrently(
+            self.registry.decode, [("test", "a", codes) for codes in requests]
+        )
+        self.assertEqual(codec.batch_sizes[3:], [1, 1])
+
+    def test_batched_encode(self):
+        """Test list outputs are split per request and errors reach every caller."""
+        audio = [mx.arange(8, dtype=mx.float32)[None, None] + i for i in range(2)]
+        mx.eval(audio)
+        outputs = self.concurrently(
+            self.registry.encode, [("test", "a", x) for x in audio]
+        )
+        for x, (fine, coarse) in zip(audio, outputs):
+            self.assertTrue(mx.array_equal(fine, x[..., ::2]))
+            self.assertTrue(mx.array_equal(coarse, x[..., ::4]))
+
+        with self.assertRaisesRegex(ValueError, "empty audio"):
+            self.registry.encode("test", "a", mx.zeros((1, 1, 0)))
+
+    def test_release_idle_keeps_held_codec(self):
+        """Test an idle codec a model still holds is reused, not loaded again."""
+        held = self.registry.get("test", "a")
+        self.registry.get("test", "b")
+
+        self.assertEqual(self.registry.release_idle(-1), [("test", "a"), ("test", "b")])
+        self.assertEqual(self.registry.loaded(), [])
+        self.assertIs(self.registry.get("test", "a"), held)
+        self.registry.get("test", "b")
+        self.assertEqual(self.loads, ["a", "b", "b"])
+
+    def test_unknown_codec(self):
+        with self.assertRaisesRegex(ValueError, "Unknown codec 'missing'"):
+            self.registry.get("missing", "repo")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -152,6 +152,304 @@ class TestKokoroModel(unittest.TestCase):
         self.assertIs(output.audio, audio)
         self.assertIs(output.pred_dur, pred_dur)
 
+    def test_lstm_padded_lengths(self):
+        """Test that a padded batch with lengths matches unpadded LSTM runs."""
+        from mlx_audio.tts.models.kokoro.modules import LSTM
+
+        lstm = LSTM(8, 4)
+        x = mx.random.normal((2, 10, 8))
+        lengths = mx.array([10, 6])
+
+        output, ((h_fwd, _), (h_bwd, _)) = lstm(x, lengths=lengths)
+        single, ((s_fwd, _), (s_bwd, _)) = lstm(x[1:2, :6])
+
+        np.testing.assert_allclose(output[1, :6], single[0], atol=1e-5)
+        np.testing.assert_allclose(h_fwd[1], s_fwd[0], atol=1e-5)
+        np.testing.assert_allclose(h_bwd[1], s_bwd[0], atol=1e-5)
+
+    def test_lstm_scan_matches_step_loop(self):
+        """Test the compiled LSTM scan against a plain per-step reference."""
+        from mlx_audio.rnn import lstm_input_projection, lstm_scan
+        from mlx_audio.tts.models.kokoro.modules import LSTM
+
+        def reference(x, Wx, Wh, bias):
+            hidden = cell = np.zeros(Wh.shape[1], dtype=np.float32)
+            outputs = []
+            for step in x:
+                i, f, g, o = np.split(Wx @ step + Wh @ hidden + bias, 4)
+                sigmoid = lambda a: 1 / (1 + np.exp(-a))
+                cell = sigmoid(f) * cell + sigmoid(i) * np.tanh(g)
+                hidden = sigmoid(o) * np.tanh(cell)
+                outputs.append(hidden)
+            return np.stack(outputs)
+
+        lstm = LSTM(8, 4)
+        x = mx.random.normal((2, 10, 8))
+        lengths = [10, 6]
+        params = {
+            direction: [
+                np.array(getattr(lstm, f"{name}_{direction}"))
+                for name in ("Wx", "Wh", "bias_ih", "bias_hh")
+            ]
+            for direction in ("forward", "backward")
+        }
+
+        # lstm_scan on its own, two recurrences stacked on the first axis
+        Wx, Wh, b_ih, b_hh = params["forward"]
+        x_proj = lstm_input_projection(x, mx.array(Wx), mx.array(b_ih + b_hh))
+        hidden, _ = lstm_scan(
+            mx.stack([x_proj, x_proj]), mx.array(np.stack([Wh.T, Wh.T]))
+        )
+        expected = reference(np.array(x[0]), Wx, Wh, b_ih + b_hh)
+        np.testing.assert_allclose(hidden[1, 0], expected, atol=1e-5)
+
+        # Bidirectional LSTM on a padded batch, and on 2-D input
+        output, _ = lstm(x, lengths=mx.array(lengths))
+        for row, length in enumerate(lengths):
+            seq = np.array(x[row, :length])
+            Wx, Wh, b_ih, b_hh = params["forward"]
+            forward = reference(seq, Wx, Wh, b_ih + b_hh)
+            Wx, Wh, b_ih, b_hh = params["backward"]
+            backward = reference(seq[::-1], Wx, Wh, b_ih + b_hh)[::-1]
+            expected = np.concatenate([forward, backward], axis=-1)
+            np.testing.assert_allclose(output[row, :length], expected, atol=1e-5)
+            if row == 1:
+                single, _ = lstm(x[row, :length])
+                np.testing.assert_allclose(single[0], expected, atol=1e-5)
+
+    def test_alignment_matches_dense(self):
+        """Test the gather length regulator against the dense alignment matmul."""
+        from mlx_audio.tts.models.kokoro.kokoro import (
+            alignment_indices,
+            dense_alignment,
+            expand_frames,
+        )
+
+        pred_dur = mx.array([[2, 3, 1, 0], [1, 4, 0, 0]])
+        x = mx.random.normal((2, 5, 4))
+
+        indices = alignment_indices(pred_dur, 6)
+        self.assertEqual(indices.tolist(), [[0, 0, 1, 1, 1, 2], [0, 1, 1, 1, 1, 4]])
+
+        dense = x @ dense_alignment(pred_dur, 6)
+        gathered = expand_frames(x, indices)
+        np.testing.assert_array_equal(gathered[0], dense[0])
+        np.testing.assert_array_equal(gathered[1, :, :5], dense[1, :, :5])
+
+    def test_stft_batch(self):
+        """Test MLXSTFT batched transforms against per-item transforms."""
+        from mlx_audio.tts.models.kokoro.istftnet import MLXSTFT
+
+        stft = MLXSTFT(filter_length=20, hop_length=5, win_length=20)
+        x = mx.random.normal((3, 400))
+
+        magnitude, phase = stft.transform(x)
+        audio = stft.inverse(magnitude, phase)
+        self.assertEqual(audio.shape, (3, 1, 400))
+        for i in range(3):
+            single_magnitude, _ = stft.transform(x[i])
+            np.testing.assert_allclose(magnitude[i], single_magnitude[0], atol=1e-5)
+            np.testing.assert_allclose(
+                audio[i], stft.inverse(magnitude[i : i + 1], phase[i : i + 1])[0], atol=1e-5
+            )
+
+    def test_sine_phase_offset(self):
+        """Test the harmonic source continues across windows of an F0 curve."""
+        from mlx_audio.tts.models.kokoro.istftnet import SineGen
+
+        sine_gen = SineGen(24000, upsample_scale=300, harmonic_num=8)
+        f0 = mx.random.uniform(100, 300, (1, 40))
+        fn = mx.repeat(f0, 300, axis=1)[..., None] * mx.arange(1, 10)
+
+        full = sine_gen._f02sine(fn, mx.zeros((1, 9)))
+        tail = sine_gen._f02sine(fn[:, 16 * 300 :], sine_gen.phase_offset(f0[:, :16]))
+        self.assertEqual(tail.shape, (1, 24 * 300, 9))
+        # Only the first point differs, where interpolation sees the window edge
+        np.testing.assert_allclose(full[:, 17 * 300 :], tail[:, 300:], atol=5e-3)
+
+    @staticmethod
+    def _stream_decoder():
+        from mlx.utils import tree_map
+
+        from mlx_audio.tts.models.kokoro.istftnet import Decoder
+
+        # Upsample scale 2: larger scales interpolate the random initial
+        # phase away, and it must carry over from the first window
+        decoder = Decoder(
+            dim_in=512,
+            style_dim=16,
+            dim_out=80,
+            resblock_kernel_sizes=[3],
+            upsample_rates=[2],
+            upsample_initial_channel=32,
+            resblock_dilation_sizes=[[1, 3, 5]],
+            upsample_kernel_sizes=[4],
+            gen_istft_n_fft=4,
+            gen_istft_hop_size=1,
+        )
+        mx.random.seed(0)
+        decoder.update(
+            tree_map(lambda p: 0.1 * mx.random.normal(p.shape), decoder.parameters())
+        )
+        decoder.generator.m_source.l_sin_gen.noise_std = 0
+        return decoder
+
+    def test_decoder_stream(self):
+        """Test streamed windows concatenate to the full decode."""
+        decoder = self._stream_decoder()
+        frames = 40
+        asr, N = mx.zeros((1, 512, frames)), mx.zeros((1, 2 * frames))
+        F0_curve = mx.random.uniform(100, 300, (1, 2 * frames))
+        s = mx.random.normal((1, 16))
+        x = mx.random.normal((1, 32, 2 * frames))
+
+        # The frame-rate blocks run once either way, only the generator is windowed
+        with patch.object(decoder, "_generator_input", return_value=x):
+            mx.random.seed(1)
+            full = decoder(asr, F0_curve, N, s)[:, 0]
+            mx.random.seed(1)
+            chunks = list(
+                decoder.stream(asr, F0_curve, N, s, window_frames=8, overlap_frames=2)
+            )
+
+        self.assertEqual(len(chunks), 5)
+        streamed = mx.concatenate(chunks, axis=-1)
+        self.assertEqual(streamed.shape, full.shape)
+        np.testing.assert_allclose(streamed, full, atol=1e-2)
+
+    def test_decoder_stream_loudness_change(self):
+        """Test windows with per-window norm statistics across silence into speech."""
+        decoder = self._stream_decoder()
+        frames = 40
+        asr, N = mx.zeros((1, 512, frames)), mx.zeros((1, 2 * frames))
+        F0_curve = mx.full((1, 2 * frames), 150.0)
+        s = mx.random.normal((1, 16))
+        x = mx.concatenate(
+            [
+                0.01 * mx.random.normal((1, 32, frames)),
+                3 * mx.random.normal((1, 32, frames)),
+            ],
+            axis=-1,
+        )
+
+        def relative_error(context_frames):
+            with patch.object(decoder, "_generator_input", return_value=x):
+                mx.random.seed(1)
+                full = decoder(asr, F0_curve, N, s)[:, 0]
+                mx.random.seed(1)
+                streamed = mx.concatenate(
+                    list(
+                        decoder.stream(
+                            asr, F0_curve, N, s, 8, context_frames=context_frames
+                        )
+                    ),
+                    axis=-1,
+                )
+            half = full.shape[-1] // 2
+            errors = []
+            for part in (slice(None, half), slice(half, None)):
+                rms = lambda a: mx.sqrt(mx.mean(mx.square(a[:, part]))).item()
+                errors.append(rms(streamed - full) / rms(full))
+            return errors
+
+        # Norm statistics only cover each window and its context, which keeps
+        # both the quiet and the loud half within a few percent of the full decode
+        errors = relative_error(8)
+        self.assertLess(max(errors), 0.05)
+        # and the gap closes once the context spans the utterance
+        self.assertLess(max(relative_error(frames)), 1e-4)
+        self.assertLess(max(relative_error(16)), max(errors))
+
+    def test_forward_batch_matches_single(self):
+        """Test masked batches of different lengths match per-item inference."""
+        from mlx.utils import tree_map
+
+        from mlx_audio.tts.models.kokoro.kokoro import Model, ModelConfig
+
+        config = {
+            "istftnet": {
+                "upsample_kernel_sizes": [4, 4],
+                "upsample_rates": [2, 2],
+                "gen_istft_hop_size": 2,
+                "gen_istft_n_fft": 8,
+                "resblock_dilation_sizes": [[1, 3, 5]],
+                "resblock_kernel_sizes": [3],
+                "upsample_initial_channel": 512,
+            },
+            "dim_in": 64,
+            "dropout": 0.0,
+            "hidden_dim": 512,
+            "max_conv_dim": 512,
+            "max_dur": 4,
+            "multispeaker": True,
+            "n_layer": 1,
+            "n_mels": 80,
+            "n_token": 8,
+            "style_dim": 128,
+            "text_encoder_kernel_size": 5,
+            "plbert": {
+                "hidden_size": 32,
+                "num_attention_heads": 2,
+                "intermediate_size": 64,
+                "max_position_embeddings": 32,
+                "num_hidden_layers": 1,
+            },
+            "vocab": {p: i for i, p in enumerate("abcdefg", 1)},
+        }
+        mx.random.seed(0)
+        model = Model(ModelConfig.from_dict(config))
+        model.update(
+            tree_map(lambda p: 0.05 * mx.random.normal(p.shape), model.parameters())
+        )
+        model.eval()
+        pack = mx.random.normal((16, 1, 256))
+
+        def assert_matches(audio, expected):
+            self.assertEqual(audio.shape, expected.shape)
+            # Only the last frame, next to the padding, may see it
+            np.testing.assert_allclose(audio[..., :-16], expected[..., :-16], atol=1e-5)
+            np.testing.assert_allclose(audio, expected, atol=1e-3)
+
+        # The unvoiced source noise is the only randomness at inference
+        with patch.object(mx.random, "normal", lambda shape, **kwargs: mx.zeros(shape)):
+            phonemes = ["abcdefgab", "gfed", "ab"]
+            single = {
+                p: model(p, pack[len(p) - 1], return_output=True) for p in phonemes
+            }
+
+            ref_s = mx.concatenate([pack[len(p) - 1] for p in phonemes[:2]])
+            for p, output in zip(phonemes, model.forward_batch(phonemes[:2], ref_s)):
+                assert_matches(output.audio, single[p].audio)
+                self.assertEqual(output.pred_dur.tolist(), single[p].pred_dur.tolist())
+
+            pipeline = MagicMock()
+            pipeline.load_voice.return_value = pack
+            pipeline.chunk_text.side_effect = lambda text, _: [
+                (None, None, p, None) for p in text.split()
+            ]
+            with patch.object(model, "_get_pipeline", return_value=pipeline):
+                results = list(
+                    model.generate_batch(
+                        ["abcdefgab ab", "gfed"], voice="test", max_batch_size=2
+                    )
+                )
+
+        self.assertEqual([i for i, _ in results], [0, 1, 0])
+        for p, (_, result) in zip(["abcdefgab", "gfed", "ab"], results):
+            assert_matches(result.audio, single[p].audio[0])
+
+    def test_resize_mask(self):
+        """Test frame masks follow upsampling of padded batches."""
+        from mlx_audio.tts.models.kokoro.istftnet import length_mask, resize_mask
+
+        mask = length_mask(mx.array([4, 2]), 4)
+        self.assertEqual(mask.shape, (2, 1, 4))
+        self.assertIsNone(resize_mask(None, 8))
+        self.assertEqual(
+            resize_mask(mask, 8)[:, 0].tolist(),
+            [[1.0] * 8, [1.0] * 4 + [0.0] * 4],
+        )
+
 
 @patch("importlib.resources.open_text", patched_open_text)
 class TestKokoroPipeline(unittest.TestCase):
@@ -237,6 +535,32 @@ class TestKokoroPipeline(unittest.TestCase):
                     self.assertIn("voice1", pipeline.voices)
                     self.assertIn("voice2", pipeline.voices)
 
+    def test_voice_cache(self):
+        """Test the shared voice cache."""
+        # Import inside the test method
+        from mlx_audio.tts.models.kokoro.voice import VoiceCache, get_voice_cache
+
+        cache = VoiceCache(max_size=2)
+        cache["voice1"] = mx.zeros((1,))
+        cache["voice2"] = mx.ones((1,))
+        # Access voice1 so voice2 becomes the least recently used
+        _ = cache["voice1"]
+        cache["voice1,voice3"] = mx.ones((1,))
+        self.assertIn("voice1", cache)
+        self.assertIn("voice1,voice3", cache)
+        self.assertNotIn("voice2", cache)
+        self.assertEqual(len(cache), 2)
+
+        # get() returns None on a miss instead of raising
+        self.assertIsNone(cache.get("voice2"))
+        self.assertIsNotNone(cache.get("voice1"))
+        cache["voice4"] = mx.ones((1,))
+        self.assertEqual(cache.keys(), ["voice1", "voice4"])
+
+        # Pipelines of the same repo share one cache
+        self.assertIs(get_voice_cache("repo"), get_voice_cache("repo"))
+        self.assertIsNot(get_voice_cache("repo"), get_voice_cache("other-repo"))
+
     def test_tokens_to_ps(self):
         """Test tokens_to_ps method."""
         # Import inside the test method
@@ -512,6 +836,45 @@ class TestBarkPipeline(unittest.TestCase):
         )  # N_FINE_CODEBOOKS (corrected from 10 to 8)
         self.assertEqual(fine_tokens.shape[1], 100)  # sequence_length
 
+    def test_kv_caching_matches_uncached(self):
+        """Test cached semantic and coarse decoding reproduce the full recompute."""
+        from mlx_audio.tts.models.bark.bark import (
+            GPT,
+            CoarseAcousticsConfig,
+            SemanticConfig,
+        )
+
+        mx.random.seed(0)
+        self.mock_model.semantic = GPT(SemanticConfig(n_layer=2, n_head=2, n_embd=32))
+        self.mock_model.coarse_acoustics = GPT(
+            CoarseAcousticsConfig(n_layer=2, n_head=2, n_embd=32)
+        )
+        # Peaked logits so rounding differences cannot flip a sample
+        for gpt in (self.mock_model.semantic, self.mock_model.coarse_acoustics):
+            gpt.lm_head.weight = gpt.lm_head.weight * 100
+        self.mock_tokenizer.encode.return_value = [1, 2, 3]
+
+        outputs = {}
+        for use_kv_caching in (True, False):
+            mx.random.seed(42)
+            semantic_tokens, _ = self.pipeline.generate_text_semantic(
+                "test text",
+                voice=None,
+                use_kv_caching=use_kv_caching,
+                max_gen_duration_s=1.0,
+            )
+            coarse_tokens = self.pipeline.generate_coarse(
+                semantic_tokens[:40],
+                voice=None,
+                use_kv_caching=use_kv_caching,
+                sliding_window_len=20,
+            )
+            outputs[use_kv_caching] = (semantic_tokens, coarse_tokens)
+
+        self.assertEqual(outputs[True][0].tolist(), outputs[False][0].tolist())
+        self.assertEqual(outputs[True][1].tolist(), outputs[False][1].tolist())
+        self.assertEqual(outputs[True][1].shape[0], 2)  # N_COARSE_CODEBOOKS
+
 
 class TestLlamaModel(unittest.TestCase):
     @property
@@ -589,6 +952,65 @@ class TestLlamaModel(unittest.TestCase):
         logits = model(input_ids)
         self.assertEqual(logits.shape, (2, 22, config.vocab_size))
 
+    @patch("mlx_audio.tts.models.llama.llama.stream_generate")
+    @patch("mlx_audio.tts.models.llama.llama.AutoTokenizer")
+    def test_generate_stream(self, mock_tokenizer, mock_stream_generate):
+        """Test streamed chunks add up to the non-streamed audio."""
+        from mlx_audio.codec_registry import _LOADERS, codec_registry
+        from mlx_audio.tts.models.llama.llama import SNAC_REPO, Model, ModelConfig
+        from mlx_audio.tts.models.snac_streaming import SNAC_CONTEXT_FRAMES
+
+        class WindowedSnac:
+            # Each frame depends on its neighbours as far as SNAC's receptive
+            # field reaches, so the default context and lookahead must cover it
+            def decode(self, codes):
+                width = 2 * SNAC_CONTEXT_FRAMES + 1
+                coarse = np.convolve(np.array(codes[0][0]), np.ones(width), "same")
+                audio = (
+                    mx.repeat(mx.array(coarse)[None], 2048, axis=1)
+                    + mx.repeat(codes[1], 1024, axis=1) * 10
+                    + mx.repeat(codes[2], 512, axis=1) * 100
+                )
+                return audio.astype(mx.float32)[..., None]
+
+        self.addCleanup(_LOADERS.pop, "snac", None)
+        self.addCleanup(codec_registry.release, "snac", SNAC_REPO)
+        codec_registry.release("snac", SNAC_REPO)
+        _LOADERS["snac"] = lambda source: WindowedSnac()
+
+        num_frames = 20
+        codes = [(i % 5) + 4096 * (i % 7) for i in range(7 * num_frames)]
+        tokens = [128257] + [128266 + c for c in codes] + [128258]
+        mock_stream_generate.side_effect = lambda *args, **kwargs: (
+            MagicMock(token=t) for t in tokens
+        )
+        mock_tokenizer.from_pretrained.return_value = MagicMock(
+            return_value=MagicMock(input_ids=mx.array([[1, 2, 3]]))
+        )
+
+        model = Model(ModelConfig(**self._default_config))
+
+        full = list(model.generate("Hello", voice="zoe"))
+        self.assertEqual(len(full), 1)
+        self.assertEqual(full[0].samples, num_frames * 2048)
+
+        chunks = list(
+            model.generate("Hello", voice="zoe", stream=True, streaming_interval=0.5)
+        )
+        self.assertGreater(len(chunks), 1)
+        self.assertEqual([c.segment_idx for c in chunks], list(range(len(chunks))))
+        streamed = mx.concatenate([c.audio for c in chunks])
+        self.assertTrue(mx.array_equal(streamed, full[0].audio))
+
+    def test_snac_context_frames(self):
+        """Test the stream context covers the SNAC decoder's receptive field."""
+        from mlx_audio.tts.models.snac_streaming import snac_context_frames
+
+        # 24 kHz decoder: about 9.86 latent steps, 4 to a frame
+        self.assertEqual(snac_context_frames(), 3)
+        self.assertEqual(snac_context_frames(latent_steps_per_frame=1), 10)
+        self.assertEqual(snac_context_frames(decoder_rates=()), 2)
+
     @patch("transformers.LlamaTokenizer")
     def test_sanitize(self, mock_tokenizer):
         """Test sanitize method."""
@@ -790,6 +1212,60 @@ class TestQwen3Model(unittest.TestCase):
         for i, code in enumerate(code_lists[0]):
             self.assertEqual(code, i)
 
+    @patch("mlx_audio.tts.models.qwen3.qwen3.stream_generate")
+    def test_generate_stream(self, mock_stream_generate):
+        """Test streamed chunks add up to the non-streamed audio."""
+        from mlx_audio.codec_registry import _LOADERS, codec_registry
+        from mlx_audio.tts.models.qwen3.qwen3 import (
+            AUDIO_TOKENS_START,
+            END_OF_SPEECH,
+            SNAC_REPO,
+            START_OF_SPEECH,
+            Model,
+            ModelConfig,
+        )
+
+        class PointwiseSnac:
+            # Each sample depends on its own frame only, so windowed decoding
+            # must reproduce the full decode exactly
+            def decode(self, codes):
+                audio = (
+                    mx.repeat(codes[0], 2048, axis=1)
+                    + mx.repeat(codes[1], 1024, axis=1) * 10
+                    + mx.repeat(codes[2], 512, axis=1) * 100
+                )
+                return audio.astype(mx.float32)[..., None]
+
+        self.addCleanup(_LOADERS.pop, "snac", None)
+        self.addCleanup(codec_registry.release, "snac", SNAC_REPO)
+        codec_registry.release("snac", SNAC_REPO)
+        _LOADERS["snac"] = lambda source: PointwiseSnac()
+
+        num_frames = 20
+        codes = [(i % 5) + 4096 * (i % 7) for i in range(7 * num_frames)]
+        tokens = [START_OF_SPEECH] + [AUDIO_TOKENS_START + c for c in codes]
+        tokens.append(END_OF_SPEECH)
+        mock_stream_generate.side_effect = lambda *args, **kwargs: (
+            MagicMock(token=t) for t in tokens
+        )
+
+        model = Model(ModelConfig(**self._default_config))
+        model.tokenizer = MagicMock(
+            return_value=MagicMock(input_ids=mx.array([[1, 2, 3]]))
+        )
+
+        full = list(model.generate("Hello", voice="zoe"))
+        self.assertEqual(len(full), 1)
+        self.assertEqual(full[0].samples, num_frames * 2048)
+
+        chunks = list(
+            model.generate("Hello", voice="zoe", stream=True, streaming_interval=0.5)
+        )
+        self.assertGreater(len(chunks), 1)
+        self.assertEqual([c.segment_idx for c in chunks], list(range(len(chunks))))
+        streamed = mx.concatenate([c.audio for c in chunks])
+        self.assertTrue(mx.array_equal(streamed, full[0].audio))
+
     @patch("transformers.AutoTokenizer")
     def test_sample_rate(self, mock_tokenizer):
         """Test sample_rate property."""
@@ -1211,6 +1687,105 @@ class TestVibeVoiceModel(unittest.TestCase):
         self.assertNotIn("model.prediction_head.t_embedder.mlp.0.weight", sanitized)
         self.assertNotIn("model.prediction_head.adaLN_modulation.1.weight", sanitized)
 
+    def test_sample_speech_tokens_batched(self):
+        """Test batched diffusion sampling matches sampling each row alone."""
+        from mlx_audio.tts.models.vibevoice.vibevoice import Model
+
+        config = self._default_config
+        model = Model(config)
+
+        hidden_size = config.decoder_config.hidden_size
+        condition = mx.random.normal((2, hidden_size))
+        neg_condition = mx.random.normal((2, hidden_size))
+        noise = mx.random.normal((2, config.acoustic_vae_dim))
+
+        batched = model.sample_speech_tokens(
+            condition, neg_condition, cfg_scale=1.5, ddpm_steps=3, noise=noise
+        )
+        rows = [
+            model.sample_speech_tokens(
+                condition[i : i + 1],
+                neg_condition[i : i + 1],
+                cfg_scale=1.5,
+                ddpm_steps=3,
+                noise=noise[i : i + 1],
+            )
+            for i in range(2)
+        ]
+
+        self.assertEqual(batched.shape, (2, config.acoustic_vae_dim))
+        self.assertTrue(mx.allclose(batched, mx.concatenate(rows), atol=1e-5))
+
+        # Timestep tables are computed once per step count
+        scheduler = model.noise_scheduler
+        timesteps = scheduler.timesteps
+        scheduler.set_timesteps(3)
+        self.assertIs(scheduler.timesteps, timesteps)
+        self.assertEqual(list(scheduler._schedules), [3])
+
+    def test_generate_batch_matches_single(self):
+        """Test batched generation samples frames together and matches per-text runs."""
+        from mlx_audio.tts.models.vibevoice.config import (
+            AcousticTokenizerConfig,
+            DiffusionHeadConfig,
+            ModelConfig,
+            Qwen2DecoderConfig,
+        )
+        from mlx_audio.tts.models.vibevoice.vibevoice import Model
+
+        config = ModelConfig(
+            acoustic_tokenizer_config=AcousticTokenizerConfig(
+                vae_dim=8, encoder_n_filters=4, decoder_n_filters=4
+            ),
+            decoder_config=Qwen2DecoderConfig(
+                hidden_size=32,
+                intermediate_size=64,
+                num_attention_heads=2,
+                num_key_value_heads=1,
+                num_hidden_layers=3,
+                vocab_size=64,
+            ),
+            diffusion_head_config=DiffusionHeadConfig(
+                hidden_size=32, head_layers=1, latent_size=8, speech_vae_dim=8
+            ),
+            acoustic_vae_dim=8,
+            tts_backbone_num_hidden_layers=2,
+        )
+        model = Model(config)
+        model.tokenizer = MagicMock()
+        model.tokenizer.encode.side_effect = lambda text, **_: [
+            ord(c) % 64 for c in text
+        ]
+        # Never stop early, so every text runs for max_tokens frames
+        model.tts_eos_classifier.fc2.bias = mx.array([-10.0])
+
+        sample = model.sample_speech_tokens
+        batch_sizes = []
+
+        def zero_noise(condition, neg_condition, **kwargs):
+            batch_sizes.append(condition.shape[0])
+            noise = mx.zeros((condition.shape[0], config.acoustic_vae_dim))
+            return sample(condition, neg_condition, noise=noise, **kwargs)
+
+        texts = ["Hi.", "A longer sentence of text.", "Third one"]
+        with patch.object(model, "sample_speech_tokens", zero_noise):
+            batched = dict(
+                model.generate_batch(texts, max_tokens=8, ddpm_steps=3)
+            )
+            self.assertEqual(batch_sizes, [3] * 8)
+            single = [
+                next(model.generate(text, max_tokens=8, ddpm_steps=3))
+                for text in texts
+            ]
+
+        self.assertEqual(sorted(batched), [0, 1, 2])
+        for index, result in enumerate(single):
+            self.assertEqual(batched[index].token_count, result.token_count)
+            self.assertEqual(batched[index].audio.shape, result.audio.shape)
+            self.assertTrue(
+                mx.allclose(batched[index].audio, result.audio, atol=1e-4)
+            )
+
     def test_config_defaults(self):
         """Test VibeVoiceModel uses correct config defaults."""
         from mlx_audio.tts.models.vibevoice.config import ModelConfig
@@ -1543,5 +2118,200 @@ class TestChatterboxTurboModelAlias(unittest.TestCase):
         self.assertIs(Model, ChatterboxTurboTTS)
 
 
+class TestSesameModel(unittest.TestCase):
+    @staticmethod
+    def _tiny_model():
+        from mlx_audio.tts.models.sesame.sesame import Model
+
+        rope_scaling = {
+            "factor": 32.0,
+            "low_freq_factor": 1.0,
+            "high_freq_factor": 4.0,
+            "original_max_position_embeddings": 8192,
+            "rope_type": "llama3",
+        }
+        llama = {
+            "attention_bias": False,
+            "attention_dropout": 0.0,
+            "head_dim": 8,
+            "hidden_act": "silu",
+            "hidden_size": 32,
+            "initializer_range": 0.02,
+            "intermediate_size": 64,
+            "max_position_embeddings": 2048,
+            "mlp_bias": False,
+            "num_attention_heads": 4,
+            "num_hidden_layers": 2,
+            "num_key_value_heads": 2,
+            "rms_norm_eps": 1e-5,
+            "rope_scaling": rope_scaling,
+            "rope_theta": 500_000,
+            "use_cache": True,
+        }
+        config = {
+            **llama,
+            "model_type": "csm",
+            "backbone_flavor": "llama-1B",
+            "decoder_flavor": "llama-100M",
+            "text_vocab_size": 64,
+            "audio_vocab_size": 16,
+            "audio_num_codebooks": 32,
+            "audio_eos_token_id": 0,
+            "audio_token_id": 0,
+            "bos_token_id": 0,
+            "codebook_eos_token_id": 0,
+            "codebook_pad_token_id": 0,
+            "depth_decoder_config": {
+                **llama,
+                "backbone_hidden_size": 32,
+                "model_type": "csm_depth_decoder_model",
+                "num_codebooks": 32,
+                "vocab_size": 16,
+            },
+            "num_codebooks": 32,
+            "pad_token_id": 0,
+            "tie_codebooks_embeddings": False,
+            "tie_word_embeddings": False,
+            "vocab_size": 64,
+        }
+        sesame = "mlx_audio.tts.models.sesame.sesame"
+        with patch(f"{sesame}.load_llama3_tokenizer"), patch(
+            f"{sesame}.load_watermarker", create=True
+        ):
+            model = Model(config)
+        mx.random.seed(0)
+        model.model.audio_head = 0.1 * mx.random.normal(model.model.audio_head.shape)
+        return model
+
+    def test_prompt_cache(self):
+        """Test restored prompts round-trip and generate like a cold prefill."""
+        model = self._tiny_model()
+        greedy = lambda logits: mx.argmax(logits, axis=-1)
+        audio_mask = (mx.arange(33) < 32)[None, None]
+
+        def generate(tokens, mask, prefilled=0, key=None):
+            # Mirrors the frame loop of Model.generate
+            frames, masks = tokens[None, prefilled:], mask[None, prefilled:]
+            samples = []
+            for _ in range(4):
+                sample = model.model.generate_frame(frames, masks, None, greedy)
+                if key is not None and not samples:
+                    model._store_prompt(key, tokens, mask)
+                samples.append(sample)
+                frame = mx.concatenate([sample, mx.zeros((1, 1), mx.int32)], axis=1)
+                frames, masks = frame[:, None], audio_mask
+            return mx.concatenate(samples).tolist()
+
+        def cold(tokens, mask, key=None):
+            model.model.reset_caches()
+            return generate(tokens, mask, key=key)
+
+        tokens = mx.random.randint(0, 16, (12, 33))
+        mask = mx.ones((12, 33), dtype=mx.bool_)
+        expected = cold(tokens, mask, key="voice")
+        entry = model._prompt_cache["voice"]
+
+        # The last frame is always prefilled again for the next-frame logits
+        self.assertEqual(model._restore_prompt("voice", tokens, mask), 11)
+        for (keys, values), (k, v) in zip(entry.state, model.model.backbone_state()):
+            self.assertTrue(mx.array_equal(keys[..., :11, :], k))
+            self.assertTrue(mx.array_equal(values[..., :11, :], v))
+        self.assertEqual(generate(tokens, mask, 11), expected)
+
+        # A longer prompt with the same prefix only prefills the new frames
+        longer = mx.concatenate([tokens, mx.random.randint(0, 16, (3, 33))])
+        longer_mask = mx.ones((15, 33), dtype=mx.bool_)
+        self.assertEqual(model._restore_prompt("voice", longer, longer_mask), 12)
+        self.assertEqual(generate(longer, longer_mask, 12), cold(longer, longer_mask))
+
+        # Divergent prompts restore up to the first differing frame
+        changed = mx.concatenate([tokens[:5], tokens[5:] + 1])
+        self.assertEqual(model._restore_prompt("voice", changed, mask), 5)
+        self.assertEqual(model._restore_prompt("other", tokens, mask), 0)
+
+    def test_voice_match_prompt_cache(self):
+        """Test voice-matched sentences restore the whole reference segment."""
+        model = self._tiny_model()
+        model._text_tokenizer.encode.side_effect = lambda text, **_: mx.array(
+            [[ord(c) % 64 for c in text]]
+        )
+        restore = model._restore_prompt
+        prompt_frames, restored = [], []
+
+        def spy(key, tokens, mask):
+            prompt_frames.append(tokens.shape[0])
+            restored.append(restore(key, tokens, mask))
+            return restored[-1]
+
+        ref_frames = 5
+        sesame = "mlx_audio.tts.models.sesame.sesame"
+        with patch(
+            f"{sesame}.codec_registry.encode",
+            return_value=mx.ones((1, 32, ref_frames), mx.int32),
+        ), patch.object(model, "_restore_prompt", spy), patch.object(
+            model, "generate_result"
+        ):
+            list(
+                model.generate(
+                    "first sentence\nsecond one",
+                    ref_audio=mx.zeros((1920 * ref_frames,)),
+                    ref_text="reference",
+                    max_audio_length_ms=160,
+                    sampler=lambda logits: mx.argmax(logits, axis=-1),
+                )
+            )
+
+        # [ref text][ref audio, no EOS][sentence text]
+        reference = len("[0]reference") + ref_frames
+        self.assertEqual(
+            prompt_frames,
+            [reference + len("[0]first sentence"), reference + len("[0]second one")],
+        )
+        # The second sentence only prefills its own text after the speaker tag
+        self.assertEqual(restored, [0, reference + len("[0]")])
+
+    def test_streaming_decoder_follows_registry(self):
+        """Test every use looks Mimi up and a reloaded Mimi gets a new decoder."""
+        model = self._tiny_model()
+        sesame = "mlx_audio.tts.models.sesame.sesame"
+        mimi = [object()]
+        with patch(
+            f"{sesame}.get_codec", side_effect=lambda *_: mimi[0]
+        ) as get_codec, patch(
+            f"{sesame}.MimiStreamingDecoder", side_effect=lambda m: MagicMock(mimi=m)
+        ):
+            decoder = model._streaming_decoder
+            self.assertIs(model._streaming_decoder, decoder)
+            mimi[0] = object()
+            self.assertIsNot(model._streaming_decoder, decoder)
+            self.assertIs(model._streaming_decoder.mimi, mimi[0])
+        self.assertEqual(get_codec.call_count, 4)
+
+    def test_prompt_cache_budget(self):
+        """Test prompt states are evicted by size, least recently used first."""
+        model = self._tiny_model()
+        mask = mx.ones((8, 33), dtype=mx.bool_)
+        for key in ("a", "b", "c"):
+            model.model.reset_caches()
+            tokens = mx.random.randint(0, 16, (8, 33))
+            model.model.generate_frame(
+                tokens[None], mask[None], None, lambda x: mx.argmax(x, axis=-1)
+            )
+            model._store_prompt(key, tokens, mask)
+            if key == "a":
+                size = model._prompt_cache["a"].nbytes
+                self.assertGreater(size, 0)
+                model.prompt_cache_bytes = 2 * size
+            if key == "b":
+                model._restore_prompt("a", tokens, mask)  # refreshes "a"
+
+        self.assertEqual(list(model._prompt_cache), ["a", "c"])
+
+        # A state larger than the whole budget is not kept
+        model.prompt_cache_bytes = size - 1
+        model._store_prompt("d", tokens, mask)
+        self.assertEqual(list(model._prompt_cache), [])
+
+
 if __name__ == "__main__":
     unittest.main()
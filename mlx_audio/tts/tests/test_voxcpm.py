@@ -77,6 +77,27 @@ class TestVoxCPM(unittest.TestCase):
         expected_val = 2.0 / (7**0.5)
         self.assertTrue(mx.allclose(w[0, 0, 0], mx.array(expected_val)))
 
+    def test_streaming_decode_matches_full(self):
+        """Chunked AudioVAE decoding reproduces a single full decode."""
+        from mlx_audio.tts.models.voxcpm.audio_vae import AudioVAEStreamingDecoder
+
+        config = AudioVAEConfig(
+            decoder_dim=64, latent_dim=16, decoder_rates=[7, 7, 6, 3, 2]
+        )
+        vae = AudioVAE(config)
+        z = mx.random.normal((1, 60, 16))
+
+        decoder = AudioVAEStreamingDecoder(vae)
+        chunks = [
+            decoder.decode(z[:, i : i + 8], final=i + 8 >= z.shape[1])
+            for i in range(0, z.shape[1], 8)
+        ]
+
+        full = vae.decode(z)
+        streamed = mx.concatenate(chunks, axis=1)
+        self.assertEqual(streamed.shape, full.shape)
+        self.assertTrue(mx.allclose(streamed, full, atol=1e-5))
+
     def test_model_init(self):
         """Test full model initialization with minimal config."""
         from mlx_audio.tts.models.voxcpm import Model, ModelArgs
@@ -131,6 +152,70 @@ class TestVoxCPM(unittest.TestCase):
         emb = model.base_lm.embed_tokens(x)
         self.assertEqual(emb.shape, (1, 3, 64))
 
+    def test_generate_stream(self):
+        """Streamed chunks concatenate to the non-streamed audio."""
+        from unittest.mock import MagicMock
+
+        from mlx_audio.tts.models.voxcpm import Model, ModelArgs
+        from mlx_audio.tts.models.voxcpm.config import (
+            CFMConfig,
+            DiTConfig,
+            EncoderConfig,
+            LMConfig,
+        )
+
+        # Every transformer uses head_dim 16, matching the rope factors
+        args = ModelArgs(
+            lm_config=LMConfig(
+                num_hidden_layers=1,
+                hidden_size=64,
+                num_attention_heads=4,
+                num_key_value_heads=2,
+                intermediate_size=128,
+                rope_long_factor=[1.0] * 8,
+                rope_short_factor=[1.0] * 8,
+            ),
+            encoder_config=EncoderConfig(
+                num_layers=1, hidden_dim=64, ffn_dim=128, num_heads=4
+            ),
+            dit_config=DiTConfig(
+                num_layers=1,
+                hidden_dim=64,
+                ffn_dim=128,
+                num_heads=4,
+                cfm_config=CFMConfig(),
+            ),
+            audio_vae_config=AudioVAEConfig(
+                encoder_rates=[2],
+                decoder_rates=[2],
+                encoder_dim=16,
+                decoder_dim=16,
+                latent_dim=16,
+            ),
+            patch_size=2,
+            feat_dim=16,
+        )
+        model = Model(args)
+        model.tokenizer = MagicMock()
+        model.tokenizer.encode.return_value = [1, 2, 3]
+
+        mx.random.seed(0)
+        (full,) = model.generate("hi", max_tokens=12, inference_timesteps=2)
+        mx.random.seed(0)
+        chunks = list(
+            model.generate(
+                "hi",
+                max_tokens=12,
+                inference_timesteps=2,
+                stream=True,
+                streaming_interval=4 / model.sample_rate,
+            )
+        )
+        self.assertGreater(len(chunks), 1)
+        self.assertEqual([c.segment_idx for c in chunks], list(range(len(chunks))))
+        streamed = mx.concatenate([c.audio for c in chunks])
+        self.assertTrue(mx.allclose(streamed, full.audio, atol=1e-5))
+
 
 if __name__ == "__main__":
     unittest.main()
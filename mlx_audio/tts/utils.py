@@ -9,9 +9,10 @@ from typing import List, Optional, Tuple, Union
 
 import mlx.core as mx
 import mlx.nn as nn
-from huggingface_hub import snapshot_download
 from mlx.utils import tree_flatten
 
+from mlx_audio.snapshot import is_snapshot, load_snapshot
+
 MODEL_REMAPPING = {
     "outetts": "outetts",
     "spark": "spark",
@@ -42,6 +43,8 @@ def get_model_path(path_or_hf_repo: str, revision: Optional[str] = None) -> Path
     model_path = Path(path_or_hf_repo)
 
     if not model_path.exists():
+        from huggingface_hub import snapshot_download
+
         model_path = Path(
             snapshot_download(
                 path_or_hf_repo,
@@ -236,9 +239,14 @@ python -m mlx_audio.tts.convert --hf-path <local_dir> --mlx-path <mlx_dir>
         """
         raise FileNotFoundError(message)
 
+    # Snapshots written by `convert --snapshot` are already sanitized and
+    # quantized, their weights are bound without the passes below
+    snapshot = is_snapshot(model_path)
+
     weights = {}
-    for wf in weight_files:
-        weights.update(mx.load(wf))
+    if not snapshot:
+        for wf in weight_files:
+            weights.update(mx.load(wf))
 
     model_class, model_type = get_model_and_args(
         model_type=model_type, model_name=model_name
@@ -256,32 +264,34 @@ python -m mlx_audio.tts.convert --hf-path <local_dir> --mlx-path <mlx_dir>
         model_config.model_path = model_path
 
     model = model_class.Model(model_config)
-    quantization = config.get("quantization", None)
-    if quantization is None:
-        weights = model.sanitize(weights)
-
-    if (quantization := config.get("quantization", None)) is not None:
-
-        def get_class_predicate(p, m):
-            # Handle custom per layer quantizations
-            if p in config["quantization"]:
-                return config["quantization"][p]
-            if not hasattr(m, "to_quantized"):
-                return False
-            # Skip layers not divisible by 64
-            if hasattr(m, "weight") and m.weight.size % 64 != 0:
-                return False
-            # Handle legacy models which may not have everything quantized
-            return f"{p}.scales" in weights
-
-        nn.quantize(
-            model,
-            group_size=quantization["group_size"],
-            bits=quantization["bits"],
-            class_predicate=get_class_predicate,
-        )
+    if snapshot:
+        load_snapshot(model, model_path, strict=strict)
+    else:
+        if quantization is None:
+            weights = model.sanitize(weights)
+
+        if quantization is not None:
+
+            def get_class_predicate(p, m):
+                # Handle custom per layer quantizations
+                if p in config["quantization"]:
+                    return config["quantization"][p]
+                if not hasattr(m, "to_quantized"):
+                    return False
+                # Skip layers not divisible by 64
+                if hasattr(m, "weight") and m.weight.size % 64 != 0:
+                    return False
+                # Handle legacy models which may not have everything quantized
+                return f"{p}.scales" in weights
+
+            nn.quantize(
+                model,
+                group_size=quantization["group_size"],
+                bits=quantization["bits"],
+                class_predicate=get_class_predicate,
+            )
 
-    model.load_weights(list(weights.items()), strict=strict)
+        model.load_weights(list(weights.items()), strict=strict)
 
     if not lazy:
         mx.eval(model.parameters())